@@ -0,0 +1,671 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from cyrxnopt import OptimizerController
+from cyrxnopt.NestedVenv import NestedVenv
+from cyrxnopt.utilities.runtime.resources import thread_worker
+from cyrxnopt.utilities.runtime.workers import worker_context
+
+logger = logging.getLogger(__name__)
+
+
+class CampaignScheduler:
+    """Runs the optimizer calls of many campaigns on a pool of workers.
+
+    A campaign is one optimization with its own experiment directory,
+    optimizer, environment, and config, registered with
+    :py:meth:`add_campaign`. Its calls are queued with :py:meth:`set_config`,
+    :py:meth:`train`, and :py:meth:`predict`, which return futures right
+    away. The calls of a campaign run one at a time, in the order they were
+    queued.
+
+    Each campaign is served by one worker, so state the controller keeps
+    between calls, such as prefetched suggestions, stays with it. By
+    default, workers are processes that activate the environment of their
+    campaigns once and keep optimizers loaded, and each environment gets
+    workers of its own. Campaigns go to a new worker until the pool is full,
+    then to the worker of their environment serving the fewest campaigns.
+    Worker processes are started fresh rather than forked, see
+    :py:func:`~cyrxnopt.utilities.runtime.workers.worker_context`, and a
+    worker stops once its last campaign is removed.
+
+    When a worker is free, it runs the next call of its campaigns with the
+    highest priority. Campaigns with the same priority share the worker in
+    proportion to their weights, so a busy campaign does not hold up the
+    others. :py:meth:`stats` reports the queue depth and the latency of each
+    campaign.
+    """
+
+    def __init__(
+        self, max_workers: Optional[int] = None, processes: bool = True
+    ) -> None:
+        """Creates a scheduler. Workers are started as campaigns are added.
+
+        :param max_workers: Size of the pool, defaults to the number of CPUs.
+            Every environment gets at least one worker, even past this size.
+        :type max_workers: Optional[int], optional
+        :param processes: Whether workers are processes (True) or threads of
+            this process (False), which only suits campaigns whose
+            environment is already active and whose resource limits apply
+            per thread, see
+            :py:func:`~cyrxnopt.utilities.runtime.resources.thread_worker`,
+            defaults to True
+        :type processes: bool, optional
+        """
+
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._processes = processes
+        self._condition = threading.Condition()
+        self._campaigns: dict[str, _Campaign] = {}
+        self._workers: list[_Worker] = []
+        self._retired: list[_Worker] = []
+        self._closed = False
+
+    def __enter__(self) -> "CampaignScheduler":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add_campaign(
+        self,
+        name: str,
+        optimizer_name: str,
+        venv: NestedVenv,
+        experiment_dir: str,
+        config: dict[str, Any],
+        priority: int = 0,
+        weight: float = 1.0,
+    ) -> None:
+        """Registers a campaign.
+
+        :param name: Name of the campaign, used to queue its calls
+        :type name: str
+        :param optimizer_name: Name of the optimizer algorithm
+        :type optimizer_name: str
+        :param venv: Environment containing the optimizer installation
+        :type venv: NestedVenv
+        :param experiment_dir: Output directory of the campaign
+        :type experiment_dir: str
+        :param config: Optimizer configuration
+        :type config: dict[str, Any]
+        :param priority: Campaigns with a higher priority are served first,
+            defaults to 0
+        :type priority: int, optional
+        :param weight: Share of its worker relative to the campaigns with the
+            same priority, defaults to 1.0
+        :type weight: float, optional
+        :raises RuntimeError: The scheduler is closed, a campaign with this
+            name exists, or the weight is not positive
+        """
+
+        if weight <= 0:
+            raise RuntimeError("Campaign weights must be positive")
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The scheduler is closed")
+            if name in self._campaigns:
+                raise RuntimeError(
+                    "A campaign named {} already exists".format(name)
+                )
+
+            worker = self._assign_worker(venv)
+            self._campaigns[name] = _Campaign(
+                name,
+                optimizer_name,
+                venv,
+                str(experiment_dir),
+                config,
+                priority,
+                weight,
+                worker,
+            )
+            worker.campaigns.append(name)
+
+    def remove_campaign(self, name: str) -> None:
+        """Unregisters a campaign. Its queued calls are cancelled, and a
+        call that is running finishes. A worker left without campaigns stops
+        after that call, along with its process.
+
+        :param name: Name of the campaign
+        :type name: str
+        :raises RuntimeError: There is no campaign with this name
+        """
+
+        with self._condition:
+            campaign = self._campaign(name)
+            del self._campaigns[name]
+            worker = campaign.worker
+            worker.campaigns.remove(name)
+
+            while campaign.queue:
+                campaign.queue.popleft().future.cancel()
+
+            # Idle workers would keep their process and optimizers loaded
+            if not worker.campaigns:
+                self._workers.remove(worker)
+                self._retired = [w for w in self._retired if w.is_alive()]
+                self._retired.append(worker)
+                worker.retired = True
+                self._condition.notify_all()
+
+    def set_config(self, name: str, **kwargs: Any) -> "Future[None]":
+        """Queues setting the config of a campaign, see
+        :py:func:`cyrxnopt.OptimizerController.set_config`.
+
+        :param name: Name of the campaign
+        :type name: str
+        :param kwargs: Other arguments of the call, such as ``resources``
+        :type kwargs: Any
+        :return: Future of the call
+        :rtype: Future[None]
+        """
+
+        return self._submit(name, "set_config", (), kwargs)
+
+    def train(
+        self, name: str, prev_param: list[Any], yield_value: Any, **kwargs: Any
+    ) -> "Future[list[Any]]":
+        """Queues a training step of a campaign, see
+        :py:func:`cyrxnopt.OptimizerController.train`.
+
+        :param name: Name of the campaign
+        :type name: str
+        :param prev_param: Previous suggested reaction conditions
+        :type prev_param: list[Any]
+        :param yield_value: Yield value from previous reaction conditions
+        :type yield_value: Any
+        :param kwargs: Other arguments of the call, such as ``obj_func``
+        :type kwargs: Any
+        :return: Future of the next suggested conditions
+        :rtype: Future[list[Any]]
+        """
+
+        return self._submit(name, "train", (prev_param, yield_value), kwargs)
+
+    def predict(
+        self, name: str, prev_param: list[Any], yield_value: Any, **kwargs: Any
+    ) -> "Future[list[Any]]":
+        """Queues giving a result to a campaign and getting its next
+        suggestion, see :py:func:`cyrxnopt.OptimizerController.predict`.
+
+        :param name: Name of the campaign
+        :type name: str
+        :param prev_param: Conditions of the previous experiment
+        :type prev_param: list[Any]
+        :param yield_value: Result of the previous experiment
+        :type yield_value: Any
+        :param kwargs: Other arguments of the call, such as ``deadline``
+        :type kwargs: Any
+        :return: Future of the next suggested conditions
+        :rtype: Future[list[Any]]
+        """
+
+        return self._submit(name, "predict", (prev_param, yield_value), kwargs)
+
+    def stats(self) -> dict[str, Any]:
+        """Reports the load of the scheduler.
+
+        Latencies are measured from when a call is queued: ``"mean_wait"``
+        until it starts, and ``"mean_latency"`` and ``"max_latency"`` until
+        it finishes, in seconds, over the finished calls.
+
+        :return: Total number of queued and running calls, number of
+            workers, and the queued calls, running state, finished and
+            failed calls, and latencies of each campaign
+        :rtype: dict[str, Any]
+        """
+
+        with self._condition:
+            campaigns = {}
+            for name, campaign in self._campaigns.items():
+                n_done = campaign.completed + campaign.failed
+                campaigns[name] = {
+                    "queued": len(campaign.queue),
+                    "running": campaign.running,
+                    "completed": campaign.completed,
+                    "failed": campaign.failed,
+                    "mean_wait": campaign.total_wait / max(n_done, 1),
+                    "mean_latency": campaign.total_latency / max(n_done, 1),
+                    "max_latency": campaign.max_latency,
+                    "worker": self._workers.index(campaign.worker),
+                }
+
+            return {
+                "queue_depth": sum(c["queued"] for c in campaigns.values()),
+                "running": sum(c["running"] for c in campaigns.values()),
+                "workers": len(self._workers),
+                "campaigns": campaigns,
+            }
+
+    def close(self, wait: bool = True) -> None:
+        """Stops the workers. Queued calls are cancelled.
+
+        :param wait: Whether to wait for running calls to finish, defaults to
+            True
+        :type wait: bool, optional
+        """
+
+        with self._condition:
+            if self._closed:
+                return
+
+            self._closed = True
+            for campaign in self._campaigns.values():
+                while campaign.queue:
+                    campaign.queue.popleft().future.cancel()
+            self._condition.notify_all()
+
+        for worker in self._workers:
+            worker.stop(wait)
+
+        # Retired workers stop their process themselves
+        if wait:
+            for worker in self._retired:
+                worker.stop(wait)
+
+    def _submit(
+        self,
+        name: str,
+        call: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> "Future[Any]":
+        """Queues a controller call for a campaign.
+
+        :param name: Name of the campaign
+        :type name: str
+        :param call: Name of the controller function
+        :type call: str
+        :param args: Arguments following the campaign's optimizer name and
+            environment
+        :type args: tuple[Any, ...]
+        :param kwargs: Keyword arguments of the function
+        :type kwargs: dict[str, Any]
+        :raises RuntimeError: The scheduler is closed, or there is no
+            campaign with this name
+        :return: Future of the call
+        :rtype: Future[Any]
+        """
+
+        future: "Future[Any]" = Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The scheduler is closed")
+
+            campaign = self._campaign(name)
+
+            # A campaign that was idle starts level with the others, so it
+            # does not catch up on the time it did not use
+            if not campaign.queue and not campaign.running:
+                campaign.virtual_time = max(
+                    campaign.virtual_time, campaign.worker.virtual_time
+                )
+
+            campaign.queue.append(
+                _Request(call, args, kwargs, future, time.perf_counter())
+            )
+            self._condition.notify_all()
+
+        return future
+
+    def _campaign(self, name: str) -> "_Campaign":
+        """Gets a registered campaign.
+
+        :param name: Name of the campaign
+        :type name: str
+        :raises RuntimeError: There is no campaign with this name
+        :return: Campaign
+        :rtype: _Campaign
+        """
+
+        campaign = self._campaigns.get(name)
+        if campaign is None:
+            raise RuntimeError("There is no campaign named {}".format(name))
+
+        return campaign
+
+    def _assign_worker(self, venv: Optional[NestedVenv]) -> "_Worker":
+        """Picks the worker for a new campaign, starting one if the pool is
+        not full or the environment has none.
+
+        :param venv: Environment of the campaign
+        :type venv: Optional[NestedVenv]
+        :return: Worker
+        :rtype: _Worker
+        """
+
+        key = None if venv is None else str(venv.prefix)
+        candidates = [w for w in self._workers if w.venv_key == key]
+
+        if len(candidates) == 0 or len(self._workers) < self._max_workers:
+            worker = _Worker(self, venv, key, self._processes)
+            self._workers.append(worker)
+            return worker
+
+        return min(candidates, key=lambda w: len(w.campaigns))
+
+    def _next_request(
+        self, worker: "_Worker"
+    ) -> Optional[tuple["_Campaign", "_Request"]]:
+        """Waits for the next call a worker should run.
+
+        :param worker: Worker asking for a call
+        :type worker: _Worker
+        :return: Campaign and call, None once the scheduler is closed
+        :rtype: Optional[tuple[_Campaign, _Request]]
+        """
+
+        with self._condition:
+            while True:
+                if self._closed or worker.retired:
+                    return None
+
+                ready = [
+                    self._campaigns[name]
+                    for name in worker.campaigns
+                    if self._campaigns[name].queue
+                ]
+                if ready:
+                    campaign = min(
+                        ready, key=lambda c: (-c.priority, c.virtual_time)
+                    )
+                    request = campaign.queue.popleft()
+                    if not request.future.set_running_or_notify_cancel():
+                        continue
+
+                    worker.virtual_time = campaign.virtual_time
+                    campaign.virtual_time += 1.0 / campaign.weight
+                    campaign.running = True
+                    return campaign, request
+
+                self._condition.wait()
+
+    def _finish(
+        self, campaign: "_Campaign", request: "_Request", started: float
+    ) -> None:
+        """Records a finished call.
+
+        :param campaign: Campaign of the call
+        :type campaign: _Campaign
+        :param request: Finished call
+        :type request: _Request
+        :param started: Time the call started running
+        :type started: float
+        """
+
+        latency = time.perf_counter() - request.submitted
+
+        with self._condition:
+            campaign.running = False
+            if request.future.exception() is None:
+                campaign.completed += 1
+            else:
+                campaign.failed += 1
+            campaign.total_wait += started - request.submitted
+            campaign.total_latency += latency
+            campaign.max_latency = max(campaign.max_latency, latency)
+
+
+class _Request:
+    """Queued controller call."""
+
+    def __init__(
+        self,
+        call: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+        future: "Future[Any]",
+        submitted: float,
+    ) -> None:
+        self.call = call
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.submitted = submitted
+
+
+class _Campaign:
+    """Registered campaign with its queue and statistics."""
+
+    def __init__(
+        self,
+        name: str,
+        optimizer_name: str,
+        venv: NestedVenv,
+        experiment_dir: str,
+        config: dict[str, Any],
+        priority: int,
+        weight: float,
+        worker: "_Worker",
+    ) -> None:
+        self.name = name
+        self.optimizer_name = optimizer_name
+        self.venv = venv
+        self.experiment_dir = experiment_dir
+        self.config = config
+        self.priority = priority
+        self.weight = weight
+        self.worker = worker
+
+        self.queue: deque[_Request] = deque()
+        self.running = False
+        self.virtual_time = 0.0
+
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def arguments(self, request: _Request) -> tuple[Any, ...]:
+        """Gets the positional arguments of a controller call.
+
+        :param request: Queued call
+        :type request: _Request
+        :return: Arguments in the order of the controller function
+        :rtype: tuple[Any, ...]
+        """
+
+        if request.call == "set_config":
+            return (
+                self.optimizer_name,
+                self.venv,
+                self.config,
+                self.experiment_dir,
+            )
+
+        return (
+            self.optimizer_name,
+            self.venv,
+            *request.args,
+            self.experiment_dir,
+            self.config,
+        )
+
+
+class _Worker:
+    """Thread running the calls of its campaigns, in a process of its own
+    when the scheduler uses processes."""
+
+    def __init__(
+        self,
+        scheduler: CampaignScheduler,
+        venv: Optional[NestedVenv],
+        venv_key: Optional[str],
+        processes: bool,
+    ) -> None:
+        self.venv = venv
+        self.venv_key = venv_key
+        self.campaigns: list[str] = []
+        self.virtual_time = 0.0
+        self.retired = False
+
+        self._scheduler = scheduler
+        self._processes = processes
+        self._process: Any = None
+        self._connection: Any = None
+
+        self._thread = threading.Thread(
+            target=self._run, name="cyrxnopt-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool) -> None:
+        """Stops the worker once its running call is done.
+
+        :param wait: Whether to wait for the running call
+        :type wait: bool
+        """
+
+        if wait:
+            self._thread.join()
+
+        if self._process is not None:
+            if wait:
+                self._stop_process()
+            else:
+                self._process.terminate()
+
+    def is_alive(self) -> bool:
+        """Checks whether the worker still runs calls or stops its process.
+
+        :return: Whether the worker's thread is running
+        :rtype: bool
+        """
+
+        return self._thread.is_alive()
+
+    def _run(self) -> None:
+        """Runs calls until the scheduler is closed or the worker is
+        retired."""
+
+        while True:
+            item = self._scheduler._next_request(self)
+            if item is None:
+                break
+
+            campaign, request = item
+            started = time.perf_counter()
+            try:
+                result = self._call(
+                    request.call,
+                    campaign.arguments(request),
+                    request.kwargs,
+                )
+            except Exception as e:
+                request.future.set_exception(e)
+            else:
+                request.future.set_result(result)
+
+            self._scheduler._finish(campaign, request, started)
+
+        # Nothing waits for a retired worker, so it stops its own process
+        if self.retired and self._process is not None:
+            self._stop_process()
+
+    def _call(
+        self, call: str, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> Any:
+        """Runs a controller call, in the worker process if there is one.
+
+        :param call: Name of the controller function
+        :type call: str
+        :param args: Positional arguments of the function
+        :type args: tuple[Any, ...]
+        :param kwargs: Keyword arguments of the function
+        :type kwargs: dict[str, Any]
+        :raises RuntimeError: The worker process died during the call
+        :return: Value returned by the function
+        :rtype: Any
+        """
+
+        if not self._processes:
+            # Resource budgets can only apply per thread here
+            with thread_worker():
+                return getattr(OptimizerController, call)(*args, **kwargs)
+
+        if self._process is None or not self._process.is_alive():
+            self._start_process()
+
+        try:
+            self._connection.send((call, args, kwargs))
+            succeeded, value = self._connection.recv()
+        except (EOFError, OSError) as e:
+            self._process = None
+            raise RuntimeError(
+                "Worker process died during {}".format(call)
+            ) from e
+
+        if not succeeded:
+            raise value
+
+        return value
+
+    def _stop_process(self) -> None:
+        """Asks the worker process to exit and waits for it."""
+
+        if self._process.is_alive():
+            self._connection.send(None)
+        self._process.join()
+        self._process = None
+
+    def _start_process(self) -> None:
+        """Starts the worker process and its environment."""
+
+        context = worker_context()
+        self._connection, child = context.Pipe()
+        self._process = context.Process(
+            target=_worker_main,
+            args=(child, self.venv),
+            name="cyrxnopt-worker",
+            # Otherwise exiting would wait for the worker, which waits for
+            # calls
+            daemon=True,
+        )
+        self._process.start()
+        child.close()
+
+
+def _worker_main(connection: Any, venv: Optional[NestedVenv]) -> None:
+    """Entry point of worker processes, running controller calls until it
+    receives None.
+
+    :param connection: Connection receiving calls and sending back whether
+        they succeeded and their result or exception
+    :type connection: multiprocessing.connection.Connection
+    :param venv: Environment to activate first, if any
+    :type venv: Optional[NestedVenv]
+    """
+
+    if venv is not None and not venv.is_active():
+        venv.activate()
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+
+        call, args, kwargs = message
+        try:
+            outcome = (
+                True,
+                getattr(OptimizerController, call)(*args, **kwargs),
+            )
+        except Exception as e:
+            outcome = (False, e)
+
+        try:
+            connection.send(outcome)
+        except Exception as e:
+            # The result or the exception could not be pickled
+            connection.send((False, RuntimeError(repr(e))))
+
+    connection.close()
@@ -1,11 +1,25 @@
+import copy
+import csv
 import logging
+import math
 import os
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 from typing import Any, Optional
 
 from cyrxnopt.NestedVenv import NestedVenv
 from cyrxnopt.OptimizerABC import OptimizerABC
-from cyrxnopt.utilities.config.transforms import use_subkeys
+from cyrxnopt.utilities.config.feature_space import feature_space
+from cyrxnopt.utilities.config.grid import (
+    coarse_grid_axes,
+    coarse_grid_strides,
+    grid_indices_to_values,
+    iter_grid_chunks,
+    trust_region_axes,
+)
+from cyrxnopt.utilities.config.transforms import read_only, use_subkeys
+from cyrxnopt.utilities.experiment.file_cache import AppendOnlyFileCache
+from cyrxnopt.utilities.experiment.performed_index import PerformedIndex
+from cyrxnopt.utilities.runtime.workers import check_cancelled
 
 logger = logging.getLogger(__name__)
 
@@ -23,12 +37,31 @@ class OptimizerAmlro(OptimizerABC):
     def __init__(self, venv: NestedVenv) -> None:
         """Optimizer class for the AMLRO package.
 
+        Reusing one instance for every call in an experiment acts as a
+        session: the tables and config transforms CyRxnOpt needs are loaded
+        once and kept in memory. Files are only reread when their modification
+        time or size shows they changed, and files that only grew, like the
+        training sets AMLRO appends to, only have their new lines read.
+        :py:mod:`~cyrxnopt.OptimizerController` keeps one instance for each
+        experiment when the config sets ``"session"``. AMLRO's own functions
+        are given file paths, so they still read the files themselves.
+
         :param venv: Virtual environment to install the optimizer
         :type venv: NestedVenv
         """
 
         super().__init__(venv)
 
+        # Session caches, see _use_subkeys(), _read_table(), _read_lines(),
+        # and _load_performed_index()
+        self._subkey_config: Optional[tuple[dict[str, Any], dict[str, Any]]]
+        self._subkey_config = None
+        self._tables: dict[str, tuple[tuple[int, int], Any]] = {}
+        self._line_caches: dict[str, AppendOnlyFileCache] = {}
+        self._performed_indices: dict[
+            str, tuple[dict[str, Any], PerformedIndex]
+        ] = {}
+
     def get_config(self) -> list[dict[str, Any]]:
         """Gets the configuration options available for this optimizer.
 
@@ -82,6 +115,66 @@ class OptimizerAmlro(OptimizerABC):
                 "value": "min",
                 "range": ["min", "max"],
             },
+            {
+                "name": "constraints",
+                "type": "list[str]",
+                "value": [],
+                "description": (
+                    "Expressions over the feature names, such as "
+                    "'f1 + f2 <= 1' or 'f3 != \"a\"'. Conditions where any "
+                    "expression is false are excluded from the grid."
+                ),
+            },
+            {
+                "name": "grid_chunk_size",
+                "type": "int",
+                "value": 100000,
+                "description": (
+                    "Number of grid rows generated and written at a time. "
+                    "Lower values reduce peak memory use for large grids."
+                ),
+            },
+            {
+                "name": "grid_mode",
+                "type": "str",
+                "value": "full",
+                "range": ["full", "adaptive"],
+                "description": (
+                    "'full' searches every point of the grid. 'adaptive' "
+                    "starts from a coarse grid and adds points at the "
+                    "configured resolution only in trust regions around the "
+                    "best results, so the number of candidates stays about "
+                    "the same regardless of the resolution."
+                ),
+            },
+            {
+                "name": "coarse_grid_points",
+                "type": "int",
+                "value": 5,
+                "description": (
+                    "Adaptive mode only. Points along each continuous "
+                    "feature in the coarse grid."
+                ),
+            },
+            {
+                "name": "trust_region_count",
+                "type": "int",
+                "value": 3,
+                "description": (
+                    "Adaptive mode only. Number of best results to refine "
+                    "the grid around."
+                ),
+            },
+            {
+                "name": "trust_region_points",
+                "type": "int",
+                "value": 5,
+                "description": (
+                    "Adaptive mode only. Points on each side of a best "
+                    "result along each continuous feature of its trust "
+                    "region."
+                ),
+            },
         ]
         # TODO: Budget should be constrained to numbers greater than
         #       zero once that format is solidified.
@@ -110,34 +203,26 @@ class OptimizerAmlro(OptimizerABC):
         if not os.path.exists(experiment_dir):
             os.makedirs(experiment_dir)
 
-        full_combo_list = self._imports[
-            "generate_combos"
-        ].generate_uniform_grid(use_subkeys(config))
-
-        full_combo_list = self._imports["np"].around(
-            full_combo_list, decimals=4
-        )
-        full_combo_df = self._imports["pd"].DataFrame(full_combo_list)
-        training_combo_df = full_combo_df.sample(20)
-
-        if bool(config["categorical_feature_names"]):
-            feature_names_list = self._imports["np"].concatenate(
-                (
-                    config["continuous_feature_names"],
-                    config["categorical_feature_names"],
-                )
-            )
-        else:
-            feature_names_list = config["continuous_feature_names"]
-
-        full_combo_df.columns = feature_names_list
+        feature_names_list = list(config.get("continuous_feature_names", []))
+        feature_names_list.extend(config.get("categorical_feature_names", []))
 
         full_combo_path = os.path.join(experiment_dir, "full_combo_file.txt")
         training_combo_path = os.path.join(
             experiment_dir, "training_combo_file.txt"
         )
 
-        full_combo_df.to_csv(full_combo_path, index=False)
+        # Adaptive mode starts from a coarse grid, which is refined around
+        # the best results during prediction
+        axes = None
+        if config.get("grid_mode", "full") == "adaptive":
+            axes = coarse_grid_axes(config, config.get("coarse_grid_points", 5))
+
+        index_chunks = iter_grid_chunks(
+            config, config.get("grid_chunk_size", 100000), axes
+        )
+        training_combo_df = self._write_full_combos(
+            full_combo_path, feature_names_list, index_chunks, config
+        )
         training_combo_df.to_csv(training_combo_path, index=False)
 
         training_set_path = os.path.join(
@@ -157,6 +242,9 @@ class OptimizerAmlro(OptimizerABC):
             feature_names = ",".join([str(elem) for elem in feature_names_list])
             file_object.write(feature_names + ",Yield" + "\n")
 
+        # Start a fresh index of performed conditions for this experiment
+        PerformedIndex(experiment_dir, config).clear()
+
     def train(
         self,
         prev_param: list[Any],
@@ -179,6 +267,12 @@ class OptimizerAmlro(OptimizerABC):
         another :py:meth:`~OptimizerAmlro.train` or a subsequent
         :py:meth:`~OptimizerAmlro.predict` call are made afterward!
 
+        Performed conditions are tracked in a persistent index in the
+        experiment directory (see
+        :py:class:`~cyrxnopt.utilities.experiment.performed_index.PerformedIndex`),
+        so the next suggestion is always the first training combo that has not
+        been performed yet, regardless of the order they were performed in.
+
         :param prev_param: Experimental parameter combination from the previous
             experiment, provide an empty list for the first call
         :type prev_param: list[Any]
@@ -212,27 +306,37 @@ class OptimizerAmlro(OptimizerABC):
         if config["direction"].lower() == "min":
             yield_value = -yield_value
 
-        # Determine next training row to perform
-        training_combos = self._imports["pd"].read_csv(training_combo_path)
-        training_set = self._imports["pd"].read_csv(training_set_path)
-        next_index = self._get_next_training_index_by_length(
-            training_combos, training_set
+        performed = self._load_performed_index(experiment_dir, config)
+        recording = [prev_param] if len(prev_param) > 0 else []
+
+        # The previous conditions are recorded by AMLRO during this call, so
+        # they count as performed when choosing the next combo, but only go
+        # into the index once AMLRO recorded them. The next combo is the
+        # first one not performed, which stays correct even if training
+        # experiments were performed out of order.
+        training_combos = self._read_table(training_combo_path)
+        next_index = self._get_next_training_index_by_hash(
+            training_combos, performed, recording
         )
-        # NOTE: Not used due to bug in amlo that causes training_set_file.txt
-        # to have the decoded feature headers, so training_set_file.txt and
-        # training_combo_file.txt will never have the prerequisite matching
-        # column headers.
-        # next_index = self._get_next_training_index_next_combo(
-        #     training_combos, training_set
-        # )
 
         # Exit early if all training points have already been performed
         if next_index == -1:
-            return []
+            # The final training result still needs to be recorded. AMLRO
+            # only records it while looking up a training combo, so look up
+            # the last one and discard it.
+            if len(prev_param) > 0:
+                self._imports["training_set_generator"].generate_training_data(
+                    training_set_path,
+                    training_set_decoded_path,
+                    training_combo_path,
+                    self._use_subkeys(config),
+                    prev_param,
+                    yield_value,
+                    len(training_combos.index) - 1,
+                )
+                performed.extend(recording)
 
-        # Workaround to avoid being stuck at the first parameter
-        if len(prev_param) > 0:
-            next_index += 1
+            return []
 
         # training step
         next_parameters = self._imports[
@@ -241,11 +345,12 @@ class OptimizerAmlro(OptimizerABC):
             training_set_path,
             training_set_decoded_path,
             training_combo_path,
-            use_subkeys(config),
+            self._use_subkeys(config),
             prev_param,
             yield_value,
             next_index,
         )
+        performed.extend(recording)
 
         return next_parameters
 
@@ -299,16 +404,28 @@ class OptimizerAmlro(OptimizerABC):
         if config["direction"].lower() == "min":
             yield_value = -yield_value
 
+        if config.get("grid_mode", "full") == "adaptive":
+            self._write_refined_combos(
+                experiment_dir, config, prev_param, yield_value
+            )
+
+        # A cancelled call stops before the prediction step, which is also
+        # where AMLRO records the previous result
+        check_cancelled()
+
         # prediction step
         best_combo = self._imports["optimizer_main"].get_optimized_parameters(
             training_set_path,
             training_set_decoded_path,
             full_combo_path,
-            use_subkeys(config),
+            self._use_subkeys(config),
             prev_param,
             yield_value,
         )
 
+        if len(prev_param) > 0:
+            self._load_performed_index(experiment_dir, config).add(prev_param)
+
         return best_combo
 
     def _import_deps(self) -> None:
@@ -317,14 +434,12 @@ class OptimizerAmlro(OptimizerABC):
         import numpy as np  # type: ignore
         import pandas as pd  # type: ignore
         from amlro import (  # type: ignore
-            generate_combos,
             optimizer,
             optimizer_main,
             training_set_generator,
         )
 
         self._imports = {
-            "generate_combos": generate_combos,
             "training_set_generator": training_set_generator,
             "optimizer": optimizer,
             "optimizer_main": optimizer_main,
@@ -332,86 +447,377 @@ class OptimizerAmlro(OptimizerABC):
             "pd": pd,
         }
 
-    def _get_next_training_index_by_length(  # type: ignore
-        self, training_combos, training_dataset
-    ) -> int:
-        """Gets the index for the next training condition to be performed.
+    def _write_full_combos(  # type: ignore
+        self,
+        full_combo_path: str,
+        feature_names: list[str],
+        index_chunks: Iterable[Any],
+        config: dict[str, Any],
+        n_training: int = 20,
+    ):
+        """Streams a grid of conditions to the full combo file and samples
+        training combos from it.
+
+        The grid is written by :py:meth:`_write_combos`. The training combos
+        are drawn while streaming by keeping the rows with the smallest
+        random keys, which gives a uniform sample of the feasible rows
+        without a second pass.
+
+        :param full_combo_path: Path of the full combo file to write
+        :type full_combo_path: str
+        :param feature_names: Column headers, continuous features first
+        :type feature_names: list[str]
+        :param index_chunks: Chunks of grid indices to write, such as those
+            from :py:func:`~cyrxnopt.utilities.config.grid.iter_grid_chunks`
+        :type index_chunks: Iterable[np.ndarray]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param n_training: Number of training combos to sample, defaults to 20
+        :type n_training: int, optional
 
-        This is implemented by a simple check on the dataset length. It is
-        assumed that the only rows present in the dataset are those from the
-        training combo list. This means that if the dataset has 6 rows, then
-        the index of the next training combo to perform is also 6.
+        :returns: Training combos sampled from the feasible grid rows
+        :rtype: pd.DataFrame
+        """
 
-        :param training_combos: Training conditions suggested by AMLRO
-        :type training_combos: pd.DataFrame
-        :param training_dataset: Current dataset of performed reactions used to
-                                 train AMLRO
-        :type training_dataset: pd.DataFrame
+        np = self._imports["np"]
+        pd = self._imports["pd"]
 
-        :returns: Index in the training combo list of the next conditions
-                  missing from the training dataset. An index of -1 is returned
-                  if the dataset is longer than the training combo list.
-        :rtype: int
+        rng = np.random.default_rng()
+        sample_keys = np.empty(0)
+        sample_indices = np.empty((0, len(feature_names)), dtype=np.uint8)
+
+        def sample(indices):  # type: ignore
+            nonlocal sample_keys, sample_indices
+
+            # Keep the chunk rows with the smallest keys, then merge them
+            # with the current sample. The sample is kept as compact grid
+            # indices and only converted to values once it is final.
+            keys = rng.random(len(indices))
+            if len(indices) > n_training:
+                smallest = np.argpartition(keys, n_training)[:n_training]
+                keys, indices = keys[smallest], indices[smallest]
+
+            sample_indices = np.concatenate((sample_indices, indices))
+            sample_keys = np.concatenate((sample_keys, keys))
+            order = np.argsort(sample_keys)[:n_training]
+            sample_keys = sample_keys[order]
+            sample_indices = sample_indices[order]
+
+        self._write_combos(
+            full_combo_path, feature_names, index_chunks, config, sample
+        )
+
+        return pd.DataFrame(
+            grid_indices_to_values(sample_indices, config),
+            columns=feature_names,
+        )
+
+    def _write_combos(
+        self,
+        full_combo_path: str,
+        feature_names: list[str],
+        index_chunks: Iterable[Any],
+        config: dict[str, Any],
+        on_chunk: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        """Streams a grid of conditions to the full combo file.
+
+        The grid is filtered by the ``constraints`` config option and written
+        one chunk of grid indices at a time, so only one chunk is held in
+        memory at once.
+
+        :param full_combo_path: Path of the full combo file to write
+        :type full_combo_path: str
+        :param feature_names: Column headers, continuous features first
+        :type feature_names: list[str]
+        :param index_chunks: Chunks of grid indices to write, such as those
+            from :py:func:`~cyrxnopt.utilities.config.grid.iter_grid_chunks`
+        :type index_chunks: Iterable[np.ndarray]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param on_chunk: Called with the grid indices of the feasible rows of
+            each chunk once they are written, defaults to None
+        :type on_chunk: Optional[Callable[[np.ndarray], None]], optional
         """
 
-        # Get the row counts of the training combos and dataset
-        combo_rows = len(training_combos.index)
-        dataset_rows = len(training_dataset.index)
-        print(f"DEBUG combo_rows, dataset_rows : {combo_rows}, {dataset_rows}")
+        pd = self._imports["pd"]
 
-        # Simple check assuming the dataset only contains the training combos
-        # that have been run
-        if dataset_rows >= combo_rows:
-            # No more training points to run
-            return -1
+        with open(full_combo_path, "w", newline="") as fout:
+            fout.write(",".join(feature_names) + "\n")
 
-        # The row count of the dataset will be the next index in the combo
-        # list due to zero indexing
-        return dataset_rows
+            for indices in index_chunks:
+                chunk = grid_indices_to_values(indices, config)
+                feasible = self._feasible_mask(chunk, feature_names, config)
 
-    def _get_next_training_index_next_combo(  # type: ignore
-        self, training_combos, training_dataset
-    ) -> int:
-        """Gets the index for the next training condition to be performed.
+                pd.DataFrame(chunk[feasible]).to_csv(
+                    fout, header=False, index=False
+                )
 
-        This is implemented by checking which training conditions are missing
-        in the training dataset, then giving the index in the training condition
-        list for the first missing condition. Importantly, this means that a
-        training dataset with the correct number of entries, but none matching
-        the training combo file, will still receive indices and not be
-        considered "completed" yet.
+                if on_chunk is not None:
+                    on_chunk(indices[feasible])
 
-        :param training_combos: Training conditions suggested by AMLRO
-        :type training_combos: pd.DataFrame
-        :param training_dataset: Current dataset of performed reactions used to
-                                 train AMLRO
-        :type training_dataset: pd.DataFrame
+    def _write_refined_combos(
+        self,
+        experiment_dir: str,
+        config: dict[str, Any],
+        prev_param: list[Any],
+        yield_value: float,
+    ) -> None:
+        """Rewrites the full combo file with a refined grid for adaptive mode.
+
+        The new candidates are the coarse grid from
+        :py:meth:`~OptimizerAmlro.set_config` plus trust regions around the
+        ``trust_region_count`` best results so far. Each trust region starts
+        one coarse grid step wide and halves with every prediction round
+        until its points are at the configured resolution. Because each
+        region has at most ``trust_region_points`` points on either side of
+        its center, the candidate count stays about the same from round to
+        round.
+
+        :param experiment_dir: Experiment directory with the AMLRO files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param prev_param: Conditions of the result not yet recorded by AMLRO
+        :type prev_param: list[Any]
+        :param yield_value: Result for ``prev_param``, already negated if
+            minimizing so that larger is better
+        :type yield_value: float
+        """
 
-        :returns: Index in the training combo list of the next conditions
-                  missing from the training dataset. An index of -1 is returned
-                  if no more training conditions are missing from the dataset.
-        :rtype: int
+        np = self._imports["np"]
+
+        training_set = self._read_training_set(experiment_dir)
+        training_combos = self._read_table(
+            os.path.join(experiment_dir, "training_combo_file.txt")
+        )
+
+        # The last column holds the results, not conditions
+        conditions = [row[:-1] for row in training_set]
+        results = [float(row[-1]) for row in training_set]
+        if len(prev_param) > 0:
+            conditions.append(prev_param)
+            results.append(yield_value)
+
+        n_coarse = config.get("coarse_grid_points", 5)
+        n_points = config.get("trust_region_points", 5)
+        chunk_size = config.get("grid_chunk_size", 100000)
+        candidates = list(
+            iter_grid_chunks(
+                config, chunk_size, coarse_grid_axes(config, n_coarse)
+            )
+        )
+
+        # Rounds of prediction performed after the training rounds. Regions
+        # stop shrinking once their points are at the configured resolution.
+        refinement_round = max(0, len(results) - len(training_combos.index))
+        half_widths = [
+            max(n_points, math.ceil(stride / 2**refinement_round))
+            for stride in coarse_grid_strides(config, n_coarse)
+        ]
+
+        space = feature_space(config)
+
+        n_regions = config.get("trust_region_count", 3)
+        best = np.argsort(results)[::-1][:n_regions]
+        centers = space.encode([conditions[i] for i in best])
+        for center in centers.tolist():
+            axes = trust_region_axes(center, config, half_widths, n_points)
+            candidates.extend(iter_grid_chunks(config, chunk_size, axes))
+
+        # No training combos are drawn here, they were fixed by set_config()
+        self._write_combos(
+            os.path.join(experiment_dir, "full_combo_file.txt"),
+            space.names,
+            [np.unique(np.concatenate(candidates), axis=0)],
+            config,
+        )
+
+    def _feasible_mask(  # type: ignore
+        self, chunk, feature_names: list[str], config: dict[str, Any]
+    ):
+        """Evaluates the ``constraints`` config option on a chunk of the grid.
+
+        Categorical levels are decoded before the constraints are evaluated,
+        so expressions can compare against the configured level values.
+
+        :param chunk: Grid rows as produced for the full combo file
+        :type chunk: np.ndarray
+        :param feature_names: Column names, continuous features first
+        :type feature_names: list[str]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Mask that is True for rows satisfying every constraint
+        :rtype: np.ndarray
+        """
+
+        np = self._imports["np"]
+
+        mask = np.ones(len(chunk), dtype=bool)
+        constraints = config.get("constraints", [])
+        if len(constraints) == 0:
+            return mask
+
+        decoded = self._imports["pd"].DataFrame(chunk, columns=feature_names)
+        for name, values in zip(
+            config.get("categorical_feature_names", []),
+            config.get("categorical_feature_values", []),
+        ):
+            levels = np.asarray(values, dtype=object)
+            decoded[name] = levels[decoded[name].to_numpy(dtype=int)]
+
+        for constraint in constraints:
+            mask &= decoded.eval(constraint, engine="python").to_numpy(
+                dtype=bool
+            )
+
+        return mask
+
+    def _use_subkeys(self, config: dict[str, Any]) -> dict[str, Any]:
+        """Converts a config to use subkeys, reusing the previous conversion
+        if the config has not changed since.
+
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Config with categorical and continuous subkeys, as a
+            read-only view shared by every call
+        :rtype: dict[str, Any]
+        """
+
+        # Comparing against a private copy catches configs modified in place
+        if self._subkey_config is None or self._subkey_config[0] != config:
+            self._subkey_config = (
+                copy.deepcopy(config),
+                read_only(use_subkeys(config)),
+            )
+
+        return self._subkey_config[1]
+
+    def _read_table(self, path: str):  # type: ignore
+        """Reads a CSV file, reusing the previous read if the file's
+        modification time and size are unchanged.
+
+        :param path: Path to the CSV file
+        :type path: str
+
+        :returns: Contents of the file
+        :rtype: pd.DataFrame
+        """
+
+        stat = os.stat(path)
+        current = (stat.st_mtime_ns, stat.st_size)
+
+        if path not in self._tables or self._tables[path][0] != current:
+            self._tables[path] = (current, self._imports["pd"].read_csv(path))
+
+        return self._tables[path][1]
+
+    def _read_lines(self, path: str) -> list[str]:
+        """Reads the lines of a file that is appended to, only reading the
+        lines added since the previous call.
+
+        :param path: Path to the file
+        :type path: str
+
+        :returns: Lines of the file, without line endings
+        :rtype: list[str]
+        """
+
+        if path not in self._line_caches:
+            self._line_caches[path] = AppendOnlyFileCache(path)
+
+        self._line_caches[path].refresh()
+
+        return self._line_caches[path].lines
+
+    def _read_training_set(self, experiment_dir: str) -> list[list[str]]:
+        """Reads the rows of the decoded training set, results included.
+
+        :param experiment_dir: Experiment directory with the AMLRO files
+        :type experiment_dir: str
+
+        :returns: Rows of the decoded training set without the header, with
+                  the result in the last column
+        :rtype: list[list[str]]
         """
 
-        # Merge the current training dataset with the training combos suggested
-        # by AMLRO. A left merge is used to only use keys from the training
-        # combos and preserve the row index in the training combos.
-        merged = training_combos.merge(
-            training_dataset, how="left", indicator=True
+        lines = self._read_lines(
+            os.path.join(experiment_dir, "training_set_decoded_file.txt")
         )
 
-        # Determine training combos are missing
-        is_missing = merged["_merge"].eq("left_only")
+        return list(csv.reader(lines[1:]))
+
+    def _load_performed_index(
+        self, experiment_dir: str, config: dict[str, Any]
+    ) -> PerformedIndex:
+        """Loads the index of performed conditions for an experiment.
+
+        The index is kept for later calls with the same config, and only
+        conditions recorded since the previous call are read from disk.
+        Experiment directories created before the index existed are indexed
+        from their decoded training set file the first time they are loaded.
 
-        # The next line to get the first missing row will return 0 for both
-        # the first row and if no rows are missing, so exit early with -1
-        # if no more training combos are missing
-        if is_missing.eq(False).all():
-            return -1
+        :param experiment_dir: Experiment directory containing the index
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
 
-        # Get the index of the first training combo not found in the provided
-        # training dataset. Apparently between True and False, True is the max
-        # so idxmax() works.
-        first_missing_index = merged["_merge"].eq("left_only").idxmax()
+        :returns: Index of performed conditions
+        :rtype: PerformedIndex
+        """
 
-        return first_missing_index
+        cached = self._performed_indices.get(experiment_dir)
+        if cached is not None and cached[0] == config:
+            performed = cached[1]
+            performed.refresh()
+        else:
+            performed = PerformedIndex(experiment_dir, config)
+            self._performed_indices[experiment_dir] = (
+                copy.deepcopy(config),
+                performed,
+            )
+
+        training_set_decoded_path = os.path.join(
+            experiment_dir, "training_set_decoded_file.txt"
+        )
+        if not performed.exists() and os.path.exists(training_set_decoded_path):
+            # The last column holds the results, not conditions
+            performed.extend(
+                row[:-1] for row in self._read_training_set(experiment_dir)
+            )
+
+        return performed
+
+    def _get_next_training_index_by_hash(  # type: ignore
+        self,
+        training_combos,
+        performed: PerformedIndex,
+        recording: list[list[Any]] = [],
+    ) -> int:
+        """Gets the index for the next training condition to be performed.
+
+        Each training combo is checked against the index of performed
+        conditions, which is a constant time lookup of the hash of its
+        quantized feature vector. Column headers are not involved, so this
+        works even though AMLRO writes decoded feature headers to the training
+        dataset.
+
+        :param training_combos: Training conditions suggested by AMLRO
+        :type training_combos: pd.DataFrame
+        :param performed: Index of the conditions performed so far
+        :type performed: PerformedIndex
+        :param recording: Conditions whose results are being recorded, which
+                          count as performed, defaults to []
+        :type recording: list[list[Any]], optional
+
+        :returns: Index in the training combo list of the first conditions
+                  that have not been performed. An index of -1 is returned
+                  if every training combo has been performed.
+        :rtype: int
+        """
+
+        return performed.first_missing(
+            training_combos.itertuples(index=False, name=None), recording
+        )
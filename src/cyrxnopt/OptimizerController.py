@@ -1,5 +1,14 @@
 import logging
-from collections.abc import Callable
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from contextlib import contextmanager
+from functools import partial
 from typing import Any, Optional
 
 from cyrxnopt.NestedVenv import NestedVenv
@@ -8,9 +17,47 @@ from cyrxnopt.OptimizerAmlro import OptimizerAmlro
 from cyrxnopt.OptimizerEDBOp import OptimizerEDBOp
 from cyrxnopt.OptimizerNMSimplex import OptimizerNMSimplex
 from cyrxnopt.OptimizerSQSnobFit import OptimizerSQSnobFit
+from cyrxnopt.utilities.experiment.experiment_store import ExperimentStore
+from cyrxnopt.utilities.experiment.idempotency import (
+    IdempotentRequest,
+    request_fingerprint,
+)
+from cyrxnopt.utilities.runtime.deadline import fallback_suggestion
+from cyrxnopt.utilities.runtime.prefetch import Speculation, liar_value
+from cyrxnopt.utilities.runtime.resources import (
+    in_thread_worker,
+    resource_budget,
+    thread_worker,
+)
 
 logger = logging.getLogger(__name__)
 
+# Work running in the background for each experiment directory, see
+# predict: speculative predictions, predictions that missed their deadline,
+# and the suggestions of late predictions that finished since. They only
+# live as long as this process.
+_speculations: dict[str, Speculation] = {}
+_late_predictions: dict[str, "Future[Any]"] = {}
+_late_suggestions: dict[str, Any] = {}
+_background_lock = threading.Lock()
+_background_executor: Optional[ThreadPoolExecutor] = None
+
+# Optimizer instances kept between calls for each optimizer, environment,
+# and experiment directory of configs with "session" set, most recently used
+# last, each with the lock its calls run under, see _session()
+_sessions: "OrderedDict[tuple[str, str, str], tuple[OptimizerABC, Any]]" = (
+    OrderedDict()
+)
+_sessions_lock = threading.Lock()
+_max_sessions = 32
+
+# Experiment stores kept open for each experiment directory of configs with
+# "experiment_store" set, most recently used last, each with the lock its
+# calls run under, see _experiment_store()
+_stores: "OrderedDict[str, tuple[ExperimentStore, Any]]" = OrderedDict()
+_stores_lock = threading.Lock()
+_max_stores = 32
+
 
 def check_install(optimizer_name: str, venv: NestedVenv) -> bool:
     """Checks if an optimizer is installed in the given environment.
@@ -70,6 +117,7 @@ def set_config(
     venv: NestedVenv,
     config: dict[str, Any],
     experiment_dir: str,
+    resources: Optional[dict[str, Any]] = None,
 ) -> None:
     """Sets the provided options for the given optimizer.
 
@@ -82,11 +130,41 @@ def set_config(
     :param experiment_dir: Directory to be used for the current experiment.
         This is where the config files will be output.
     :type experiment_dir: str
+    :param resources: Resource limits for this call, see
+        :py:func:`_resource_context`, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
     """
 
-    opt = get_optimizer(optimizer_name, venv)
+    # A new campaign makes any background work meaningless, but it must not
+    # write to the directory anymore
+    speculation = _pop_speculation(experiment_dir)
+    if speculation is not None:
+        speculation.cancel()
+        speculation.sync(retry=False)
+
+    with _background_lock:
+        late = _late_predictions.pop(os.path.abspath(experiment_dir), None)
+        _late_suggestions.pop(os.path.abspath(experiment_dir), None)
+    if late is not None:
+        wait([late])
 
-    opt.set_config(experiment_dir, config)
+    start = (time.perf_counter(), time.process_time())
+    # A new campaign starts a new session, see _session()
+    with _session(
+        optimizer_name, venv, experiment_dir, config, new=True
+    ) as opt, _resource_context(
+        optimizer_name, experiment_dir, config, resources
+    ) as budget:
+        opt.set_config(experiment_dir, config)
+
+    _record_call(
+        "set_config",
+        optimizer_name,
+        experiment_dir,
+        config,
+        start,
+        resources=budget,
+    )
 
 
 def train(
@@ -97,6 +175,7 @@ def train(
     experiment_dir: str,
     config: dict[str, Any],
     obj_func: Optional[Callable] = None,
+    resources: Optional[dict[str, Any]] = None,
 ) -> list[Any]:
     """Predicts new reaction conditions using the given optimizer.
 
@@ -114,16 +193,38 @@ def train(
     :type config: dict[str, Any]
     :param obj_func: Objective function to optimize, defaults to None
     :type obj_func: Optional[Callable], optional
+    :param resources: Resource limits for this call, see
+        :py:func:`_resource_context`, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
 
     :returns: The next suggested conditions to perform
     :rtype: list[Any]
     """
 
-    opt = get_optimizer(optimizer_name, venv)
+    start = (time.perf_counter(), time.process_time())
+    with _session(
+        optimizer_name, venv, experiment_dir, config
+    ) as opt, _resource_context(
+        optimizer_name, experiment_dir, config, resources
+    ) as budget:
+        opt.check_install()
+        next_suggestion = opt.train(
+            prev_param, yield_value, experiment_dir, config, obj_func
+        )
 
-    opt.check_install()
+    _record_call(
+        "train",
+        optimizer_name,
+        experiment_dir,
+        config,
+        start,
+        prev_param,
+        yield_value,
+        next_suggestion,
+        budget,
+    )
 
-    return opt.train(prev_param, yield_value, experiment_dir, config, obj_func)
+    return next_suggestion
 
 
 def predict(
@@ -134,9 +235,65 @@ def predict(
     experiment_dir: str,
     config: dict[str, Any],
     obj_func: Optional[Callable] = None,
+    resources: Optional[dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None,
+    deadline: Optional[float] = None,
 ) -> list[Any]:
     """Predicts new reaction conditions using the given optimizer.
 
+    With ``"session"`` set in the config, the optimizer instance and what it
+    read from the experiment's files are kept between calls, instead of
+    being loaded for each, see :py:func:`_session`.
+
+    A request with an idempotency key runs at most once. When it is retried
+    with the same key and arguments, and no results were recorded for the
+    optimizer since, the suggestion it returned is given back without
+    running the optimizer or recording the previous results again. Retries
+    that arrive while the first request still runs wait for it, for up to
+    ``"idempotency_timeout"`` seconds from the config (one hour by default).
+    Responses and the results they were given after are kept in the
+    experiment store, so idempotency keys need ``"experiment_store"`` set
+    in the config.
+    See :py:class:`~cyrxnopt.utilities.experiment.idempotency.IdempotentRequest`.
+
+    With ``"prefetch"`` set in the config, the prediction of the suggestion
+    after the returned one starts in the background right away, assuming the
+    returned suggestion gives a constant liar result: the mean, ``"min"``,
+    or ``"max"`` of the results so far, or a number, as set by
+    ``"prefetch_liar"``. The optimizer's ``speculate`` method overlays the
+    liar on what it reads and records nothing. When the real result is
+    given to the next call, the prefetched suggestion is returned without
+    waiting for the optimizer. The real result and the prefetched
+    suggestion are then recorded by the optimizer's ``record_results``
+    method in the background, before the following prefetch starts, so the
+    suggestion is pending like one the optimizer made. To predict again
+    instead when the real result is far from the liar, set
+    ``"prefetch_tolerance"`` to the largest difference to accept. Results
+    for other conditions always discard the prefetch, and the prediction
+    runs as usual. Prefetching only applies to optimizers that suggest one
+    step at a time without an objective function and have ``speculate`` and
+    ``record_results``, such as
+    :py:class:`~cyrxnopt.OptimizerEDBOp.OptimizerEDBOp`, and to calls made
+    in the same process.
+    See :py:class:`~cyrxnopt.utilities.runtime.prefetch.Speculation`.
+
+    With a deadline, the optimizer runs in a background thread. If it has
+    not finished when the deadline passes, the best suggestion available
+    right away is returned instead, as a
+    :py:class:`~cyrxnopt.utilities.runtime.deadline.DegradedSuggestion`: the
+    suggestion of an earlier prediction that missed its deadline, a
+    finished prefetch, or conditions far from every observation. The late
+    prediction keeps running, so the optimizer still gets the result it was
+    given, and the next call for the experiment waits for it. Optimizers
+    that keep track of pending suggestions then replace the late suggestion
+    with the returned one, see ``replace_suggestion`` of
+    :py:class:`~cyrxnopt.OptimizerEDBOp.OptimizerEDBOp`. Other optimizers
+    keep the late suggestion as pending, which is logged as a warning.
+    Resource limits apply to the background thread for as long as the
+    prediction runs, so a late prediction keeps its budget after the call
+    returns. With the experiment store, how long predictions take is
+    recorded, to help choose deadlines for each optimizer.
+
     :param optimizer_name: Name of the optimizer algorithm
     :type optimizer_name: str
     :param venv: Environment containing the optimizer installation
@@ -151,25 +308,878 @@ def predict(
     :type config: dict[str, Any]
     :param obj_func: Objective function needed to optimize, defaults to None
     :type obj_func: Optional[Callable], optional
+    :param resources: Resource limits for this call, see
+        :py:func:`_resource_context`, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
+    :param idempotency_key: Key identifying this request across retries,
+        defaults to None
+    :type idempotency_key: Optional[str], optional
+    :param deadline: Seconds to wait for the optimizer before returning a
+        fallback suggestion, defaults to None to wait until it is done
+    :type deadline: Optional[float], optional
+
+    :raises RuntimeError: The idempotency key was already used for a
+        different request, or results were recorded since it was used, or
+        an idempotency key was given without the experiment store
 
     :return: Next suggested reaction conditions
     :rtype: list[Any]
     """
 
-    opt = get_optimizer(optimizer_name, venv)
+    if idempotency_key is None:
+        return _predict_by_deadline(
+            deadline,
+            optimizer_name,
+            venv,
+            prev_param,
+            yield_value,
+            experiment_dir,
+            config,
+            obj_func,
+            resources,
+        )
+
+    if not config.get("experiment_store", False):
+        raise RuntimeError(
+            "Idempotency keys need the experiment store, which records the "
+            "results a response is valid for. Set experiment_store in the "
+            "config."
+        )
+
+    with IdempotentRequest(
+        str(experiment_dir),
+        idempotency_key,
+        optimizer_name,
+        request_fingerprint(optimizer_name, prev_param, yield_value, config),
+        timeout=config.get("idempotency_timeout", 3600.0),
+    ) as request:
+        if request.replayed:
+            logger.info(
+                "Replaying the response to idempotency key %s",
+                idempotency_key,
+            )
+            return request.response
 
+        next_suggestion = _predict_by_deadline(
+            deadline,
+            optimizer_name,
+            venv,
+            prev_param,
+            yield_value,
+            experiment_dir,
+            config,
+            obj_func,
+            resources,
+        )
+        request.complete(next_suggestion)
+
+    return next_suggestion
+
+
+def _predict_by_deadline(
+    deadline: Optional[float],
+    optimizer_name: str,
+    venv: NestedVenv,
+    prev_param: list[Any],
+    yield_value: float,
+    experiment_dir: str,
+    config: dict[str, Any],
+    obj_func: Optional[Callable],
+    resources: Optional[dict[str, Any]],
+) -> list[Any]:
+    """Runs a prediction once the late prediction for the experiment, if
+    any, is done, and falls back to another suggestion when it does not
+    finish in time, see :py:func:`predict`.
+
+    :param deadline: Seconds to wait for the optimizer, None to wait until
+        it is done
+    :type deadline: Optional[float]
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param prev_param: Conditions of the previous experiment
+    :type prev_param: list[Any]
+    :param yield_value: Result of the previous experiment
+    :type yield_value: float
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param obj_func: Objective function to optimize
+    :type obj_func: Optional[Callable]
+    :param resources: Resource limits for this call
+    :type resources: Optional[dict[str, Any]]
+
+    :return: Next suggested reaction conditions
+    :rtype: list[Any]
+    """
+
+    key = os.path.abspath(experiment_dir)
+    args = (
+        optimizer_name,
+        venv,
+        prev_param,
+        yield_value,
+        experiment_dir,
+        config,
+        obj_func,
+        resources,
+    )
+
+    with _background_lock:
+        late = _late_predictions.pop(key, None)
+        speculation = _speculations.get(key)
+
+    if deadline is None:
+        if late is not None:
+            wait([late])
+        return _predict(*args)
+
+    # The prediction runs under its budget in the background, so the limits
+    # apply to the thread doing the work and last as long as it does
+    start = (time.perf_counter(), time.process_time())
+    future = _background().submit(
+        _predict_after, late, in_thread_worker(), *args
+    )
     try:
-        next_suggestion = opt.predict(
-            prev_param, yield_value, experiment_dir, config, obj_func=obj_func
+        next_suggestion: list[Any] = future.result(timeout=deadline)
+        return next_suggestion
+    except FutureTimeoutError:
+        pass
+
+    # The next call waits until the suggestion of the late prediction was
+    # replaced with the one returned here
+    given: "Future[Any]" = Future()
+    settled = _background().submit(
+        _replace_late_suggestion,
+        future,
+        given,
+        optimizer_name,
+        venv,
+        experiment_dir,
+        config,
+    )
+    with _background_lock:
+        _late_predictions[key] = settled
+    settled.add_done_callback(partial(_keep_late_suggestion, key))
+
+    logger.warning(
+        "%s did not predict within %s seconds, returning a fallback",
+        optimizer_name,
+        deadline,
+    )
+
+    suggestion = None
+    try:
+        suggestion = _fallback(
+            optimizer_name, prev_param, experiment_dir, config, speculation
+        )
+    finally:
+        given.set_result(suggestion)
+
+    _record_call(
+        "deadline_fallback",
+        optimizer_name,
+        experiment_dir,
+        config,
+        start,
+        result=suggestion,
+    )
+
+    return suggestion
+
+
+def _fallback(
+    optimizer_name: str,
+    prev_param: list[Any],
+    experiment_dir: str,
+    config: dict[str, Any],
+    speculation: Optional[Speculation],
+) -> list[Any]:
+    """Gets the suggestion to return in place of a late prediction, see
+    :py:func:`predict`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param prev_param: Conditions of the previous experiment
+    :type prev_param: list[Any]
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param speculation: Speculation running for the experiment, if any
+    :type speculation: Optional[Speculation]
+
+    :return: Fallback suggestion
+    :rtype: list[Any]
+    """
+
+    key = os.path.abspath(experiment_dir)
+    with _background_lock:
+        late_suggestion = _late_suggestions.pop(key, None)
+
+    prefetched = None
+    if speculation is not None and speculation.done():
+        try:
+            prefetched = speculation.result()
+        except Exception:
+            pass
+
+    observed = _condition_rows(prev_param)
+    with _experiment_store(experiment_dir, config) as store:
+        if store is not None:
+            observed.extend(
+                c for c, _ in store.observations(optimizer_name.lower())
+            )
+
+    return fallback_suggestion(
+        config,
+        _condition_rows(late_suggestion),
+        _condition_rows(prefetched),
+        observed,
+        config.get("batch_size", 1),
+    )
+
+
+def _replace_late_suggestion(
+    late: "Future[Any]",
+    given: "Future[Any]",
+    optimizer_name: str,
+    venv: NestedVenv,
+    experiment_dir: str,
+    config: dict[str, Any],
+) -> list[Any]:
+    """Waits for a prediction that missed its deadline, then lets the
+    optimizer replace the suggestion it made with the one returned in its
+    place, if it has a ``replace_suggestion`` method, such as
+    :py:meth:`~cyrxnopt.OptimizerEDBOp.OptimizerEDBOp.replace_suggestion`.
+
+    :param late: Late prediction
+    :type late: Future[Any]
+    :param given: Suggestion returned instead, None if there was none
+    :type given: Future[Any]
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+
+    :return: Suggestion of the late prediction
+    :rtype: list[Any]
+    """
+
+    suggestion: list[Any] = late.result()
+
+    with _session(optimizer_name, venv, experiment_dir, config) as opt:
+        if hasattr(opt, "replace_suggestion"):
+            opt.replace_suggestion(
+                suggestion, given.result(), experiment_dir, config
+            )
+        else:
+            logger.warning(
+                "%s cannot replace the suggestion %s of a prediction that "
+                "missed its deadline with the fallback %s it returned "
+                "instead, so its files in %s hold the late suggestion. Give "
+                "it results for the fallback anyway, or run it without a "
+                "deadline.",
+                optimizer_name,
+                suggestion,
+                given.result(),
+                experiment_dir,
+            )
+
+    return suggestion
+
+
+def _predict_after(
+    late: Optional["Future[Any]"], thread_worker_call: bool, *args: Any
+) -> list[Any]:
+    """Runs a prediction once a late prediction is done.
+
+    :param late: Late prediction for the same experiment, if any
+    :type late: Optional[Future[Any]]
+    :param thread_worker_call: Whether the prediction was requested by a
+        thread worker, see
+        :py:func:`~cyrxnopt.utilities.runtime.resources.thread_worker`, so
+        its budget only applies limits local to the thread
+    :type thread_worker_call: bool
+    :param args: Arguments of :py:func:`_predict`
+    :type args: Any
+
+    :return: Next suggested reaction conditions
+    :rtype: list[Any]
+    """
+
+    if late is not None:
+        wait([late])
+
+    if thread_worker_call:
+        with thread_worker():
+            return _predict(*args)
+
+    return _predict(*args)
+
+
+def _keep_late_suggestion(key: str, future: "Future[Any]") -> None:
+    """Keeps the suggestion of a late prediction for the next fallback.
+
+    :param key: Absolute experiment directory of the prediction
+    :type key: str
+    :param future: Finished late prediction
+    :type future: Future[Any]
+    """
+
+    with _background_lock:
+        if _late_predictions.get(key) is future:
+            del _late_predictions[key]
+
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is None:
+            _late_suggestions[key] = future.result()
+
+    if error is not None:
+        logger.warning("Prediction that missed its deadline failed: %s", error)
+
+
+def _condition_rows(conditions: Any) -> list[list[Any]]:
+    """Gets a list of sets of conditions from a suggestion.
+
+    :param conditions: One set of conditions, a list of them, or None
+    :type conditions: Any
+
+    :return: Sets of conditions
+    :rtype: list[list[Any]]
+    """
+
+    if conditions is None or len(conditions) == 0:
+        return []
+
+    if isinstance(conditions[0], (list, tuple)):
+        return [list(row) for row in conditions]
+
+    return [list(conditions)]
+
+
+def _background() -> ThreadPoolExecutor:
+    """Gets the thread pool running background work.
+
+    :return: Thread pool
+    :rtype: ThreadPoolExecutor
+    """
+
+    global _background_executor
+
+    with _background_lock:
+        if _background_executor is None:
+            _background_executor = ThreadPoolExecutor(
+                thread_name_prefix="cyrxnopt-background"
+            )
+
+    return _background_executor
+
+
+def _predict(
+    optimizer_name: str,
+    venv: NestedVenv,
+    prev_param: list[Any],
+    yield_value: float,
+    experiment_dir: str,
+    config: dict[str, Any],
+    obj_func: Optional[Callable],
+    resources: Optional[dict[str, Any]],
+) -> list[Any]:
+    """Runs and records a prediction, see :py:func:`predict`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param prev_param: Conditions of the previous experiment
+    :type prev_param: list[Any]
+    :param yield_value: Result of the previous experiment
+    :type yield_value: float
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param obj_func: Objective function to optimize
+    :type obj_func: Optional[Callable]
+    :param resources: Resource limits for this call
+    :type resources: Optional[dict[str, Any]]
+
+    :return: Next suggested reaction conditions
+    :rtype: list[Any]
+    """
+
+    start = (time.perf_counter(), time.process_time())
+
+    # Wait until the previous real result reached the optimizer's files
+    speculation = _pop_speculation(experiment_dir)
+    if speculation is not None:
+        speculation.sync()
+
+    next_suggestion: Any = None
+    budget: Optional[dict[str, Any]] = None
+    reconcile: Optional[Callable[[], None]] = None
+    if speculation is not None and speculation.matches(
+        prev_param, yield_value, config.get("prefetch_tolerance")
+    ):
+        try:
+            next_suggestion = speculation.result()
+        except Exception as e:
+            logger.warning("Prefetched prediction failed: %s", e)
+
+        if next_suggestion is not None:
+            reconcile = partial(
+                _reconcile,
+                optimizer_name,
+                venv,
+                prev_param,
+                yield_value,
+                experiment_dir,
+                config,
+                next_suggestion,
+            )
+    elif speculation is not None:
+        speculation.cancel()
+
+    with _session(optimizer_name, venv, experiment_dir, config) as opt:
+        can_prefetch = hasattr(opt, "speculate") and hasattr(
+            opt, "record_results"
         )
-    except TypeError:
-        next_suggestion = opt.predict(
-            prev_param, yield_value, experiment_dir, config
+        if reconcile is None:
+            with _resource_context(
+                optimizer_name, experiment_dir, config, resources
+            ) as budget:
+                try:
+                    next_suggestion = opt.predict(
+                        prev_param,
+                        yield_value,
+                        experiment_dir,
+                        config,
+                        obj_func=obj_func,
+                    )
+                except TypeError:
+                    next_suggestion = opt.predict(
+                        prev_param, yield_value, experiment_dir, config
+                    )
+
+    _record_call(
+        "predict",
+        optimizer_name,
+        experiment_dir,
+        config,
+        start,
+        prev_param,
+        yield_value,
+        next_suggestion,
+        budget,
+    )
+
+    started = False
+    if config.get("prefetch", False) and obj_func is None and can_prefetch:
+        started = _start_speculation(
+            optimizer_name,
+            venv,
+            experiment_dir,
+            config,
+            next_suggestion,
+            yield_value,
+            reconcile,
         )
 
+    if reconcile is not None and not started:
+        reconcile()
+
     return next_suggestion
 
 
+def _reconcile(
+    optimizer_name: str,
+    venv: NestedVenv,
+    prev_param: list[Any],
+    yield_value: Any,
+    experiment_dir: str,
+    config: dict[str, Any],
+    suggestion: Any,
+) -> None:
+    """Gives the optimizer a real result after a prefetched suggestion was
+    returned for it, along with that suggestion, without predicting again.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param prev_param: Conditions of the previous experiment
+    :type prev_param: list[Any]
+    :param yield_value: Result of the previous experiment
+    :type yield_value: Any
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param suggestion: Prefetched suggestion that was returned
+    :type suggestion: Any
+    """
+
+    start = (time.perf_counter(), time.process_time())
+    with _session(optimizer_name, venv, experiment_dir, config) as opt:
+        opt.record_results(  # type: ignore
+            prev_param, yield_value, experiment_dir, config, suggestion
+        )
+    _record_call("reconcile", optimizer_name, experiment_dir, config, start)
+
+
+def _start_speculation(
+    optimizer_name: str,
+    venv: NestedVenv,
+    experiment_dir: str,
+    config: dict[str, Any],
+    suggestion: Any,
+    yield_value: Any,
+    reconcile: Optional[Callable[[], None]],
+) -> bool:
+    """Starts predicting the suggestion after the given one in the
+    background, see :py:func:`predict`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param suggestion: Suggestion that was just returned
+    :type suggestion: Any
+    :param yield_value: Result given with the call that returned it
+    :type yield_value: Any
+    :param reconcile: Function giving the optimizer the real result of the
+        previous suggestion first
+    :type reconcile: Optional[Callable[[], None]]
+
+    :return: Whether a speculation was started
+    :rtype: bool
+    """
+
+    if not isinstance(suggestion, list) or len(suggestion) == 0:
+        return False
+
+    results: list[Any] = []
+    with _experiment_store(experiment_dir, config) as store:
+        if store is not None:
+            results = [r for _, r in store.observations(optimizer_name.lower())]
+    if len(results) == 0:
+        results = (
+            yield_value if isinstance(yield_value, list) else [yield_value]
+        )
+
+    liar = liar_value(results, config.get("prefetch_liar", "mean"))
+    if liar is None:
+        logger.debug("No numeric results to base a prefetch on")
+        return False
+
+    def speculate(pending: list[Any], liar_results: Any) -> Any:
+        start = (time.perf_counter(), time.process_time())
+        with _session(optimizer_name, venv, experiment_dir, config) as opt:
+            result = opt.speculate(  # type: ignore
+                pending, liar_results, experiment_dir, config
+            )
+        _record_call("prefetch", optimizer_name, experiment_dir, config, start)
+
+        return result
+
+    speculation = Speculation(
+        suggestion,
+        liar,
+        speculate,
+        _background(),
+        reconcile=reconcile,
+    )
+    with _background_lock:
+        _speculations[os.path.abspath(experiment_dir)] = speculation
+
+    return True
+
+
+def _pop_speculation(experiment_dir: str) -> Optional[Speculation]:
+    """Takes the speculation running for an experiment directory, if any.
+
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+
+    :return: Speculation, None if there is none
+    :rtype: Optional[Speculation]
+    """
+
+    with _background_lock:
+        return _speculations.pop(os.path.abspath(experiment_dir), None)
+
+
+@contextmanager
+def _resource_context(
+    optimizer_name: str,
+    experiment_dir: str,
+    config: dict[str, Any],
+    resources: Optional[dict[str, Any]],
+) -> Iterator[Optional[dict[str, Any]]]:
+    """Runs an optimizer call under its resource budget.
+
+    Limits given for the call take precedence over the ``"resources"`` entry
+    of the config, which applies to every call of an optimizer. Both are
+    dictionaries that may contain ``"threads"``, ``"blas_threads"``,
+    ``"cpu_affinity"``, and ``"memory_limit"`` (in MB), as described in
+    :py:func:`~cyrxnopt.utilities.runtime.resources.resource_budget`. When
+    limits are given, they are applied for the duration of the call, and
+    :py:func:`_record_call` records them with the time the call took.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param resources: Resource limits for this call
+    :type resources: Optional[dict[str, Any]]
+
+    :return: Context yielding the requested and applied limits, or None
+        without limits
+    :rtype: Iterator[Optional[dict[str, Any]]]
+    """
+
+    if resources is None:
+        resources = config.get("resources", {})
+
+    if not resources:
+        yield None
+        return
+
+    with resource_budget(resources) as applied:
+        yield {"requested": resources, "applied": applied}
+
+
+def _record_call(
+    call: str,
+    optimizer_name: str,
+    experiment_dir: str,
+    config: dict[str, Any],
+    start: tuple[float, float],
+    prev_param: list[Any] = [],
+    yield_value: Any = None,
+    result: Any = None,
+    resources: Optional[dict[str, Any]] = None,
+) -> None:
+    """Records an optimizer call in the experiment store, the opt-in audit
+    log of the experiment.
+
+    For ``set_config``, the config is recorded, which starts a new campaign
+    of the optimizer in the store. The records of earlier campaigns are
+    kept, and reads of the store default to the new campaign. For the other
+    calls, the
+    results given to the optimizer are recorded as observations, and the
+    conditions it returned as suggestions. Optimizers that run a whole
+    minimization in one call return a result object instead; the
+    iterations it holds in ``raw_results``, if any, are recorded as
+    observations. The time the call took is always recorded, along with
+    its resource budget, if any.
+
+    Nothing is recorded unless ``"experiment_store"`` is set in the config,
+    see :py:func:`_experiment_store`.
+
+    :param call: Name of the optimizer method that was called
+    :type call: str
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param start: Wall and processor time when the call started
+    :type start: tuple[float, float]
+    :param prev_param: Conditions given to the call, a list of them for
+        several results, defaults to []
+    :type prev_param: list[Any], optional
+    :param yield_value: Results given to the call, defaults to None
+    :type yield_value: Any, optional
+    :param result: Value returned by the call, defaults to None
+    :type result: Any, optional
+    :param resources: Requested and applied resource limits of the call,
+        see :py:func:`_resource_context`, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
+    """
+
+    wall_seconds = time.perf_counter() - start[0]
+    cpu_seconds = time.process_time() - start[1]
+
+    optimizer_name = optimizer_name.lower()
+
+    with _experiment_store(experiment_dir, config) as store:
+        if store is None:
+            return
+
+        if call == "set_config":
+            store.add_config(optimizer_name, config)
+
+        if len(prev_param) > 0:
+            if isinstance(prev_param[0], (list, tuple)):
+                store.add_observations(
+                    optimizer_name, zip(prev_param, yield_value)
+                )
+            else:
+                store.add_observations(
+                    optimizer_name, [(prev_param, yield_value)]
+                )
+
+        if isinstance(result, list) and len(result) > 0:
+            if isinstance(result[0], (list, tuple)):
+                store.add_suggestions(optimizer_name, result)
+            else:
+                store.add_suggestions(optimizer_name, [result])
+        elif getattr(result, "raw_results", None):
+            # Rows hold the conditions followed by the result
+            store.add_observations(
+                optimizer_name,
+                [(row[:-1], row[-1]) for row in result.raw_results],
+            )
+
+        store.add_timing(
+            optimizer_name, call, wall_seconds, cpu_seconds, resources
+        )
+
+
+@contextmanager
+def _session(
+    optimizer_name: str,
+    venv: NestedVenv,
+    experiment_dir: str,
+    config: dict[str, Any],
+    new: bool = False,
+) -> Iterator[OptimizerABC]:
+    """Gets the optimizer instance to run a call of an experiment with.
+
+    Every call gets a new instance, unless ``"session"`` is set in the
+    config. Then one instance is kept for every call of an experiment, as
+    optimizers keep what they read from an experiment's files on their
+    instance, such as parsed tables and open logs, which saves reading the
+    files again. Instances are kept for the ``_max_sessions`` most recently
+    used experiments of this process, and ones that are dropped or replaced
+    are closed. Background work of :py:func:`predict` shares the instance,
+    so calls on it run one at a time.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param new: Whether to replace the instance with a new one, as for a new
+        campaign, defaults to False
+    :type new: bool, optional
+
+    :return: Context yielding the optimizer instance, held for the call
+    :rtype: Iterator[OptimizerABC]
+    """
+
+    if not config.get("session", False):
+        yield get_optimizer(optimizer_name, venv)
+        return
+
+    key = (
+        optimizer_name.lower(),
+        str(getattr(venv, "prefix", venv)),
+        os.path.abspath(experiment_dir),
+    )
+
+    dropped = []
+    with _sessions_lock:
+        entry = _sessions.get(key)
+        if new and entry is not None:
+            dropped.append(entry)
+            entry = None
+        if entry is None:
+            entry = (get_optimizer(optimizer_name, venv), threading.RLock())
+            _sessions[key] = entry
+        _sessions.move_to_end(key)
+
+        while len(_sessions) > _max_sessions:
+            dropped.append(_sessions.popitem(last=False)[1])
+
+    # Optimizers may keep files open, such as EDBO+'s reaction order log
+    for opt, lock in dropped:
+        close = getattr(opt, "close", None)
+        if close is not None:
+            with lock:
+                close()
+
+    opt, lock = entry
+    with lock:
+        yield opt
+
+
+@contextmanager
+def _experiment_store(
+    experiment_dir: str, config: dict[str, Any]
+) -> Iterator[Optional[ExperimentStore]]:
+    """Gets the experiment store to record a call of an experiment in.
+
+    The store is only used with ``"experiment_store"`` set in the config,
+    and for existing experiment directories. One connection is then kept
+    for each experiment, rather than one for each call. Connections are
+    kept for the ``_max_stores`` most recently used experiments of this
+    process, and ones that are dropped are closed. Background work of
+    :py:func:`predict` shares the connection, so its uses run one at a time.
+
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+
+    :return: Context yielding the store, held for the block, or None when
+        the store is not used
+    :rtype: Iterator[Optional[ExperimentStore]]
+    """
+
+    if not config.get("experiment_store", False) or not os.path.isdir(
+        experiment_dir
+    ):
+        yield None
+        return
+
+    key = os.path.abspath(experiment_dir)
+
+    while True:
+        dropped = []
+        with _stores_lock:
+            entry = _stores.get(key)
+            if entry is None:
+                entry = (ExperimentStore(key), threading.Lock())
+                _stores[key] = entry
+            _stores.move_to_end(key)
+
+            while len(_stores) > _max_stores:
+                dropped.append(_stores.popitem(last=False)[1])
+
+        for old_store, old_lock in dropped:
+            with old_lock:
+                old_store.close()
+
+        store, lock = entry
+        with lock:
+            # A store dropped while this call waited for it is opened again
+            if not store.closed:
+                yield store
+                return
+
+
 def get_optimizer(optimizer_name: str, venv: NestedVenv) -> OptimizerABC:
     """Gets an instance of the requested optimizer algorithm
 
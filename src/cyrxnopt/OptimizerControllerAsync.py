@@ -0,0 +1,546 @@
+import asyncio
+import logging
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from cyrxnopt import OptimizerController
+from cyrxnopt.NestedVenv import NestedVenv
+from cyrxnopt.utilities.runtime.resources import thread_worker
+from cyrxnopt.utilities.runtime.workers import (
+    CancellationToken,
+    cancellable,
+    worker_context,
+)
+
+logger = logging.getLogger(__name__)
+
+WORKERS = ["thread", "process"]
+
+# Calls still running for each experiment directory. A cancelled call may
+# keep running in the background, and the next call for the same directory
+# waits for it.
+_running: dict[str, "Future[Any]"] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+async def install(
+    optimizer_name: str,
+    venv: NestedVenv,
+    local_paths: dict[str, str] = {},
+    timeout: Optional[float] = None,
+    worker: str = "thread",
+    executor: Optional[Executor] = None,
+) -> None:
+    """Installs an optimizer into the given environment without blocking the
+    event loop, see :py:func:`cyrxnopt.OptimizerController.install`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param local_paths: Mapping of package names to local paths to the packages
+        to be installed, defaults to {}
+    :type local_paths: dict[str, str], optional
+    :param timeout: Seconds before the call is cancelled, see :py:func:`_run`,
+        defaults to None
+    :type timeout: Optional[float], optional
+    :param worker: Where the call runs, see :py:func:`_run`, defaults to
+        "thread"
+    :type worker: str, optional
+    :param executor: Executor for thread workers, defaults to None
+    :type executor: Optional[Executor], optional
+    """
+
+    await _run(
+        OptimizerController.install,
+        (optimizer_name, venv),
+        {"local_paths": local_paths},
+        None,
+        timeout,
+        worker,
+        executor,
+    )
+
+
+async def set_config(
+    optimizer_name: str,
+    venv: NestedVenv,
+    config: dict[str, Any],
+    experiment_dir: str,
+    resources: Optional[dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    worker: str = "thread",
+    executor: Optional[Executor] = None,
+) -> None:
+    """Sets the provided options for the given optimizer without blocking the
+    event loop, see :py:func:`cyrxnopt.OptimizerController.set_config`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param config: Desired optimizer configuration
+    :type config: dict[str, Any]
+    :param experiment_dir: Directory to be used for the current experiment
+    :type experiment_dir: str
+    :param resources: Resource limits for this call, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
+    :param timeout: Seconds before the call is cancelled, see :py:func:`_run`,
+        defaults to None
+    :type timeout: Optional[float], optional
+    :param worker: Where the call runs, see :py:func:`_run`, defaults to
+        "thread"
+    :type worker: str, optional
+    :param executor: Executor for thread workers, defaults to None
+    :type executor: Optional[Executor], optional
+    """
+
+    await _run(
+        OptimizerController.set_config,
+        (optimizer_name, venv, config, experiment_dir),
+        {"resources": resources},
+        experiment_dir,
+        timeout,
+        worker,
+        executor,
+    )
+
+
+async def train(
+    optimizer_name: str,
+    venv: NestedVenv,
+    prev_param: list[Any],
+    yield_value: float,
+    experiment_dir: str,
+    config: dict[str, Any],
+    obj_func: Optional[Callable] = None,
+    resources: Optional[dict[str, Any]] = None,
+    timeout: Optional[float] = None,
+    worker: str = "thread",
+    executor: Optional[Executor] = None,
+) -> list[Any]:
+    """Trains the given optimizer without blocking the event loop, see
+    :py:func:`cyrxnopt.OptimizerController.train`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param prev_param: Previous suggested reaction conditions
+    :type prev_param: list[Any]
+    :param yield_value: Yield value from previous reaction conditions
+    :type yield_value: float
+    :param experiment_dir: Output directory for the current experiment
+    :type experiment_dir: str
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :param obj_func: Objective function to optimize, defaults to None
+    :type obj_func: Optional[Callable], optional
+    :param resources: Resource limits for this call, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
+    :param timeout: Seconds before the call is cancelled, see :py:func:`_run`,
+        defaults to None
+    :type timeout: Optional[float], optional
+    :param worker: Where the call runs, see :py:func:`_run`, defaults to
+        "thread"
+    :type worker: str, optional
+    :param executor: Executor for thread workers, defaults to None
+    :type executor: Optional[Executor], optional
+
+    :returns: The next suggested conditions to perform
+    :rtype: list[Any]
+    """
+
+    result: list[Any] = await _run(
+        OptimizerController.train,
+        (optimizer_name, venv, prev_param, yield_value, experiment_dir, config),
+        {"obj_func": obj_func, "resources": resources},
+        experiment_dir,
+        timeout,
+        worker,
+        executor,
+    )
+
+    return result
+
+
+async def predict(
+    optimizer_name: str,
+    venv: NestedVenv,
+    prev_param: list[Any],
+    yield_value: float,
+    experiment_dir: str,
+    config: dict[str, Any],
+    obj_func: Optional[Callable] = None,
+    resources: Optional[dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None,
+    timeout: Optional[float] = None,
+    worker: str = "thread",
+    executor: Optional[Executor] = None,
+) -> list[Any]:
+    """Predicts new reaction conditions without blocking the event loop, see
+    :py:func:`cyrxnopt.OptimizerController.predict`.
+
+    :param optimizer_name: Name of the optimizer algorithm
+    :type optimizer_name: str
+    :param venv: Environment containing the optimizer installation
+    :type venv: NestedVenv
+    :param prev_param: experimental parameter combination for previous experiment
+    :type prev_param: list[Any]
+    :param yield_value: experimental yield
+    :type yield_value: float
+    :param experiment_dir: experimental directory for saving data files
+    :type experiment_dir: str
+    :param config: Initial reaction feature configurations
+    :type config: dict[str, Any]
+    :param obj_func: Objective function needed to optimize, defaults to None
+    :type obj_func: Optional[Callable], optional
+    :param resources: Resource limits for this call, defaults to None
+    :type resources: Optional[dict[str, Any]], optional
+    :param idempotency_key: Key identifying this request across retries,
+        defaults to None
+    :type idempotency_key: Optional[str], optional
+    :param timeout: Seconds before the call is cancelled, see :py:func:`_run`,
+        defaults to None
+    :type timeout: Optional[float], optional
+    :param worker: Where the call runs, see :py:func:`_run`, defaults to
+        "thread"
+    :type worker: str, optional
+    :param executor: Executor for thread workers, defaults to None
+    :type executor: Optional[Executor], optional
+
+    :return: Next suggested reaction conditions
+    :rtype: list[Any]
+    """
+
+    result: list[Any] = await _run(
+        OptimizerController.predict,
+        (optimizer_name, venv, prev_param, yield_value, experiment_dir, config),
+        {
+            "obj_func": obj_func,
+            "resources": resources,
+            "idempotency_key": idempotency_key,
+        },
+        experiment_dir,
+        timeout,
+        worker,
+        executor,
+    )
+
+    return result
+
+
+async def _run(
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    experiment_dir: Optional[str],
+    timeout: Optional[float],
+    worker: str,
+    executor: Optional[Executor],
+) -> Any:
+    """Runs a blocking controller function outside of the event loop.
+
+    With ``"thread"`` workers, the call runs in ``executor``, or in a thread
+    pool shared by every call when it is None. Cancelling the awaiting task,
+    or reaching the timeout, removes a call that has not started yet from
+    the executor. A call that already started cannot be interrupted, so it
+    is asked to stop through a
+    :py:class:`~cyrxnopt.utilities.runtime.workers.CancellationToken`, which
+    the optimizers check between steps. It stops at the next check, or
+    finishes in the background if it makes none, and its result is
+    discarded. Results given to a cancelled call may already have been
+    recorded by the optimizer.
+
+    With ``"process"`` workers, the call runs in a process of its own, which
+    is terminated when the task is cancelled or the timeout is reached. The
+    process is started fresh rather than forked, see
+    :py:func:`~cyrxnopt.utilities.runtime.workers.worker_context`, so the
+    function, its arguments, and the result must be picklable, and state the
+    controller keeps between calls, such as prefetched suggestions, stays in
+    that process. An optimizer terminated in the middle of writing its files
+    can leave them incomplete, so only use cancellation with process workers
+    where that is acceptable.
+
+    Calls for the same experiment directory run one at a time, in the order
+    they were made, including cancelled calls that are still finishing.
+
+    :param func: Controller function to call
+    :type func: Callable[..., Any]
+    :param args: Positional arguments of the function
+    :type args: tuple[Any, ...]
+    :param kwargs: Keyword arguments of the function
+    :type kwargs: dict[str, Any]
+    :param experiment_dir: Experiment directory the call works in, None if
+        it does not use one
+    :type experiment_dir: Optional[str]
+    :param timeout: Seconds before the call is cancelled, including the time
+        spent waiting for earlier calls, None to wait for as long as needed
+    :type timeout: Optional[float]
+    :param worker: One of :py:data:`WORKERS`
+    :type worker: str
+    :param executor: Executor for thread workers, None for the shared one
+    :type executor: Optional[Executor]
+
+    :raises ValueError: Unknown worker
+    :raises asyncio.TimeoutError: The timeout was reached
+
+    :return: Value returned by the function
+    :rtype: Any
+    """
+
+    if worker not in WORKERS:
+        raise ValueError(
+            "Unknown worker {}, expected one of {}".format(worker, WORKERS)
+        )
+
+    return await asyncio.wait_for(
+        _run_in_order(func, args, kwargs, experiment_dir, worker, executor),
+        timeout,
+    )
+
+
+async def _run_in_order(
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    experiment_dir: Optional[str],
+    worker: str,
+    executor: Optional[Executor],
+) -> Any:
+    """Runs a call once the earlier calls for its experiment directory are
+    done, see :py:func:`_run`.
+
+    :param func: Controller function to call
+    :type func: Callable[..., Any]
+    :param args: Positional arguments of the function
+    :type args: tuple[Any, ...]
+    :param kwargs: Keyword arguments of the function
+    :type kwargs: dict[str, Any]
+    :param experiment_dir: Experiment directory the call works in
+    :type experiment_dir: Optional[str]
+    :param worker: One of :py:data:`WORKERS`
+    :type worker: str
+    :param executor: Executor for thread workers
+    :type executor: Optional[Executor]
+
+    :return: Value returned by the function
+    :rtype: Any
+    """
+
+    key = None if experiment_dir is None else os.path.abspath(experiment_dir)
+
+    # Wait for the earlier calls, then take their place. Several calls can
+    # be waiting at once, so check again after every wait.
+    while key is not None and key in _running and not _running[key].done():
+        previous = asyncio.wrap_future(_running[key])
+        await asyncio.wait([previous])
+        # Its outcome belongs to its own caller
+        previous.cancelled() or previous.exception()
+
+    stop = threading.Event()
+    token = CancellationToken()
+    if worker == "process":
+        future = _shared_executor().submit(
+            _run_in_process, func, args, kwargs, stop
+        )
+    else:
+        if executor is None:
+            executor = _shared_executor()
+        future = executor.submit(_run_in_thread, token, func, args, kwargs)
+
+    if key is not None:
+        _running[key] = future
+        # Done callbacks run in the thread that finished the call, so the
+        # running calls are only changed from the event loop's thread
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(
+            lambda done: _call_soon(loop, _forget, key, done)
+        )
+
+    wrapped = asyncio.wrap_future(future)
+    try:
+        # Shielded so cancelling this task does not cancel the future
+        # before the stop event below is handled
+        return await asyncio.shield(wrapped)
+    except asyncio.CancelledError:
+        stop.set()
+        token.cancel()
+        future.cancel()
+        # Nobody waits for the outcome anymore
+        wrapped.add_done_callback(
+            lambda done: done.cancelled() or done.exception()
+        )
+        raise
+
+
+def _run_in_thread(
+    token: CancellationToken,
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> Any:
+    """Runs a function in a worker thread under a cancellation token.
+    Resource budgets of the call only apply to the thread, see
+    :py:func:`~cyrxnopt.utilities.runtime.resources.thread_worker`.
+
+    :param token: Token that asks the call to stop
+    :type token: CancellationToken
+    :param func: Function to call
+    :type func: Callable[..., Any]
+    :param args: Positional arguments of the function
+    :type args: tuple[Any, ...]
+    :param kwargs: Keyword arguments of the function
+    :type kwargs: dict[str, Any]
+    :return: Value returned by the function
+    :rtype: Any
+    """
+
+    with cancellable(token), thread_worker():
+        return func(*args, **kwargs)
+
+
+def _call_soon(
+    loop: asyncio.AbstractEventLoop, callback: Callable[..., Any], *args: Any
+) -> None:
+    """Schedules a callback on an event loop from any thread.
+
+    A loop that was closed in the meantime no longer has running calls to
+    update. Finished calls left in :py:data:`_running` are skipped by the
+    next call for their experiment directory.
+
+    :param loop: Event loop to run the callback in
+    :type loop: asyncio.AbstractEventLoop
+    :param callback: Function to call
+    :type callback: Callable[..., Any]
+    """
+
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass
+
+
+def _forget(key: str, future: "Future[Any]") -> None:
+    """Removes a finished call from the running calls.
+
+    :param key: Absolute experiment directory of the call
+    :type key: str
+    :param future: Finished call
+    :type future: Future[Any]
+    """
+
+    if _running.get(key) is future:
+        del _running[key]
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    """Gets the thread pool shared by calls without an executor.
+
+    :return: Thread pool
+    :rtype: ThreadPoolExecutor
+    """
+
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(thread_name_prefix="cyrxnopt-async")
+
+    return _executor
+
+
+def _run_in_process(
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+    stop: threading.Event,
+    poll_interval: float = 0.05,
+) -> Any:
+    """Runs a function in a new process, terminating it when asked to.
+
+    :param func: Function to call, must be picklable
+    :type func: Callable[..., Any]
+    :param args: Positional arguments of the function
+    :type args: tuple[Any, ...]
+    :param kwargs: Keyword arguments of the function
+    :type kwargs: dict[str, Any]
+    :param stop: Event set to terminate the process
+    :type stop: threading.Event
+    :param poll_interval: Seconds between checks of the process and the
+        event, defaults to 0.05
+    :type poll_interval: float, optional
+
+    :raises RuntimeError: The process was terminated, or exited without a
+        result
+
+    :return: Value returned by the function
+    :rtype: Any
+    """
+
+    context = worker_context()
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_process_main, args=(sender, func, args, kwargs)
+    )
+    process.start()
+    sender.close()
+
+    try:
+        while not receiver.poll(poll_interval):
+            if stop.is_set():
+                process.terminate()
+                raise RuntimeError("Worker process was terminated")
+
+            if not process.is_alive() and not receiver.poll():
+                raise RuntimeError(
+                    "Worker process exited with code {} without a "
+                    "result".format(process.exitcode)
+                )
+
+        succeeded, value = receiver.recv()
+    finally:
+        process.join()
+        receiver.close()
+
+    if not succeeded:
+        raise value
+
+    return value
+
+
+def _process_main(
+    sender: Any,
+    func: Callable[..., Any],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any],
+) -> None:
+    """Entry point of worker processes, sending back whether the call
+    succeeded and its result or exception.
+
+    :param sender: Connection to send the outcome through
+    :type sender: multiprocessing.connection.Connection
+    :param func: Function to call
+    :type func: Callable[..., Any]
+    :param args: Positional arguments of the function
+    :type args: tuple[Any, ...]
+    :param kwargs: Keyword arguments of the function
+    :type kwargs: dict[str, Any]
+    """
+
+    try:
+        outcome = (True, func(*args, **kwargs))
+    except Exception as e:
+        outcome = (False, e)
+
+    try:
+        sender.send(outcome)
+    except Exception as e:
+        # The result or the exception could not be pickled
+        sender.send((False, RuntimeError(repr(e))))
+    finally:
+        sender.close()
@@ -1,16 +1,59 @@
+import copy
+import csv
 import logging
 import os
 import random
+import shutil
+import tempfile
+import time
+import weakref
 from collections.abc import Callable
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Optional, Union, cast
 
 from cyrxnopt.NestedVenv import NestedVenv
 from cyrxnopt.OptimizerABC import OptimizerABC
+from cyrxnopt.utilities.config.candidate_pool import sample_candidate_pool
+from cyrxnopt.utilities.config.encoding import (
+    decode_candidates,
+    encode_candidates,
+)
+from cyrxnopt.utilities.config.feature_space import feature_space
+from cyrxnopt.utilities.config.grid import (
+    encoded_grid_bytes,
+    grid_indices_to_values,
+    grid_shape,
+    grid_size,
+    iter_grid_chunks,
+    trust_region_axes,
+)
 from cyrxnopt.utilities.config.transforms import use_subkeys
+from cyrxnopt.utilities.experiment.file_cache import AppendOnlyFileCache
+from cyrxnopt.utilities.experiment.observation_log import (
+    DEFAULT_FSYNC_POLICY,
+    FSYNC_POLICIES,
+    ObservationLog,
+)
+from cyrxnopt.utilities.experiment.pareto_front import (
+    ParetoFront,
+    read_pareto_front,
+    write_pareto_front,
+)
+from cyrxnopt.utilities.experiment.pending_observations import (
+    PendingObservations,
+)
+from cyrxnopt.utilities.experiment.scope_checkpoint import (
+    PENDING,
+    load_scope_checkpoint,
+    save_scope_checkpoint,
+)
+from cyrxnopt.utilities.runtime.workers import check_cancelled
 
 logger = logging.getLogger(__name__)
 
+# Scope size in MB that is warned about when no memory budget is set
+_SCOPE_WARNING_MB = 1024
+
 
 class OptimizerEDBOp(OptimizerABC):
     # Private static data member to list dependency packages required
@@ -20,6 +63,17 @@ class OptimizerEDBOp(OptimizerABC):
     def __init__(self, venv: NestedVenv) -> None:
         """Optimizer class for the EDBO+ algorithm.
 
+        Reusing one instance for every call in an experiment acts as a
+        session: the reaction scope stays in memory between predictions and
+        is handed to EDBO+ through a file in a memory-backed directory.
+        :py:meth:`OptimizerEDBOp.set_config` writes the initial scope to
+        ``my_optimization.csv`` and a compact checkpoint of it. A new
+        instance resumes from the checkpoint and applies the results in the
+        reaction order file, so nothing the size of the scope is written to
+        the experiment directory after set_config. With the
+        ``candidate_pool_size`` option, no scope is generated at all, and the
+        candidates of each prediction are sampled from the grid instead.
+
         :param venv: Virtual environment to install the optimizer
         :type venv: NestedVenv
         """
@@ -28,6 +82,22 @@ class OptimizerEDBOp(OptimizerABC):
 
         self._edbop_filename = "my_optimization.csv"
         self._reaction_order_filename = "reaction_order.csv"
+        self._suggestions_filename = "suggestions.csv"
+        self._checkpoint_filename = "my_optimization.npz"
+        self._row_column = "cyrxnopt_row"
+        self._pareto_filename = "pareto_front.csv"
+
+        # Session state, see _load_scope(), _working_dir(),
+        # _observation_log(), _file_keys(), _update_pareto_front(), and
+        # _config_translate()
+        self._scopes: dict[
+            str, tuple[tuple[int, int], Any, AppendOnlyFileCache, int]
+        ] = {}
+        self._logs: dict[str, ObservationLog] = {}
+        self._key_caches: dict[str, tuple[AppendOnlyFileCache, Any, Any]] = {}
+        self._fronts: dict[str, tuple[Optional[tuple[int, int]], Any]] = {}
+        self._translated: Optional[tuple[dict[str, Any], dict[str, Any]]] = None
+        self._work_dir: Optional[str] = None
 
     def get_config(self) -> list[dict[str, Any]]:
         """Get the configuration options available for this optimizer.
@@ -83,6 +153,73 @@ class OptimizerEDBOp(OptimizerABC):
                 "value": ["min"],
                 "range": ["min", "max"],
             },
+            {
+                "name": "grid_chunk_size",
+                "type": "int",
+                "value": 100000,
+                "description": (
+                    "Maximum number of rows of the reaction scope held in "
+                    "memory at once while it is generated."
+                ),
+            },
+            {
+                "name": "scope_memory_budget",
+                "type": "float",
+                "value": 0,
+                "description": (
+                    "Memory in MB the encoded reaction scope may take. "
+                    "Configs whose scope would exceed it are rejected "
+                    "before it is generated. 0, the default, sets no limit "
+                    "but warns about scopes over 1024 MB. The scope is only "
+                    "generated when candidate_pool_size is 0."
+                ),
+            },
+            {
+                "name": "candidate_pool_size",
+                "type": "int",
+                "value": 0,
+                "description": (
+                    "Number of unobserved grid points EDBO+ scores in each "
+                    "prediction. They are sampled from the grid for each "
+                    "prediction, so the full reaction scope is never "
+                    "generated. Half are sampled at random, a quarter are "
+                    "nearest to the best result, and a quarter are far from "
+                    "every result. Use 0 to generate and score the whole "
+                    "scope."
+                ),
+            },
+            {
+                "name": "candidate_pool_audit",
+                "type": "bool",
+                "value": False,
+                "description": (
+                    "Candidate pool mode only. Also score the whole scope "
+                    "and record how the pool's suggestion ranks in "
+                    "candidate_pool_stats.csv. This is slow and meant for "
+                    "tuning candidate_pool_size."
+                ),
+            },
+            {
+                "name": "batch_size",
+                "type": "int",
+                "value": 1,
+                "description": (
+                    "Number of suggestions returned by each prediction. "
+                    "Suggestions stay pending until their results are "
+                    "given, and pending suggestions are not proposed again."
+                ),
+            },
+            {
+                "name": "log_fsync",
+                "type": "str",
+                "value": DEFAULT_FSYNC_POLICY,
+                "range": FSYNC_POLICIES,
+                "description": (
+                    "When results written to reaction_order.csv are synced "
+                    "to disk: after every prediction, at most once a "
+                    "second, or when the operating system decides."
+                ),
+            },
         ]
 
         return config
@@ -103,53 +240,78 @@ class OptimizerEDBOp(OptimizerABC):
             os.makedirs(experiment_dir)
 
         # Get reaction scope configurations from general config
-        config = self._config_translate(config)
+        edbo_config = self._config_translate(config)
 
-        # generate reaction scope for EDBO+
-        self._imports["EDBOplus"]().generate_reaction_scope(
-            components=config["reaction_components"],
-            directory=experiment_dir,
-            filename=self._edbop_filename,
-            check_overwrite=False,
+        scope_path = os.path.join(experiment_dir, self._edbop_filename)
+        checkpoint_path = os.path.join(
+            experiment_dir, self._checkpoint_filename
         )
+        use_pool = config.get("candidate_pool_size", 0) > 0
 
-        # Initialize the EDBO+ file to be used for prediction
-        self._imports["EDBOplus"]().run(
-            directory=experiment_dir,
-            # Previously generated scope
-            filename=self._edbop_filename,
-            # Objectives to be optimized
-            # For example, maximize yield and ee but minimize side_product:
-            # objectives=['yield', 'ee', 'side_product'],
-            # objective_mode=['max', 'max', 'min'],
-            objectives=config["objectives"],
-            objective_mode=config["direction"],
-            # Number of experiments in parallel to perform in this round
-            batch=1,
-            # Features to be included in the model
-            columns_features="all",
-            # Initialization method
-            init_sampling_method="seed",
-            seed=random.randint(0, 2**32 - 1),
-        )
+        if use_pool:
+            # Candidates are sampled from the grid for each prediction, so
+            # no scope is generated, and one left by an earlier config would
+            # be out of date
+            for path in (scope_path, checkpoint_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._scopes.pop(checkpoint_path, None)
+        else:
+            # generate reaction scope for EDBO+
+            self._check_scope_size(config, edbo_config["objectives"])
+            self._write_reaction_scope(scope_path, config)
+
+            # Initialize the EDBO+ file to be used for prediction
+            self._imports["EDBOplus"]().run(
+                directory=experiment_dir,
+                # Previously generated scope
+                filename=self._edbop_filename,
+                # Objectives to be optimized
+                # For example, maximize yield and ee but minimize
+                # side_product:
+                # objectives=['yield', 'ee', 'side_product'],
+                # objective_mode=['max', 'max', 'min'],
+                objectives=edbo_config["objectives"],
+                objective_mode=edbo_config["direction"],
+                # Number of experiments in parallel to perform in this round
+                batch=config.get("batch_size", 1),
+                # Features to be included in the model
+                columns_features="all",
+                # Initialization method
+                init_sampling_method="seed",
+                seed=random.randint(0, 2**32 - 1),
+            )
+
+        # Create the log preserving reaction order, with the feature names
+        # followed by one column for each objective as headers
+        headers = self._feature_names(config) + list(edbo_config["objectives"])
 
-        # Create file for preserving reaction order
-        # TODO: Rework this when we switch to multi-objective!
+        log = self._observation_log(experiment_dir, config)
+        log.truncate()
+        log.append(",".join(headers))
+        log.commit()
+
+        # Create file for the suggestions given out, which are pending until
+        # their results show up in the reaction order file
         with open(
-            Path(experiment_dir) / self._reaction_order_filename, "w"
+            Path(experiment_dir) / self._suggestions_filename, "w"
         ) as fout:
-            feature_names = config["continuous"]["feature_names"]
-            # If categorical feature names is an empty list, list.extend leaves
-            # the list unchanged
-            feature_names.extend(config["categorical"]["feature_names"])
-
-            objectives = config["objectives"]
+            fout.write(",".join(self._feature_names(config)) + "\n")
 
-            # Collect the feature names and objective names as headers
-            headers = feature_names
-            headers.extend(objectives)
+        PendingObservations(
+            os.path.join(experiment_dir, self._reaction_order_filename),
+            consumer="pareto",
+        ).reset()
+        pareto_path = Path(experiment_dir) / self._pareto_filename
+        if pareto_path.exists():
+            pareto_path.unlink()
+        self._fronts.pop(str(pareto_path), None)
 
-            fout.write(",".join(headers) + "\n")
+        # Later sessions start from the checkpoint rather than the CSV
+        if not use_pool:
+            self._save_scope(
+                self._read_scope(scope_path, config), experiment_dir, config
+            )
 
     def train(
         self,
@@ -170,7 +332,7 @@ class OptimizerEDBOp(OptimizerABC):
     def predict(
         self,
         prev_param: list[Any],
-        yield_value: float,
+        yield_value: Union[float, list[Any]],
         experiment_dir: str,
         config: dict[str, Any],
         obj_func: Optional[Callable[..., float]] = None,
@@ -180,11 +342,25 @@ class OptimizerEDBOp(OptimizerABC):
         :py:meth:`OptimizerEDBOp.set_config` must be called prior to this method
         to generate the necessary files.
 
+        When the ``batch_size`` option is larger than 1, each call returns a
+        list of suggestions. Results can be given for any subset of the
+        pending suggestions by passing a list of conditions as
+        ``prev_param`` and a list of results as ``yield_value``. Suggestions
+        without results stay pending and are not proposed again.
+
+        With several objectives, each result is a list with one value per
+        objective, in the order of the ``objectives`` option. The
+        non-dominated results are kept up to date as results come in, see
+        :py:meth:`OptimizerEDBOp.get_pareto_front`.
+
         :param prev_param: Parameters provided from the previous prediction,
-                           provide an empty list for the first call
+                           or a list of them to give several results at
+                           once, provide an empty list for the first call
         :type prev_param: list[Any]
-        :param yield_value: Experimental yield
-        :type yield_value: float
+        :param yield_value: Experimental yield, or one yield for each set of
+                            parameters in ``prev_param``. A yield is a list of
+                            values when there are several objectives.
+        :type yield_value: Union[float, list[Any]]
         :param experiment_dir: Output directory for any generated files
         :type experiment_dir: str
         :param config: CyRxnOpt-level config for the optimizer
@@ -192,125 +368,1626 @@ class OptimizerEDBOp(OptimizerABC):
         :param obj_func: Ignored for this optimizer, defaults to None
         :type obj_func: Optional[Callable[..., float]], optional
 
-        :returns: The next suggested reaction to perform
+        :returns: The next suggested reaction to perform, or a list of
+                  ``batch_size`` suggestions if it is larger than 1
         :rtype: list[Any]
         """
 
         # Get reaction scope configurations from general config file
-        config = self._config_translate(config)
+        edbo_config = self._config_translate(config)
+        batch_size = config.get("batch_size", 1)
 
-        # Read optimization file with reaction conditions
-        df_edbo = self._imports["pd"].read_csv(
-            os.path.join(experiment_dir, self._edbop_filename)
-        )
-
-        # TODO: Writing the entire dataframe of shape (2085136, 6),
-        #       12,510,816 elements: 8.674756252000407 sec. This can probably
-        #       be optimized quite a bit
-        if len(prev_param) != 0:
-            # [df_edbo.loc[0,config['objectives'][i]] =
-            # yield_value[i] for i in range(len(yield_value))]
-            df_edbo.loc[0, config["objectives"][0]] = yield_value
-            df_edbo.to_csv(
-                os.path.join(experiment_dir, self._edbop_filename), index=False
+        self._record_results(prev_param, yield_value, experiment_dir, config)
+
+        self._update_pareto_front(experiment_dir, config)
+
+        # The results are recorded, so a cancelled call can stop before the
+        # EDBO+ run
+        check_cancelled()
+
+        seed = random.randint(0, 2**32 - 1)
+        use_pool = config.get("candidate_pool_size", 0) > 0
+        df_edbo, visible = self._candidates(
+            experiment_dir, config, edbo_config, seed
+        )
+
+        # Run one EDBO+ prediction on a copy of the scope in memory-backed
+        # storage, then keep its output in memory for the next prediction
+        start_time = time.perf_counter()
+        df_scored = self._run_edbo(
+            df_edbo[visible], config, edbo_config, batch_size, seed
+        )
+        run_seconds = time.perf_counter() - start_time
+
+        if use_pool:
+            self._record_pool_stats(
+                df_scored,
+                run_seconds,
+                experiment_dir,
+                config,
+                edbo_config,
+                seed,
+            )
+        else:
+            self._keep_scope(
+                self._imports["pd"].concat(
+                    [df_scored, df_edbo[~visible]], ignore_index=True
+                ),
+                experiment_dir,
+            )
+
+        # Only the suggested rows are decoded
+        next_combos = decode_candidates(df_scored.iloc[:batch_size], config)
+        suggestions = next_combos[self._feature_names(config)].values.tolist()
+
+        self._record_suggestions(suggestions, experiment_dir, config)
+
+        if batch_size == 1:
+            return suggestions[0]
+
+        return suggestions
+
+    def speculate(
+        self,
+        pending: list[Any],
+        yield_value: Union[float, list[Any]],
+        experiment_dir: str,
+        config: dict[str, Any],
+    ) -> list[Any]:
+        """Predicts the suggestion that would follow pending suggestions if
+        they gave assumed results, without recording anything.
+
+        This is how the next suggestion is prefetched while the pending ones
+        are being performed. The assumed results are only overlaid on the
+        rows handed to EDBO+: the scope kept in memory, the files of the
+        experiment, and the pending suggestions stay as they are, so the
+        prediction reads no more than :py:meth:`OptimizerEDBOp.predict`.
+
+        :param pending: Parameters of the pending suggestions, or a list of
+                        them, as for :py:meth:`OptimizerEDBOp.predict`
+        :type pending: list[Any]
+        :param yield_value: Results assumed for them, as for
+                            :py:meth:`OptimizerEDBOp.predict`
+        :type yield_value: Union[float, list[Any]]
+        :param experiment_dir: Output directory for any generated files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: The suggestion that would be predicted next, or a list of
+                  ``batch_size`` suggestions if it is larger than 1
+        :rtype: list[Any]
+        """
+
+        np = self._imports["np"]
+        pd = self._imports["pd"]
+
+        edbo_config = self._config_translate(config)
+        objectives = edbo_config["objectives"]
+        batch_size = config.get("batch_size", 1)
+
+        seed = random.randint(0, 2**32 - 1)
+        df_edbo, visible = self._candidates(
+            experiment_dir, config, edbo_config, seed
+        )
+
+        # The pending suggestions are hidden from EDBO+, so they are added
+        # back as observed rows with the assumed results
+        assumed = [
+            [str(element) for element in conditions]
+            + [str(value) for value in values]
+            for conditions, values in self._split_results(
+                pending, yield_value, len(objectives)
             )
+        ]
+        shape = self._key_shape(config)
+        keys = self._condition_keys(
+            [row[: len(shape)] for row in assumed], shape, config
+        )
+        df_assumed = self._grid_table(
+            np.stack(np.unravel_index(keys[keys >= 0], shape), axis=1),
+            config,
+            objectives,
+        )
+        self._apply_observations(df_assumed, assumed, config, objectives)
+
+        df_scored = self._run_edbo(
+            pd.concat([df_edbo[visible], df_assumed], ignore_index=True),
+            config,
+            edbo_config,
+            batch_size,
+            seed,
+        )
+
+        next_combos = decode_candidates(df_scored.iloc[:batch_size], config)
+        suggestions = next_combos[self._feature_names(config)].values.tolist()
+
+        if batch_size == 1:
+            return suggestions[0]
+
+        return suggestions
+
+    def record_results(
+        self,
+        prev_param: list[Any],
+        yield_value: Union[float, list[Any]],
+        experiment_dir: str,
+        config: dict[str, Any],
+        suggestion: list[Any],
+    ) -> None:
+        """Records results, and a suggestion that was made for the
+        experiment without this call, without running EDBO+.
+
+        This is how a suggestion predicted ahead of time, such as a
+        prefetched one, is taken over: the results it was predicted before
+        are recorded like :py:meth:`OptimizerEDBOp.predict` does, and the
+        suggestion is pending from then on, so it is not proposed again.
+
+        :param prev_param: Parameters of the results, or a list of them, as
+                           for :py:meth:`OptimizerEDBOp.predict`
+        :type prev_param: list[Any]
+        :param yield_value: Results, as for :py:meth:`OptimizerEDBOp.predict`
+        :type yield_value: Union[float, list[Any]]
+        :param experiment_dir: Output directory for any generated files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param suggestion: Suggestion given out in place of a prediction, or
+                           a list of them if ``batch_size`` is larger than 1
+        :type suggestion: list[Any]
+        """
+
+        self._record_results(prev_param, yield_value, experiment_dir, config)
+        self._update_pareto_front(experiment_dir, config)
+
+        if config.get("batch_size", 1) == 1:
+            suggestion = [suggestion]
+        self._record_suggestions(suggestion, experiment_dir, config)
+
+    def replace_suggestion(
+        self,
+        made: list[Any],
+        given: Optional[list[Any]],
+        experiment_dir: str,
+        config: dict[str, Any],
+    ) -> None:
+        """Replaces a suggestion made by :py:meth:`OptimizerEDBOp.predict`
+        with the one given out in its place.
+
+        A prediction that missed its deadline still records its suggestion,
+        but the caller was given a fallback instead, so the suggestion would
+        wait for a result that never comes. It is removed from the pending
+        suggestions, and the fallback is pending from then on, so it is not
+        proposed again.
+
+        :param made: Suggestion returned by the prediction, or a list of them
+                     if ``batch_size`` is larger than 1
+        :type made: list[Any]
+        :param given: Suggestion given out instead, in the same form, or
+                      None if nothing was given out
+        :type given: Optional[list[Any]]
+        :param experiment_dir: Output directory for any generated files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        """
+
+        if config.get("batch_size", 1) == 1:
+            made = [made]
+            given = None if given is None else [given]
+
+        suggestions_path = Path(experiment_dir) / self._suggestions_filename
+        with open(suggestions_path) as fin:
+            lines = fin.read().splitlines()
+
+        # Only the rows recorded last for each suggestion are removed, as
+        # earlier ones were given out by other predictions
+        for suggestion in made:
+            line = ",".join(str(element) for element in suggestion)
+            for i in range(len(lines) - 1, 0, -1):
+                if lines[i] == line:
+                    del lines[i]
+                    break
+
+        lines.extend(
+            ",".join(str(element) for element in suggestion)
+            for suggestion in (given or [])
+        )
+
+        temp_path = str(suggestions_path) + ".tmp"
+        with open(temp_path, "w") as fout:
+            fout.write("".join(line + "\n" for line in lines))
+        os.replace(temp_path, suggestions_path)
+
+        # The file was rewritten, so its keys are read again
+        self._key_caches.pop(
+            os.path.join(experiment_dir, self._suggestions_filename), None
+        )
+
+    def _record_results(
+        self,
+        prev_param: list[Any],
+        yield_value: Union[float, list[Any]],
+        experiment_dir: str,
+        config: dict[str, Any],
+    ) -> None:
+        """Writes results to the reaction order log.
+
+        The log preserves the reaction order. It is also the table of
+        results waiting to be applied to the scope, so recording a result
+        only appends a line. All results of a call are committed together.
+
+        :param prev_param: Parameters of the results, or a list of them
+        :type prev_param: list[Any]
+        :param yield_value: Results for the parameters
+        :type yield_value: Union[float, list[Any]]
+        :param experiment_dir: Output directory for any generated files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        """
+
+        results = self._split_results(
+            prev_param,
+            yield_value,
+            len(self._config_translate(config)["objectives"]),
+        )
+
+        log = self._observation_log(experiment_dir, config)
+        for conditions, values in results:
+            line = [str(element) for element in conditions]
+            line.extend(str(value) for value in values)
+            log.append(",".join(line))
+        log.commit()
+
+    def _record_suggestions(
+        self,
+        suggestions: list[list[Any]],
+        experiment_dir: str,
+        config: dict[str, Any],
+    ) -> None:
+        """Appends suggestions that were given out to the suggestions file,
+        where they wait for their results.
+
+        :param suggestions: Conditions of each suggestion
+        :type suggestions: list[list[Any]]
+        :param experiment_dir: Output directory for any generated files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        """
 
-            # Write the reaction parameters and results to the file preserving
-            # reaction order
-            # TODO: Rework this when we switch to multi-objective!
-            with open(
-                Path(experiment_dir) / self._reaction_order_filename, "a"
-            ) as fout:
-                line = prev_param
-                line.extend([yield_value])
-                line = [str(element) for element in line]
-                fout.write(",".join(line))
+        suggestions_path = Path(experiment_dir) / self._suggestions_filename
+        write_header = not suggestions_path.exists()
+        with open(suggestions_path, "a") as fout:
+            # Experiments set up before suggestions were tracked have no file
+            if write_header:
+                fout.write(",".join(self._feature_names(config)) + "\n")
+            for suggestion in suggestions:
+                fout.write(",".join(str(element) for element in suggestion))
                 fout.write("\n")
 
-        # Run one EDBO+ prediction
+    def get_pareto_front(
+        self, experiment_dir: str, config: dict[str, Any]
+    ) -> list[list[Any]]:
+        """Gets the results that no other result is better than for every
+        objective.
+
+        The front is maintained as results are given to
+        :py:meth:`OptimizerEDBOp.predict`, so only results recorded since
+        then are checked here.
+
+        :param experiment_dir: Experiment directory of the optimizer
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Conditions followed by objective values of each result on
+                  the front, as strings and floats respectively
+        :rtype: list[list[Any]]
+        """
+
+        front = self._update_pareto_front(experiment_dir, config)
+
+        return [
+            list(item) + values
+            for item, values in zip(front.items, front.values.tolist())
+        ]
+
+    def close(self) -> None:
+        """Closes the files the instance keeps open between calls. Calls
+        made afterwards open them again.
+        """
+
+        for log in self._logs.values():
+            log.close()
+        self._logs.clear()
+
+    def _split_results(
+        self,
+        prev_param: list[Any],
+        yield_value: Union[float, list[Any]],
+        n_objectives: int,
+    ) -> list[tuple[list[Any], list[float]]]:
+        """Pairs the conditions given to predict with their results.
+
+        :param prev_param: One set of conditions or a list of them
+        :type prev_param: list[Any]
+        :param yield_value: One result or a list of them, where a result is
+                            a value or a list of one value per objective
+        :type yield_value: Union[float, list[Any]]
+        :param n_objectives: Number of objectives
+        :type n_objectives: int
+
+        :raises ValueError: A result has the wrong number of values
+
+        :returns: Conditions and objective values of each result
+        :rtype: list[tuple[list[Any], list[float]]]
+        """
+
+        if len(prev_param) == 0:
+            return []
+
+        if isinstance(prev_param[0], (list, tuple)):
+            pairs = list(zip(prev_param, cast(list[Any], yield_value)))
+        else:
+            pairs = [(prev_param, yield_value)]
+
+        results = []
+        for conditions, values in pairs:
+            if not isinstance(values, (list, tuple)):
+                values = [values]
+
+            if len(values) != n_objectives:
+                raise ValueError(
+                    "Expected {} objective values for {}, got {}".format(
+                        n_objectives, conditions, values
+                    )
+                )
+
+            results.append((list(conditions), [float(v) for v in values]))
+
+        return results
+
+    def _update_pareto_front(
+        self, experiment_dir: str, config: dict[str, Any]
+    ) -> ParetoFront:
+        """Adds the results recorded since the last update to the saved
+        Pareto front.
+
+        The front is kept between calls and only read again if the saved
+        file changed, and only results after the recorded offset in the
+        reaction order file are read and compared to it.
+
+        :param experiment_dir: Experiment directory of the optimizer
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Updated front, with conditions as its items
+        :rtype: ParetoFront
+        """
+
+        edbo_config = self._config_translate(config)
+        objectives = edbo_config["objectives"]
+        n_features = len(self._feature_names(config))
+
+        pareto_path = os.path.join(experiment_dir, self._pareto_filename)
+        cached = self._fronts.get(pareto_path)
+        if cached is not None and cached[0] == _file_stamp(pareto_path):
+            front = cached[1]
+        else:
+            front = read_pareto_front(pareto_path, edbo_config["direction"])
+            self._fronts[pareto_path] = (_file_stamp(pareto_path), front)
+
+        observations = PendingObservations(
+            os.path.join(experiment_dir, self._reaction_order_filename),
+            consumer="pareto",
+        )
+        pending = list(csv.reader(observations.pending()))
+        if len(pending) == 0:
+            return front
+
+        for row in pending:
+            front.add(
+                [float(value) for value in row[n_features:]], row[:n_features]
+            )
+
+        write_pareto_front(
+            pareto_path, front, self._feature_names(config) + list(objectives)
+        )
+        observations.mark_applied(len(pending))
+        self._fronts[pareto_path] = (_file_stamp(pareto_path), front)
+
+        return front
+
+    def _run_edbo(  # type: ignore
+        self,
+        df_edbo,
+        config: dict[str, Any],
+        edbo_config: dict[str, Any],
+        batch_size: int,
+        seed: int,
+        filename: Optional[str] = None,
+    ):
+        """Runs one EDBO+ prediction on a compact scope table.
+
+        The table is written to the memory-backed working directory for EDBO+
+        to read, and its output is read back. The scope key column is passed
+        through EDBO+, which is only given the feature columns to model, so
+        its output can be matched back to the compact rows instead of
+        parsing and encoding the feature values again.
+
+        Only the rows given are written, so the hand-off costs time in
+        proportion to them: the observed rows and the candidate pool with
+        ``candidate_pool_size``, or every row that is not pending without
+        it. Columns EDBO+ wrote in earlier runs are left out, as it computes
+        them again.
+
+        EDBO+ encodes, scales and fits its model from the file on every run.
+        ``EDBOplus.run`` takes no fitted model or hyperparameters to start
+        from, so nothing of the model is kept between runs; only the scope
+        table is.
+
+        :param df_edbo: Compact scope table for EDBO+ to score
+        :type df_edbo: pd.DataFrame
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param edbo_config: Config translated by :py:meth:`_config_translate`
+        :type edbo_config: dict[str, Any]
+        :param batch_size: Number of suggestions to make
+        :type batch_size: int
+        :param seed: Seed for EDBO+'s initial sampling
+        :type seed: int
+        :param filename: Name of the scope file in the working directory,
+                         defaults to the regular EDBO+ scope file name
+        :type filename: Optional[str], optional
+
+        :returns: Scope table as sorted by EDBO+, suggestions first
+        :rtype: pd.DataFrame
+        """
+
+        np = self._imports["np"]
+        pd = self._imports["pd"]
+
+        if filename is None:
+            filename = self._edbop_filename
+
+        feature_names = self._feature_names(config)
+        df_edbo = df_edbo.reset_index(drop=True)
+
+        # EDBO+ only reads the features, the objectives, and the key it
+        # passes through
+        columns = (
+            feature_names + list(edbo_config["objectives"]) + [self._row_column]
+        )
+        scope_path = os.path.join(self._working_dir(), filename)
+        decode_candidates(
+            df_edbo[[c for c in columns if c in df_edbo]], config
+        ).to_csv(scope_path, index=False)
+
         self._imports["EDBOplus"]().run(
-            directory=experiment_dir,
-            filename=self._edbop_filename,
-            objectives=config["objectives"],
-            objective_mode=config["direction"],
-            batch=1,
-            columns_features="all",
+            directory=self._working_dir(),
+            filename=filename,
+            objectives=edbo_config["objectives"],
+            objective_mode=edbo_config["direction"],
+            batch=batch_size,
+            columns_features=feature_names,
             init_sampling_method="seed",
-            seed=random.randint(0, 2**32 - 1),
+            seed=seed,
             write_extra_data=False,
         )
 
-        # After one cycle of prediction, read the reaction condition file to
-        # get the next reaction condition
-        df_edbo = self._imports["pd"].read_csv(
-            os.path.join(experiment_dir, self._edbop_filename)
+        df_output = pd.read_csv(
+            scope_path, usecols=lambda name: name not in feature_names
         )
+        if self._row_column not in df_output:
+            # Fall back to encoding the features EDBO+ wrote
+            return self._read_scope(scope_path, config)
 
-        next_combo = df_edbo.iloc[:1].values.tolist()
-        next_combo = next_combo[0][:-2]
+        keys = df_output.pop(self._row_column).to_numpy(dtype=np.int64)
+        rows = pd.Index(self._scope_keys(df_edbo, config)[0]).get_indexer(keys)
+        df_scored = df_edbo.iloc[rows].reset_index(drop=True)
+        for name in df_output.columns:
+            df_scored[name] = df_output[name].to_numpy()
 
-        return next_combo
+        return df_scored
 
-    def _config_translate(self, config: dict[str, Any]) -> dict[str, Any]:
-        """Convers general config into EDBO+ reaction scope config format.
+    def _candidates(  # type: ignore
+        self,
+        experiment_dir: str,
+        config: dict[str, Any],
+        edbo_config: dict[str, Any],
+        seed: int,
+    ):
+        """Gets the compact scope table of a prediction and the rows of it
+        EDBO+ is shown.
 
-        :param config: General configuration dictionary
+        With ``candidate_pool_size``, the table only holds the results and
+        the grid points a pool is picked from, see
+        :py:meth:`_sampled_scope`. Otherwise it is the full scope, and every
+        row is shown except the suggestions still waiting for results, so
+        EDBO+ proposes new conditions instead of repeating them.
+
+        :param experiment_dir: Experiment directory with the scope
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
         :type config: dict[str, Any]
+        :param edbo_config: Config translated by :py:meth:`_config_translate`
+        :type edbo_config: dict[str, Any]
+        :param seed: Seed for the random parts of the pool
+        :type seed: int
 
-        :return: Translated configuration dictionary
-        :rtype: dict[str, Any]
+        :returns: Compact scope table, and whether each row is shown to
+                  EDBO+
+        :rtype: tuple[pd.DataFrame, np.ndarray]
         """
 
-        self._import_deps()
-        reaction_components = {}
+        if config.get("candidate_pool_size", 0) > 0:
+            # Only score a pool of candidates sampled from the grid, so the
+            # full scope is never generated
+            df_edbo = self._sampled_scope(
+                experiment_dir, config, edbo_config, seed
+            )
+            visible = self._candidate_pool_mask(
+                df_edbo,
+                self._imports["np"].ones(len(df_edbo), dtype=bool),
+                config,
+                edbo_config,
+                seed,
+            )
+        else:
+            df_edbo = self._load_scope(experiment_dir, config)
+            visible = ~self._waiting_mask(df_edbo, experiment_dir, config)
 
-        config = use_subkeys(config)
+        return df_edbo, visible
 
-        for i in range(len(config["continuous"]["feature_names"])):
-            low_bound = config["continuous"]["bounds"][i][0]
-            upper_bound = config["continuous"]["bounds"][i][1]
-            increment = config["continuous"]["resolutions"][i]
+    def _candidate_pool_mask(  # type: ignore
+        self,
+        df_edbo,
+        visible,
+        config: dict[str, Any],
+        edbo_config: dict[str, Any],
+        seed: int,
+    ):
+        """Limits the rows EDBO+ scores to a pool of candidates.
 
-            values = self._imports["np"].arange(
-                low_bound, upper_bound + increment, increment
-            )
+        Observed rows are always kept so EDBO+ can fit its model. The
+        unobserved rows are reduced to ``candidate_pool_size`` rows picked by
+        :py:func:`~cyrxnopt.utilities.config.candidate_pool.sample_candidate_pool`:
+        a random sample, the neighbourhood of the best result so far, and
+        rows far from every result. The best result is judged by the first
+        objective.
 
-            reaction_components[config["continuous"]["feature_names"][i]] = (
-                values
-            )
+        :param df_edbo: Compact scope table
+        :type df_edbo: pd.DataFrame
+        :param visible: Whether each row may be shown to EDBO+
+        :type visible: np.ndarray
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param edbo_config: Config translated by :py:meth:`_config_translate`
+        :type edbo_config: dict[str, Any]
+        :param seed: Seed for the random parts of the pool
+        :type seed: int
 
-        if bool(config["categorical"]["feature_names"]):
-            for i in range(len(config["categorical"]["feature_names"])):
-                reaction_components[
-                    config["categorical"]["feature_names"][i]
-                ] = config["categorical"]["values"][i]
+        :returns: Whether each row is shown to EDBO+
+        :rtype: np.ndarray
+        """
 
-        # EDBO+ supports multi-objective optimization, of which single-
-        # objective optimization is a subset. When providing arguments
-        # for single-objective optimization, only one objective and one
-        # corresponding direction must be given. This catches when the user
-        # does not provide single-element lists for the objectives and
-        # their directions, which could be an easy mistake.
-        if type(config["objectives"]) is str:
-            config["objectives"] = [config["objectives"]]
-        if type(config["direction"]) is str:
-            config["direction"] = [config["direction"]]
-
-        edbo_config = {
-            "reaction_components": reaction_components,
-            "objectives": config["objectives"],
-            "direction": config["direction"],
-        }
+        np = self._imports["np"]
 
-        edbo_config = config | edbo_config
+        observed, best = self._best_row(df_edbo, edbo_config)
 
-        return edbo_config
+        pool = sample_candidate_pool(
+            self._scope_indices(df_edbo, config),
+            visible & ~observed,
+            observed,
+            best,
+            config,
+            config["candidate_pool_size"],
+            np.random.default_rng(seed),
+        )
 
-    def _import_deps(self) -> None:
-        """Import packages needed to run the optimizer."""
+        mask = visible & observed
+        mask[pool] = True
 
-        import numpy as np  # type: ignore
-        import pandas as pd  # type: ignore
-        from edbo.plus.optimizer_botorch import EDBOplus  # type: ignore
+        return mask
 
-        self._imports = {"EDBOplus": EDBOplus, "np": np, "pd": pd}
+    def _best_row(self, df_edbo, edbo_config: dict[str, Any]):  # type: ignore
+        """Finds the rows of a compact scope table with a result, and the
+        best of them by the first objective.
+
+        :param df_edbo: Compact scope table
+        :type df_edbo: pd.DataFrame
+        :param edbo_config: Config translated by :py:meth:`_config_translate`
+        :type edbo_config: dict[str, Any]
+
+        :returns: Whether each row has a result, and the position of the best
+                  row, None if no row has one
+        :rtype: tuple[np.ndarray, Optional[int]]
+        """
+
+        np = self._imports["np"]
+
+        results = (
+            self._imports["pd"]
+            .to_numeric(df_edbo[edbo_config["objectives"][0]], errors="coerce")
+            .to_numpy(dtype=float)
+        )
+        observed = ~np.isnan(results)
+
+        best = None
+        if observed.any():
+            if edbo_config["direction"][0] == "max":
+                best = int(np.nanargmax(results))
+            else:
+                best = int(np.nanargmin(results))
+
+        return observed, best
+
+    def _sampled_scope(  # type: ignore
+        self,
+        experiment_dir: str,
+        config: dict[str, Any],
+        edbo_config: dict[str, Any],
+        seed: int,
+    ):
+        """Builds the compact scope table of one candidate pool prediction
+        from grid indices, without generating the full scope.
+
+        The table holds a row for each result in the reaction order file,
+        the grid points next to the best result, and four times
+        ``candidate_pool_size`` grid points drawn at random, which
+        :py:meth:`_candidate_pool_mask` picks the pool from. Grid points
+        waiting for a result are left out. Grids with fewer points than
+        would be drawn are used whole. Building the table takes time in
+        proportion to the results and the pool rather than the scope.
+
+        :param experiment_dir: Experiment directory with the suggestion and
+                               reaction order files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param edbo_config: Config translated by :py:meth:`_config_translate`
+        :type edbo_config: dict[str, Any]
+        :param seed: Seed for the grid points drawn at random
+        :type seed: int
+
+        :returns: Compact scope table, results first
+        :rtype: pd.DataFrame
+        """
+
+        np = self._imports["np"]
+        pd = self._imports["pd"]
+
+        objectives = edbo_config["objectives"]
+        shape = self._key_shape(config)
+        chunk_size = config.get("grid_chunk_size", 100000)
+
+        order_keys = self._file_keys(
+            os.path.join(experiment_dir, self._reaction_order_filename),
+            shape,
+            config,
+        )
+        observed_keys = np.unique(order_keys[order_keys >= 0])
+        df_observed = self._grid_table(
+            np.stack(np.unravel_index(observed_keys, shape), axis=1),
+            config,
+            objectives,
+        )
+        if len(df_observed) > 0:
+            self._apply_observations(
+                df_observed,
+                self._recorded_results(experiment_dir, config),
+                config,
+                objectives,
+            )
+
+        n_samples = 4 * config["candidate_pool_size"]
+        if grid_size(config) <= n_samples:
+            chunks = list(iter_grid_chunks(config, chunk_size))
+        else:
+            rng = np.random.default_rng(seed)
+            chunks = [
+                np.stack(
+                    [
+                        rng.integers(0, n, size=n_samples)
+                        for n in grid_shape(config)
+                    ],
+                    axis=1,
+                )
+            ]
+
+            _, best = self._best_row(df_observed, edbo_config)
+            if best is not None:
+                n_continuous = len(config.get("continuous_feature_names", []))
+                chunks.extend(
+                    iter_grid_chunks(
+                        config,
+                        chunk_size,
+                        trust_region_axes(
+                            self._scope_indices(df_observed, config)[best],
+                            config,
+                            [1] * n_continuous,
+                            1,
+                        ),
+                    )
+                )
+
+        candidate_keys = np.setdiff1d(
+            np.ravel_multi_index(
+                np.concatenate(chunks).astype(np.int64).T, shape
+            ),
+            np.concatenate(
+                (
+                    observed_keys,
+                    self._waiting_keys(experiment_dir, shape, config),
+                )
+            ),
+        )
+        df_candidates = self._grid_table(
+            np.stack(np.unravel_index(candidate_keys, shape), axis=1),
+            config,
+            objectives,
+        )
+
+        return pd.concat([df_observed, df_candidates], ignore_index=True)
+
+    def _grid_scope(  # type: ignore
+        self, config: dict[str, Any], objectives: list[str]
+    ):
+        """Generates the compact table of the full reaction scope, without
+        any results, for when every row is needed at once.
+
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param objectives: Names of the objective columns
+        :type objectives: list[str]
+
+        :returns: Compact scope table
+        :rtype: pd.DataFrame
+        """
+
+        self._check_scope_size(config, objectives)
+
+        return self._imports["pd"].concat(
+            [
+                self._grid_table(indices, config, objectives)
+                for indices in iter_grid_chunks(
+                    config, config.get("grid_chunk_size", 100000)
+                )
+            ],
+            ignore_index=True,
+        )
+
+    def _grid_table(  # type: ignore
+        self, indices, config: dict[str, Any], objectives: list[str]
+    ):
+        """Builds a compact scope table from grid indices, with every
+        objective pending.
+
+        :param indices: Grid indices, shape ``(rows, features)``
+        :type indices: np.ndarray
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param objectives: Names of the objective columns
+        :type objectives: list[str]
+
+        :returns: Compact scope table with a key column
+        :rtype: pd.DataFrame
+        """
+
+        pd = self._imports["pd"]
+
+        n_continuous = len(config.get("continuous_feature_names", []))
+        levels = config.get("categorical_feature_values", [])
+
+        data = {}
+        for i, name in enumerate(self._feature_names(config)):
+            if i < n_continuous:
+                data[name] = indices[:, i]
+            else:
+                data[name] = pd.Categorical.from_codes(
+                    indices[:, i], categories=levels[i - n_continuous]
+                )
+        df_edbo = pd.DataFrame(data, columns=self._feature_names(config))
+
+        for objective in objectives:
+            df_edbo[objective] = self._imports["np"].full(
+                len(df_edbo), PENDING, dtype=object
+            )
+
+        return self._add_scope_keys(df_edbo, config)
+
+    def _record_pool_stats(  # type: ignore
+        self,
+        df_scored,
+        run_seconds: float,
+        experiment_dir: str,
+        config: dict[str, Any],
+        edbo_config: dict[str, Any],
+        seed: int,
+    ) -> None:
+        """Appends the latency, and optionally the accuracy, of a prediction
+        made with a candidate pool to ``candidate_pool_stats.csv``.
+
+        With the ``candidate_pool_audit`` option, the same prediction is
+        also made over every grid point that is not waiting for a result,
+        which generates the full scope for it. The stats then record how long
+        it took, the best priority EDBO+ gave any row, and the priority and
+        rank the pool's suggestion got in that full run. A rank of 0 means
+        the pool found the same suggestion.
+
+        :param df_scored: Scope table as sorted by EDBO+
+        :type df_scored: pd.DataFrame
+        :param run_seconds: Time the EDBO+ run took
+        :type run_seconds: float
+        :param experiment_dir: Experiment directory for the stats file
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param edbo_config: Config translated by :py:meth:`_config_translate`
+        :type edbo_config: dict[str, Any]
+        :param seed: Seed used for the pool's EDBO+ run
+        :type seed: int
+        """
+
+        np = self._imports["np"]
+
+        stats = {
+            "scope_rows": grid_size(config),
+            "scored_rows": len(df_scored),
+            "seconds": run_seconds,
+            "full_seconds": "",
+            "full_best_priority": "",
+            "pool_choice_priority": "",
+            "pool_choice_rank": "",
+        }
+
+        if config.get("candidate_pool_audit", False):
+            objectives = edbo_config["objectives"]
+            df_edbo = self._grid_scope(config, objectives)
+            self._apply_observations(
+                df_edbo,
+                self._recorded_results(experiment_dir, config),
+                config,
+                objectives,
+            )
+            eligible = ~self._waiting_mask(df_edbo, experiment_dir, config)
+
+            start_time = time.perf_counter()
+            df_full = self._run_edbo(
+                df_edbo[eligible],
+                config,
+                edbo_config,
+                1,
+                seed,
+                filename="audit_" + self._edbop_filename,
+            )
+            stats["full_seconds"] = time.perf_counter() - start_time
+
+            full_keys = self._scope_keys(df_full, config)[0]
+            choice_key = self._scope_keys(df_scored.iloc[:1], config)[0][0]
+            rank = int(np.flatnonzero(full_keys == choice_key)[0])
+
+            stats["full_best_priority"] = df_full["priority"].iloc[0]
+            stats["pool_choice_priority"] = df_full["priority"].iloc[rank]
+            stats["pool_choice_rank"] = rank
+
+        logger.info("Candidate pool prediction: %s", stats)
+
+        stats_path = Path(experiment_dir) / "candidate_pool_stats.csv"
+        write_header = not stats_path.exists()
+        with open(stats_path, "a") as fout:
+            if write_header:
+                fout.write(",".join(stats) + "\n")
+            fout.write(",".join(str(value) for value in stats.values()))
+            fout.write("\n")
+
+    def _check_scope_size(
+        self, config: dict[str, Any], objectives: list[str]
+    ) -> None:
+        """Rejects configs whose reaction scope would not fit in the memory
+        budget, if the ``scope_memory_budget`` option sets one.
+
+        The scope size is computed from the config alone, before anything is
+        generated. The estimate is for one float64 copy of the scope with
+        categorical features one-hot encoded, which EDBO+ builds to fit its
+        model, so actual peak usage is higher. A warning is logged when the
+        estimate is over half of the budget, or over
+        ``_SCOPE_WARNING_MB`` without a budget.
+
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param objectives: Names of the objective columns
+        :type objectives: list[str]
+        :raises RuntimeError: The scope is estimated to exceed the budget
+        """
+
+        budget_mb = config.get("scope_memory_budget", 0)
+
+        # One extra column for EDBO+'s priorities
+        estimate_mb = encoded_grid_bytes(config, len(objectives) + 1) / 2**20
+        n_rows = grid_size(config)
+
+        if budget_mb <= 0:
+            if estimate_mb > _SCOPE_WARNING_MB:
+                logger.warning(
+                    "The reaction scope has %d rows and needs about %.0f MB "
+                    "of memory. Set 'candidate_pool_size' to sample "
+                    "candidates instead of generating the scope, or "
+                    "'scope_memory_budget' to reject scopes this large.",
+                    n_rows,
+                    estimate_mb,
+                )
+            return
+
+        if estimate_mb > budget_mb:
+            raise RuntimeError(
+                (
+                    "The reaction scope has {} rows and needs about {:.0f} MB "
+                    "of memory, which exceeds 'scope_memory_budget' of {} "
+                    "MB. Use coarser resolutions or fewer features, or raise "
+                    "the budget."
+                ).format(n_rows, estimate_mb, budget_mb)
+            )
+
+        if estimate_mb > budget_mb / 2:
+            logger.warning(
+                "The reaction scope has %d rows and needs about %.0f MB of "
+                "memory, over half of the %s MB budget",
+                n_rows,
+                estimate_mb,
+                budget_mb,
+            )
+
+    def _write_reaction_scope(
+        self, scope_path: str, config: dict[str, Any]
+    ) -> None:
+        """Writes the EDBO+ reaction scope, the full grid of the config.
+
+        Rows are generated one chunk of grid indices at a time and appended
+        to the file, so only ``grid_chunk_size`` rows are held in memory
+        while the scope is written.
+
+        :param scope_path: Path to the EDBO+ scope file
+        :type scope_path: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        """
+
+        pd = self._imports["pd"]
+
+        feature_names = self._feature_names(config)
+        n_continuous = len(config.get("continuous_feature_names", []))
+        chunk_size = config.get("grid_chunk_size", 100000)
+
+        with open(scope_path, "w", newline="") as fout:
+            fout.write(",".join(feature_names) + "\n")
+
+            for indices in iter_grid_chunks(config, chunk_size):
+                values = grid_indices_to_values(indices, config)
+
+                chunk = pd.DataFrame(
+                    values[:, :n_continuous],
+                    columns=feature_names[:n_continuous],
+                )
+                for i, levels in enumerate(
+                    config.get("categorical_feature_values", [])
+                ):
+                    chunk[feature_names[n_continuous + i]] = (
+                        pd.Categorical.from_codes(
+                            indices[:, n_continuous + i], categories=levels
+                        )
+                    )
+
+                chunk.to_csv(fout, header=False, index=False)
+
+    def _apply_observations(  # type: ignore
+        self,
+        df_edbo,
+        pending: list[list[str]],
+        config: dict[str, Any],
+        objectives: list[str],
+    ) -> None:
+        """Writes recorded results into a compact scope table.
+
+        Results are appended to the reaction order file as they come in, and
+        all of the pending ones are applied here, right before EDBO+ needs
+        them. Each result is matched to its scope row by the grid point of
+        its conditions, so it does not depend on the row order EDBO+ left
+        behind. Results whose conditions are not in the scope are skipped
+        with a warning.
+
+        :param df_edbo: Compact scope table, modified in place
+        :type df_edbo: pd.DataFrame
+        :param pending: Rows of the reaction order file that have not been
+                        applied yet, conditions followed by results
+        :type pending: list[list[str]]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :param objectives: Names of the objective columns
+        :type objectives: list[str]
+        """
+
+        if len(pending) == 0:
+            return
+
+        np = self._imports["np"]
+
+        scope_keys, shape = self._scope_keys(df_edbo, config)
+        n_features = len(shape)
+
+        # Look up every result's row at once, using the first row of each key
+        unique_keys, first_rows = np.unique(scope_keys, return_index=True)
+        keys = self._condition_keys(
+            [row[:n_features] for row in pending], shape, config
+        )
+        positions = np.minimum(
+            np.searchsorted(unique_keys, keys), len(unique_keys) - 1
+        )
+        found = (keys >= 0) & (unique_keys[positions] == keys)
+
+        # Columns read from a file with only pending values can have a
+        # string type, which does not take results
+        for objective in objectives:
+            if df_edbo[objective].dtype != object:
+                df_edbo[objective] = df_edbo[objective].astype(object)
+
+        for row, is_found, position in zip(pending, found, positions):
+            if not is_found:
+                logger.warning(
+                    "Conditions %s are not in the reaction scope, their "
+                    "result is not given to EDBO+",
+                    row[:n_features],
+                )
+                continue
+
+            for objective, value in zip(objectives, row[n_features:]):
+                df_edbo.loc[first_rows[position], objective] = float(value)
+
+    def _waiting_mask(  # type: ignore
+        self, df_edbo, experiment_dir: str, config: dict[str, Any]
+    ):
+        """Finds the scope rows that were suggested but have no result yet.
+
+        :param df_edbo: Compact scope table
+        :type df_edbo: pd.DataFrame
+        :param experiment_dir: Experiment directory with the suggestion and
+                               reaction order files
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Whether each scope row is waiting for a result
+        :rtype: np.ndarray
+        """
+
+        scope_keys, shape = self._scope_keys(df_edbo, config)
+
+        return self._imports["np"].isin(
+            scope_keys, self._waiting_keys(experiment_dir, shape, config)
+        )
+
+    def _waiting_keys(  # type: ignore
+        self,
+        experiment_dir: str,
+        shape: tuple[int, ...],
+        config: dict[str, Any],
+    ):
+        """Gets the scope keys of the suggestions that have no result yet.
+
+        :param experiment_dir: Experiment directory with the suggestion and
+                               reaction order files
+        :type experiment_dir: str
+        :param shape: Grid shape from :py:meth:`_scope_keys`
+        :type shape: tuple[int, ...]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Sorted keys of the suggestions waiting for a result
+        :rtype: np.ndarray
+        """
+
+        waiting = self._imports["np"].setdiff1d(
+            self._file_keys(
+                os.path.join(experiment_dir, self._suggestions_filename),
+                shape,
+                config,
+            ),
+            self._file_keys(
+                os.path.join(experiment_dir, self._reaction_order_filename),
+                shape,
+                config,
+            ),
+        )
+
+        return waiting[waiting >= 0]
+
+    def _file_keys(  # type: ignore
+        self, path: str, shape: tuple[int, ...], config: dict[str, Any]
+    ):
+        """Gets the scope keys of the conditions in each row of a CSV file.
+
+        The file is expected to only be appended to, like the suggestion and
+        reaction order files. Its rows and their keys are kept for the rest
+        of the session, so only rows added since the last call are read and
+        converted. A file that was rewritten is read again.
+
+        :param path: Path to the CSV file, whose first line is a header
+        :type path: str
+        :param shape: Grid shape from :py:meth:`_scope_keys`
+        :type shape: tuple[int, ...]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Keys of the rows, -1 for conditions not on the grid
+        :rtype: np.ndarray
+        """
+
+        np = self._imports["np"]
+
+        cache, keys, keys_shape = self._key_caches.get(
+            path, (AppendOnlyFileCache(path), None, None)
+        )
+        if cache.refresh() or keys is None or keys_shape != shape:
+            keys = np.empty(0, dtype=np.int64)
+
+        # Skip the header and the rows converted before
+        rows = list(csv.reader(cache.lines[1 + len(keys) :]))
+        keys = np.concatenate(
+            (
+                keys,
+                self._condition_keys(
+                    [row[: len(shape)] for row in rows], shape, config
+                ),
+            )
+        )
+        self._key_caches[path] = (cache, keys, shape)
+
+        return keys
+
+    def _recorded_results(
+        self, experiment_dir: str, config: dict[str, Any]
+    ) -> list[list[str]]:
+        """Gets every result in the reaction order file.
+
+        The file is read through the same cache as :py:meth:`_file_keys`, so
+        only rows added since the last call are read from disk.
+
+        :param experiment_dir: Experiment directory with the reaction order
+                               file
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Rows of the file, conditions followed by results
+        :rtype: list[list[str]]
+        """
+
+        path = os.path.join(experiment_dir, self._reaction_order_filename)
+        self._file_keys(path, self._key_shape(config), config)
+
+        return list(csv.reader(self._key_caches[path][0].lines[1:]))
+
+    def _scope_indices(self, df_edbo, config: dict[str, Any]):  # type: ignore
+        """Gets the grid indices of each scope row.
+
+        :param df_edbo: Compact scope table
+        :type df_edbo: pd.DataFrame
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Grid indices, shape ``(rows, features)``
+        :rtype: np.ndarray
+        """
+
+        np = self._imports["np"]
+        pd = self._imports["pd"]
+
+        columns = []
+        for name in self._feature_names(config):
+            column = df_edbo[name]
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.cat.codes
+            columns.append(column.to_numpy(dtype=np.int64))
+
+        return np.stack(columns, axis=1)
+
+    def _scope_keys(self, df_edbo, config: dict[str, Any]):  # type: ignore
+        """Gets the key of each scope row, see :py:meth:`_add_scope_keys`.
+
+        :param df_edbo: Compact scope table with a key column
+        :type df_edbo: pd.DataFrame
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Key of each row and the grid shape the keys are based on
+        :rtype: tuple[np.ndarray, tuple[int, ...]]
+        """
+
+        keys = df_edbo[self._row_column].to_numpy(
+            dtype=self._imports["np"].int64
+        )
+
+        return keys, self._key_shape(config)
+
+    def _add_scope_keys(self, df_edbo, config: dict[str, Any]):  # type: ignore
+        """Adds a column with the key of each row to a compact scope table.
+
+        The key flattens a row's grid indices into one number. It is
+        computed once, when the scope is read, and kept in the table from
+        then on, so rows can be looked up and matched with EDBO+'s output
+        without going through their features again.
+
+        :param df_edbo: Compact scope table
+        :type df_edbo: pd.DataFrame
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: The same table with a key column
+        :rtype: pd.DataFrame
+        """
+
+        if self._row_column not in df_edbo:
+            df_edbo[self._row_column] = self._imports["np"].ravel_multi_index(
+                self._scope_indices(df_edbo, config).T,
+                self._key_shape(config),
+            )
+
+        return df_edbo
+
+    def _key_shape(self, config: dict[str, Any]) -> tuple[int, ...]:
+        """Gets the grid shape scope keys are based on.
+
+        Continuous features have one step past their upper bound, which
+        older scopes can have, so the keys only depend on the config.
+
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Number of grid points along each feature
+        :rtype: tuple[int, ...]
+        """
+
+        n_continuous = len(config.get("continuous_feature_names", []))
+
+        return tuple(
+            n + 1 if i < n_continuous else n
+            for i, n in enumerate(grid_shape(config))
+        )
+
+    def _condition_keys(  # type: ignore
+        self,
+        conditions: list[list[Any]],
+        shape: tuple[int, ...],
+        config: dict[str, Any],
+    ):
+        """Gets the scope keys of several sets of conditions at once.
+
+        :param conditions: Reaction conditions, continuous features first
+        :type conditions: list[list[Any]]
+        :param shape: Grid shape from :py:meth:`_scope_keys`
+        :type shape: tuple[int, ...]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Keys matching :py:meth:`_scope_keys`, -1 for conditions
+                  that are not on the grid
+        :rtype: np.ndarray
+        """
+
+        np = self._imports["np"]
+
+        keys = np.full(len(conditions), -1, dtype=np.int64)
+        if len(conditions) == 0:
+            return keys
+
+        indices = feature_space(config).encode(conditions, strict=False)
+        on_grid = ((indices >= 0) & (indices < np.array(shape))).all(axis=1)
+        keys[on_grid] = np.ravel_multi_index(indices[on_grid].T, shape)
+
+        return keys
+
+    def _load_scope(  # type: ignore
+        self, experiment_dir: str, config: dict[str, Any]
+    ):
+        """Gets the compact scope table of an experiment with every recorded
+        result applied.
+
+        The table kept in memory from the previous call is used as long as
+        the checkpoint on disk is the one it started from, and only the
+        results recorded since are applied. Otherwise, the table is loaded
+        from the checkpoint, and every result in the reaction order file is
+        applied. Experiments set up without a checkpoint get one from the
+        EDBO+ scope file first, or from the grid if they were set up for
+        candidate pools and have no scope file.
+
+        :param experiment_dir: Experiment directory with the scope
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Compact scope table
+        :rtype: pd.DataFrame
+        """
+
+        checkpoint_path = os.path.join(
+            experiment_dir, self._checkpoint_filename
+        )
+
+        if not os.path.exists(checkpoint_path):
+            scope_path = os.path.join(experiment_dir, self._edbop_filename)
+            if os.path.exists(scope_path):
+                df_edbo = self._read_scope(scope_path, config)
+            else:
+                # Set up for candidate pools, which need no scope
+                df_edbo = self._grid_scope(
+                    config, self._config_translate(config)["objectives"]
+                )
+            self._save_scope(df_edbo, experiment_dir, config)
+
+        stat = os.stat(checkpoint_path)
+        current = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._scopes.get(checkpoint_path)
+        if cached is None or cached[0] != current:
+            cached = self._start_scope(checkpoint_path, current, config)
+        _, df_edbo, log, applied = cached
+
+        if log.refresh() and applied > 0:
+            # The log was rewritten, so start over from the checkpoint
+            _, df_edbo, log, applied = self._start_scope(
+                checkpoint_path, current, config
+            )
+            log.refresh()
+
+        # Skip the header and the results applied before
+        pending = list(csv.reader(log.lines[1 + applied :]))
+        self._apply_observations(
+            df_edbo,
+            pending,
+            config,
+            self._config_translate(config)["objectives"],
+        )
+        self._scopes[checkpoint_path] = (
+            current,
+            df_edbo,
+            log,
+            applied + len(pending),
+        )
+
+        return df_edbo
+
+    def _start_scope(  # type: ignore
+        self,
+        checkpoint_path: str,
+        stamp: tuple[int, int],
+        config: dict[str, Any],
+    ):
+        """Loads a scope checkpoint into a new session entry, see
+        :py:meth:`_load_scope`.
+
+        :param checkpoint_path: Path of the scope checkpoint
+        :type checkpoint_path: str
+        :param stamp: Modification time and size of the checkpoint
+        :type stamp: tuple[int, int]
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Session entry without any results applied
+        :rtype: tuple[tuple[int, int], pd.DataFrame, AppendOnlyFileCache, int]
+        """
+
+        df_edbo = self._add_scope_keys(
+            load_scope_checkpoint(checkpoint_path, config), config
+        )
+        log = AppendOnlyFileCache(
+            os.path.join(
+                os.path.dirname(checkpoint_path), self._reaction_order_filename
+            )
+        )
+
+        return (stamp, df_edbo, log, 0)
+
+    def _keep_scope(self, df_edbo, experiment_dir: str) -> None:  # type: ignore
+        """Keeps a compact scope table in memory for the next call.
+
+        :param df_edbo: Compact scope table loaded by :py:meth:`_load_scope`,
+            possibly reordered
+        :type df_edbo: pd.DataFrame
+        :param experiment_dir: Experiment directory of the scope
+        :type experiment_dir: str
+        """
+
+        checkpoint_path = os.path.join(
+            experiment_dir, self._checkpoint_filename
+        )
+
+        stamp, _, log, applied = self._scopes[checkpoint_path]
+        self._scopes[checkpoint_path] = (stamp, df_edbo, log, applied)
+
+    def _save_scope(  # type: ignore
+        self, df_edbo, experiment_dir: str, config: dict[str, Any]
+    ) -> None:
+        """Checkpoints a compact scope table that sessions start from.
+
+        :param df_edbo: Compact scope table
+        :type df_edbo: pd.DataFrame
+        :param experiment_dir: Experiment directory for the checkpoint
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        """
+
+        checkpoint_path = os.path.join(
+            experiment_dir, self._checkpoint_filename
+        )
+
+        # The next call loads it again, with results applied. The table kept
+        # so far maps the old file, which is released before it is replaced.
+        self._scopes.pop(checkpoint_path, None)
+
+        objectives = self._config_translate(config)["objectives"]
+        save_scope_checkpoint(checkpoint_path, df_edbo, config, objectives)
+
+    def _working_dir(self) -> str:
+        """Gets the directory EDBO+ reads and writes its scope file in.
+
+        The directory is created in memory-backed storage where available
+        (``/dev/shm`` on Linux), or in the system's temporary directory
+        otherwise, and is removed along with this instance.
+
+        :returns: Path to the working directory
+        :rtype: str
+        """
+
+        if self._work_dir is None:
+            shm_dir = "/dev/shm"
+            parent = shm_dir if os.access(shm_dir, os.W_OK) else None
+
+            self._work_dir = tempfile.mkdtemp(
+                prefix="cyrxnopt-edbop-", dir=parent
+            )
+            weakref.finalize(
+                self, shutil.rmtree, self._work_dir, ignore_errors=True
+            )
+
+        return self._work_dir
+
+    def _observation_log(
+        self, experiment_dir: str, config: dict[str, Any]
+    ) -> ObservationLog:
+        """Gets the open log preserving reaction order for an experiment.
+
+        The log is opened on first use and kept open for the rest of the
+        session, so recording results does not reopen the file. It is
+        closed along with this instance.
+
+        :param experiment_dir: Experiment directory of the optimizer
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Reaction order log
+        :rtype: ObservationLog
+        """
+
+        log_path = os.path.join(experiment_dir, self._reaction_order_filename)
+
+        log = self._logs.get(log_path)
+        if log is None or log.closed:
+            log = ObservationLog(
+                log_path, fsync=config.get("log_fsync", DEFAULT_FSYNC_POLICY)
+            )
+            self._logs[log_path] = log
+            weakref.finalize(self, log.close)
+
+        return log
+
+    def _read_scope(  # type: ignore
+        self, scope_path: str, config: dict[str, Any]
+    ):
+        """Reads an EDBO+ scope file into a compact candidate table.
+
+        Categorical columns are parsed as pandas categories, so each distinct
+        string is only stored once while the file is read, then every feature
+        column is converted to its integer code (see
+        :py:func:`~cyrxnopt.utilities.config.encoding.encode_candidates`).
+        Objective and priority columns are left as EDBO+ wrote them.
+
+        :param scope_path: Path to the EDBO+ scope file
+        :type scope_path: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Compact scope table
+        :rtype: pd.DataFrame
+        """
+
+        categorical_dtypes = {
+            name: "category"
+            for name in config.get("categorical_feature_names", [])
+        }
+        df_edbo = self._imports["pd"].read_csv(
+            scope_path, dtype=categorical_dtypes
+        )
+
+        return self._add_scope_keys(encode_candidates(df_edbo, config), config)
+
+    def _feature_names(self, config: dict[str, Any]) -> list[str]:
+        """Gets the feature names in the order EDBO+ columns use.
+
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :returns: Continuous feature names followed by categorical ones
+        :rtype: list[str]
+        """
+
+        return feature_space(config).names
+
+    def _config_translate(self, config: dict[str, Any]) -> dict[str, Any]:
+        """Convers general config into EDBO+ reaction scope config format.
+
+        The translation is reused until the config changes, so callers must
+        not modify the returned dictionary.
+
+        :param config: General configuration dictionary
+        :type config: dict[str, Any]
+
+        :return: Translated configuration dictionary
+        :rtype: dict[str, Any]
+        """
+
+        self._import_deps()
+
+        # Comparing against a private copy is cheaper than translating again
+        # and catches configs modified in place
+        if self._translated is not None and self._translated[0] == config:
+            return self._translated[1]
+
+        # The reaction scope itself is generated lazily from the grid, see
+        # _write_reaction_scope()
+        translated = use_subkeys(config)
+
+        # EDBO+ supports multi-objective optimization, of which single-
+        # objective optimization is a subset. When providing arguments
+        # for single-objective optimization, only one objective and one
+        # corresponding direction must be given. This catches when the user
+        # does not provide single-element lists for the objectives and
+        # their directions, which could be an easy mistake.
+        if type(translated["objectives"]) is str:
+            translated["objectives"] = [translated["objectives"]]
+        if type(translated["direction"]) is str:
+            translated["direction"] = [translated["direction"]]
+
+        self._translated = (copy.deepcopy(config), translated)
+
+        return translated
+
+    def _import_deps(self) -> None:
+        """Import packages needed to run the optimizer."""
+
+        import numpy as np  # type: ignore
+        import pandas as pd  # type: ignore
+        from edbo.plus.optimizer_botorch import EDBOplus  # type: ignore
+
+        self._imports = {"EDBOplus": EDBOplus, "np": np, "pd": pd}
+
+
+def _file_stamp(path: str) -> Optional[tuple[int, int]]:
+    """Gets the modification time and size of a file.
+
+    :param path: Path to the file
+    :type path: str
+    :return: Modification time and size, None if the file does not exist
+    :rtype: Optional[tuple[int, int]]
+    """
+
+    if not os.path.exists(path):
+        return None
+
+    stat = os.stat(path)
+
+    return (stat.st_mtime_ns, stat.st_size)
@@ -6,6 +6,20 @@ from typing import Any, Optional
 
 from cyrxnopt.NestedVenv import NestedVenv
 from cyrxnopt.OptimizerABC import OptimizerABC
+from cyrxnopt.utilities.config.feature_space import feature_space
+from cyrxnopt.utilities.config.snapping import (
+    snap_conditions,
+    snapped_objective,
+)
+from cyrxnopt.utilities.experiment.evaluation_cache import (
+    open_evaluation_cache,
+)
+from cyrxnopt.utilities.experiment.observation_log import (
+    DEFAULT_FSYNC_POLICY,
+    FSYNC_POLICIES,
+    ObservationLog,
+)
+from cyrxnopt.utilities.runtime.workers import cancellable_objective
 
 logger = logging.getLogger(__name__)
 
@@ -53,6 +67,49 @@ class OptimizerNMSimplex(OptimizerABC):
                 "type": "list[list]",
                 "value": [[]],
             },
+            {
+                "name": "continuous_feature_resolutions",
+                "type": "list[float]",
+                "value": [],
+                "description": (
+                    "Resolution of each continuous feature. When given, "
+                    "every point is snapped to the resolution grid within "
+                    "the bounds before the objective is evaluated, and "
+                    "points that snap to an evaluated grid point reuse its "
+                    "result."
+                ),
+            },
+            {
+                "name": "evaluation_cache",
+                "type": "bool",
+                "value": False,
+                "description": (
+                    "Keep objective function results in the experiment "
+                    "store and reuse them for conditions that were already "
+                    "evaluated, by this or any other optimizer in the same "
+                    "experiment directory. Only use with deterministic "
+                    "objective functions."
+                ),
+            },
+            {
+                "name": "evaluation_cache_tolerance",
+                "type": "float",
+                "value": 0.0,
+                "description": (
+                    "Evaluation cache only. Reuse the result of the nearest "
+                    "evaluated conditions within this distance, with each "
+                    "feature scaled to the width of its bounds."
+                ),
+            },
+            {
+                "name": "evaluation_cache_memory",
+                "type": "int",
+                "value": 4096,
+                "description": (
+                    "Evaluation cache only. Number of results kept in "
+                    "memory in addition to the store."
+                ),
+            },
             {
                 "name": "budget",
                 "type": "int",
@@ -78,6 +135,17 @@ class OptimizerNMSimplex(OptimizerABC):
                 "type": "bool",
                 "value": False,
             },
+            {
+                "name": "log_fsync",
+                "type": "str",
+                "value": DEFAULT_FSYNC_POLICY,
+                "range": FSYNC_POLICIES,
+                "description": (
+                    "When iterations written to results.csv are synced to "
+                    "disk: after every write, at most once a second, or "
+                    "when the operating system decides."
+                ),
+            },
         ]
 
         return config
@@ -155,27 +223,44 @@ class OptimizerNMSimplex(OptimizerABC):
         # Convert initial parameters to tuple
         param_init = tuple(config["param_init"])
 
-        # Convert bounds list to sequence of tuples
-        bounds = tuple(
-            [
-                tuple(bound_list)
-                for bound_list in config["continuous_feature_bounds"]
-            ]
-        )
-
-        # Call the minimization function
-        results = self._imports["minimize"](
-            obj_func,
-            param_init,
-            method="Nelder-Mead",
-            bounds=bounds,
-            options={
-                "maxiter": config["budget"],
-                "xatol": config["xatol"],
-                "disp": config["display"],
-            },
-            callback=self._create_writer(experiment_dir),
-        )
+        space = feature_space(config)
+
+        # Convert bounds to sequence of tuples
+        bounds = tuple(zip(space.lower.tolist(), space.upper.tolist()))
+
+        with open_evaluation_cache(experiment_dir, config) as cache:
+            # Evaluations are shared with the other optimizers of the
+            # experiment when the evaluation cache is enabled
+            if cache is not None and obj_func is not None:
+                obj_func = cache.wrap(obj_func)
+
+            # With resolutions, only grid points are evaluated and points
+            # that snap to an evaluated one reuse its result
+            objective = snapped_objective(obj_func, config)
+
+            # Iterations are written to a log that stays open for the whole
+            # minimization. Each iteration is committed as soon as it is
+            # written, so a crash loses none of them, while syncing to disk
+            # follows the fsync policy.
+            with ObservationLog(
+                os.path.join(experiment_dir, "results.csv"),
+                fsync=config.get("log_fsync", DEFAULT_FSYNC_POLICY),
+                group_size=1,
+            ) as log:
+                # Call the minimization function
+                # A cancelled call stops before its next evaluation
+                results = self._imports["minimize"](
+                    cancellable_objective(objective),
+                    param_init,
+                    method="Nelder-Mead",
+                    bounds=bounds,
+                    options={
+                        "maxiter": config["budget"],
+                        "xatol": config["xatol"],
+                        "disp": config["display"],
+                    },
+                    callback=self._create_writer(log, config),
+                )
 
         raw_results: list = []
         with open(os.path.join(experiment_dir, "results.csv")) as fin:
@@ -186,10 +271,17 @@ class OptimizerNMSimplex(OptimizerABC):
 
         results.raw_results = raw_results
 
+        if config.get("continuous_feature_resolutions"):
+            # Report the grid point that was evaluated for the best result
+            results.x = snap_conditions([results.x], config)[0][0]
+        results.duplicate_suggestions = getattr(objective, "duplicates", [])
+
         # TODO: This is returning a result object, not the next suggested params
         return results
 
-    def _create_writer(self, experiment_dir: str) -> Callable[..., None]:
+    def _create_writer(
+        self, log: ObservationLog, config: dict[str, Any]
+    ) -> Callable[..., None]:
         """Creates a callback function to write results for the optimizer.
 
         This function uses the "closure" technique to create and return
@@ -197,8 +289,10 @@ class OptimizerNMSimplex(OptimizerABC):
         for the optimizer. These are typically considered an anti-pattern
         in Python, but I do not have a great way around it.
 
-        :param experiment_dir: Experiment directory where files will be output.
-        :type experiment_dir: str
+        :param log: Open results log in the experiment directory
+        :type log: ObservationLog
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
 
         :return: Callback function to write results.
         :rtype: Callable[..., None]
@@ -215,21 +309,21 @@ class OptimizerNMSimplex(OptimizerABC):
             :type intermediate_result: scipy.optimize.OptimizeResult.OptimizeResult
             """
 
-            # TODO: Make this file name a constant for the package
-            results_path = os.path.join(str(experiment_dir), "results.csv")
-
             # Create results list with parameters before results.
-            # This will be the next row in the results file
-            results = intermediate_result.x.tolist()
+            # This will be the next row in the results file. With
+            # resolutions, the result is the one of the snapped parameters.
+            x = intermediate_result.x
+            if config.get("continuous_feature_resolutions"):
+                x = snap_conditions([x], config)[0][0]
+            results = x.tolist()
             results.append(intermediate_result.fun)
 
             # Convert results list to strings since ','.join() can't
             # be called on a list of numbers
             results = [str(x) for x in results]
 
-            with open(results_path, "a") as fout:
-                results_line = ",".join(results) + "\n"
-                fout.write(results_line)
+            # Committed right away, since the log's groups hold one record
+            log.append(",".join(results))
 
         return writer
 
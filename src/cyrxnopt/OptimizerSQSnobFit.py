@@ -5,6 +5,20 @@ from typing import Any, Optional
 
 from cyrxnopt.NestedVenv import NestedVenv
 from cyrxnopt.OptimizerABC import OptimizerABC
+from cyrxnopt.utilities.config.feature_space import feature_space
+from cyrxnopt.utilities.config.snapping import (
+    snap_conditions,
+    snapped_objective,
+)
+from cyrxnopt.utilities.experiment.evaluation_cache import (
+    open_evaluation_cache,
+)
+from cyrxnopt.utilities.experiment.observation_log import (
+    DEFAULT_FSYNC_POLICY,
+    FSYNC_POLICIES,
+    ObservationLog,
+)
+from cyrxnopt.utilities.runtime.workers import cancellable_objective
 
 
 class OptimizerSQSnobFit(OptimizerABC):
@@ -49,6 +63,49 @@ class OptimizerSQSnobFit(OptimizerABC):
                 "type": "list[list]",
                 "value": [[]],
             },
+            {
+                "name": "continuous_feature_resolutions",
+                "type": "list[float]",
+                "value": [],
+                "description": (
+                    "Resolution of each continuous feature. When given, "
+                    "every point is snapped to the resolution grid within "
+                    "the bounds before the objective is evaluated, and "
+                    "points that snap to an evaluated grid point reuse its "
+                    "result."
+                ),
+            },
+            {
+                "name": "evaluation_cache",
+                "type": "bool",
+                "value": False,
+                "description": (
+                    "Keep objective function results in the experiment "
+                    "store and reuse them for conditions that were already "
+                    "evaluated, by this or any other optimizer in the same "
+                    "experiment directory. Only use with deterministic "
+                    "objective functions."
+                ),
+            },
+            {
+                "name": "evaluation_cache_tolerance",
+                "type": "float",
+                "value": 0.0,
+                "description": (
+                    "Evaluation cache only. Reuse the result of the nearest "
+                    "evaluated conditions within this distance, with each "
+                    "feature scaled to the width of its bounds."
+                ),
+            },
+            {
+                "name": "evaluation_cache_memory",
+                "type": "int",
+                "value": 4096,
+                "description": (
+                    "Evaluation cache only. Number of results kept in "
+                    "memory in addition to the store."
+                ),
+            },
             {
                 "name": "budget",
                 "type": "int",
@@ -69,6 +126,17 @@ class OptimizerSQSnobFit(OptimizerABC):
                 "type": "bool",
                 "value": False,
             },
+            {
+                "name": "log_fsync",
+                "type": "str",
+                "value": DEFAULT_FSYNC_POLICY,
+                "range": FSYNC_POLICIES,
+                "description": (
+                    "When evaluations written to results.csv are synced to "
+                    "disk: after every write, at most once a second, or "
+                    "when the operating system decides."
+                ),
+            },
         ]
 
         return config
@@ -149,7 +217,11 @@ class OptimizerSQSnobFit(OptimizerABC):
 
         # Convert bounds list to sequence of tuples
         # bounds = tuple([tuple(bound_list) for bound_list in config["bounds"]])
-        bounds = config["continuous_feature_bounds"]
+        space = feature_space(config)
+        bounds = [
+            [lower, upper]
+            for lower, upper in zip(space.lower.tolist(), space.upper.tolist())
+        ]
 
         options = {
             "minfcall": None,
@@ -159,20 +231,105 @@ class OptimizerSQSnobFit(OptimizerABC):
         }
         options = self._imports["SQSnobFit"].optset(options)
 
-        # Call the minimization function
-        result, history = self._imports["SQSnobFit"].minimize(
-            obj_func,
-            param_init,
-            bounds,
-            config["budget"],
-            options,
-        )
+        with open_evaluation_cache(experiment_dir, config) as cache:
+            # Evaluations are shared with the other optimizers of the
+            # experiment when the evaluation cache is enabled
+            if cache is not None and obj_func is not None:
+                obj_func = cache.wrap(obj_func)
+
+            # With resolutions, only grid points are evaluated and points
+            # that snap to an evaluated one reuse its result
+            objective = snapped_objective(obj_func, config)
+
+            # Evaluations are written to a log that stays open for the
+            # whole minimization. Each one is committed as soon as it is
+            # written, so a crash loses none of them, while syncing to disk
+            # follows the fsync policy.
+            with ObservationLog(
+                os.path.join(experiment_dir, "results.csv"),
+                fsync=config.get("log_fsync", DEFAULT_FSYNC_POLICY),
+                group_size=1,
+            ) as log:
+                # Call the minimization function. A cancelled call stops
+                # before its next evaluation.
+                result, history = self._imports["SQSnobFit"].minimize(
+                    cancellable_objective(
+                        self._create_writer(objective, log, config)
+                    ),
+                    param_init,
+                    bounds,
+                    config["budget"],
+                    options,
+                )
+
+        if config.get("continuous_feature_resolutions"):
+            # Report the grid points that were evaluated, rather than the
+            # points SNOBFIT asked for. History rows hold the result followed
+            # by the parameters.
+            result.optpar = snap_conditions([result.optpar], config)[0][0]
+            if len(history) > 0:
+                history = history.copy()
+                history[:, 1:] = snap_conditions(history[:, 1:], config)[0]
 
         result.history = history
+        result.duplicate_suggestions = getattr(objective, "duplicates", [])
 
         # TODO: This is returning a result object, not the next suggested params
         return result
 
+    def _create_writer(
+        self,
+        objective: Optional[Callable[..., float]],
+        log: ObservationLog,
+        config: dict[str, Any],
+    ) -> Optional[Callable[..., float]]:
+        """Wraps an objective function to write each evaluation to the
+        results log.
+
+        SNOBFIT has no per-iteration callback, so evaluations are written
+        as the objective returns them, in the same format as
+        :py:class:`~cyrxnopt.OptimizerNMSimplex.OptimizerNMSimplex`: the
+        parameters followed by the result.
+
+        :param objective: Objective function to wrap, or None
+        :type objective: Optional[Callable[..., float]]
+        :param log: Open results log in the experiment directory
+        :type log: ObservationLog
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+
+        :return: Objective function that writes its evaluations, or None
+            without an objective function
+        :rtype: Optional[Callable[..., float]]
+        """
+
+        if objective is None:
+            return None
+
+        def writer(x):  # type: ignore
+            """Evaluates the objective and writes the result.
+
+            :param x: Parameters to evaluate
+            :type x: numpy.ndarray
+            :return: Result of the objective
+            :rtype: float
+            """
+
+            value = objective(x)
+
+            # With resolutions, the result is the one of the snapped
+            # parameters
+            if config.get("continuous_feature_resolutions"):
+                x = snap_conditions([x], config)[0][0]
+            row = [float(param) for param in x] + [float(value)]
+
+            # Committed right away, since the log's groups hold one record
+            log.append(",".join(str(item) for item in row))
+
+            return value
+
+        return writer
+
     def _import_deps(self) -> None:
         """Import package needed to run the optimizer."""
 
@@ -0,0 +1,753 @@
+import getpass
+import hmac
+import http.client
+import http.server
+import json
+import logging
+import os
+import queue
+import secrets
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+from typing import Any, Callable, Optional
+
+from cyrxnopt.CampaignScheduler import CampaignScheduler
+from cyrxnopt.NestedVenv import NestedVenv
+from cyrxnopt.utilities.runtime.deadline import DegradedSuggestion
+
+logger = logging.getLogger(__name__)
+
+
+def default_address() -> str:
+    """Gets the address the service listens on when none is given.
+
+    The ``CYRXNOPT_SERVICE`` environment variable takes precedence. Otherwise
+    it is a Unix socket in the user's runtime directory, or in a directory
+    of the user's in the temporary directory if there is none.
+
+    :return: Path of a Unix socket, or an ``http://host:port`` URL
+    :rtype: str
+    """
+
+    address = os.environ.get("CYRXNOPT_SERVICE")
+    if address:
+        return address
+
+    return os.path.join(
+        _runtime_dir(), "cyrxnopt-{}.sock".format(getpass.getuser())
+    )
+
+
+def default_token_path() -> str:
+    """Gets the file holding the token HTTP clients must send when none is
+    given.
+
+    The ``CYRXNOPT_SERVICE_TOKEN`` environment variable takes precedence.
+    Otherwise it is next to the default socket.
+
+    :return: Path of the token file
+    :rtype: str
+    """
+
+    path = os.environ.get("CYRXNOPT_SERVICE_TOKEN")
+    if path:
+        return path
+
+    return os.path.join(
+        _runtime_dir(), "cyrxnopt-{}.token".format(getpass.getuser())
+    )
+
+
+def _runtime_dir() -> str:
+    """Gets the directory for the service's socket and token.
+
+    Without a runtime directory, a directory only the user may access is
+    created in the temporary directory, so other users cannot take the
+    socket's path or reach it before it is secured.
+
+    :raises RuntimeError: The directory in the temporary directory exists
+        but is not the user's own private directory
+    :return: The user's runtime directory, or the user's directory in the
+        temporary directory if there is none
+    :rtype: str
+    """
+
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return runtime_dir
+
+    path = os.path.join(
+        tempfile.gettempdir(), "cyrxnopt-{}".format(getpass.getuser())
+    )
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    info = os.lstat(path)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & 0o077
+    ):
+        raise RuntimeError(
+            "{} is not a directory only the current user can access".format(
+                path
+            )
+        )
+
+    return path
+
+
+class ServiceError(RuntimeError):
+    """Error raised by the service while handling a request."""
+
+    def __init__(self, error_type: str, message: str) -> None:
+        """Creates the error.
+
+        :param error_type: Name of the exception raised by the service
+        :type error_type: str
+        :param message: Message of the exception
+        :type message: str
+        """
+
+        super().__init__("{}: {}".format(error_type, message))
+        self.error_type = error_type
+
+
+class OptimizerService:
+    """Long-running service handling optimizer calls for local clients.
+
+    Campaigns are registered with the service and their calls run on a
+    :py:class:`~cyrxnopt.CampaignScheduler.CampaignScheduler`, whose worker
+    processes keep their environments active and their optimizers loaded
+    between calls, so a call only costs the optimizer's own work.
+
+    Requests are JSON objects with a ``"method"``, its ``"params"``, and an
+    optional ``"id"`` echoed in the response. A response holds the
+    ``"result"``, with ``"degraded"`` and ``"sources"`` for fallback
+    suggestions, or an ``"error"`` with the exception ``"type"`` and
+    ``"message"``. The methods are:
+
+    - ``"ping"``: Checks the service is up.
+    - ``"add_campaign"``: Registers a campaign from its ``name``,
+      ``optimizer``, ``venv`` path (None for the service's own
+      environment), ``experiment_dir``, ``config``, and optional
+      ``priority`` and ``weight``. Registering the same campaign again does
+      nothing, so clients can register on every start.
+    - ``"remove_campaign"``: Unregisters the campaign ``name``.
+    - ``"set_config"``, ``"train"``, ``"predict"``: Run the controller call
+      for ``campaign``, with ``prev_param``, ``yield_value``, and any other
+      arguments of the call, such as ``deadline`` or ``idempotency_key``.
+    - ``"stats"``: Reports the scheduler's queues and latencies.
+    - ``"shutdown"``: Stops the service.
+
+    The service listens on a Unix socket, one request per line on
+    connections that stay open, and on localhost HTTP, one request per
+    ``POST`` with keep-alive. Only the user running the service can
+    connect to its socket. HTTP requests must be JSON, be addressed to
+    localhost, come without an ``Origin``, so web pages cannot make them,
+    and carry the token the service writes to a file only its user can
+    read, see :py:func:`default_token_path`.
+    """
+
+    def __init__(
+        self, max_workers: Optional[int] = None, processes: bool = True
+    ) -> None:
+        """Creates the service.
+
+        :param max_workers: Size of the worker pool, see
+            :py:class:`~cyrxnopt.CampaignScheduler.CampaignScheduler`,
+            defaults to None
+        :type max_workers: Optional[int], optional
+        :param processes: Whether workers are processes, defaults to True
+        :type processes: bool, optional
+        """
+
+        self._scheduler = CampaignScheduler(max_workers, processes)
+        self._campaigns: dict[str, dict[str, Any]] = {}
+        self._venvs: dict[str, NestedVenv] = {}
+        self._lock = threading.Lock()
+        self._servers: list[socketserver.BaseServer] = []
+        self._stopped = threading.Event()
+
+        self._methods: dict[str, Callable[..., Any]] = {
+            "ping": lambda: "pong",
+            "add_campaign": self._add_campaign,
+            "remove_campaign": self._remove_campaign,
+            "set_config": self._scheduled("set_config"),
+            "train": self._scheduled("train"),
+            "predict": self._scheduled("predict"),
+            "stats": self._scheduler.stats,
+            "shutdown": self.shutdown,
+        }
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handles one request.
+
+        :param request: Request with a method and its parameters
+        :type request: dict[str, Any]
+        :return: Response with the result or the error
+        :rtype: dict[str, Any]
+        """
+
+        response: dict[str, Any] = {"id": request.get("id")}
+
+        try:
+            method = self._methods.get(request.get("method", ""))
+            if method is None:
+                raise RuntimeError(
+                    "Unknown method {}".format(request.get("method"))
+                )
+
+            result = method(**request.get("params", {}))
+        except Exception as e:
+            logger.debug("Request failed", exc_info=True)
+            response["error"] = {"type": type(e).__name__, "message": str(e)}
+            return response
+
+        response["result"] = result
+        if getattr(result, "degraded", False):
+            response["degraded"] = True
+            response["sources"] = result.sources
+
+        return response
+
+    def serve(
+        self,
+        socket_path: Optional[str] = None,
+        http_address: Optional[tuple[str, int]] = None,
+        token_path: Optional[str] = None,
+    ) -> None:
+        """Serves requests until :py:meth:`shutdown` is called.
+
+        :param socket_path: Path of the Unix socket to listen on, defaults to
+            None
+        :type socket_path: Optional[str], optional
+        :param http_address: Host and port to listen on for HTTP, defaults to
+            None
+        :type http_address: Optional[tuple[str, int]], optional
+        :param token_path: File to write the token HTTP clients must send
+            to, defaults to :py:func:`default_token_path`
+        :type token_path: Optional[str], optional
+        :raises RuntimeError: No address was given, or a service is already
+            listening on the socket
+        """
+
+        if socket_path is None and http_address is None:
+            raise RuntimeError("The service needs a socket path or an address")
+
+        if socket_path is not None:
+            self._servers.append(self._unix_server(socket_path))
+
+        if http_address is not None:
+            if http_address[0] not in ("127.0.0.1", "localhost", "::1"):
+                logger.warning(
+                    "Serving HTTP on %s, which other machines may reach",
+                    http_address[0],
+                )
+            token_path = token_path or default_token_path()
+            http_server = _HttpServer(http_address, _HttpHandler)
+            http_server.service = self
+            http_server.token = _write_token(token_path)
+            self._servers.append(http_server)
+
+        threads = [
+            threading.Thread(target=server.serve_forever, daemon=True)
+            for server in self._servers
+        ]
+        for thread in threads:
+            thread.start()
+
+        logger.info("Service ready")
+        self._stopped.wait()
+
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+        if http_address is not None and os.path.exists(str(token_path)):
+            os.unlink(str(token_path))
+
+        self._scheduler.close()
+
+    def shutdown(self) -> None:
+        """Stops serving. Calls that are running finish first."""
+
+        self._stopped.set()
+
+    def _unix_server(self, socket_path: str) -> socketserver.BaseServer:
+        """Creates the Unix socket server, replacing a stale socket.
+
+        :param socket_path: Path of the socket
+        :type socket_path: str
+        :raises RuntimeError: A service is already listening on the socket
+        :return: Server
+        :rtype: socketserver.BaseServer
+        """
+
+        if os.path.exists(socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(socket_path)
+            except OSError:
+                # Left behind by a service that did not stop cleanly
+                os.unlink(socket_path)
+            else:
+                raise RuntimeError(
+                    "A service is already listening on {}".format(socket_path)
+                )
+            finally:
+                probe.close()
+
+        # Only the owner may connect, from the moment the socket exists
+        umask = os.umask(0o177)
+        try:
+            server = _UnixServer(socket_path, _LineHandler)
+        finally:
+            os.umask(umask)
+        server.service = self
+
+        return server
+
+    def _add_campaign(
+        self,
+        name: str,
+        optimizer: str,
+        venv: Optional[str],
+        experiment_dir: str,
+        config: dict[str, Any],
+        priority: int = 0,
+        weight: float = 1.0,
+    ) -> None:
+        """Registers a campaign, see the class description.
+
+        :raises RuntimeError: A different campaign with this name exists
+        """
+
+        definition = {
+            "optimizer": optimizer,
+            "venv": venv,
+            "experiment_dir": experiment_dir,
+            "config": config,
+            "priority": priority,
+            "weight": weight,
+        }
+
+        with self._lock:
+            existing = self._campaigns.get(name)
+            if existing == definition:
+                return
+            if existing is not None:
+                raise RuntimeError(
+                    "A different campaign named {} exists".format(name)
+                )
+
+            nested_venv = None
+            if venv is not None:
+                nested_venv = self._venvs.setdefault(venv, NestedVenv(venv))
+
+            self._scheduler.add_campaign(
+                name,
+                optimizer,
+                nested_venv,  # type: ignore
+                experiment_dir,
+                config,
+                priority,
+                weight,
+            )
+            self._campaigns[name] = definition
+
+    def _remove_campaign(self, name: str) -> None:
+        """Unregisters a campaign.
+
+        :param name: Name of the campaign
+        :type name: str
+        """
+
+        with self._lock:
+            self._scheduler.remove_campaign(name)
+            del self._campaigns[name]
+
+    def _scheduled(self, call: str) -> Callable[..., Any]:
+        """Gets the method running a controller call on the scheduler.
+
+        :param call: Name of the controller function
+        :type call: str
+        :return: Method taking the campaign and the call's arguments, and
+            returning its result
+        :rtype: Callable[..., Any]
+        """
+
+        def method(campaign: str, **kwargs: Any) -> Any:
+            return getattr(self._scheduler, call)(campaign, **kwargs).result()
+
+        return method
+
+
+class ServiceClient:
+    """Client of an :py:class:`OptimizerService`.
+
+    Connections are kept open in a pool and reused, so a call only costs a
+    round trip. Several threads can share a client, each call taking a
+    connection of its own.
+    """
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        pool_size: int = 4,
+        timeout: Optional[float] = None,
+        token_path: Optional[str] = None,
+    ) -> None:
+        """Creates a client. Connections are opened when first needed.
+
+        :param address: Path of the service's Unix socket, or its
+            ``http://host:port`` URL, defaults to :py:func:`default_address`
+        :type address: Optional[str], optional
+        :param pool_size: Largest number of idle connections kept open,
+            defaults to 4
+        :type pool_size: int, optional
+        :param timeout: Seconds to wait for a response, defaults to None to
+            wait until it arrives
+        :type timeout: Optional[float], optional
+        :param token_path: File holding the token of an HTTP service, read
+            when connecting, defaults to :py:func:`default_token_path`
+        :type token_path: Optional[str], optional
+        """
+
+        self.address = address or default_address()
+        self._timeout = timeout
+        self._token_path = token_path or default_token_path()
+        self._pool: "queue.LifoQueue[Any]" = queue.LifoQueue(pool_size)
+        self._next_id = 0
+        self._id_lock = threading.Lock()
+
+    def __enter__(self) -> "ServiceClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def call(self, method: str, **params: Any) -> Any:
+        """Calls a method of the service.
+
+        :param method: Name of the method
+        :type method: str
+        :param params: Parameters of the method
+        :type params: Any
+        :raises ServiceError: The service could not handle the request
+        :return: Result of the method, a
+            :py:class:`~cyrxnopt.utilities.runtime.deadline.DegradedSuggestion`
+            for fallback suggestions
+        :rtype: Any
+        """
+
+        with self._id_lock:
+            self._next_id += 1
+            request_id = self._next_id
+
+        response = self.request(
+            {"id": request_id, "method": method, "params": params}
+        )
+
+        error = response.get("error")
+        if error is not None:
+            raise ServiceError(error["type"], error["message"])
+
+        if response.get("degraded"):
+            return DegradedSuggestion(response["result"], response["sources"])
+
+        return response.get("result")
+
+    def request(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Sends a raw request and gets its response.
+
+        :param request: Request, see :py:class:`OptimizerService`
+        :type request: dict[str, Any]
+        :return: Response
+        :rtype: dict[str, Any]
+        """
+
+        data = _dumps(request)
+
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        else:
+            try:
+                connection.send(data)
+            except OSError:
+                # The service closed this idle connection, it never got the
+                # request
+                connection.close()
+                connection = self._connect()
+            else:
+                return self._receive(connection)
+
+        connection.send(data)
+
+        return self._receive(connection)
+
+    def close(self) -> None:
+        """Closes the idle connections."""
+
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _connect(self) -> Any:
+        """Opens a connection to the service.
+
+        :return: Connection
+        :rtype: _UnixConnection or _HttpConnection
+        """
+
+        if self.address.startswith("http://"):
+            host, _, port = (
+                self.address[len("http://") :].rstrip("/").rpartition(":")
+            )
+            with open(self._token_path) as fin:
+                token = fin.read().strip()
+
+            return _HttpConnection(host, int(port), self._timeout, token)
+
+        return _UnixConnection(self.address, self._timeout)
+
+    def _receive(self, connection: Any) -> dict[str, Any]:
+        """Reads a response, then returns the connection to the pool.
+
+        :param connection: Connection the request was sent on
+        :type connection: _UnixConnection or _HttpConnection
+        :return: Response
+        :rtype: dict[str, Any]
+        """
+
+        try:
+            response: dict[str, Any] = json.loads(connection.receive())
+        except BaseException:
+            connection.close()
+            raise
+
+        try:
+            self._pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+        return response
+
+
+class _UnixConnection:
+    """Connection to the service's Unix socket."""
+
+    def __init__(self, path: str, timeout: Optional[float]) -> None:
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+        self._file = self._socket.makefile("rb")
+
+    def send(self, data: bytes) -> None:
+        self._socket.sendall(data + b"\n")
+
+    def receive(self) -> bytes:
+        line: bytes = self._file.readline()
+        if not line:
+            raise ConnectionError("The service closed the connection")
+
+        return line
+
+    def close(self) -> None:
+        self._file.close()
+        self._socket.close()
+
+
+class _HttpConnection:
+    """Keep-alive HTTP connection to the service."""
+
+    def __init__(
+        self, host: str, port: int, timeout: Optional[float], token: str
+    ) -> None:
+        self._connection = http.client.HTTPConnection(
+            host, port, timeout=timeout
+        )
+        self._headers = {
+            "Content-Type": "application/json",
+            "Authorization": "Bearer " + token,
+        }
+
+    def send(self, data: bytes) -> None:
+        self._connection.request("POST", "/", data, self._headers)
+
+    def receive(self) -> bytes:
+        data: bytes = self._connection.getresponse().read()
+        return data
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    service: OptimizerService
+
+
+class _HttpServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    service: OptimizerService
+    token: str
+
+
+class _LineHandler(socketserver.StreamRequestHandler):
+    """Handles the requests of one Unix socket connection, one per line."""
+
+    server: _UnixServer
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            if not line.strip():
+                continue
+
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response: dict[str, Any] = {
+                    "id": None,
+                    "error": {"type": "ValueError", "message": str(e)},
+                }
+            else:
+                response = self.server.service.handle(request)
+
+            self.wfile.write(_dumps(response) + b"\n")
+
+
+class _HttpHandler(http.server.BaseHTTPRequestHandler):
+    """Handles one request per ``POST``, keeping connections open."""
+
+    protocol_version = "HTTP/1.1"
+    server: _HttpServer
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        status = 200
+        refusal = self._refusal()
+        if refusal is not None:
+            status, error_type, message = refusal
+            response: dict[str, Any] = {
+                "id": None,
+                "error": {"type": error_type, "message": message},
+            }
+        else:
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                response = {
+                    "id": None,
+                    "error": {"type": "ValueError", "message": str(e)},
+                }
+            else:
+                response = self.server.service.handle(request)
+
+        data = _dumps(response)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _refusal(self) -> Optional[tuple[int, str, str]]:
+        """Checks whether a request may be handled. Browsers send requests
+        to localhost for any web page, so requests that a page could make
+        are refused.
+
+        :return: HTTP status, exception type, and message to refuse the
+            request with, None if it may be handled
+        :rtype: Optional[tuple[int, str, str]]
+        """
+
+        if self.headers.get_content_type() != "application/json":
+            return 415, "ValueError", "Requests must be application/json"
+
+        host = self.headers.get("Host", "")
+        if host.startswith("["):
+            host = host[: host.find("]") + 1]
+        else:
+            host = host.partition(":")[0]
+        if host not in ("localhost", "127.0.0.1", "[::1]"):
+            return 403, "PermissionError", "Requests must be for localhost"
+
+        if self.headers.get("Origin") is not None:
+            return 403, "PermissionError", "Requests from web pages refused"
+
+        authorization = self.headers.get("Authorization", "")
+        if not hmac.compare_digest(
+            authorization.encode("utf-8"),
+            ("Bearer " + self.server.token).encode("utf-8"),
+        ):
+            return 403, "PermissionError", "Missing or wrong service token"
+
+        return None
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(format, *args)
+
+
+def _write_token(path: str) -> str:
+    """Writes a new random token to a file only the user can read.
+
+    :param path: Path of the token file, replaced if it exists
+    :type path: str
+    :return: Token
+    :rtype: str
+    """
+
+    token = secrets.token_urlsafe(32)
+
+    # Created with its final permissions, then moved in place, so the token
+    # is never readable by others
+    temp_path = path + ".tmp"
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as fout:
+        fout.write(token + "\n")
+    os.replace(temp_path, path)
+
+    return token
+
+
+def _dumps(value: Any) -> bytes:
+    """Serializes a request or a response to one line of JSON.
+
+    :param value: Request or response
+    :type value: Any
+    :return: JSON text without line breaks
+    :rtype: bytes
+    """
+
+    return json.dumps(value, default=_to_json).encode("utf-8")
+
+
+def _to_json(value: Any) -> Any:
+    """Converts values that JSON does not know, such as NumPy arrays and
+    numbers.
+
+    :param value: Value to convert
+    :type value: Any
+    :return: JSON-compatible value
+    :rtype: Any
+    """
+
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "item"):
+        return value.item()
+
+    return str(value)
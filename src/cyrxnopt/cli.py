@@ -0,0 +1,264 @@
+"""Command-line interface of the optimizer service.
+
+``cyrxnopt serve`` starts an :py:class:`~cyrxnopt.OptimizerService.OptimizerService`
+that keeps optimizers loaded between calls. The other commands send one call
+to it and print the JSON result, so bridges to other software can call an
+optimizer without loading it each time. ``cyrxnopt call`` reads requests from
+standard input, one JSON object per line, and answers each on its own line
+over the same connection.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from typing import Any, Optional
+
+from cyrxnopt import __version__
+from cyrxnopt.OptimizerService import (
+    OptimizerService,
+    ServiceClient,
+    ServiceError,
+    default_address,
+)
+
+
+def parse_args(args: list[str]) -> argparse.Namespace:
+    """Parses command line parameters.
+
+    :param args: Command line parameters as a list of strings
+    :type args: list[str]
+    :return: Command line parameters namespace
+    :rtype: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="cyrxnopt", description="Run optimizer calls through a service"
+    )
+    parser.add_argument(
+        "--version", action="version", version="cyrxnopt {}".format(__version__)
+    )
+    parser.add_argument(
+        "--address",
+        default=None,
+        help="Unix socket path or http://host:port URL of the service",
+    )
+    parser.add_argument(
+        "--token-file",
+        default=None,
+        help="file holding the token of an HTTP service",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        dest="loglevel",
+        action="store_const",
+        const=logging.INFO,
+        help="set loglevel to INFO",
+    )
+    parser.add_argument(
+        "-vv",
+        "--very-verbose",
+        dest="loglevel",
+        action="store_const",
+        const=logging.DEBUG,
+        help="set loglevel to DEBUG",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="start the service")
+    serve.add_argument(
+        "--http",
+        metavar="HOST:PORT",
+        default=None,
+        help="also serve HTTP, on localhost only unless a host is given",
+    )
+    serve.add_argument(
+        "--workers", type=int, default=None, help="size of the worker pool"
+    )
+    serve.add_argument(
+        "--threads",
+        action="store_true",
+        help="run optimizers in threads of the service instead of processes",
+    )
+
+    add_campaign = commands.add_parser(
+        "add-campaign", help="register a campaign"
+    )
+    add_campaign.add_argument("name")
+    add_campaign.add_argument("--optimizer", required=True)
+    add_campaign.add_argument(
+        "--venv", default=None, help="environment of the optimizer"
+    )
+    add_campaign.add_argument("--experiment-dir", required=True)
+    add_campaign.add_argument(
+        "--config", required=True, help="JSON file with the configuration"
+    )
+    add_campaign.add_argument("--priority", type=int, default=0)
+    add_campaign.add_argument("--weight", type=float, default=1.0)
+
+    remove_campaign = commands.add_parser(
+        "remove-campaign", help="unregister a campaign"
+    )
+    remove_campaign.add_argument("name")
+
+    commands.add_parser("set-config", help="set up a campaign").add_argument(
+        "name"
+    )
+
+    for command in ("train", "predict"):
+        call = commands.add_parser(
+            command, help="{} a campaign".format(command)
+        )
+        call.add_argument("name")
+        call.add_argument(
+            "--prev-param", required=True, help="JSON list of conditions"
+        )
+        call.add_argument(
+            "--yield-value", required=True, help="JSON yield or list of them"
+        )
+    predict = commands.choices["predict"]
+    predict.add_argument(
+        "--deadline", type=float, default=None, help="seconds to wait"
+    )
+    predict.add_argument("--idempotency-key", default=None)
+
+    commands.add_parser("call", help="send JSON requests read from stdin")
+    commands.add_parser("ping", help="check that the service is up")
+    commands.add_parser("stats", help="show queues and latencies")
+    commands.add_parser("shutdown", help="stop the service")
+
+    return parser.parse_args(args)
+
+
+def setup_logging(loglevel: Optional[int]) -> None:
+    """Sets up basic logging.
+
+    :param loglevel: Minimum loglevel for emitting messages
+    :type loglevel: Optional[int]
+    """
+
+    logformat = "[%(asctime)s] %(levelname)s:%(name)s:%(message)s"
+    logging.basicConfig(
+        level=loglevel or logging.WARNING,
+        stream=sys.stderr,
+        format=logformat,
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+
+def main(args: list[str]) -> int:
+    """Runs a command.
+
+    :param args: Command line parameters as a list of strings
+    :type args: list[str]
+    :return: Exit status, 1 if the service reported an error
+    :rtype: int
+    """
+
+    parsed = parse_args(args)
+    setup_logging(parsed.loglevel)
+    address = parsed.address or default_address()
+
+    if parsed.command == "serve":
+        _serve(parsed, address)
+        return 0
+
+    with ServiceClient(address, token_path=parsed.token_file) as client:
+        if parsed.command == "call":
+            for line in sys.stdin:
+                if line.strip():
+                    response = client.request(json.loads(line))
+                    print(json.dumps(response), flush=True)
+            return 0
+
+        method, params = _method(parsed)
+        try:
+            result = client.call(method, **params)
+        except ServiceError as e:
+            print(e, file=sys.stderr)
+            return 1
+
+    if result is not None:
+        print(json.dumps(result))
+
+    return 0
+
+
+def run() -> None:
+    """Entry point of the ``cyrxnopt`` console script."""
+
+    sys.exit(main(sys.argv[1:]))
+
+
+def _serve(parsed: argparse.Namespace, address: str) -> None:
+    """Runs the service until it is shut down.
+
+    :param parsed: Command line parameters
+    :type parsed: argparse.Namespace
+    :param address: Unix socket path or HTTP URL to serve on
+    :type address: str
+    """
+
+    socket_path: Optional[str] = address
+    http = parsed.http
+    if address.startswith("http://"):
+        socket_path = None
+        http = http or address[len("http://") :].rstrip("/")
+
+    http_address = None
+    if http is not None:
+        host, _, port = http.rpartition(":")
+        http_address = (host or "127.0.0.1", int(port))
+
+    service = OptimizerService(parsed.workers, processes=not parsed.threads)
+    service.serve(socket_path, http_address, parsed.token_file)
+
+
+def _method(parsed: argparse.Namespace) -> tuple[str, dict[str, Any]]:
+    """Gets the service method and its parameters for a command.
+
+    :param parsed: Command line parameters
+    :type parsed: argparse.Namespace
+    :return: Name of the method and its parameters
+    :rtype: tuple[str, dict[str, Any]]
+    """
+
+    if parsed.command == "add-campaign":
+        with open(parsed.config) as fin:
+            config = json.load(fin)
+
+        return (
+            "add_campaign",
+            {
+                "name": parsed.name,
+                "optimizer": parsed.optimizer,
+                "venv": parsed.venv,
+                "experiment_dir": parsed.experiment_dir,
+                "config": config,
+                "priority": parsed.priority,
+                "weight": parsed.weight,
+            },
+        )
+
+    if parsed.command == "remove-campaign":
+        return "remove_campaign", {"name": parsed.name}
+
+    if parsed.command == "set-config":
+        return "set_config", {"campaign": parsed.name}
+
+    if parsed.command in ("train", "predict"):
+        params: dict[str, Any] = {
+            "campaign": parsed.name,
+            "prev_param": json.loads(parsed.prev_param),
+            "yield_value": json.loads(parsed.yield_value),
+        }
+        if parsed.command == "predict":
+            if parsed.deadline is not None:
+                params["deadline"] = parsed.deadline
+            if parsed.idempotency_key is not None:
+                params["idempotency_key"] = parsed.idempotency_key
+
+        return parsed.command, params
+
+    return parsed.command, {}
@@ -0,0 +1,6 @@
+"""Building blocks shared by the optimizers and the controller.
+
+NumPy and pandas are imported inside the functions and classes that use
+them rather than at the module level, because they are only available once
+an optimizer's virtual environment is active.
+"""
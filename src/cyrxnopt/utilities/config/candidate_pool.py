@@ -0,0 +1,87 @@
+from typing import Any, Optional
+
+from cyrxnopt.utilities.config.grid import grid_shape
+
+
+def sample_candidate_pool(
+    indices: Any,
+    eligible: Any,
+    observed: Any,
+    best: Optional[int],
+    config: dict[str, Any],
+    pool_size: int,
+    rng: Any,
+) -> Any:
+    """Selects a subset of candidate rows to score instead of all of them.
+
+    The pool is made of three parts:
+
+    * Half of it is a uniform random sample of the eligible rows.
+    * A quarter is the eligible rows nearest to the best observed row.
+    * A quarter is the rows farthest from every observed row, picked from a
+      random sample four times that size.
+
+    Without observations, the whole pool is a random sample. Distances are
+    measured on grid indices scaled to ``[0, 1]`` for continuous features,
+    with categorical features adding 1 when their levels differ.
+
+    :param indices: Grid indices of each row, shape ``(rows, features)``
+    :type indices: np.ndarray
+    :param eligible: Whether each row may be part of the pool
+    :type eligible: np.ndarray
+    :param observed: Whether each row has a result
+    :type observed: np.ndarray
+    :param best: Position of the best observed row, None if there is none
+    :type best: Optional[int]
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param pool_size: Maximum number of rows in the pool
+    :type pool_size: int
+    :param rng: Random number generator for the random parts of the pool
+    :type rng: np.random.Generator
+    :return: Sorted positions of the rows in the pool
+    :rtype: np.ndarray
+    """
+
+    import numpy as np  # type: ignore
+
+    candidates = np.flatnonzero(eligible)
+    if len(candidates) <= pool_size:
+        return candidates
+
+    n_continuous = len(config.get("continuous_feature_names", []))
+    scale = np.array(
+        [max(n - 1, 1) for n in grid_shape(config)[:n_continuous]],
+        dtype=float,
+    )
+
+    def distances(rows: Any, point: Any) -> Any:
+        continuous = (
+            indices[rows, :n_continuous] - point[:n_continuous]
+        ) / scale
+        categorical = indices[rows, n_continuous:] != point[n_continuous:]
+        return np.sqrt((continuous**2).sum(axis=1) + categorical.sum(axis=1))
+
+    observed_rows = np.flatnonzero(observed)
+    n_local = 0 if best is None else pool_size // 4
+    n_unexplored = 0 if len(observed_rows) == 0 else pool_size // 4
+    n_random = pool_size - n_local - n_unexplored
+
+    pool = [rng.choice(candidates, size=n_random, replace=False)]
+
+    if n_local > 0:
+        near = distances(candidates, indices[best])
+        pool.append(candidates[np.argpartition(near, n_local)[:n_local]])
+
+    if n_unexplored > 0:
+        sample = rng.choice(
+            candidates,
+            size=min(4 * n_unexplored, len(candidates)),
+            replace=False,
+        )
+        nearest = np.full(len(sample), np.inf)
+        for row in observed_rows:
+            nearest = np.minimum(nearest, distances(sample, indices[row]))
+        pool.append(sample[np.argsort(nearest)[::-1][:n_unexplored]])
+
+    return np.unique(np.concatenate(pool))
@@ -0,0 +1,125 @@
+from typing import Any
+
+from cyrxnopt.utilities.config.grid import continuous_step_counts, grid_decimals
+
+
+def code_dtype(n_codes: int) -> Any:
+    """Gets the smallest unsigned integer type that can hold a set of codes.
+
+    :param n_codes: Number of distinct codes, ``0`` to ``n_codes - 1``
+    :type n_codes: int
+    :return: Smallest unsigned integer type holding every code
+    :rtype: np.dtype
+    """
+
+    import numpy as np  # type: ignore
+
+    return np.min_scalar_type(max(n_codes - 1, 0))
+
+
+def encode_candidates(candidates: Any, config: dict[str, Any]) -> Any:
+    """Converts a table of candidate conditions into its compact form.
+
+    Each continuous feature column is replaced by the number of resolution
+    steps above its lower bound, stored in the smallest unsigned integer type
+    that fits its grid. Each categorical feature column is replaced by a
+    pandas ``Categorical`` over the configured levels, which stores one small
+    integer code per row instead of a Python object. Columns that are not
+    features, such as objective columns, are left unchanged.
+
+    Use :py:func:`decode_candidates` to get the feature values back when they
+    are handed to a user or to an optimizer package.
+
+    :param candidates: Candidate conditions with one column per feature
+    :type candidates: pd.DataFrame
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :raises ValueError: A continuous value is below its lower bound or a
+        categorical value does not match any level
+    :return: Compact candidate table
+    :rtype: pd.DataFrame
+    """
+
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    encoded = candidates.copy(deep=False)
+
+    for name, bounds, resolution, n_steps in zip(
+        config.get("continuous_feature_names", []),
+        config.get("continuous_feature_bounds", []),
+        config.get("continuous_feature_resolutions", []),
+        continuous_step_counts(config),
+    ):
+        steps = np.rint(
+            (candidates[name].to_numpy(dtype=float) - bounds[0]) / resolution
+        )
+        if (steps < 0).any():
+            raise ValueError(
+                "Column '{}' has values below its lower bound {}".format(
+                    name, bounds[0]
+                )
+            )
+        # Tables generated with np.arange can overshoot the upper bound by a
+        # step, so leave room for it instead of overflowing
+        n_codes = max(n_steps, int(steps.max(initial=0)) + 1)
+        encoded[name] = steps.astype(code_dtype(n_codes))
+
+    for name, levels in zip(
+        config.get("categorical_feature_names", []),
+        config.get("categorical_feature_values", []),
+    ):
+        # Match on strings since values read from a CSV file may not have the
+        # same type as the configured levels
+        codes = pd.Index([str(level) for level in levels]).get_indexer(
+            candidates[name].astype(str)
+        )
+        if (codes < 0).any():
+            raise ValueError(
+                "Column '{}' has values that are not one of {}".format(
+                    name, list(levels)
+                )
+            )
+        encoded[name] = pd.Categorical.from_codes(codes, categories=levels)
+
+    return encoded
+
+
+def decode_candidates(encoded: Any, config: dict[str, Any]) -> Any:
+    """Converts a compact candidate table back into feature values.
+
+    This is the inverse of :py:func:`encode_candidates`. Continuous values
+    are rounded with :py:func:`~cyrxnopt.utilities.config.grid.grid_decimals`,
+    matching the values CyRxnOpt generates for its grids.
+
+    :param encoded: Compact candidate table
+    :type encoded: pd.DataFrame
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Candidate table with feature values
+    :rtype: pd.DataFrame
+    """
+
+    import numpy as np  # type: ignore
+
+    decoded = encoded.copy(deep=False)
+
+    for name, bounds, resolution in zip(
+        config.get("continuous_feature_names", []),
+        config.get("continuous_feature_bounds", []),
+        config.get("continuous_feature_resolutions", []),
+    ):
+        codes = encoded[name].to_numpy(dtype=np.int64)
+
+        # Each grid value is computed once and then looked up by its code,
+        # so decoding a large table does no arithmetic per row
+        values = np.around(
+            bounds[0] + np.arange(int(codes.max(initial=0)) + 1) * resolution,
+            decimals=grid_decimals(bounds[0], resolution),
+        )
+        decoded[name] = values[codes]
+
+    for name in config.get("categorical_feature_names", []):
+        decoded[name] = encoded[name].astype(object)
+
+    return decoded
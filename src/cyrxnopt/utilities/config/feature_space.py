@@ -0,0 +1,589 @@
+import functools
+import json
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from cyrxnopt.utilities.config.grid import grid_decimals
+
+# Config keys that describe the features, the rest of a config does not
+# change the feature space
+FEATURE_KEYS = (
+    "continuous_feature_names",
+    "continuous_feature_bounds",
+    "continuous_feature_resolutions",
+    "categorical_feature_names",
+    "categorical_feature_values",
+)
+
+
+class FeatureSpace:
+    """Features of a CyRxnOpt config, compiled into arrays once.
+
+    Bounds, resolutions, and grid step counts of the continuous features are
+    held in read-only NumPy arrays, and each categorical feature has a table
+    mapping its levels to their codes. Conditions are handled in the usual
+    CyRxnOpt order, continuous features first, followed by categorical
+    features. The operations work on whole tables of conditions at once:
+
+    - :py:meth:`encode` converts conditions to grid indices.
+    - :py:meth:`decode` converts grid indices back to conditions.
+    - :py:meth:`snap` moves continuous values to the nearest grid point.
+    - :py:meth:`validate` checks conditions against bounds and levels.
+
+    Continuous features without resolutions, as used by the optimizers that
+    search a continuous space, have no grid, so only :py:meth:`validate`
+    applies to them.
+
+    Grid values are rounded to the decimals of
+    :py:func:`~cyrxnopt.utilities.config.grid.grid_decimals` for each
+    feature, so they match the values CyRxnOpt generates for its grids.
+
+    Instances are immutable. Use :py:func:`feature_space` to get the space of
+    a config, which only compiles each distinct config once.
+    """
+
+    __slots__ = (
+        "continuous_names",
+        "categorical_names",
+        "lower",
+        "upper",
+        "resolutions",
+        "step_counts",
+        "decimals",
+        "levels",
+        "shape",
+        "_level_codes",
+        "_np",
+    )
+
+    continuous_names: tuple[str, ...]
+    categorical_names: tuple[str, ...]
+    lower: Any
+    upper: Any
+    resolutions: Any
+    step_counts: Any
+    decimals: Optional[tuple[int, ...]]
+    levels: tuple[tuple[Any, ...], ...]
+    shape: Optional[tuple[int, ...]]
+    _level_codes: tuple[dict[str, int], ...]
+    _np: Any
+
+    def __init__(self, config: dict[str, Any]) -> None:
+        """Compiles the features of a config.
+
+        :param config: CyRxnOpt-level config describing the features
+        :type config: dict[str, Any]
+        :raises RuntimeError: Missing or invalid bounds, resolutions, or
+            levels
+        """
+
+        import numpy as np  # type: ignore
+
+        continuous_names = tuple(config.get("continuous_feature_names", []))
+        categorical_names = tuple(config.get("categorical_feature_names", []))
+        n_continuous = len(continuous_names)
+
+        bounds = list(config.get("continuous_feature_bounds", []))
+        if len(bounds) < n_continuous:
+            raise RuntimeError(
+                "Expected bounds for {} continuous features, got {}".format(
+                    n_continuous, len(bounds)
+                )
+            )
+        bounds_array = np.array(bounds[:n_continuous], dtype=float).reshape(
+            n_continuous, 2
+        )
+        if (bounds_array[:, 0] > bounds_array[:, 1]).any():
+            raise RuntimeError(
+                "Lower bounds must not be above upper bounds: {}".format(
+                    bounds[:n_continuous]
+                )
+            )
+
+        resolutions = None
+        step_counts = None
+        decimals = None
+        if config.get("continuous_feature_resolutions"):
+            resolution_list = list(config["continuous_feature_resolutions"])
+            if len(resolution_list) < n_continuous:
+                raise RuntimeError(
+                    "Expected resolutions for {} continuous features, "
+                    "got {}".format(n_continuous, len(resolution_list))
+                )
+            resolutions = np.array(resolution_list[:n_continuous], dtype=float)
+            if (resolutions <= 0).any():
+                raise RuntimeError(
+                    "Resolutions must be positive: {}".format(
+                        resolution_list[:n_continuous]
+                    )
+                )
+            # The small tolerance keeps float error from dropping the upper
+            # bound, as in grid.continuous_step_counts()
+            step_counts = (
+                np.floor(
+                    (bounds_array[:, 1] - bounds_array[:, 0]) / resolutions
+                    + 1e-9
+                ).astype(np.int64)
+                + 1
+            )
+            decimals = tuple(
+                grid_decimals(lower, resolution)
+                for lower, resolution in zip(
+                    bounds_array[:, 0].tolist(), resolutions.tolist()
+                )
+            )
+
+        levels = tuple(
+            tuple(values)
+            for values in config.get("categorical_feature_values", [])
+        )
+        if len(levels) < len(categorical_names):
+            raise RuntimeError(
+                "Expected levels for {} categorical features, got {}".format(
+                    len(categorical_names), len(levels)
+                )
+            )
+        levels = levels[: len(categorical_names)]
+        if any(len(values) == 0 for values in levels):
+            raise RuntimeError("Categorical features need at least one level")
+
+        shape = None
+        if step_counts is not None or n_continuous == 0:
+            continuous_counts = [] if step_counts is None else step_counts
+            shape = tuple(int(n) for n in continuous_counts) + tuple(
+                len(values) for values in levels
+            )
+
+        lower = bounds_array[:, 0].copy()
+        upper = bounds_array[:, 1].copy()
+        for array in (lower, upper, resolutions, step_counts):
+            if array is not None:
+                array.flags.writeable = False
+
+        for name, value in [
+            ("continuous_names", continuous_names),
+            ("categorical_names", categorical_names),
+            ("lower", lower),
+            ("upper", upper),
+            ("resolutions", resolutions),
+            ("step_counts", step_counts),
+            ("decimals", decimals),
+            ("levels", levels),
+            ("shape", shape),
+            (
+                "_level_codes",
+                tuple(
+                    {str(level): code for code, level in enumerate(values)}
+                    for values in levels
+                ),
+            ),
+            ("_np", np),
+        ]:
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FeatureSpace is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("FeatureSpace is immutable")
+
+    @property
+    def names(self) -> list[str]:
+        """Continuous feature names followed by categorical ones.
+
+        :return: Feature names
+        :rtype: list[str]
+        """
+
+        return list(self.continuous_names + self.categorical_names)
+
+    @property
+    def quantized(self) -> bool:
+        """Whether every feature is on a grid, which is the case when
+        resolutions are given for the continuous features.
+
+        :return: True if the space has a grid
+        :rtype: bool
+        """
+
+        return self.shape is not None
+
+    def encode(self, conditions: Any, strict: bool = True) -> Any:
+        """Converts conditions to grid indices.
+
+        Continuous values are converted to the nearest number of resolution
+        steps above their lower bound. Categorical values are matched to
+        their levels as text, since values read from files may not have the
+        type of the configured levels. Values that match no level but are
+        level indices are taken as such, which is how AMLRO writes
+        categorical values.
+
+        :param conditions: Conditions, one row per set of conditions
+        :type conditions: Sequence[Sequence[Any]]
+        :param strict: Whether values that cannot be encoded are an error
+            (True) or get the index -1 (False), defaults to True
+        :type strict: bool, optional
+        :raises ValueError: The space has no grid, or in strict mode, a
+            continuous value is not a number or a categorical value matches
+            no level
+        :return: Grid indices, shape ``(rows, features)``
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        if not self.quantized:
+            raise ValueError(
+                "Continuous features need resolutions to be encoded"
+            )
+
+        table = self._table(conditions)
+        n_continuous = len(self.continuous_names)
+
+        steps = np.rint(
+            (self._continuous_values(table) - self.lower) / self.resolutions
+        )
+        not_numbers = np.isnan(steps)
+        if strict and not_numbers.any():
+            raise ValueError(
+                "Continuous values must be numbers: {}".format(
+                    table[:, :n_continuous][not_numbers].tolist()
+                )
+            )
+
+        indices = np.empty(table.shape, dtype=np.int64)
+        indices[:, :n_continuous] = np.where(not_numbers, -1, steps)
+        indices[:, n_continuous:] = self._level_indices(table, strict)
+
+        return indices
+
+    def encode_levels(self, conditions: Any, strict: bool = True) -> Any:
+        """Converts the categorical values of conditions to level codes.
+
+        Unlike :py:meth:`encode`, this works for spaces without a grid.
+
+        :param conditions: Conditions, one row per set of conditions
+        :type conditions: Sequence[Sequence[Any]]
+        :param strict: Whether values that match no level are an error
+            (True) or get the code -1 (False), defaults to True
+        :type strict: bool, optional
+        :raises ValueError: A value matches no level in strict mode
+        :return: Level codes, shape ``(rows, categorical features)``
+        :rtype: np.ndarray
+        """
+
+        return self._level_indices(self._table(conditions), strict)
+
+    def continuous_values(self, conditions: Any) -> Any:
+        """Gets the continuous values of conditions as numbers.
+
+        Unlike :py:meth:`encode`, this works for spaces without a grid.
+
+        :param conditions: Conditions, one row per set of conditions
+        :type conditions: Sequence[Sequence[Any]]
+        :return: Continuous values, NaN for values that are not numbers,
+            shape ``(rows, continuous features)``
+        :rtype: np.ndarray
+        """
+
+        return self._continuous_values(self._table(conditions))
+
+    def decode(self, indices: Any) -> list[list[Any]]:
+        """Converts grid indices to conditions.
+
+        Continuous values are rounded to the decimals of their grid.
+
+        :param indices: Grid indices, shape ``(rows, features)``
+        :type indices: np.ndarray
+        :return: Conditions, one list per row
+        :rtype: list[list[Any]]
+        """
+
+        np = self._np
+
+        indices = np.asarray(indices, dtype=np.int64).reshape(
+            -1, len(self.names)
+        )
+        n_continuous = len(self.continuous_names)
+
+        columns: list[list[Any]] = []
+        if n_continuous > 0:
+            values = self._round(
+                self.lower + indices[:, :n_continuous] * self.resolutions
+            )
+            columns.extend(values.T.tolist())
+        for i, levels in enumerate(self.levels):
+            columns.append(
+                [levels[code] for code in indices[:, n_continuous + i]]
+            )
+
+        return [list(row) for row in zip(*columns)]
+
+    def snap(self, values: Any) -> Any:
+        """Moves continuous values to the nearest grid point within bounds.
+
+        Values without a grid are only clipped to the bounds.
+
+        :param values: Continuous values, shape ``(rows, continuous
+            features)``
+        :type values: np.ndarray
+        :return: Snapped values rounded to the decimals of their grid, same
+            shape
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        values = np.asarray(values, dtype=float)
+        if self.resolutions is None:
+            return np.clip(values, self.lower, self.upper)
+
+        steps = np.clip(
+            np.rint((values - self.lower) / self.resolutions),
+            0,
+            self.step_counts - 1,
+        )
+
+        return self._round(self.lower + steps * self.resolutions)
+
+    def validate(self, conditions: Any) -> Any:
+        """Checks which conditions are in the space.
+
+        Continuous values must be numbers within their bounds, and
+        categorical values must match one of their levels.
+
+        :param conditions: Conditions, one row per set of conditions
+        :type conditions: Sequence[Sequence[Any]]
+        :return: Whether each row is in the space
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        table = self._table(conditions)
+        n_continuous = len(self.continuous_names)
+
+        valid = np.ones(len(table), dtype=bool)
+        if n_continuous > 0:
+            values = self._continuous_values(table)
+            # Compare with a small tolerance for float error
+            tolerance = 1e-9 * np.maximum(1.0, np.abs(self.upper))
+            valid &= (
+                (values >= self.lower - tolerance)
+                & (values <= self.upper + tolerance)
+            ).all(axis=1)
+
+        for i, (codes, levels) in enumerate(
+            zip(self._level_codes, self.levels)
+        ):
+            column = table[:, n_continuous + i]
+            valid &= np.array(
+                [_has_level(value, codes, levels) for value in column],
+                dtype=bool,
+            )
+
+        return valid
+
+    def keys(self, indices: Any) -> Any:
+        """Flattens grid indices into one integer key per row.
+
+        :param indices: Grid indices, shape ``(rows, features)``
+        :type indices: np.ndarray
+        :return: Key of each row
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        if self.shape is None:
+            raise ValueError(
+                "Continuous features need resolutions to have keys"
+            )
+
+        return np.ravel_multi_index(np.asarray(indices).T, self.shape)
+
+    def _round(self, values: Any) -> Any:
+        """Rounds grid values of the continuous features to the decimals of
+        their grid.
+
+        :param values: Grid values, shape ``(rows, continuous features)``
+        :type values: np.ndarray
+        :return: Rounded values, same shape
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        rounded = np.empty_like(values)
+        for i, decimals in enumerate(self.decimals or ()):
+            rounded[..., i] = np.around(values[..., i], decimals=decimals)
+
+        return rounded
+
+    def _level_indices(self, table: Any, strict: bool) -> Any:
+        """Gets the level codes of the categorical columns of a conditions
+        table.
+
+        :param table: Conditions from :py:meth:`_table`
+        :type table: np.ndarray
+        :param strict: Whether values that match no level are an error
+            (True) or get the code -1 (False)
+        :type strict: bool
+        :raises ValueError: A value matches no level in strict mode
+        :return: Level codes, shape ``(rows, categorical features)``
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        n_continuous = len(self.continuous_names)
+        codes = np.empty((len(table), len(self.levels)), dtype=np.int64)
+
+        for i, (level_codes, levels) in enumerate(
+            zip(self._level_codes, self.levels)
+        ):
+            for row, value in enumerate(table[:, n_continuous + i]):
+                try:
+                    codes[row, i] = _level_code(value, level_codes, levels)
+                except ValueError:
+                    if strict:
+                        raise
+                    codes[row, i] = -1
+
+        return codes
+
+    def _continuous_values(self, table: Any) -> Any:
+        """Gets the continuous columns of a conditions table as floats.
+
+        :param table: Conditions from :py:meth:`_table`
+        :type table: np.ndarray
+        :return: Continuous values, NaN for values that are not numbers
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        continuous = table[:, : len(self.continuous_names)]
+        try:
+            return continuous.astype(float)
+        except (TypeError, ValueError):
+            return np.array(
+                [[_to_float(value) for value in row] for row in continuous],
+                dtype=float,
+            ).reshape(continuous.shape)
+
+    def _table(self, conditions: Any) -> Any:
+        """Converts conditions to a two-dimensional object array.
+
+        :param conditions: Conditions, one row per set of conditions
+        :type conditions: Sequence[Sequence[Any]]
+        :return: Conditions, shape ``(rows, features)``
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        table = np.empty((len(conditions), len(self.names)), dtype=object)
+        for row, values in enumerate(conditions):
+            table[row, :] = list(values)[: len(self.names)]
+
+        return table
+
+
+@functools.lru_cache(maxsize=32)
+def _compile(key: str) -> FeatureSpace:
+    """Compiles the feature space of a config, cached by its features.
+
+    :param key: JSON text of the config's feature keys
+    :type key: str
+    :return: Feature space
+    :rtype: FeatureSpace
+    """
+
+    return FeatureSpace(json.loads(key))
+
+
+def feature_space(config: dict[str, Any]) -> FeatureSpace:
+    """Gets the feature space of a config.
+
+    Spaces are cached by the features of the config, so getting the space
+    of a config that was seen before does not compile it again.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :raises RuntimeError: Missing or invalid bounds, resolutions, or levels
+    :return: Feature space of the config
+    :rtype: FeatureSpace
+    """
+
+    features = {name: config[name] for name in FEATURE_KEYS if name in config}
+
+    return _compile(json.dumps(features, sort_keys=True, default=str))
+
+
+def _level_code(
+    value: Any, codes: dict[str, int], levels: Sequence[Any]
+) -> int:
+    """Finds the code of a categorical value.
+
+    :param value: Categorical value or encoded level index
+    :type value: Any
+    :param codes: Code of each level, keyed by the level as text
+    :type codes: dict[str, int]
+    :param levels: Levels of the feature
+    :type levels: Sequence[Any]
+    :raises ValueError: The value matches no level
+    :return: Code of the value
+    :rtype: int
+    """
+
+    code = codes.get(str(value))
+    if code is not None:
+        return code
+
+    # Fall back to treating the value as an encoded level index
+    index = _to_float(value)
+    if index.is_integer() and 0 <= index < len(levels):
+        return int(index)
+
+    raise ValueError(
+        "Categorical value '{}' is not one of {}".format(value, list(levels))
+    )
+
+
+def _has_level(
+    value: Any, codes: dict[str, int], levels: Sequence[Any]
+) -> bool:
+    """Checks whether a categorical value matches a level.
+
+    :param value: Categorical value or encoded level index
+    :type value: Any
+    :param codes: Code of each level, keyed by the level as text
+    :type codes: dict[str, int]
+    :param levels: Levels of the feature
+    :type levels: Sequence[Any]
+    :return: Whether :py:func:`_level_code` finds a code for the value
+    :rtype: bool
+    """
+
+    try:
+        _level_code(value, codes, levels)
+    except ValueError:
+        return False
+
+    return True
+
+
+def _to_float(value: Any) -> float:
+    """Converts a value to a float, NaN if it is not a number.
+
+    :param value: Value to convert
+    :type value: Any
+    :return: Value as a float
+    :rtype: float
+    """
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
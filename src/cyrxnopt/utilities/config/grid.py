@@ -0,0 +1,301 @@
+import math
+from collections.abc import Iterator, Sequence
+from decimal import Decimal
+from typing import Any, Optional
+
+
+def continuous_step_counts(config: dict[str, Any]) -> list[int]:
+    """Counts the grid points of each continuous feature in a config.
+
+    The grid for a continuous feature starts at its lower bound and moves
+    up by its resolution without passing its upper bound.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Number of grid points for each continuous feature
+    :rtype: list[int]
+    """
+
+    counts = []
+    for _, bounds, resolution in zip(
+        config.get("continuous_feature_names", []),
+        config.get("continuous_feature_bounds", []),
+        config.get("continuous_feature_resolutions", []),
+    ):
+        # The small tolerance keeps float error from dropping the upper bound
+        steps = math.floor((bounds[1] - bounds[0]) / resolution + 1e-9)
+        counts.append(steps + 1)
+
+    return counts
+
+
+def grid_decimals(lower: float, resolution: float) -> int:
+    """Gets the number of decimals to round the grid values of a feature to.
+
+    Grid values ``lower + k * resolution`` are rounded to undo float error.
+    Four decimals are kept at least, matching the values CyRxnOpt has always
+    generated, and more when the lower bound or the resolution needs them, so
+    that fine resolutions do not collapse neighbouring grid points.
+
+    :param lower: Lower bound of the feature
+    :type lower: float
+    :param resolution: Resolution of the feature
+    :type resolution: float
+    :return: Number of decimals, at most 15
+    :rtype: int
+    """
+
+    decimals = 4
+    for value in (lower, resolution):
+        exponent = Decimal(repr(float(value))).normalize().as_tuple().exponent
+        if isinstance(exponent, int):
+            decimals = max(decimals, -exponent)
+
+    return min(decimals, 15)
+
+
+def grid_shape(config: dict[str, Any]) -> tuple[int, ...]:
+    """Gets the number of grid points along each feature of a config.
+
+    Continuous features come first, followed by categorical features, whose
+    grid points are their levels.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Number of grid points along each feature
+    :rtype: tuple[int, ...]
+    """
+
+    categorical_counts = [
+        len(values) for values in config.get("categorical_feature_values", [])
+    ]
+
+    return tuple(continuous_step_counts(config) + categorical_counts)
+
+
+def grid_size(config: dict[str, Any]) -> int:
+    """Counts the rows in the full Cartesian product grid of a config.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Number of rows in the full grid
+    :rtype: int
+    """
+
+    return math.prod(grid_shape(config))
+
+
+def encoded_grid_bytes(config: dict[str, Any], n_extra_columns: int = 0) -> int:
+    """Estimates the memory needed to hold the full grid of a config as a
+    float64 matrix with categorical features one-hot encoded.
+
+    This is the form Bayesian optimization packages typically turn a reaction
+    scope into before fitting a model, so it is a lower bound on their peak
+    memory use for the scope.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param n_extra_columns: Number of columns stored alongside the features,
+        such as objectives, defaults to 0
+    :type n_extra_columns: int, optional
+    :return: Estimated size of the encoded grid in bytes
+    :rtype: int
+    """
+
+    n_columns = (
+        len(continuous_step_counts(config))
+        + sum(
+            len(values)
+            for values in config.get("categorical_feature_values", [])
+        )
+        + n_extra_columns
+    )
+
+    return grid_size(config) * n_columns * 8
+
+
+def iter_grid_chunks(
+    config: dict[str, Any],
+    chunk_size: int,
+    axes: Optional[Sequence[Any]] = None,
+) -> Iterator[Any]:
+    """Iterates over the full grid of a config in bounded chunks.
+
+    Each chunk is an integer array of shape ``(rows, features)`` holding grid
+    indices: resolution steps above the lower bound for continuous features
+    and level indices for categorical features. The indices use the smallest
+    unsigned integer type that fits the grid. The last feature varies
+    fastest. At most ``chunk_size`` rows are held in memory at once, so grids
+    far larger than the available memory can be processed.
+
+    A subset of the grid can be iterated over by giving the grid indices to
+    use along each feature with ``axes``, as returned by
+    :py:func:`coarse_grid_axes` or :py:func:`trust_region_axes`.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param chunk_size: Maximum number of rows in each chunk
+    :type chunk_size: int
+    :param axes: Grid indices to use along each feature, defaults to every
+        index of the full grid
+    :type axes: Optional[Sequence[np.ndarray]], optional
+    :raises ValueError: ``chunk_size`` is not positive
+    :return: Iterator over chunks of grid indices
+    :rtype: Iterator[np.ndarray]
+    """
+
+    import numpy as np  # type: ignore
+
+    if chunk_size <= 0:
+        raise ValueError(
+            "chunk_size must be positive, got {}".format(chunk_size)
+        )
+
+    full_shape = grid_shape(config)
+    index_dtype = np.min_scalar_type(max(full_shape, default=1) - 1)
+
+    if axes is None:
+        axes = [np.arange(n) for n in full_shape]
+
+    shape = tuple(len(axis) for axis in axes)
+    total = math.prod(shape)
+
+    for start in range(0, total, chunk_size):
+        flat_indices = np.arange(start, min(start + chunk_size, total))
+        positions = np.unravel_index(flat_indices, shape)
+        indices = [axis[pos] for axis, pos in zip(axes, positions)]
+        yield np.stack(indices, axis=1).astype(index_dtype)
+
+
+def coarse_grid_strides(config: dict[str, Any], n_points: int) -> list[int]:
+    """Gets the spacing of a coarse grid along each continuous feature.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param n_points: Number of points to keep along each continuous feature
+    :type n_points: int
+    :return: Grid steps between neighboring coarse points of each continuous
+        feature
+    :rtype: list[int]
+    """
+
+    return [
+        max(1, math.ceil((n_steps - 1) / max(n_points - 1, 1)))
+        for n_steps in continuous_step_counts(config)
+    ]
+
+
+def coarse_grid_axes(config: dict[str, Any], n_points: int) -> list[Any]:
+    """Gets the grid indices of a coarse version of the full grid.
+
+    Each continuous feature is reduced to about ``n_points`` evenly spaced
+    indices of the full grid (see :py:func:`coarse_grid_strides`), always
+    including both bounds. Categorical features keep all of their levels.
+    Since the coarse points lie on the full grid, they keep the configured
+    resolution.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param n_points: Number of points to keep along each continuous feature
+    :type n_points: int
+    :return: Grid indices along each feature
+    :rtype: list[np.ndarray]
+    """
+
+    import numpy as np  # type: ignore
+
+    axes = []
+    for n_steps, stride in zip(
+        continuous_step_counts(config), coarse_grid_strides(config, n_points)
+    ):
+        axis = np.arange(0, n_steps, stride)
+        axes.append(np.union1d(axis, [n_steps - 1]))
+
+    for values in config.get("categorical_feature_values", []):
+        axes.append(np.arange(len(values)))
+
+    return axes
+
+
+def trust_region_axes(
+    center: Sequence[int],
+    config: dict[str, Any],
+    half_widths: Sequence[int],
+    n_points: int,
+) -> list[Any]:
+    """Gets the grid indices of a trust region around a point of the grid.
+
+    Along each continuous feature, the region spans its entry of
+    ``half_widths`` grid steps on either side of the center, clipped to the
+    bounds. The region is sampled with at most ``n_points`` points on each
+    side of the center, using the finest spacing the configured resolution
+    allows, so the number of points in the region does not depend on the
+    resolution. Categorical features keep the level of the center.
+
+    :param center: Grid indices of the center of the region
+    :type center: Sequence[int]
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param half_widths: Grid steps from the center to the edge of the region
+        along each continuous feature
+    :type half_widths: Sequence[int]
+    :param n_points: Maximum points on each side of the center
+    :type n_points: int
+    :return: Grid indices along each feature
+    :rtype: list[np.ndarray]
+    """
+
+    import numpy as np  # type: ignore
+
+    step_counts = continuous_step_counts(config)
+
+    axes = []
+    for i, index in enumerate(center):
+        index = int(index)
+
+        if i < len(step_counts):
+            stride = max(1, math.ceil(half_widths[i] / max(n_points, 1)))
+            reach = stride * min(n_points, half_widths[i])
+
+            axis = np.arange(index - reach, index + reach + 1, stride)
+            axes.append(axis[(axis >= 0) & (axis < step_counts[i])])
+        else:
+            axes.append(np.array([index]))
+
+    return axes
+
+
+def grid_indices_to_values(indices: Any, config: dict[str, Any]) -> Any:
+    """Converts grid indices into the feature values AMLRO expects.
+
+    Continuous features are converted to their values rounded with
+    :py:func:`grid_decimals`. Categorical features keep their level index, which is how
+    AMLRO encodes them in its combo files.
+
+    :param indices: Grid indices from :py:func:`iter_grid_chunks`
+    :type indices: np.ndarray
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Float array of feature values with the same shape as ``indices``
+    :rtype: np.ndarray
+    """
+
+    import numpy as np  # type: ignore
+
+    n_continuous = len(config.get("continuous_feature_names", []))
+    lower_bounds = np.array(
+        [bounds[0] for bounds in config.get("continuous_feature_bounds", [])],
+        dtype=float,
+    )[:n_continuous]
+    resolutions = np.array(
+        config.get("continuous_feature_resolutions", []), dtype=float
+    )[:n_continuous]
+
+    values = indices.astype(float)
+    for i, (lower, resolution) in enumerate(zip(lower_bounds, resolutions)):
+        values[:, i] = np.around(
+            lower + values[:, i] * resolution,
+            decimals=grid_decimals(lower, resolution),
+        )
+
+    return values
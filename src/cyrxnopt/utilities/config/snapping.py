@@ -0,0 +1,124 @@
+import logging
+from collections.abc import Callable
+from typing import Any, Optional
+
+from cyrxnopt.utilities.config.feature_space import feature_space
+
+logger = logging.getLogger(__name__)
+
+
+def snap_conditions(conditions: Any, config: dict[str, Any]) -> tuple[Any, Any]:
+    """Snaps the continuous values of conditions to the resolution grid.
+
+    Values are moved to the nearest grid point within their bounds, as
+    described in
+    :py:meth:`~cyrxnopt.utilities.config.feature_space.FeatureSpace.snap`.
+    Conditions that are only continuous values are expected, as suggested by
+    the optimizers that search a continuous space.
+
+    :param conditions: Conditions, shape ``(rows, continuous features)``
+    :type conditions: np.ndarray
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Snapped conditions, and whether each row collapsed onto the
+        same grid point as an earlier row
+    :rtype: tuple[np.ndarray, np.ndarray]
+    """
+
+    import numpy as np  # type: ignore
+
+    snapped = feature_space(config).snap(conditions)
+
+    duplicates = np.ones(len(snapped), dtype=bool)
+    if len(snapped) > 0:
+        _, first = np.unique(snapped, axis=0, return_index=True)
+        duplicates[first] = False
+
+    return snapped, duplicates
+
+
+class SnappedObjective:
+    """Objective function that is only evaluated on the resolution grid.
+
+    Each point an optimizer asks for is snapped to the grid, like
+    :py:func:`snap_conditions` does, before it is evaluated, so the experiment
+    that is performed is one that can actually be set up. Points that snap
+    to a grid point that was already evaluated reuse its result instead of
+    repeating the experiment, and are reported as duplicates.
+    """
+
+    def __init__(
+        self, obj_func: Callable[..., float], config: dict[str, Any]
+    ) -> None:
+        """Wraps an objective function.
+
+        :param obj_func: Objective function taking a vector of continuous
+            values
+        :type obj_func: Callable[..., float]
+        :param config: CyRxnOpt-level config describing the features
+        :type config: dict[str, Any]
+        """
+
+        self._obj_func = obj_func
+        self._space = feature_space(config)
+        self._results: dict[tuple[float, ...], float] = {}
+        self.duplicates: list[list[float]] = []
+
+    def __call__(self, x: Any) -> float:
+        """Evaluates the objective at the grid point nearest to ``x``.
+
+        :param x: Continuous values suggested by the optimizer
+        :type x: np.ndarray
+        :return: Result at the snapped point
+        :rtype: float
+        """
+
+        snapped = self.snap(x)
+        key = tuple(snapped.tolist())
+
+        if key in self._results:
+            self.duplicates.append(list(key))
+            logger.warning(
+                "Suggestion %s snaps to %s, which was already evaluated, "
+                "reusing its result",
+                list(x),
+                list(key),
+            )
+            return self._results[key]
+
+        result = self._obj_func(snapped)
+        self._results[key] = result
+
+        return result
+
+    def snap(self, x: Any) -> Any:
+        """Snaps one set of continuous values to the grid.
+
+        :param x: Continuous values
+        :type x: np.ndarray
+        :return: Snapped values
+        :rtype: np.ndarray
+        """
+
+        return self._space.snap([x])[0]
+
+
+def snapped_objective(
+    obj_func: Optional[Callable[..., float]], config: dict[str, Any]
+) -> Optional[Callable[..., float]]:
+    """Restricts an objective function to the resolution grid, if the config
+    has one.
+
+    :param obj_func: Objective function taking a vector of continuous values
+    :type obj_func: Optional[Callable[..., float]]
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: A :py:class:`SnappedObjective` when resolutions are configured,
+        otherwise ``obj_func`` itself
+    :rtype: Optional[Callable[..., float]]
+    """
+
+    if obj_func is None or not config.get("continuous_feature_resolutions"):
+        return obj_func
+
+    return SnappedObjective(obj_func, config)
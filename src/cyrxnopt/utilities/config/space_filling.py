@@ -0,0 +1,86 @@
+from collections.abc import Sequence
+from typing import Any, Optional
+
+from cyrxnopt.utilities.config.feature_space import feature_space
+
+
+def space_filling_conditions(
+    config: dict[str, Any],
+    observed: Sequence[Sequence[Any]] = [],
+    n: int = 1,
+    n_candidates: int = 512,
+    seed: Optional[int] = None,
+) -> list[list[Any]]:
+    """Picks conditions far from the ones already observed.
+
+    Random candidates are drawn from the feature space, on the resolution
+    grid when the config has one, and the candidate farthest from every
+    observed point is picked, one at a time. Continuous features are scaled
+    by the width of their bounds, and each categorical feature with a
+    different level adds one to the squared distance.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param observed: Conditions to stay away from, continuous features first,
+        defaults to []
+    :type observed: Sequence[Sequence[Any]], optional
+    :param n: Number of conditions to pick, defaults to 1
+    :type n: int, optional
+    :param n_candidates: Number of random candidates to pick from, defaults
+        to 512
+    :type n_candidates: int, optional
+    :param seed: Seed of the random candidates, defaults to None
+    :type seed: Optional[int], optional
+    :return: Picked conditions, continuous values on the grid when the
+        config has one
+    :rtype: list[list[Any]]
+    """
+
+    import numpy as np  # type: ignore
+
+    space = feature_space(config)
+    rng = np.random.default_rng(seed)
+    n_continuous = len(space.continuous_names)
+
+    continuous = space.snap(
+        rng.uniform(space.lower, space.upper, size=(n_candidates, n_continuous))
+    )
+    codes = np.empty((n_candidates, len(space.levels)), dtype=np.int64)
+    for i, levels in enumerate(space.levels):
+        codes[:, i] = rng.integers(len(levels), size=n_candidates)
+
+    widths = space.upper - space.lower
+    widths = np.where(widths > 0, widths, 1.0)
+
+    def distances(other_continuous: Any, other_codes: Any) -> Any:
+        """Squared distances from every candidate to every other point."""
+
+        difference = (
+            continuous[:, None, :] - other_continuous[None, :, :]
+        ) / widths
+        difference = np.where(np.isnan(difference), 0.0, difference)
+
+        return (difference**2).sum(axis=2) + (
+            codes[:, None, :] != other_codes[None, :, :]
+        ).sum(axis=2)
+
+    nearest = np.full(n_candidates, np.inf)
+    if len(observed) > 0:
+        nearest = distances(
+            space.continuous_values(observed),
+            space.encode_levels(observed, strict=False),
+        ).min(axis=1)
+
+    picked = []
+    for _ in range(min(n, n_candidates)):
+        best = int(np.argmax(nearest))
+        picked.append(best)
+        picked_distances = distances(continuous[[best]], codes[[best]])
+        nearest = np.minimum(nearest, picked_distances[:, 0])
+        nearest[best] = -np.inf
+
+    return [
+        continuous[i].tolist()
+        + [levels[code] for levels, code in zip(space.levels, codes[i])]
+        for i in picked
+    ]
@@ -37,3 +37,71 @@ def use_subkeys(
     )
 
     return new_config
+
+
+class ReadOnlyDict(dict):  # type: ignore
+    """Dictionary that cannot be modified, see :py:func:`read_only`.
+
+    Copies made with :py:func:`copy.copy` or :py:func:`copy.deepcopy` are
+    plain dictionaries that can be modified.
+    """
+
+    def _read_only(self, *args: Any, **kwargs: Any) -> Any:
+        raise TypeError("This config is read-only, modify a copy instead")
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    __ior__ = _read_only
+    clear = _read_only
+    pop = _read_only
+    popitem = _read_only
+    setdefault = _read_only
+    update = _read_only
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return {
+            key: _mutable(copy.deepcopy(value, memo))
+            for key, value in self.items()
+        }
+
+    def __reduce__(self) -> Any:
+        return (ReadOnlyDict, (dict(self),))
+
+
+def read_only(config: Any) -> Any:
+    """Gets a read-only view of a config, so it can be shared between calls
+    without copying it for each. Dictionaries become
+    :py:class:`ReadOnlyDict` and lists become tuples, at every level.
+
+    :param config: Config, or any value in it
+    :type config: Any
+    :return: Read-only config
+    :rtype: Any
+    """
+
+    if isinstance(config, dict):
+        return ReadOnlyDict(
+            {key: read_only(value) for key, value in config.items()}
+        )
+    if isinstance(config, list):
+        return tuple(read_only(value) for value in config)
+
+    return config
+
+
+def _mutable(value: Any) -> Any:
+    """Turns the tuples of a read-only config back into lists.
+
+    :param value: Value from a read-only config
+    :type value: Any
+    :return: Value with lists in place of tuples
+    :rtype: Any
+    """
+
+    if isinstance(value, tuple):
+        return [_mutable(element) for element in value]
+
+    return value
@@ -0,0 +1,314 @@
+import logging
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from cyrxnopt.utilities.config.feature_space import feature_space
+from cyrxnopt.utilities.experiment.experiment_store import (
+    ExperimentStore,
+    condition_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationCache:
+    """Results of objective function evaluations, shared by every optimizer
+    working in an experiment directory.
+
+    Evaluations are kept in the experiment's
+    :py:class:`~cyrxnopt.utilities.experiment.experiment_store.ExperimentStore`
+    and keyed by their quantized conditions: the values of the nearest grid
+    point when the config has resolutions, the values themselves otherwise.
+    Keys are values rather than grid indices, so configs with different
+    grids in one experiment directory only share results of the same
+    conditions. A bounded
+    in-memory tier holds the most recently used results, so repeated
+    lookups do not go to the database.
+
+    With a tolerance, a lookup that has no exact match returns the result of
+    the nearest evaluated point within that distance. Distances are measured
+    with each continuous feature scaled by the width of its bounds, so a
+    tolerance of 0.01 is 1% of every range. Nearest points are found with a
+    KD-tree from SciPy when it is installed, and by comparing against every
+    point otherwise. Points evaluated by other processes after the cache was
+    opened are only found by exact lookups.
+    """
+
+    def __init__(
+        self,
+        experiment_dir: str,
+        config: dict[str, Any],
+        tolerance: float = 0.0,
+        memory_size: int = 4096,
+    ) -> None:
+        """Opens the evaluation cache of an experiment.
+
+        :param experiment_dir: Experiment directory holding the store
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config describing the features
+        :type config: dict[str, Any]
+        :param tolerance: Scaled distance within which an evaluated point
+            counts as a match, defaults to 0.0 for exact matches only
+        :type tolerance: float, optional
+        :param memory_size: Maximum number of results held in memory,
+            defaults to 4096
+        :type memory_size: int, optional
+        """
+
+        import numpy as np  # type: ignore
+
+        self._np = np
+        self._store = ExperimentStore(experiment_dir)
+        self._space = feature_space(config)
+        self._tolerance = tolerance
+        self._memory_size = memory_size
+        self._memory: OrderedDict[str, Any] = OrderedDict()
+
+        # Scaled points for nearest lookups, loaded on first use. Points
+        # after the first _n_indexed are not in the tree yet.
+        self._points: Optional[list[Any]] = None
+        self._results: list[Any] = []
+        self._tree: Any = None
+        self._n_indexed = 0
+        self._has_scipy = True
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> "EvaluationCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the connection to the store."""
+
+        self._store.close()
+
+    def key(self, conditions: Any) -> str:
+        """Gets the key of a set of conditions.
+
+        :param conditions: Conditions, continuous features first
+        :type conditions: Sequence[Any]
+        :return: Key of the quantized conditions
+        :rtype: str
+        """
+
+        conditions = list(conditions)
+        if self._space.quantized:
+            # Grid values and levels as configured, whatever form the
+            # conditions were given in
+            conditions = self._space.decode(self._space.encode([conditions]))[0]
+
+        return condition_key(conditions)
+
+    def get(self, conditions: Any) -> Optional[Any]:
+        """Gets the result of evaluating some conditions, if known.
+
+        :param conditions: Conditions, continuous features first
+        :type conditions: Sequence[Any]
+        :return: Result of the conditions or of the nearest evaluated point
+            within the tolerance, None if there is none
+        :rtype: Optional[Any]
+        """
+
+        key = self.key(conditions)
+
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return result
+
+        result = self._store.find_evaluation(key)
+        if result is None and self._tolerance > 0:
+            result = self._nearest(conditions)
+
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._remember(key, result)
+
+        return result
+
+    def put(self, conditions: Any, result: Any) -> None:
+        """Records the result of evaluating some conditions.
+
+        :param conditions: Conditions, continuous features first
+        :type conditions: Sequence[Any]
+        :param result: Result of the objective function
+        :type result: Any
+        """
+
+        conditions = list(conditions)
+        key = self.key(conditions)
+
+        self._store.add_evaluation(key, conditions, result)
+        self._remember(key, result)
+
+        if self._points is not None:
+            self._points.append(self._scale(conditions))
+            self._results.append(result)
+
+    def wrap(self, obj_func: Callable[..., Any]) -> Callable[..., Any]:
+        """Wraps an objective function so it is only evaluated on misses.
+
+        :param obj_func: Objective function taking a vector of conditions
+        :type obj_func: Callable[..., Any]
+        :return: Objective function that checks the cache first
+        :rtype: Callable[..., Any]
+        """
+
+        def cached(x: Any) -> Any:
+            result = self.get(x)
+            if result is None:
+                result = obj_func(x)
+                self.put(x, result)
+
+            return result
+
+        return cached
+
+    def _remember(self, key: str, result: Any) -> None:
+        """Adds a result to the in-memory tier, dropping the least recently
+        used one when it is full.
+
+        :param key: Key of the conditions
+        :type key: str
+        :param result: Result of the conditions
+        :type result: Any
+        """
+
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_size:
+            self._memory.popitem(last=False)
+
+    def _nearest(self, conditions: Any) -> Optional[Any]:
+        """Finds the result of the nearest evaluated point within the
+        tolerance.
+
+        :param conditions: Conditions, continuous features first
+        :type conditions: Sequence[Any]
+        :return: Result of the nearest point, None if none is close enough
+        :rtype: Optional[Any]
+        """
+
+        np = self._np
+
+        if self._points is None:
+            evaluations = self._store.evaluations()
+            self._points = [self._scale(c) for c, _ in evaluations]
+            self._results = [result for _, result in evaluations]
+
+        if len(self._points) == 0:
+            return None
+
+        # Rebuild the tree once enough points were added after it was built
+        n_pending = len(self._points) - self._n_indexed
+        if self._has_scipy and n_pending > max(64, self._n_indexed // 4):
+            self._build_tree()
+
+        point = self._scale(conditions)
+        best_distance = np.inf
+        best = None
+
+        if self._tree is not None:
+            distance, index = self._tree.query(point)
+            if distance < best_distance:
+                best_distance, best = distance, int(index)
+
+        start = self._n_indexed if self._tree is not None else 0
+        if start < len(self._points):
+            distances = np.linalg.norm(
+                np.array(self._points[start:]) - point, axis=1
+            )
+            index = int(np.argmin(distances))
+            if distances[index] < best_distance:
+                best_distance, best = distances[index], start + index
+
+        if best is None or best_distance > self._tolerance:
+            return None
+
+        return self._results[best]
+
+    def _build_tree(self) -> None:
+        """Builds a KD-tree over the known points, if SciPy is installed."""
+
+        try:
+            from scipy.spatial import cKDTree  # type: ignore
+        except ImportError:
+            self._has_scipy = False
+            return
+
+        assert self._points is not None
+        self._tree = cKDTree(self._np.array(self._points))
+        self._n_indexed = len(self._points)
+
+    def _scale(self, conditions: Any) -> Any:
+        """Scales conditions for distance measurements.
+
+        Continuous features are scaled by the width of their bounds, and
+        categorical features become their level codes, times a large factor
+        so points with different levels are never within the tolerance.
+
+        :param conditions: Conditions, continuous features first
+        :type conditions: Sequence[Any]
+        :return: Scaled point
+        :rtype: np.ndarray
+        """
+
+        np = self._np
+
+        n_continuous = len(self._space.continuous_names)
+        conditions = list(conditions)
+
+        widths = self._space.upper - self._space.lower
+        widths = np.where(widths > 0, widths, 1.0)
+        continuous = (
+            np.array(conditions[:n_continuous], dtype=float) - self._space.lower
+        ) / widths
+
+        codes = self._space.encode_levels([conditions], strict=False)[0]
+
+        return np.concatenate([continuous, codes * 1e6])
+
+
+@contextmanager
+def open_evaluation_cache(
+    experiment_dir: str, config: dict[str, Any]
+) -> Iterator[Optional[EvaluationCache]]:
+    """Opens the evaluation cache of an experiment if the config enables it.
+
+    The cache is enabled by ``"evaluation_cache"``, and configured by
+    ``"evaluation_cache_tolerance"`` and ``"evaluation_cache_memory"``, see
+    :py:class:`EvaluationCache`.
+
+    :param experiment_dir: Experiment directory holding the store
+    :type experiment_dir: str
+    :param config: CyRxnOpt-level config for the optimizer
+    :type config: dict[str, Any]
+    :return: Context yielding the cache, or None when it is disabled
+    :rtype: Iterator[Optional[EvaluationCache]]
+    """
+
+    if not config.get("evaluation_cache", False):
+        yield None
+        return
+
+    with EvaluationCache(
+        str(experiment_dir),
+        config,
+        tolerance=config.get("evaluation_cache_tolerance", 0.0),
+        memory_size=config.get("evaluation_cache_memory", 4096),
+    ) as cache:
+        yield cache
+
+        logger.info(
+            "Evaluation cache: %d hits, %d misses", cache.hits, cache.misses
+        )
@@ -0,0 +1,645 @@
+import json
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Sequence
+from typing import Any, Optional
+
+STORE_FILENAME = "experiment.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS config (
+    id INTEGER PRIMARY KEY,
+    optimizer TEXT NOT NULL,
+    config TEXT NOT NULL,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS suggestions (
+    id INTEGER PRIMARY KEY,
+    optimizer TEXT NOT NULL,
+    campaign INTEGER NOT NULL DEFAULT 0,
+    key TEXT NOT NULL,
+    conditions TEXT NOT NULL,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    optimizer TEXT NOT NULL,
+    campaign INTEGER NOT NULL DEFAULT 0,
+    key TEXT NOT NULL,
+    conditions TEXT NOT NULL,
+    result TEXT NOT NULL,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS timings (
+    id INTEGER PRIMARY KEY,
+    optimizer TEXT NOT NULL,
+    call TEXT NOT NULL,
+    wall_seconds REAL NOT NULL,
+    cpu_seconds REAL NOT NULL,
+    resources TEXT,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    key TEXT PRIMARY KEY,
+    conditions TEXT NOT NULL,
+    result TEXT NOT NULL,
+    time REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    optimizer TEXT NOT NULL,
+    request TEXT NOT NULL,
+    state TEXT,
+    response TEXT,
+    time REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS config_optimizer ON config (optimizer, id);
+CREATE INDEX IF NOT EXISTS suggestions_campaign
+    ON suggestions (optimizer, campaign);
+CREATE INDEX IF NOT EXISTS observations_campaign
+    ON observations (optimizer, campaign);
+CREATE INDEX IF NOT EXISTS timings_call ON timings (optimizer, call);
+PRAGMA user_version = 1;
+"""
+
+
+def condition_key(conditions: Sequence[Any]) -> str:
+    """Gets a key that is the same for equal conditions, whether their
+    numbers are given as numbers or as text.
+
+    :param conditions: Values of each feature
+    :type conditions: Sequence[Any]
+    :return: Key of the conditions
+    :rtype: str
+    """
+
+    values = []
+    for value in conditions:
+        try:
+            values.append(repr(float(value)))
+        except (TypeError, ValueError):
+            values.append(str(value))
+
+    return json.dumps(values)
+
+
+class ExperimentStore:
+    """SQLite database holding the opt-in audit log of an experiment.
+
+    Each experiment directory has one database, :py:data:`STORE_FILENAME`,
+    with a table for each kind of record: the configs that were set, the
+    suggestions given out, the observed results, and how long optimizer
+    calls took. Every optimizer uses the same tables, with a column naming
+    the optimizer. Objective function evaluations are shared by all
+    optimizers, see
+    :py:class:`~cyrxnopt.utilities.experiment.evaluation_cache.EvaluationCache`.
+
+    The store is opt-in: the controller only records calls in it when
+    ``"experiment_store"`` is set in the config. It only records what
+    happened and does not replace the files of the optimizers, which keep
+    their state in those files and never read it back from here. The
+    evaluation cache and idempotency keys keep their own records in it.
+
+    Each config that is set starts a new campaign of the optimizer, named by
+    the config's id. Suggestions and observations are recorded under the
+    optimizer's current campaign and nothing is ever deleted, so the records
+    of earlier campaigns stay available. Reads default to the current
+    campaign.
+
+    The database runs in write-ahead logging (WAL) mode, so readers, such as
+    a dashboard opening the store with ``read_only=True``, neither block the
+    optimizer's writes nor are blocked by them. Conditions are stored as
+    JSON next to a key from :py:func:`condition_key`.
+
+    The tables are only created with the database. A connection may be used
+    from several threads, one at a time.
+    """
+
+    def __init__(
+        self,
+        experiment_dir: str,
+        read_only: bool = False,
+        timeout: float = 30.0,
+    ) -> None:
+        """Opens the store of an experiment, creating it if needed.
+
+        :param experiment_dir: Experiment directory holding the store
+        :type experiment_dir: str
+        :param read_only: Whether to open an existing store for reading
+            only, defaults to False
+        :type read_only: bool, optional
+        :param timeout: Seconds to wait for another connection's write to
+            finish, defaults to 30.0
+        :type timeout: float, optional
+        """
+
+        self._path = os.path.join(experiment_dir, STORE_FILENAME)
+
+        if read_only:
+            self._connection = sqlite3.connect(
+                "file:{}?mode=ro".format(self._path), timeout=timeout, uri=True
+            )
+        else:
+            self._connection = sqlite3.connect(
+                self._path, timeout=timeout, check_same_thread=False
+            )
+            # Commits are durable once the WAL is synced at checkpoints,
+            # which is safe in WAL mode and avoids a sync per commit
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+
+            # The schema sets the version last, so a database whose
+            # creation was interrupted is completed here
+            (version,) = self._connection.execute(
+                "PRAGMA user_version"
+            ).fetchone()
+            if version == 0:
+                # WAL mode is kept by the database file
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.executescript(_SCHEMA)
+
+        self._closed = False
+
+    def __enter__(self) -> "ExperimentStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    @property
+    def path(self) -> str:
+        """Path to the database file.
+
+        :return: File path
+        :rtype: str
+        """
+
+        return self._path
+
+    @property
+    def closed(self) -> bool:
+        """Whether the store was closed.
+
+        :return: True if the store was closed
+        :rtype: bool
+        """
+
+        return self._closed
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+
+        self._connection.close()
+        self._closed = True
+
+    def add_config(self, optimizer: str, config: dict[str, Any]) -> int:
+        """Records a config that was set for an optimizer, which starts a
+        new campaign of the optimizer.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param config: CyRxnOpt-level config for the optimizer
+        :type config: dict[str, Any]
+        :return: Id of the new campaign
+        :rtype: int
+        """
+
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO config (optimizer, config, time) VALUES (?, ?, ?)",
+                (optimizer, _dumps(config), time.time()),
+            )
+
+        return int(cursor.lastrowid or 0)
+
+    def campaign(self, optimizer: str) -> int:
+        """Gets the current campaign of an optimizer.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :return: Id of the last config set for the optimizer, 0 if none was
+            recorded
+        :rtype: int
+        """
+
+        row = self._connection.execute(
+            "SELECT MAX(id) FROM config WHERE optimizer = ?", (optimizer,)
+        ).fetchone()
+
+        return int(row[0] or 0)
+
+    def get_config(self, optimizer: str) -> Optional[dict[str, Any]]:
+        """Gets the last config set for an optimizer.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :return: Config, None if none was recorded
+        :rtype: Optional[dict[str, Any]]
+        """
+
+        row = self._connection.execute(
+            "SELECT config FROM config WHERE optimizer = ? "
+            "ORDER BY id DESC LIMIT 1",
+            (optimizer,),
+        ).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def add_suggestions(
+        self, optimizer: str, suggestions: Iterable[Sequence[Any]]
+    ) -> None:
+        """Records conditions suggested by an optimizer in its current
+        campaign.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param suggestions: Conditions of each suggestion
+        :type suggestions: Iterable[Sequence[Any]]
+        """
+
+        now = time.time()
+        campaign = self.campaign(optimizer)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO suggestions "
+                "(optimizer, campaign, key, conditions, time) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        optimizer,
+                        campaign,
+                        condition_key(conditions),
+                        _dumps(conditions),
+                        now,
+                    )
+                    for conditions in suggestions
+                ),
+            )
+
+    def add_observations(
+        self,
+        optimizer: str,
+        observations: Iterable[tuple[Sequence[Any], Any]],
+    ) -> None:
+        """Records results observed for conditions in the current campaign
+        of an optimizer.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param observations: Conditions and result of each observation. A
+            result may be a single value or one value per objective.
+        :type observations: Iterable[tuple[Sequence[Any], Any]]
+        """
+
+        now = time.time()
+        campaign = self.campaign(optimizer)
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO observations "
+                "(optimizer, campaign, key, conditions, result, time) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        optimizer,
+                        campaign,
+                        condition_key(conditions),
+                        _dumps(conditions),
+                        _dumps(result),
+                        now,
+                    )
+                    for conditions, result in observations
+                ),
+            )
+
+    def suggestions(
+        self, optimizer: str, campaign: Optional[int] = None
+    ) -> list[list[Any]]:
+        """Gets the conditions suggested by an optimizer in a campaign.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param campaign: Id of the campaign, defaults to the current one
+        :type campaign: Optional[int], optional
+        :return: Conditions of each suggestion, oldest first
+        :rtype: list[list[Any]]
+        """
+
+        if campaign is None:
+            campaign = self.campaign(optimizer)
+
+        rows = self._connection.execute(
+            "SELECT conditions FROM suggestions "
+            "WHERE optimizer = ? AND campaign = ? ORDER BY id",
+            (optimizer, campaign),
+        )
+
+        return [json.loads(row[0]) for row in rows]
+
+    def observations(
+        self, optimizer: str, campaign: Optional[int] = None
+    ) -> list[tuple[list[Any], Any]]:
+        """Gets the results observed for an optimizer in a campaign.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param campaign: Id of the campaign, defaults to the current one
+        :type campaign: Optional[int], optional
+        :return: Conditions and result of each observation, oldest first
+        :rtype: list[tuple[list[Any], Any]]
+        """
+
+        if campaign is None:
+            campaign = self.campaign(optimizer)
+
+        rows = self._connection.execute(
+            "SELECT conditions, result FROM observations "
+            "WHERE optimizer = ? AND campaign = ? ORDER BY id",
+            (optimizer, campaign),
+        )
+
+        return [(json.loads(row[0]), json.loads(row[1])) for row in rows]
+
+    def dataset_state(self, optimizer: str) -> str:
+        """Gets a token that changes whenever observations of an optimizer
+        are added or a new campaign starts.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :return: Current campaign, and the number of its observations and
+            the id of the newest one
+        :rtype: str
+        """
+
+        campaign = self.campaign(optimizer)
+        count, newest = self._connection.execute(
+            "SELECT COUNT(*), MAX(id) FROM observations "
+            "WHERE optimizer = ? AND campaign = ?",
+            (optimizer, campaign),
+        ).fetchone()
+
+        return "{}:{}:{}".format(campaign, count, newest)
+
+    def claim_response(
+        self, key: str, optimizer: str, request: str, stale_after: float
+    ) -> bool:
+        """Claims an idempotency key before its request is run.
+
+        A claim that was never completed is taken over once it is older than
+        ``stale_after`` seconds, as the call that made it is assumed to have
+        died.
+
+        :param key: Idempotency key of the request
+        :type key: str
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param request: Fingerprint of the request's arguments
+        :type request: str
+        :param stale_after: Seconds after which an incomplete claim is taken
+            over
+        :type stale_after: float
+        :return: Whether the key was claimed, False if it was already claimed
+            or completed
+        :rtype: bool
+        """
+
+        now = time.time()
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM responses "
+                "WHERE key = ? AND response IS NULL AND time < ?",
+                (key, now - stale_after),
+            )
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO responses "
+                "(key, optimizer, request, time) VALUES (?, ?, ?, ?)",
+                (key, optimizer, request, now),
+            )
+
+        return cursor.rowcount == 1
+
+    def complete_response(self, key: str, state: str, response: str) -> None:
+        """Records the response to a claimed request.
+
+        :param key: Idempotency key of the request
+        :type key: str
+        :param state: Dataset state after the request, see
+            :py:meth:`dataset_state`
+        :type state: str
+        :param response: Response as JSON
+        :type response: str
+        """
+
+        with self._connection:
+            self._connection.execute(
+                "UPDATE responses SET state = ?, response = ?, time = ? "
+                "WHERE key = ?",
+                (state, response, time.time(), key),
+            )
+
+    def release_response(self, key: str) -> None:
+        """Removes the claim on a request that did not complete, so it can be
+        retried.
+
+        :param key: Idempotency key of the request
+        :type key: str
+        """
+
+        with self._connection:
+            self._connection.execute(
+                "DELETE FROM responses WHERE key = ? AND response IS NULL",
+                (key,),
+            )
+
+    def find_response(
+        self, key: str
+    ) -> Optional[tuple[str, str, Optional[str], Optional[str]]]:
+        """Gets the recorded response to a request with an idempotency key.
+
+        :param key: Idempotency key of the request
+        :type key: str
+        :return: Optimizer name, request fingerprint, dataset state, and
+            response as JSON, which are None while the request runs. None
+            if the key was not used.
+        :rtype: Optional[tuple[str, str, Optional[str], Optional[str]]]
+        """
+
+        row = self._connection.execute(
+            "SELECT optimizer, request, state, response FROM responses "
+            "WHERE key = ?",
+            (key,),
+        ).fetchone()
+
+        return None if row is None else (row[0], row[1], row[2], row[3])
+
+    def add_evaluation(
+        self, key: str, conditions: Sequence[Any], result: Any
+    ) -> None:
+        """Records the result of evaluating the objective function.
+
+        :param key: Key of the conditions, replacing any earlier evaluation
+            with the same key
+        :type key: str
+        :param conditions: Conditions that were evaluated
+        :type conditions: Sequence[Any]
+        :param result: Result of the objective function
+        :type result: Any
+        """
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO evaluations "
+                "(key, conditions, result, time) VALUES (?, ?, ?, ?)",
+                (key, _dumps(conditions), _dumps(result), time.time()),
+            )
+
+    def find_evaluation(self, key: str) -> Optional[Any]:
+        """Gets the result of an earlier objective function evaluation.
+
+        :param key: Key of the conditions
+        :type key: str
+        :return: Result, None if the conditions were not evaluated
+        :rtype: Optional[Any]
+        """
+
+        row = self._connection.execute(
+            "SELECT result FROM evaluations WHERE key = ?", (key,)
+        ).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def evaluations(self) -> list[tuple[list[Any], Any]]:
+        """Gets every objective function evaluation.
+
+        :return: Conditions and result of each evaluation, oldest first
+        :rtype: list[tuple[list[Any], Any]]
+        """
+
+        rows = self._connection.execute(
+            "SELECT conditions, result FROM evaluations ORDER BY rowid"
+        )
+
+        return [(json.loads(row[0]), json.loads(row[1])) for row in rows]
+
+    def add_timing(
+        self,
+        optimizer: str,
+        call: str,
+        wall_seconds: float,
+        cpu_seconds: float,
+        resources: Optional[dict[str, Any]] = None,
+    ) -> None:
+        """Records how long an optimizer call took, and under which resource
+        limits it ran.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param call: Name of the optimizer method that was called
+        :type call: str
+        :param wall_seconds: Elapsed time of the call
+        :type wall_seconds: float
+        :param cpu_seconds: Processor time of the call
+        :type cpu_seconds: float
+        :param resources: Requested and applied resource limits, defaults
+            to None if the call ran without limits
+        :type resources: Optional[dict[str, Any]], optional
+        """
+
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO timings "
+                "(optimizer, call, wall_seconds, cpu_seconds, resources, "
+                "time) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    optimizer,
+                    call,
+                    wall_seconds,
+                    cpu_seconds,
+                    None if resources is None else _dumps(resources),
+                    time.time(),
+                ),
+            )
+
+    def timings(
+        self, optimizer: str, call: Optional[str] = None
+    ) -> list[tuple[str, float, float]]:
+        """Gets how long the calls of an optimizer took.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param call: Only get calls of this method, defaults to all calls
+        :type call: Optional[str], optional
+        :return: Method name, wall time, and processor time of each call,
+            oldest first
+        :rtype: list[tuple[str, float, float]]
+        """
+
+        query = (
+            "SELECT call, wall_seconds, cpu_seconds FROM timings "
+            "WHERE optimizer = ?"
+        )
+        parameters: tuple[str, ...] = (optimizer,)
+        if call is not None:
+            query += " AND call = ?"
+            parameters += (call,)
+
+        rows = self._connection.execute(query + " ORDER BY id", parameters)
+
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    def resources(
+        self, optimizer: str, call: Optional[str] = None
+    ) -> list[tuple[str, Optional[dict[str, Any]]]]:
+        """Gets the resource limits the calls of an optimizer ran under.
+
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param call: Only get calls of this method, defaults to all calls
+        :type call: Optional[str], optional
+        :return: Method name and requested and applied limits of each call,
+            or None for calls without limits, oldest first
+        :rtype: list[tuple[str, Optional[dict[str, Any]]]]
+        """
+
+        query = "SELECT call, resources FROM timings WHERE optimizer = ?"
+        parameters: tuple[str, ...] = (optimizer,)
+        if call is not None:
+            query += " AND call = ?"
+            parameters += (call,)
+
+        rows = self._connection.execute(query + " ORDER BY id", parameters)
+
+        return [
+            (row[0], None if row[1] is None else json.loads(row[1]))
+            for row in rows
+        ]
+
+
+def _dumps(value: Any) -> str:
+    """Converts a record to JSON, including values JSON does not support,
+    such as NumPy numbers.
+
+    :param value: Value to convert
+    :type value: Any
+    :return: JSON text
+    :rtype: str
+    """
+
+    if hasattr(value, "tolist"):
+        value = value.tolist()
+
+    return json.dumps(value, default=_to_json)
+
+
+def _to_json(value: Any) -> Any:
+    """Converts a value JSON does not support.
+
+    :param value: Value to convert
+    :type value: Any
+    :return: Python number for NumPy scalars, text otherwise
+    :rtype: Any
+    """
+
+    if hasattr(value, "item"):
+        return value.item()
+
+    return str(value)
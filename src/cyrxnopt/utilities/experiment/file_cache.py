@@ -0,0 +1,147 @@
+import os
+from collections.abc import Iterable
+from typing import Optional
+
+# Bytes before the end of the cached content that are compared to detect
+# edits that happen to leave the file longer than it was
+_TAIL_CHECK_BYTES = 64
+
+
+class AppendOnlyFileCache:
+    """In-memory copy of the lines of a file that is mostly appended to.
+
+    The file's modification time and size are checked on every
+    :py:meth:`refresh`. When the file only grew, just the new bytes are read
+    and their lines are added to the cache. Any other change, such as a file
+    that was rewritten or truncated by another program, causes a full reload.
+    This makes checking for new data cost about the same regardless of the
+    size of the file.
+
+    Only complete lines are cached. A trailing line without a newline, such
+    as one that is still being written, is picked up by a later refresh.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Creates a cache for a file. The file is not read until the first
+        call to :py:meth:`refresh`.
+
+        :param path: Path to the cached file
+        :type path: str
+        """
+
+        self._path = path
+        self._lines: list[str] = []
+        self._offset = 0
+        self._tail = b""
+        self._stat: Optional[tuple[int, int]] = None
+
+    @property
+    def lines(self) -> list[str]:
+        """Lines of the file as of the last refresh, without line endings.
+
+        :return: Cached lines
+        :rtype: list[str]
+        """
+
+        return self._lines
+
+    @property
+    def path(self) -> str:
+        """Path to the cached file.
+
+        :return: File path
+        :rtype: str
+        """
+
+        return self._path
+
+    def refresh(self) -> bool:
+        """Brings the cache up to date with the file on disk.
+
+        :return: Whether every line was reloaded (True) or only new lines,
+            if any, were added to the existing ones (False)
+        :rtype: bool
+        """
+
+        if not os.path.exists(self._path):
+            reloaded = self._offset > 0 or len(self._lines) > 0
+            self._clear()
+            return reloaded
+
+        stat = os.stat(self._path)
+        current = (stat.st_mtime_ns, stat.st_size)
+
+        if current == self._stat:
+            return False
+
+        with open(self._path, "rb") as fin:
+            reload = self._stat is None or stat.st_size < self._offset
+            if not reload and self._offset > 0:
+                # Make sure the cached part of the file is unchanged
+                start = max(self._offset - _TAIL_CHECK_BYTES, 0)
+                fin.seek(start)
+                reload = fin.read(self._offset - start) != self._tail
+
+            if reload:
+                self._clear()
+
+            fin.seek(self._offset)
+            self._consume(fin.read())
+
+        self._stat = current
+
+        return reload
+
+    def append(self, lines: Iterable[str]) -> None:
+        """Appends lines to the file and to the cache.
+
+        The cache is refreshed first, so changes made by other programs are
+        not lost.
+
+        :param lines: Lines to append, without line endings
+        :type lines: Iterable[str]
+        """
+
+        self.refresh()
+
+        data = "".join(line + "\n" for line in lines).encode("utf-8")
+        if len(data) == 0:
+            return
+
+        with open(self._path, "ab") as fout:
+            fout.write(data)
+
+        self.refresh()
+
+    def truncate(self) -> None:
+        """Empties the file and the cache."""
+
+        with open(self._path, "wb"):
+            pass
+
+        self._clear()
+        self.refresh()
+
+    def _clear(self) -> None:
+        """Drops all cached content."""
+
+        self._lines = []
+        self._offset = 0
+        self._tail = b""
+        self._stat = None
+
+    def _consume(self, data: bytes) -> None:
+        """Adds the complete lines from newly read bytes to the cache.
+
+        :param data: Bytes read from the current offset to the end of file
+        :type data: bytes
+        """
+
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+
+        self._lines.extend(data[:end].decode("utf-8").splitlines())
+        self._offset += end
+
+        self._tail = (self._tail + data[:end])[-_TAIL_CHECK_BYTES:]
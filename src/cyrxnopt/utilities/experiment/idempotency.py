@@ -0,0 +1,222 @@
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Optional
+
+from cyrxnopt.utilities.experiment.experiment_store import ExperimentStore
+
+logger = logging.getLogger(__name__)
+
+
+def request_fingerprint(
+    optimizer: str,
+    prev_param: list[Any],
+    yield_value: Any,
+    config: dict[str, Any],
+) -> str:
+    """Gets a digest of the arguments of an optimizer request.
+
+    :param optimizer: Name of the optimizer algorithm
+    :type optimizer: str
+    :param prev_param: Conditions given to the request
+    :type prev_param: list[Any]
+    :param yield_value: Results given to the request
+    :type yield_value: Any
+    :param config: Optimizer configuration
+    :type config: dict[str, Any]
+    :return: Hexadecimal SHA-256 digest
+    :rtype: str
+    """
+
+    text = json.dumps(
+        [optimizer.lower(), prev_param, yield_value, config],
+        sort_keys=True,
+        default=str,
+    )
+
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class IdempotentRequest:
+    """Optimizer request that runs at most once for its idempotency key.
+
+    Entering the request looks up its key in the experiment store. If the
+    request already completed with the same arguments, and no observations
+    of the optimizer were recorded since, :py:attr:`replayed` is True and
+    :py:attr:`response` holds the response it returned, which the caller
+    gives back instead of running the request again. Otherwise the key is
+    claimed, the caller runs the request, and gives its response to
+    :py:meth:`complete`. A request that raises instead releases its claim,
+    so it can be retried.
+
+    While another call holds the claim, for example one that a client gave
+    up waiting for before retrying, entering waits for it to complete. A
+    claim that is not completed within ``timeout`` seconds is taken over.
+
+    Responses are stored as JSON, as the store is a file in the experiment
+    directory that anyone able to write there could change. Suggestions,
+    lists of conditions, are replayed as lists. Other responses, such as
+    the result objects of optimizers that run a whole minimization, are not
+    recorded, so their requests run again when retried.
+    """
+
+    def __init__(
+        self,
+        experiment_dir: str,
+        key: str,
+        optimizer: str,
+        request: str,
+        timeout: float = 3600.0,
+        poll_interval: float = 0.1,
+    ) -> None:
+        """Prepares a request for its idempotency key.
+
+        :param experiment_dir: Experiment directory holding the store
+        :type experiment_dir: str
+        :param key: Idempotency key given by the client
+        :type key: str
+        :param optimizer: Name of the optimizer algorithm
+        :type optimizer: str
+        :param request: Fingerprint of the request's arguments, see
+            :py:func:`request_fingerprint`
+        :type request: str
+        :param timeout: Seconds to wait for a call that holds the claim,
+            defaults to 3600.0
+        :type timeout: float, optional
+        :param poll_interval: Seconds between checks of a claim held by
+            another call, defaults to 0.1
+        :type poll_interval: float, optional
+        """
+
+        self._experiment_dir = str(experiment_dir)
+        self._key = key
+        self._optimizer = optimizer.lower()
+        self._request = request
+        self._timeout = timeout
+        self._poll_interval = poll_interval
+        self._store: Optional[ExperimentStore] = None
+        self._claimed = False
+
+        self.replayed = False
+        self.response: Any = None
+
+    def __enter__(self) -> "IdempotentRequest":
+        """Replays the response of a completed request, or claims the key.
+
+        :raises RuntimeError: The key was used for a request with different
+            arguments, or observations were recorded since it completed
+        :return: The request
+        :rtype: IdempotentRequest
+        """
+
+        self._store = ExperimentStore(self._experiment_dir)
+
+        try:
+            self._acquire(self._store)
+        except BaseException:
+            self._store.close()
+            raise
+
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        assert self._store is not None
+
+        if self._claimed:
+            self._store.release_response(self._key)
+
+        self._store.close()
+
+    def complete(self, response: Any) -> None:
+        """Records the response of the request.
+
+        Call this after the observations the request brought were recorded,
+        as they are part of the dataset state the response is valid for.
+
+        :param response: Value returned by the optimizer
+        :type response: Any
+        """
+
+        assert self._store is not None
+
+        try:
+            text = json.dumps(response, default=_json_number)
+        except (TypeError, ValueError):
+            # The claim is released on exit, so a retry runs again
+            logger.warning(
+                "Response to idempotency key %s is not JSON and cannot be "
+                "replayed",
+                self._key,
+            )
+            return
+
+        self._store.complete_response(
+            self._key, self._store.dataset_state(self._optimizer), text
+        )
+        self._claimed = False
+
+    def _acquire(self, store: ExperimentStore) -> None:
+        """Waits until the key is completed or claimed by this request.
+
+        :param store: Store of the experiment
+        :type store: ExperimentStore
+        :raises RuntimeError: The key was used for a request with different
+            arguments, or observations were recorded since it completed
+        """
+
+        deadline = time.monotonic() + self._timeout
+
+        while True:
+            if store.claim_response(
+                self._key, self._optimizer, self._request, self._timeout
+            ):
+                self._claimed = True
+                return
+
+            found = store.find_response(self._key)
+            if found is None:
+                # The claim was released while checking it
+                continue
+
+            optimizer, request, state, response = found
+            if optimizer != self._optimizer or request != self._request:
+                raise RuntimeError(
+                    "Idempotency key {} was already used for a different "
+                    "request".format(self._key)
+                )
+
+            if response is not None:
+                if state != store.dataset_state(self._optimizer):
+                    raise RuntimeError(
+                        "Idempotency key {} was already used, and results "
+                        "were recorded since".format(self._key)
+                    )
+
+                self.replayed = True
+                self.response = json.loads(response)
+                return
+
+            if time.monotonic() >= deadline:
+                raise RuntimeError(
+                    "Timed out waiting for the request with idempotency key "
+                    "{}".format(self._key)
+                )
+
+            time.sleep(self._poll_interval)
+
+
+def _json_number(value: Any) -> Any:
+    """Converts NumPy numbers and arrays in a response to JSON values.
+
+    :param value: Value JSON does not support
+    :type value: Any
+    :raises TypeError: The value is not a NumPy number or array
+    :return: Python number or list
+    :rtype: Any
+    """
+
+    if hasattr(value, "tolist"):
+        return value.tolist()
+
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
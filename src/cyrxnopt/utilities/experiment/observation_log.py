@@ -0,0 +1,343 @@
+import os
+import struct
+import time
+from collections.abc import Iterable
+from typing import Any, Optional
+
+FSYNC_POLICIES = ["always", "interval", "never"]
+
+# Policy of every log unless the config sets ``log_fsync``
+DEFAULT_FSYNC_POLICY = "interval"
+
+# Each index entry is the byte offset where a record ends, as an unsigned
+# 64-bit little-endian integer
+_INDEX_ENTRY = struct.Struct("<Q")
+
+
+class ObservationLog:
+    """Append-only log of text records, one per line, kept open between
+    writes.
+
+    Records are buffered by :py:meth:`append` and written together by
+    :py:meth:`commit`, with one write and at most one fsync for the whole
+    group. A group is also committed on its own once it holds
+    ``group_size`` records. How often commits reach the disk is set by the
+    fsync policy:
+
+    - ``"always"``: Every commit is synced before it returns.
+    - ``"interval"``: Commits are synced at most once every
+      ``fsync_interval`` seconds, and when the log is closed.
+    - ``"never"``: Syncing is left to the operating system.
+
+    Next to the log, a compact index holds the byte offset where each record
+    ends, so any record can be read without scanning the log. The index is
+    only ever written after the log, so the log is always the source of
+    truth. When a log is opened after a crash, a partly written last record
+    is cut off, and the index is truncated or extended to match the
+    complete records in the log.
+
+    The log is plain text, so it can still be read as a file of lines, for
+    example by :py:class:`PendingObservations`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync: str = DEFAULT_FSYNC_POLICY,
+        fsync_interval: float = 1.0,
+        group_size: int = 64,
+    ) -> None:
+        """Opens a log for appending, creating it if needed, and recovers it
+        if it was not closed cleanly.
+
+        :param path: Path to the log file. The index is kept at ``path``
+            with ``.idx`` appended.
+        :type path: str
+        :param fsync: Policy for syncing commits to disk, one of
+            :py:data:`FSYNC_POLICIES`, defaults to
+            :py:data:`DEFAULT_FSYNC_POLICY`
+        :type fsync: str, optional
+        :param fsync_interval: Seconds between syncs for the ``"interval"``
+            policy, defaults to 1.0
+        :type fsync_interval: float, optional
+        :param group_size: Number of buffered records that triggers a
+            commit, defaults to 64
+        :type group_size: int, optional
+        :raises ValueError: Unknown fsync policy
+        """
+
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                "Unknown fsync policy {}, expected one of {}".format(
+                    fsync, FSYNC_POLICIES
+                )
+            )
+
+        self._path = path
+        self._index_path = path + ".idx"
+        self._fsync = fsync
+        self._fsync_interval = fsync_interval
+        self._group_size = group_size
+
+        self._buffer: list[bytes] = []
+        self._last_sync = time.monotonic()
+        self._unsynced = False
+
+        self._recover()
+
+        self._file: Any = open(self._path, "ab")
+        self._index_file: Any = open(self._index_path, "ab")
+        self._n_records = os.path.getsize(self._index_path) // (
+            _INDEX_ENTRY.size
+        )
+
+    def __enter__(self) -> "ObservationLog":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Number of committed records."""
+
+        return self._n_records
+
+    @property
+    def path(self) -> str:
+        """Path to the log file.
+
+        :return: File path
+        :rtype: str
+        """
+
+        return self._path
+
+    @property
+    def closed(self) -> bool:
+        """Whether the log was closed.
+
+        :return: True if the log was closed
+        :rtype: bool
+        """
+
+        return bool(self._file.closed)
+
+    def append(self, record: str) -> None:
+        """Buffers a record to be written by the next commit.
+
+        :param record: Text of the record, without a line ending
+        :type record: str
+        :raises ValueError: The record contains a line break
+        """
+
+        if "\n" in record or "\r" in record:
+            raise ValueError("Records cannot contain line breaks")
+
+        self._buffer.append(record.encode("utf-8") + b"\n")
+
+        if len(self._buffer) >= self._group_size:
+            self.commit()
+
+    def extend(self, records: Iterable[str]) -> None:
+        """Buffers several records to be written by the next commit.
+
+        :param records: Texts of the records, without line endings
+        :type records: Iterable[str]
+        """
+
+        for record in records:
+            self.append(record)
+
+    def commit(self) -> None:
+        """Writes the buffered records to the log, then adds them to the
+        index.
+        """
+
+        if len(self._buffer) == 0:
+            return
+
+        self._file.write(b"".join(self._buffer))
+        self._file.flush()
+
+        # The file is opened for appending, so this is the end of the log
+        # even if another program appended to it since it was opened
+        end = self._file.tell()
+        offsets = []
+        for record in reversed(self._buffer):
+            offsets.append(end)
+            end -= len(record)
+
+        self._index_file.write(
+            b"".join(_INDEX_ENTRY.pack(offset) for offset in reversed(offsets))
+        )
+        self._index_file.flush()
+
+        self._n_records += len(self._buffer)
+        self._buffer = []
+        self._unsynced = True
+
+        if self._fsync == "always" or (
+            self._fsync == "interval"
+            and time.monotonic() - self._last_sync >= self._fsync_interval
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Forces committed records to disk."""
+
+        if not self._unsynced:
+            return
+
+        os.fsync(self._file.fileno())
+        os.fsync(self._index_file.fileno())
+        self._last_sync = time.monotonic()
+        self._unsynced = False
+
+    def read(self, start: int = 0, stop: Optional[int] = None) -> list[str]:
+        """Reads committed records by position, using the index to find
+        them.
+
+        :param start: Position of the first record, defaults to 0
+        :type start: int, optional
+        :param stop: Position after the last record, defaults to the number
+            of committed records
+        :type stop: Optional[int], optional
+        :return: Records without line endings
+        :rtype: list[str]
+        """
+
+        start, stop, _ = slice(start, stop).indices(self._n_records)
+        if start >= stop:
+            return []
+
+        begin = 0 if start == 0 else self._offset(start - 1)
+        end = self._offset(stop - 1)
+
+        with open(self._path, "rb") as fin:
+            fin.seek(begin)
+            data = fin.read(end - begin)
+
+        return data.decode("utf-8").splitlines()
+
+    def truncate(self) -> None:
+        """Removes every record, including buffered ones."""
+
+        self._buffer = []
+        self._file.truncate(0)
+        self._index_file.truncate(0)
+        self._n_records = 0
+        self._unsynced = True
+
+        if self._fsync != "never":
+            self.sync()
+
+    def close(self) -> None:
+        """Commits buffered records and closes the log. Unless the policy is
+        ``"never"``, committed records are synced to disk first.
+        """
+
+        if self.closed:
+            return
+
+        self.commit()
+        if self._fsync != "never":
+            self.sync()
+
+        self._file.close()
+        self._index_file.close()
+
+    def _offset(self, position: int) -> int:
+        """Reads the end offset of a record from the index.
+
+        :param position: Position of the record
+        :type position: int
+        :return: Byte offset just past the record in the log
+        :rtype: int
+        """
+
+        with open(self._index_path, "rb") as fin:
+            fin.seek(position * _INDEX_ENTRY.size)
+            (offset,) = _INDEX_ENTRY.unpack(fin.read(_INDEX_ENTRY.size))
+
+        return int(offset)
+
+    def _recover(self) -> None:
+        """Makes the log and the index agree before the log is opened.
+
+        A last record without a line ending was cut off by a crash and is
+        removed. Index entries past the end of the log, or a partial last
+        entry, are removed, and records missing from the index are added.
+        """
+
+        if not os.path.exists(self._path):
+            # Start fresh, any old index belongs to a removed log
+            open(self._path, "wb").close()
+            open(self._index_path, "wb").close()
+            return
+
+        with open(self._path, "r+b") as flog:
+            size = flog.seek(0, os.SEEK_END)
+            end = _last_line_end(flog, size)
+            if end < size:
+                flog.truncate(end)
+
+        if not os.path.exists(self._index_path):
+            open(self._index_path, "wb").close()
+
+        with open(self._index_path, "r+b") as findex:
+            index_size = findex.seek(0, os.SEEK_END)
+            n_entries = index_size // _INDEX_ENTRY.size
+
+            # Drop entries that point past the log, newest first
+            last_offset = 0
+            while n_entries > 0:
+                findex.seek((n_entries - 1) * _INDEX_ENTRY.size)
+                (last_offset,) = _INDEX_ENTRY.unpack(
+                    findex.read(_INDEX_ENTRY.size)
+                )
+                if last_offset <= end:
+                    break
+                n_entries -= 1
+                last_offset = 0
+
+            findex.truncate(n_entries * _INDEX_ENTRY.size)
+
+            if last_offset == end:
+                return
+
+            # Index the records written after the last indexed one
+            with open(self._path, "rb") as flog:
+                flog.seek(last_offset)
+                offset = last_offset
+                entries = []
+                for line in flog:
+                    offset += len(line)
+                    entries.append(_INDEX_ENTRY.pack(offset))
+
+            findex.seek(0, os.SEEK_END)
+            findex.write(b"".join(entries))
+
+
+def _last_line_end(flog: Any, size: int, block_size: int = 4096) -> int:
+    """Finds the end of the last complete line in a file.
+
+    :param flog: File opened in binary mode
+    :type flog: BinaryIO
+    :param size: Size of the file in bytes
+    :type size: int
+    :param block_size: Bytes read at a time from the end, defaults to 4096
+    :type block_size: int, optional
+    :return: Offset just past the last line ending, 0 if there is none
+    :rtype: int
+    """
+
+    end = size
+    while end > 0:
+        start = max(0, end - block_size)
+        flog.seek(start)
+        position = flog.read(end - start).rfind(b"\n")
+        if position >= 0:
+            return start + position + 1
+        end = start
+
+    return 0
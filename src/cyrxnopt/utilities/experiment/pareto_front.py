@@ -0,0 +1,181 @@
+import csv
+import os
+from collections.abc import Sequence
+from typing import Any
+
+
+class ParetoFront:
+    """Set of non-dominated results, updated one result at a time.
+
+    A result dominates another if it is at least as good for every objective
+    and better for at least one. Each added result is checked against the
+    current front only, with one vectorized comparison, so adding a result
+    and querying the front do not depend on how many results came before.
+    """
+
+    def __init__(self, directions: Sequence[str]) -> None:
+        """Creates an empty front.
+
+        :param directions: ``"min"`` or ``"max"`` for each objective
+        :type directions: Sequence[str]
+        """
+
+        import numpy as np  # type: ignore
+
+        self._np = np
+        # Results are stored negated for minimized objectives, so larger is
+        # always better
+        self._signs = np.array(
+            [1.0 if direction == "max" else -1.0 for direction in directions]
+        )
+        self._values = np.empty((0, len(directions)))
+        self._items: list[Any] = []
+
+    @classmethod
+    def restore(
+        cls,
+        directions: Sequence[str],
+        values: Sequence[Sequence[float]],
+        items: Sequence[Any],
+    ) -> "ParetoFront":
+        """Creates a front from results known to be non-dominated, such as a
+        saved front, without comparing them.
+
+        :param directions: ``"min"`` or ``"max"`` for each objective
+        :type directions: Sequence[str]
+        :param values: Objective values of each result on the front
+        :type values: Sequence[Sequence[float]]
+        :param items: Item of each result on the front
+        :type items: Sequence[Any]
+        :return: Front holding the results
+        :rtype: ParetoFront
+        """
+
+        front = cls(directions)
+        np = front._np
+
+        front._values = (
+            np.asarray(values, dtype=float).reshape(len(items), -1)
+            * front._signs
+        )
+        front._items = list(items)
+
+        return front
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def items(self) -> list[Any]:
+        """Items of the results on the front, in the order they were added.
+
+        :return: Items given to :py:meth:`add`
+        :rtype: list[Any]
+        """
+
+        return list(self._items)
+
+    @property
+    def values(self) -> Any:
+        """Objective values of the results on the front.
+
+        :return: Values with shape ``(results, objectives)``
+        :rtype: np.ndarray
+        """
+
+        return self._values * self._signs
+
+    def add(self, values: Sequence[float], item: Any = None) -> bool:
+        """Adds a result to the front if no result on it dominates it.
+
+        Results on the front that the new result dominates are removed.
+        Adding a result that is already on the front, with the same values
+        and item, leaves the front as it is, so results can safely be added
+        again after an interrupted update.
+
+        :param values: Objective values of the result
+        :type values: Sequence[float]
+        :param item: Data to keep with the result, such as its conditions,
+            defaults to None
+        :type item: Any, optional
+        :return: Whether the result is on the front (True) or not (False)
+        :rtype: bool
+        """
+
+        np = self._np
+
+        point = np.asarray(values, dtype=float) * self._signs
+
+        same = np.flatnonzero((self._values == point).all(axis=1))
+        if any(self._items[i] == item for i in same):
+            return True
+
+        if (
+            (self._values >= point).all(axis=1)
+            & (self._values > point).any(axis=1)
+        ).any():
+            return False
+
+        dominated = (point >= self._values).all(axis=1) & (
+            point > self._values
+        ).any(axis=1)
+        keep = np.flatnonzero(~dominated)
+
+        self._values = np.vstack([self._values[keep], point])
+        self._items = [self._items[i] for i in keep] + [item]
+
+        return True
+
+
+def read_pareto_front(path: str, directions: Sequence[str]) -> ParetoFront:
+    """Reads a front saved by :py:func:`write_pareto_front`.
+
+    :param path: Path of the front file
+    :type path: str
+    :param directions: ``"min"`` or ``"max"`` for each objective
+    :type directions: Sequence[str]
+    The saved results are taken as the front without comparing them again.
+
+    :return: Front with each row's conditions as its item
+    :rtype: ParetoFront
+    """
+
+    if not os.path.exists(path):
+        return ParetoFront(directions)
+
+    n_objectives = len(directions)
+    with open(path, newline="") as fin:
+        # Skip the header
+        rows = list(csv.reader(fin))[1:]
+
+    return ParetoFront.restore(
+        directions,
+        [[float(value) for value in row[-n_objectives:]] for row in rows],
+        [row[:-n_objectives] for row in rows],
+    )
+
+
+def write_pareto_front(
+    path: str, front: ParetoFront, header: Sequence[str]
+) -> None:
+    """Saves a front whose items are conditions to a CSV file.
+
+    The file is written to a temporary file that then replaces ``path``, so
+    readers never see a partial front.
+
+    :param path: Path of the front file
+    :type path: str
+    :param front: Front to save
+    :type front: ParetoFront
+    :param header: Column names, conditions followed by objectives
+    :type header: Sequence[str]
+    """
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", newline="") as fout:
+        writer = csv.writer(fout)
+        writer.writerow(header)
+        for item, values in zip(front.items, front.values.tolist()):
+            writer.writerow(list(item) + values)
+
+    os.replace(temp_path, path)
@@ -0,0 +1,201 @@
+import os
+from typing import Optional
+
+# Bytes before the applied offset that are compared to detect a table that
+# was rewritten since the offset was recorded
+_TAIL_CHECK_BYTES = 64
+
+
+class PendingObservations:
+    """Tracks which rows of an append-only observation table have been
+    applied somewhere else, such as to an optimizer's scope file.
+
+    Recording an observation only appends a line to the table, so it costs
+    the same regardless of how large the data the observation is applied to
+    is. Applying observations can then be deferred until they are needed and
+    done for all pending rows at once. The number of applied rows is stored
+    next to the table, along with the byte offset where they end, so pending
+    rows survive restarts and only the bytes after the offset are read.
+
+    The end of the applied rows is checked against the table before the
+    offset is used. A table that was rewritten since, or a state file that
+    only has a count, falls back to counting lines from the start.
+
+    The first line of the table is treated as a header.
+    """
+
+    def __init__(self, table_path: str, consumer: str = "applied") -> None:
+        """Sets up tracking for an observation table. Nothing is read until
+        :py:meth:`pending` is called.
+
+        :param table_path: Path to the append-only observation table
+        :type table_path: str
+        :param consumer: Name for what the rows are applied to. Each name
+            keeps its own count, so rows can be applied to several places
+            independently. Defaults to "applied"
+        :type consumer: str, optional
+        """
+
+        self._table_path = table_path
+        self._state_path = table_path + "." + consumer
+
+        # Applied rows and where they end, and the raw pending rows, as of
+        # the last call to pending()
+        self._count = 0
+        self._offset = 0
+        self._tail = b""
+        self._rows: Optional[list[bytes]] = None
+
+    def pending(self) -> list[str]:
+        """Gets the observation rows that have not been applied yet.
+
+        :return: Lines of the table after the last applied row
+        :rtype: list[str]
+        """
+
+        self._count, offset, tail = self._read_state()
+        self._rows = []
+
+        if not os.path.exists(self._table_path):
+            self._offset, self._tail = 0, b""
+            return []
+
+        with open(self._table_path, "rb") as fin:
+            if offset is None or not _ends_with(fin, offset, tail):
+                # Skip the header along with the applied rows
+                offset, tail = _row_offset(fin, 1 + self._count)
+
+            fin.seek(offset)
+            data = fin.read()
+
+        self._offset, self._tail = offset, tail
+
+        # Only complete lines are pending
+        end = data.rfind(b"\n") + 1
+        self._rows = [row + b"\n" for row in data[:end].split(b"\n")[:-1]]
+
+        return [row.decode("utf-8").rstrip("\r\n") for row in self._rows]
+
+    def mark_applied(self, count: int) -> None:
+        """Marks pending rows as applied.
+
+        :param count: Number of pending rows, from the start of
+            :py:meth:`pending`, that were applied
+        :type count: int
+        """
+
+        if self._rows is None:
+            self.pending()
+        rows = self._rows or []
+
+        applied = b"".join(rows[:count])
+        self._count += count
+        self._offset += len(applied)
+        self._tail = (self._tail + applied)[-_TAIL_CHECK_BYTES:]
+        self._rows = rows[count:]
+
+        self._write_state(self._count, self._offset, self._tail)
+
+    def reset(self) -> None:
+        """Marks every row as pending, such as after the table is
+        rewritten.
+        """
+
+        self._rows = None
+        self._write_state(0, None, b"")
+
+    def _read_state(self) -> tuple[int, Optional[int], bytes]:
+        """Reads the number of applied rows and where they end.
+
+        :return: Number of applied rows, 0 if none were recorded, the byte
+            offset after them, None if unknown, and the bytes before it
+        :rtype: tuple[int, Optional[int], bytes]
+        """
+
+        if not os.path.exists(self._state_path):
+            return 0, None, b""
+
+        with open(self._state_path) as fin:
+            fields = fin.read().split()
+
+        if len(fields) == 0:
+            return 0, None, b""
+        if len(fields) < 2:
+            return int(fields[0]), None, b""
+
+        tail = bytes.fromhex(fields[2]) if len(fields) > 2 else b""
+
+        return int(fields[0]), int(fields[1]), tail
+
+    def _write_state(
+        self, count: int, offset: Optional[int], tail: bytes
+    ) -> None:
+        """Writes the number of applied rows and where they end.
+
+        The state is written to a temporary file that then replaces the old
+        one, so an interrupted write cannot leave a partial state behind.
+
+        :param count: Number of applied rows
+        :type count: int
+        :param offset: Byte offset after the applied rows, None if unknown
+        :type offset: Optional[int]
+        :param tail: Bytes of the table before the offset
+        :type tail: bytes
+        """
+
+        fields = [str(count)]
+        if offset is not None:
+            fields.extend([str(offset), tail.hex()])
+
+        temp_path = self._state_path + ".tmp"
+        with open(temp_path, "w") as fout:
+            fout.write(" ".join(fields) + "\n")
+
+        os.replace(temp_path, self._state_path)
+
+
+def _ends_with(fin, offset: int, tail: bytes) -> bool:  # type: ignore
+    """Checks whether the bytes of a file before an offset are as expected.
+
+    :param fin: File opened in binary mode
+    :type fin: BinaryIO
+    :param offset: Byte offset to check before
+    :type offset: int
+    :param tail: Expected bytes right before the offset
+    :type tail: bytes
+    :return: Whether the file has the bytes right before the offset
+    :rtype: bool
+    """
+
+    if offset < len(tail):
+        return False
+
+    fin.seek(offset - len(tail))
+
+    return fin.read(len(tail)) == tail
+
+
+def _row_offset(fin, n_lines: int) -> tuple[int, bytes]:  # type: ignore
+    """Finds where the first lines of a file end by reading it from the
+    start.
+
+    :param fin: File opened in binary mode
+    :type fin: BinaryIO
+    :param n_lines: Number of lines to skip
+    :type n_lines: int
+    :return: Byte offset after the lines, or after the last complete line if
+        the file has fewer, and the bytes before it
+    :rtype: tuple[int, bytes]
+    """
+
+    fin.seek(0)
+    offset = 0
+    tail = b""
+    for _ in range(n_lines):
+        line = fin.readline()
+        if not line.endswith(b"\n"):
+            break
+        offset += len(line)
+        tail = (tail + line)[-_TAIL_CHECK_BYTES:]
+
+    return offset, tail
@@ -0,0 +1,227 @@
+import hashlib
+import os
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+from cyrxnopt.utilities.experiment.file_cache import AppendOnlyFileCache
+
+
+def quantize_conditions(
+    conditions: Sequence[Any], config: dict[str, Any]
+) -> tuple[int, ...]:
+    """Converts reaction conditions into a vector of integer grid indices.
+
+    Continuous features are converted to the number of resolution steps away
+    from their lower bound, and categorical features are converted to the
+    index of their level in ``categorical_feature_values``. Conditions are
+    expected in the usual CyRxnOpt order: continuous features first, followed
+    by categorical features.
+
+    Categorical entries are matched against the configured levels first. If
+    no level matches, an integer-like entry is treated as an already encoded
+    level index, which is how AMLRO writes categorical values to its combo
+    files.
+
+    :param conditions: Reaction conditions to quantize
+    :type conditions: Sequence[Any]
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :raises ValueError: A categorical entry matches no configured level
+    :return: Grid index of each feature
+    :rtype: tuple[int, ...]
+    """
+
+    continuous_bounds = config.get("continuous_feature_bounds", [])
+    continuous_resolutions = config.get("continuous_feature_resolutions", [])
+    categorical_values = config.get("categorical_feature_values", [])
+    n_continuous = len(config.get("continuous_feature_names", []))
+
+    indices = []
+    for i, value in enumerate(conditions):
+        if i < n_continuous:
+            low_bound = continuous_bounds[i][0]
+            resolution = continuous_resolutions[i]
+            indices.append(round((float(value) - low_bound) / resolution))
+        else:
+            levels = categorical_values[i - n_continuous]
+            indices.append(_level_index(value, levels))
+
+    return tuple(indices)
+
+
+def hash_conditions(conditions: Sequence[Any], config: dict[str, Any]) -> str:
+    """Hashes the quantized form of a set of reaction conditions.
+
+    Two sets of conditions that quantize to the same grid point (for example,
+    ``0.30000000000000004`` and ``0.3`` with a resolution of ``0.1``) produce
+    the same hash.
+
+    :param conditions: Reaction conditions to hash
+    :type conditions: Sequence[Any]
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Hexadecimal digest of the quantized conditions
+    :rtype: str
+    """
+
+    quantized = quantize_conditions(conditions, config)
+    key = ",".join(str(index) for index in quantized).encode("utf-8")
+
+    return hashlib.blake2b(key, digest_size=16).hexdigest()
+
+
+def _level_index(value: Any, levels: Sequence[Any]) -> int:
+    """Finds the index of a categorical value in its list of levels.
+
+    :param value: Categorical value or encoded level index
+    :type value: Any
+    :param levels: Allowed levels for the categorical feature
+    :type levels: Sequence[Any]
+    :raises ValueError: The value matches no level
+    :return: Index of the value in ``levels``
+    :rtype: int
+    """
+
+    str_levels = [str(level) for level in levels]
+    if str(value) in str_levels:
+        return str_levels.index(str(value))
+
+    # Fall back to treating the value as an encoded level index
+    try:
+        index = float(value)
+    except (TypeError, ValueError):
+        index = -1.0
+
+    if index.is_integer() and 0 <= index < len(levels):
+        return int(index)
+
+    raise ValueError(
+        "Categorical value '{}' is not one of {}".format(value, list(levels))
+    )
+
+
+class PerformedIndex:
+    """Persistent set of the reaction conditions that have been performed.
+
+    Conditions are stored as hashes of their quantized feature vectors (see
+    :py:func:`hash_conditions`), one per line, in a file within the experiment
+    directory. The file is only ever appended to, so the index survives
+    restarts and membership checks do not depend on the order experiments
+    were performed in.
+    """
+
+    filename = "performed_index.txt"
+
+    def __init__(self, experiment_dir: str, config: dict[str, Any]) -> None:
+        """Loads the index for an experiment, if one exists.
+
+        :param experiment_dir: Experiment directory containing the index
+        :type experiment_dir: str
+        :param config: CyRxnOpt-level config describing the features
+        :type config: dict[str, Any]
+        """
+
+        self._file = AppendOnlyFileCache(
+            os.path.join(experiment_dir, self.filename)
+        )
+        self._config = config
+        self._hashes: set[str] = set()
+        self._n_lines = 0
+
+        self.refresh()
+
+    def __contains__(self, conditions: Sequence[Any]) -> bool:
+        return hash_conditions(conditions, self._config) in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, conditions: Sequence[Any]) -> None:
+        """Records a set of conditions as performed.
+
+        :param conditions: Performed reaction conditions
+        :type conditions: Sequence[Any]
+        """
+
+        self.extend([conditions])
+
+    def extend(self, conditions_list: Iterable[Sequence[Any]]) -> None:
+        """Records several sets of conditions as performed.
+
+        Conditions already in the index are skipped, so the index file does
+        not grow when the same conditions are performed repeatedly.
+
+        :param conditions_list: Performed reaction conditions
+        :type conditions_list: Iterable[Sequence[Any]]
+        """
+
+        self.refresh()
+
+        new_hashes = []
+        for conditions in conditions_list:
+            condition_hash = hash_conditions(conditions, self._config)
+            if condition_hash not in self._hashes:
+                self._hashes.add(condition_hash)
+                new_hashes.append(condition_hash)
+
+        self._file.append(new_hashes)
+        self.refresh()
+
+    def clear(self) -> None:
+        """Removes all conditions from the index."""
+
+        self._file.truncate()
+        self._hashes = set()
+        self._n_lines = 0
+
+    def exists(self) -> bool:
+        """Checks if the index file exists in the experiment directory.
+
+        :return: Whether the index file exists (True) or not (False)
+        :rtype: bool
+        """
+
+        return os.path.exists(self._file.path)
+
+    def first_missing(
+        self,
+        conditions_list: Iterable[Sequence[Any]],
+        performing: Iterable[Sequence[Any]] = (),
+    ) -> int:
+        """Finds the first set of conditions that has not been performed.
+
+        :param conditions_list: Candidate reaction conditions, in order
+        :type conditions_list: Iterable[Sequence[Any]]
+        :param performing: Conditions that count as performed without being
+                           in the index yet, such as ones whose result is
+                           about to be recorded, defaults to ()
+        :type performing: Iterable[Sequence[Any]], optional
+        :return: Position of the first candidate missing from the index, or
+                 -1 if every candidate has been performed
+        :rtype: int
+        """
+
+        extra = {hash_conditions(c, self._config) for c in performing}
+        for i, conditions in enumerate(conditions_list):
+            condition_hash = hash_conditions(conditions, self._config)
+            if (
+                condition_hash not in self._hashes
+                and condition_hash not in extra
+            ):
+                return i
+
+        return -1
+
+    def refresh(self) -> None:
+        """Picks up conditions added to the index file since it was loaded,
+        such as by another process working in the same experiment directory.
+        Only the new part of the file is read.
+        """
+
+        if self._file.refresh():
+            self._hashes = set()
+            self._n_lines = 0
+
+        new_lines = self._file.lines[self._n_lines :]
+        self._hashes.update(line.strip() for line in new_lines if line.strip())
+        self._n_lines = len(self._file.lines)
@@ -0,0 +1,203 @@
+import os
+import struct
+import zipfile
+from typing import Any
+
+from cyrxnopt.utilities.config.encoding import code_dtype
+from cyrxnopt.utilities.config.grid import grid_shape
+
+# Value EDBO+ uses for objectives that have not been measured yet
+PENDING = "PENDING"
+
+
+def save_scope_checkpoint(
+    path: str, scope: Any, config: dict[str, Any], objectives: list[str]
+) -> None:
+    """Saves a compact reaction scope table as a NumPy ``.npz`` checkpoint.
+
+    Feature columns are stored as one column-major integer matrix of grid
+    indices (see
+    :py:func:`~cyrxnopt.utilities.config.encoding.encode_candidates`),
+    uncompressed so that :py:func:`load_scope_checkpoint` can memory-map it.
+    Objective columns are stored as float arrays with NaN in place of
+    pending values, and every other column, such as scope keys and
+    priorities, as a numeric array of its own type. Everything is written to
+    one temporary file that then replaces the checkpoint, so a save that is
+    interrupted leaves the previous checkpoint whole.
+
+    :param path: Path of the checkpoint file
+    :type path: str
+    :param scope: Compact scope table with feature and objective columns
+    :type scope: pd.DataFrame
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param objectives: Names of the objective columns
+    :type objectives: list[str]
+    """
+
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    feature_names = _feature_names(config)
+
+    codes = []
+    for name in feature_names:
+        column = scope[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.cat.codes
+        codes.append(column.to_numpy(dtype=np.int64))
+    n_codes = max(
+        [int(column.max(initial=0)) + 1 for column in codes]
+        + list(grid_shape(config))
+        + [1]
+    )
+
+    other_names = [name for name in scope.columns if name not in feature_names]
+    others = {}
+    for i, name in enumerate(other_names):
+        values = pd.to_numeric(scope[name], errors="coerce")
+        if name in objectives:
+            values = values.astype(float)
+        others["column_{}".format(i)] = values.to_numpy()
+
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as fout:
+        np.savez(
+            fout,
+            columns=np.array(list(scope.columns), dtype=str),
+            objectives=np.array(objectives, dtype=str),
+            # Column-major, so each feature's codes are contiguous
+            codes=(
+                np.asfortranarray(
+                    np.stack(codes, axis=1).astype(code_dtype(n_codes))
+                )
+                if len(codes) > 0
+                else np.empty((len(scope), 0), dtype=np.uint8)
+            ),
+            **others,
+        )
+
+    os.replace(temp_path, path)
+
+
+def load_scope_checkpoint(path: str, config: dict[str, Any]) -> Any:
+    """Loads a compact reaction scope table saved by
+    :py:func:`save_scope_checkpoint`.
+
+    The feature code matrix is memory-mapped read-only, without any parsing,
+    and the continuous feature columns are views of it. Processes that load
+    the same checkpoint share its pages through the operating system's
+    cache, and a saved checkpoint replaces the file rather than writing to
+    it, so mapped tables keep their data. Pending objective values are
+    restored as ``"PENDING"``, the way EDBO+ writes them.
+
+    :param path: Path of the checkpoint file
+    :type path: str
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Compact scope table
+    :rtype: pd.DataFrame
+    """
+
+    import numpy as np  # type: ignore
+    import pandas as pd  # type: ignore
+
+    codes = _map_array(path, "codes")
+
+    with np.load(path) as checkpoint:
+        columns = checkpoint["columns"].tolist()
+        objectives = checkpoint["objectives"].tolist()
+
+        data = {}
+        for i, name in enumerate(config.get("continuous_feature_names", [])):
+            data[name] = codes[:, i]
+
+        n_continuous = len(data)
+        for i, (name, levels) in enumerate(
+            zip(
+                config.get("categorical_feature_names", []),
+                config.get("categorical_feature_values", []),
+            )
+        ):
+            data[name] = pd.Categorical.from_codes(
+                codes[:, n_continuous + i], categories=levels
+            )
+
+        other_names = [name for name in columns if name not in data]
+        for i, name in enumerate(other_names):
+            values = checkpoint["column_{}".format(i)]
+            if name in objectives:
+                # Keep measured values as floats like pandas reads them
+                values = np.where(
+                    np.isnan(values), PENDING, values.astype(object)
+                )
+            data[name] = values
+
+    # Keep the continuous columns as views of the mapped codes
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+
+def _map_array(path: str, name: str) -> Any:
+    """Memory-maps an array stored uncompressed in a ``.npz`` file.
+
+    :py:func:`numpy.savez` stores each array as an ``.npy`` member of a zip
+    archive without compressing it, so the array data is a contiguous range
+    of the file, found from the member's local zip header and ``.npy``
+    header.
+
+    :param path: Path of the ``.npz`` file
+    :type path: str
+    :param name: Name the array was saved under
+    :type name: str
+    :return: Read-only memory-mapped array, or an array read into memory if
+        the member is compressed
+    :rtype: np.ndarray
+    """
+
+    import numpy as np  # type: ignore
+
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(name + ".npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            with archive.open(info) as member:
+                return np.lib.format.read_array(member)
+
+    with open(path, "rb") as fin:
+        # The local header is 30 bytes, then the member name and extra field
+        fin.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", fin.read(4))
+        fin.seek(name_length + extra_length, os.SEEK_CUR)
+
+        version = np.lib.format.read_magic(fin)
+        if version == (1, 0):
+            header = np.lib.format.read_array_header_1_0(fin)
+        else:
+            header = np.lib.format.read_array_header_2_0(fin)
+        shape, fortran_order, dtype = header
+        offset = fin.tell()
+
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran_order else "C",
+    )
+
+
+def _feature_names(config: dict[str, Any]) -> list[str]:
+    """Gets the feature names of a config, continuous ones first.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :return: Feature names
+    :rtype: list[str]
+    """
+
+    return list(config.get("continuous_feature_names", [])) + list(
+        config.get("categorical_feature_names", [])
+    )
@@ -0,0 +1,91 @@
+from collections.abc import Sequence
+from typing import Any
+
+from cyrxnopt.utilities.config.space_filling import space_filling_conditions
+from cyrxnopt.utilities.experiment.experiment_store import condition_key
+
+
+class DegradedSuggestion(list):  # type: ignore
+    """Suggestion returned when the optimizer did not finish in time.
+
+    It is a list like any other suggestion, with :py:attr:`degraded` set so
+    callers can tell it apart, and :py:attr:`sources` giving where each set
+    of conditions came from:
+
+    - ``"late"``: The last prediction that finished after its deadline.
+    - ``"prefetch"``: A prediction prefetched in the background.
+    - ``"space_filling"``: Conditions far from every observation, see
+      :py:func:`~cyrxnopt.utilities.config.space_filling.space_filling_conditions`.
+    """
+
+    degraded = True
+
+    def __init__(self, conditions: Sequence[Any], sources: list[str]) -> None:
+        """Creates a suggestion.
+
+        :param conditions: Conditions, or a list of them for a batch
+        :type conditions: Sequence[Any]
+        :param sources: Where each set of conditions came from
+        :type sources: list[str]
+        """
+
+        super().__init__(conditions)
+        self.sources = sources
+
+
+def fallback_suggestion(
+    config: dict[str, Any],
+    late: Sequence[Sequence[Any]] = [],
+    prefetched: Sequence[Sequence[Any]] = [],
+    observed: Sequence[Sequence[Any]] = [],
+    batch_size: int = 1,
+) -> DegradedSuggestion:
+    """Gets the best available suggestion when a prediction missed its
+    deadline.
+
+    Conditions are taken from the late and prefetched predictions first, in
+    that order, skipping any that were observed. The rest of the batch is
+    filled with space-filling conditions.
+
+    :param config: CyRxnOpt-level config describing the features
+    :type config: dict[str, Any]
+    :param late: Conditions from the last late prediction, defaults to []
+    :type late: Sequence[Sequence[Any]], optional
+    :param prefetched: Conditions from a prefetched prediction, defaults to
+        []
+    :type prefetched: Sequence[Sequence[Any]], optional
+    :param observed: Conditions already observed or being performed,
+        defaults to []
+    :type observed: Sequence[Sequence[Any]], optional
+    :param batch_size: Number of conditions to suggest, defaults to 1
+    :type batch_size: int, optional
+    :return: One set of conditions, or a list of ``batch_size`` of them if
+        it is larger than 1
+    :rtype: DegradedSuggestion
+    """
+
+    seen = {condition_key(list(conditions)) for conditions in observed}
+    chosen: list[list[Any]] = []
+    sources: list[str] = []
+
+    for source, candidates in (("late", late), ("prefetch", prefetched)):
+        for conditions in candidates:
+            key = condition_key(list(conditions))
+            if len(chosen) < batch_size and key not in seen:
+                seen.add(key)
+                chosen.append(list(conditions))
+                sources.append(source)
+
+    if len(chosen) < batch_size:
+        filled = space_filling_conditions(
+            config,
+            [list(c) for c in observed] + chosen,
+            n=batch_size - len(chosen),
+        )
+        chosen.extend(filled)
+        sources.extend(["space_filling"] * len(filled))
+
+    if batch_size == 1:
+        return DegradedSuggestion(chosen[0], sources)
+
+    return DegradedSuggestion(chosen, sources)
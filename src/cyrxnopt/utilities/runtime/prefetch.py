@@ -0,0 +1,248 @@
+import logging
+import math
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor
+from typing import Any, Optional, Union
+
+from cyrxnopt.utilities.experiment.experiment_store import condition_key
+
+logger = logging.getLogger(__name__)
+
+LIAR_STRATEGIES = ["mean", "min", "max"]
+
+
+def liar_value(
+    results: Sequence[Any], strategy: Union[str, float] = "mean"
+) -> Optional[float]:
+    """Gets the result to assume for a suggestion that is still being
+    performed, known as a constant liar.
+
+    :param results: Results observed so far
+    :type results: Sequence[Any]
+    :param strategy: One of :py:data:`LIAR_STRATEGIES` applied to the
+        numeric results, or a number to use as is, defaults to "mean"
+    :type strategy: Union[str, float], optional
+    :raises ValueError: Unknown strategy
+    :return: Assumed result, None if there are no numeric results to base it
+        on
+    :rtype: Optional[float]
+    """
+
+    if not isinstance(strategy, str):
+        return float(strategy)
+
+    if strategy not in LIAR_STRATEGIES:
+        raise ValueError(
+            "Unknown liar strategy {}, expected a number or one of {}".format(
+                strategy, LIAR_STRATEGIES
+            )
+        )
+
+    values = []
+    for result in results:
+        try:
+            value = float(result)
+        except (TypeError, ValueError):
+            continue
+        if math.isfinite(value):
+            values.append(value)
+
+    if len(values) == 0:
+        return None
+
+    if strategy == "min":
+        return min(values)
+    if strategy == "max":
+        return max(values)
+
+    return sum(values) / len(values)
+
+
+class Speculation:
+    """Prediction of the next suggestion, run in the background while the
+    current one is being performed.
+
+    The prediction assumes the pending suggestion gave the liar result, see
+    :py:func:`liar_value`. The optimizer overlays the liar on what it reads
+    from the experiment, such as its scope in memory, and records nothing,
+    so the fantasized result never reaches the experiment's files. See
+    ``speculate`` of :py:class:`~cyrxnopt.OptimizerEDBOp.OptimizerEDBOp`.
+
+    Before the prediction, a reconcile step can bring the experiment
+    directory up to date, typically by giving the optimizer the real result
+    of the previous suggestion. Callers wait for it with :py:meth:`sync`
+    before they touch the experiment directory.
+    """
+
+    def __init__(
+        self,
+        pending: list[Any],
+        liar: float,
+        predict: Callable[[list[Any], Any], Any],
+        executor: Executor,
+        reconcile: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Starts a speculative prediction.
+
+        :param pending: Suggestion being performed, or a list of them
+        :type pending: list[Any]
+        :param liar: Result assumed for each pending suggestion
+        :type liar: float
+        :param predict: Function running the optimizer's prediction without
+            recording anything, given the pending conditions and the results
+            to assume for them
+        :type predict: Callable[[list[Any], Any], Any]
+        :param executor: Executor to run the prediction in
+        :type executor: Executor
+        :param reconcile: Function updating the experiment directory before
+            the prediction, defaults to None
+        :type reconcile: Optional[Callable[[], None]], optional
+        """
+
+        self.pending = pending
+        self.liar = liar
+
+        self._batch = isinstance(pending[0], (list, tuple))
+        self._reconcile = reconcile
+        self._reconcile_error: Optional[BaseException] = None
+        self._synced = threading.Event()
+        self._cancelled = False
+
+        self._future = executor.submit(self._run, predict)
+
+    def matches(
+        self,
+        prev_param: list[Any],
+        yield_value: Any,
+        tolerance: Optional[float] = None,
+    ) -> bool:
+        """Checks whether real results can take over the speculation.
+
+        The results must be for exactly the pending suggestions. Any result
+        is accepted by default, as the real results are reconciled into the
+        optimizer's files afterwards, which is the constant liar approach.
+        A tolerance forces a new prediction for results further from the
+        liar.
+
+        :param prev_param: Conditions the results are for
+        :type prev_param: list[Any]
+        :param yield_value: Real results
+        :type yield_value: Any
+        :param tolerance: Largest difference from the liar that is accepted,
+            defaults to None to accept any result
+        :type tolerance: Optional[float], optional
+        :return: Whether the results are for exactly the pending
+            suggestions, and each is within the tolerance of the liar
+        :rtype: bool
+        """
+
+        if len(prev_param) == 0:
+            return False
+
+        if self._batch:
+            if not isinstance(prev_param[0], (list, tuple)):
+                return False
+            conditions = list(prev_param)
+            results = list(yield_value)
+            pending = list(self.pending)
+        else:
+            conditions = [prev_param]
+            results = [yield_value]
+            pending = [self.pending]
+
+        if sorted(condition_key(list(c)) for c in conditions) != sorted(
+            condition_key(list(c)) for c in pending
+        ):
+            return False
+
+        if tolerance is None:
+            return True
+
+        try:
+            return all(
+                abs(float(result) - self.liar) <= tolerance
+                for result in results
+            )
+        except (TypeError, ValueError):
+            return False
+
+    def sync(self, retry: bool = True) -> None:
+        """Waits for the reconcile step.
+
+        :param retry: Whether to run the reconcile step again if it failed,
+            defaults to True
+        :type retry: bool, optional
+        """
+
+        self._synced.wait()
+
+        if not retry:
+            return
+
+        if self._reconcile_error is not None and self._reconcile is not None:
+            logger.warning(
+                "Reconciling the experiment directory failed in the "
+                "background (%s), retrying",
+                self._reconcile_error,
+            )
+            self._reconcile()
+            self._reconcile_error = None
+
+    def done(self) -> bool:
+        """Checks whether the speculative prediction finished.
+
+        :return: True if it finished, successfully or not
+        :rtype: bool
+        """
+
+        return self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Waits for the speculative prediction.
+
+        :param timeout: Seconds to wait, defaults to None to wait until it
+            is done
+        :type timeout: Optional[float], optional
+        :return: Suggestion predicted with the liar results
+        :rtype: Any
+        """
+
+        return self._future.result(timeout)
+
+    def cancel(self) -> None:
+        """Abandons the speculative prediction. The reconcile step still
+        runs, and a prediction that already started runs to completion in
+        the background, but its result is discarded.
+        """
+
+        self._cancelled = True
+
+    def _run(self, predict: Callable[[list[Any], Any], Any]) -> Any:
+        """Reconciles the experiment directory, then predicts with the liar
+        results.
+
+        :param predict: Function running the optimizer's prediction
+        :type predict: Callable[[list[Any], Any], Any]
+        :return: Suggestion predicted with the liar results, None if the
+            speculation was cancelled first
+        :rtype: Any
+        """
+
+        try:
+            if self._reconcile is not None:
+                self._reconcile()
+        except Exception as e:
+            self._reconcile_error = e
+        finally:
+            self._synced.set()
+
+        if self._cancelled:
+            return None
+
+        if self._batch:
+            results: Any = [self.liar] * len(self.pending)
+        else:
+            results = self.liar
+
+        return predict(self.pending, results)
@@ -0,0 +1,333 @@
+import logging
+import os
+import sys
+import threading
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Environment variables read by the common BLAS and OpenMP runtimes when they
+# are loaded
+BLAS_THREAD_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+# Limits that apply to the whole process rather than the calling thread
+PROCESS_WIDE_LIMITS = ["blas_threads", "memory_limit"]
+
+# Process-wide limits of one budget at a time, see resource_budget()
+_process_lock = threading.Lock()
+
+# Whether each thread is a thread worker and inside a budget
+_thread_state = threading.local()
+
+
+@contextmanager
+def thread_worker() -> Iterator[None]:
+    """Marks the current thread as one of several running optimizer calls
+    side by side in this process within a block, such as the workers of a
+    :py:class:`~cyrxnopt.CampaignScheduler.CampaignScheduler` with
+    ``processes=False``.
+
+    Budgets entered in a thread worker only apply limits local to the
+    thread, see :py:func:`resource_budget`, so thread workers never wait
+    for each other's budgets.
+
+    :return: Context marking the thread
+    :rtype: Iterator[None]
+    """
+
+    previous = in_thread_worker()
+    _thread_state.worker = True
+    try:
+        yield
+    finally:
+        _thread_state.worker = previous
+
+
+def in_thread_worker() -> bool:
+    """Checks whether the current thread is marked with
+    :py:func:`thread_worker`.
+
+    :return: Whether the thread is a thread worker
+    :rtype: bool
+    """
+
+    return getattr(_thread_state, "worker", False)
+
+
+@contextmanager
+def resource_budget(spec: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    """Limits the resources optimizer backends may use within a block.
+
+    The spec may contain any of these keys, and missing keys leave the
+    corresponding resource alone:
+
+    - ``"threads"``: Threads for intra-op parallelism. Applied as the
+      default ``n_jobs`` for joblib in the calling thread, and to PyTorch if
+      it is loaded.
+    - ``"blas_threads"``: Threads for BLAS and OpenMP. Set through the usual
+      environment variables, which take effect for libraries loaded inside
+      the block, and through threadpoolctl for already loaded libraries
+      when it is available.
+    - ``"cpu_affinity"``: CPUs the calls may run on. Linux only.
+    - ``"memory_limit"``: Address space limit in MB. Unix only.
+
+    Everything is restored when the block exits. Settings that cannot be
+    applied on the current platform are skipped with a warning.
+
+    Budgets are meant to be applied per worker process, where the limits
+    cover every thread of the optimizer. The CPU affinity is then set for
+    every thread of the process. Budgets with limits in
+    :py:data:`PROCESS_WIDE_LIMITS` that are entered from several threads of
+    one process run one at a time.
+
+    In a :py:func:`thread_worker`, only limits local to the thread are
+    applied: the CPU affinity of the thread, which threads it starts
+    inherit, and joblib's ``n_jobs``. PyTorch's thread count is left alone,
+    and the limits in :py:data:`PROCESS_WIDE_LIMITS` are refused, as they
+    would also limit the calls of the other workers.
+
+    :param spec: Resource limits to apply
+    :type spec: dict[str, Any]
+    :raises RuntimeError: The thread is already inside a budget
+    :raises ValueError: A process-wide limit was given in a thread worker
+    :return: Context yielding the settings that were applied
+    :rtype: Iterator[dict[str, Any]]
+    """
+
+    if getattr(_thread_state, "budget", False):
+        raise RuntimeError("Resource budgets cannot be nested")
+
+    process_wide = [
+        name for name in PROCESS_WIDE_LIMITS if spec.get(name) is not None
+    ]
+    whole_process = not in_thread_worker()
+    if process_wide and not whole_process:
+        raise ValueError(
+            "{} limit the whole process, so thread workers cannot apply "
+            "them. Run the calls in worker processes instead.".format(
+                ", ".join(process_wide)
+            )
+        )
+
+    applied: dict[str, Any] = {}
+
+    with ExitStack() as stack:
+        if process_wide:
+            stack.enter_context(_process_lock)
+
+        _thread_state.budget = True
+        stack.callback(setattr, _thread_state, "budget", False)
+
+        if spec.get("blas_threads") is not None:
+            _limit_blas_threads(stack, int(spec["blas_threads"]), applied)
+
+        if spec.get("threads") is not None:
+            _limit_threads(stack, int(spec["threads"]), whole_process, applied)
+
+        if spec.get("cpu_affinity") is not None:
+            _set_cpu_affinity(
+                stack, list(spec["cpu_affinity"]), whole_process, applied
+            )
+
+        if spec.get("memory_limit") is not None:
+            _limit_memory(stack, float(spec["memory_limit"]), applied)
+
+        yield applied
+
+
+def _limit_blas_threads(
+    stack: ExitStack, n_threads: int, applied: dict[str, Any]
+) -> None:
+    """Limits BLAS and OpenMP threads until the stack is closed.
+
+    :param stack: Stack collecting the restore callbacks
+    :type stack: ExitStack
+    :param n_threads: Maximum number of threads
+    :type n_threads: int
+    :param applied: Record of applied settings, updated in place
+    :type applied: dict[str, Any]
+    """
+
+    previous = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    for name in BLAS_THREAD_VARIABLES:
+        os.environ[name] = str(n_threads)
+    stack.callback(_restore_environment, previous)
+    applied["blas_threads"] = n_threads
+
+    # Libraries that are already loaded ignore the environment variables.
+    # threadpoolctl ships with scikit-learn, but is not always installed.
+    try:
+        from threadpoolctl import threadpool_limits  # type: ignore
+    except ImportError:
+        return
+
+    stack.enter_context(threadpool_limits(limits=n_threads))
+    applied["threadpoolctl"] = True
+
+
+def _limit_threads(
+    stack: ExitStack,
+    n_threads: int,
+    whole_process: bool,
+    applied: dict[str, Any],
+) -> None:
+    """Limits intra-op threads until the stack is closed.
+
+    :param stack: Stack collecting the restore callbacks
+    :type stack: ExitStack
+    :param n_threads: Maximum number of threads
+    :type n_threads: int
+    :param whole_process: Whether limits of the whole process may be changed
+    :type whole_process: bool
+    :param applied: Record of applied settings, updated in place
+    :type applied: dict[str, Any]
+    """
+
+    import joblib
+
+    # parallel_config replaced parallel_backend in joblib 1.3
+    if hasattr(joblib, "parallel_config"):
+        stack.enter_context(joblib.parallel_config(n_jobs=n_threads))
+    else:
+        stack.enter_context(joblib.parallel_backend("loky", n_jobs=n_threads))
+    applied["joblib_n_jobs"] = n_threads
+
+    # Only limit PyTorch if a backend already loaded it, importing it here
+    # would be slow and it is not installed for every optimizer
+    torch = sys.modules.get("torch")
+    if torch is not None and whole_process:
+        previous = torch.get_num_threads()
+        torch.set_num_threads(n_threads)
+        stack.callback(torch.set_num_threads, previous)
+        applied["torch_threads"] = n_threads
+
+
+def _set_cpu_affinity(
+    stack: ExitStack,
+    cpus: list[int],
+    whole_process: bool,
+    applied: dict[str, Any],
+) -> None:
+    """Pins threads to a set of CPUs until the stack is closed.
+
+    On Linux, the affinity is a property of each thread, and new threads
+    inherit it from the thread that starts them. Pinning the whole process
+    therefore sets it for every thread running in it, such as the thread
+    pools of BLAS or PyTorch started by earlier calls.
+
+    :param stack: Stack collecting the restore callbacks
+    :type stack: ExitStack
+    :param cpus: CPUs the threads may run on
+    :type cpus: list[int]
+    :param whole_process: Whether to pin every thread of the process rather
+        than the calling thread
+    :type whole_process: bool
+    :param applied: Record of applied settings, updated in place
+    :type applied: dict[str, Any]
+    """
+
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("CPU affinity is not supported on this platform")
+        return
+
+    # The calling thread goes first, and 0 stands for it
+    thread_ids = [0]
+    if whole_process:
+        thread_ids.extend(_other_thread_ids())
+
+    for thread_id in thread_ids:
+        try:
+            previous = os.sched_getaffinity(thread_id)
+            os.sched_setaffinity(thread_id, cpus)
+        except ProcessLookupError:
+            # The thread exited in the meantime
+            continue
+        stack.callback(_restore_affinity, thread_id, previous)
+
+    applied["cpu_affinity"] = sorted(os.sched_getaffinity(0))
+
+
+def _limit_memory(
+    stack: ExitStack, limit_mb: float, applied: dict[str, Any]
+) -> None:
+    """Limits the address space of the process until the stack is closed.
+
+    Allocations past the limit raise a MemoryError instead of pushing the
+    machine into swap.
+
+    :param stack: Stack collecting the restore callbacks
+    :type stack: ExitStack
+    :param limit_mb: Address space limit in MB
+    :type limit_mb: float
+    :param applied: Record of applied settings, updated in place
+    :type applied: dict[str, Any]
+    """
+
+    try:
+        import resource
+    except ImportError:
+        logger.warning("Memory limits are not supported on this platform")
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = int(limit_mb * 2**20)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    stack.callback(resource.setrlimit, resource.RLIMIT_AS, (soft, hard))
+    applied["memory_limit"] = limit / 2**20
+
+
+def _other_thread_ids() -> list[int]:
+    """Gets the ids of the other threads of this process, on Linux.
+
+    :return: Thread ids, empty where they cannot be listed
+    :rtype: list[int]
+    """
+
+    try:
+        thread_ids = [int(name) for name in os.listdir("/proc/self/task")]
+    except OSError:
+        return []
+
+    current = threading.get_native_id()
+
+    return [thread_id for thread_id in thread_ids if thread_id != current]
+
+
+def _restore_affinity(thread_id: int, cpus: Any) -> None:
+    """Restores the CPU affinity of a thread, unless it exited.
+
+    :param thread_id: Thread id, 0 for the calling thread
+    :type thread_id: int
+    :param cpus: CPUs the thread may run on
+    :type cpus: Any
+    """
+
+    try:
+        os.sched_setaffinity(thread_id, cpus)
+    except ProcessLookupError:
+        pass
+
+
+def _restore_environment(previous: dict[str, Any]) -> None:
+    """Restores environment variables to previous values.
+
+    :param previous: Previous value of each variable, None if it was unset
+    :type previous: dict[str, Any]
+    """
+
+    for name, value in previous.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
@@ -0,0 +1,121 @@
+import multiprocessing
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any, Optional
+
+# Start methods for worker processes, in order of preference. Forking a
+# process that runs threads, as the service and the async controller do, can
+# leave locks held by other threads locked forever in the child, so worker
+# processes are started fresh instead.
+START_METHODS = ["forkserver", "spawn"]
+
+# Cancellation token of the call running in each thread, see cancellable()
+_current = threading.local()
+
+
+class CallCancelled(RuntimeError):
+    """Raised inside a call that was asked to stop, see
+    :py:func:`check_cancelled`."""
+
+
+class CancellationToken:
+    """Flag that asks a running call to stop.
+
+    A call cannot be interrupted from the outside while it runs in a thread,
+    so optimizers check the token of their call between steps with
+    :py:func:`check_cancelled`, and stop by raising :py:class:`CallCancelled`
+    once it is set. Steps are chosen so that stopping between them leaves
+    the experiment's files consistent.
+    """
+
+    def __init__(self) -> None:
+        """Creates a token that is not cancelled."""
+
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the call was asked to stop.
+
+        :return: True once :py:meth:`cancel` was called
+        :rtype: bool
+        """
+
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Asks the call to stop at its next check."""
+
+        self._event.set()
+
+
+@contextmanager
+def cancellable(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Makes a token the one checked by :py:func:`check_cancelled` in the
+    current thread within a block.
+
+    :param token: Token of the call running in the block
+    :type token: CancellationToken
+    :return: Context yielding the token
+    :rtype: Iterator[CancellationToken]
+    """
+
+    previous = getattr(_current, "token", None)
+    _current.token = token
+    try:
+        yield token
+    finally:
+        _current.token = previous
+
+
+def check_cancelled() -> None:
+    """Stops the current call if it was asked to.
+
+    Calls that do not run under :py:func:`cancellable` are never stopped.
+
+    :raises CallCancelled: The token of the current call was cancelled
+    """
+
+    token: Optional[CancellationToken] = getattr(_current, "token", None)
+    if token is not None and token.cancelled:
+        raise CallCancelled("The call was cancelled")
+
+
+def cancellable_objective(
+    obj_func: Optional[Callable[..., Any]],
+) -> Optional[Callable[..., Any]]:
+    """Wraps an objective function so the current call is checked for
+    cancellation before each evaluation.
+
+    :param obj_func: Objective function, or None
+    :type obj_func: Optional[Callable[..., Any]]
+    :return: Wrapped objective function, None if ``obj_func`` is None
+    :rtype: Optional[Callable[..., Any]]
+    """
+
+    if obj_func is None:
+        return None
+
+    def objective(x: Any) -> Any:
+        check_cancelled()
+
+        return obj_func(x)
+
+    return objective
+
+
+def worker_context() -> Any:
+    """Gets the multiprocessing context to start worker processes with.
+
+    :return: Context of the first available method in
+        :py:data:`START_METHODS`
+    :rtype: multiprocessing.context.BaseContext
+    """
+
+    available = multiprocessing.get_all_start_methods()
+    for method in START_METHODS:
+        if method in available:
+            return multiprocessing.get_context(method)
+
+    return multiprocessing.get_context()
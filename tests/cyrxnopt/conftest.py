@@ -0,0 +1,25 @@
+import pytest
+
+from cyrxnopt.NestedVenv import NestedVenv
+
+
+@pytest.fixture(scope="session")
+def venv_pandas(tmp_path_factory):
+    """Virtual environment with the NumPy and pandas packages that the
+    optimizer utilities operate on.
+    """
+
+    venv_path = tmp_path_factory.mktemp("venv_pandas")
+
+    test_venv = NestedVenv(venv_path)
+
+    test_venv.create()
+    test_venv.activate()
+
+    test_venv.pip_install("numpy")
+    test_venv.pip_install("pandas")
+
+    yield test_venv
+
+    test_venv.deactivate()
+    test_venv.delete()
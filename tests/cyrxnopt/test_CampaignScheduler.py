@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt.CampaignScheduler import CampaignScheduler
+from cyrxnopt.utilities.runtime import workers
+
+
+class RecordingOptimizer:
+    """Optimizer that appends each call to ``calls.txt`` in its experiment
+    directory and suggests the process it ran in."""
+
+    def set_config(self, experiment_dir, config):
+        self._record(experiment_dir, "set_config")
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        time.sleep(config.get("sleep", 0.0))
+        if config.get("fail"):
+            raise ValueError("prediction failed")
+        self._record(experiment_dir, "predict {}".format(yield_value))
+
+        return [os.getpid()]
+
+    def _record(self, experiment_dir, line):
+        with open(os.path.join(experiment_dir, "calls.txt"), "a") as fout:
+            fout.write(line + "\n")
+
+
+@pytest.fixture
+def recording_optimizer(monkeypatch):
+    monkeypatch.setattr(
+        controller, "get_optimizer", lambda name, venv: RecordingOptimizer()
+    )
+    # Worker processes only see the fake optimizer when they are forked
+    monkeypatch.setattr(workers, "START_METHODS", ["fork"])
+
+
+def add_campaigns(scheduler, tmp_path, n, **config):
+    for i in range(n):
+        (tmp_path / str(i)).mkdir()
+        scheduler.add_campaign(
+            str(i),
+            "recording",
+            None,
+            str(tmp_path / str(i)),
+            dict(config, experiment_store=False),
+        )
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_calls_of_a_campaign_run_in_order(
+    recording_optimizer, tmp_path, processes
+):
+    with CampaignScheduler(max_workers=2, processes=processes) as scheduler:
+        add_campaigns(scheduler, tmp_path, 3)
+
+        futures = [scheduler.set_config("0")]
+        futures.extend(scheduler.predict("0", [1], i) for i in range(5))
+        futures.append(scheduler.predict("1", [1], 9))
+        for future in futures:
+            future.result(timeout=30)
+
+        # Process workers suggest their own process ID
+        assert (futures[-1].result() != [os.getpid()]) == processes
+
+    assert (tmp_path / "0" / "calls.txt").read_text() == (
+        "set_config\n" + "".join("predict {}\n".format(i) for i in range(5))
+    )
+
+
+def test_workers_run_campaigns_concurrently(recording_optimizer, tmp_path):
+    with CampaignScheduler(max_workers=4, processes=False) as scheduler:
+        add_campaigns(scheduler, tmp_path, 4, sleep=0.3)
+
+        start = time.perf_counter()
+        futures = [scheduler.predict(str(i), [1], 0) for i in range(4)]
+        for future in futures:
+            future.result(timeout=30)
+
+        assert time.perf_counter() - start < 4 * 0.3
+        assert scheduler.stats()["workers"] == 4
+
+
+def test_priority_and_fair_share(recording_optimizer, tmp_path):
+    order = []
+    release = threading.Event()
+
+    with CampaignScheduler(max_workers=1, processes=False) as scheduler:
+        add_campaigns(scheduler, tmp_path, 3)
+        scheduler.remove_campaign("2")
+        scheduler.add_campaign(
+            "urgent",
+            "recording",
+            None,
+            str(tmp_path / "2"),
+            {"experiment_store": False},
+            priority=1,
+        )
+
+        # Hold the only worker while the queues fill up
+        blocker = scheduler.predict("0", [1], -1)
+        blocker.add_done_callback(lambda _: release.wait(10))
+
+        futures = []
+        for name in ["0", "0", "0", "1", "1", "urgent"]:
+            future = scheduler.predict(name, [1], 0)
+            future.add_done_callback(lambda _, name=name: order.append(name))
+            futures.append(future)
+
+        release.set()
+        for future in futures:
+            future.result(timeout=30)
+
+    assert order == ["urgent", "1", "0", "1", "0", "0"]
+
+
+def test_idle_workers_stop(recording_optimizer, tmp_path):
+    with CampaignScheduler(max_workers=2, processes=True) as scheduler:
+        add_campaigns(scheduler, tmp_path, 2)
+        scheduler.predict("1", [1], 0).result(timeout=30)
+
+        worker = scheduler._campaign("1").worker
+        process = worker._process
+        scheduler.remove_campaign("1")
+
+        worker._thread.join(30)
+        assert not process.is_alive()
+        assert scheduler.stats()["workers"] == 1
+
+        # The pool has room for a new worker again
+        (tmp_path / "2").mkdir()
+        scheduler.add_campaign("2", "recording", None, str(tmp_path / "2"), {})
+        assert scheduler.stats()["workers"] == 2
+
+
+def test_stats_and_failures(recording_optimizer, tmp_path):
+    with CampaignScheduler(max_workers=1, processes=False) as scheduler:
+        add_campaigns(scheduler, tmp_path, 1, fail=True)
+
+        future = scheduler.predict("0", [1], 0)
+        with pytest.raises(ValueError):
+            future.result(timeout=30)
+
+        stats = scheduler.stats()
+
+    assert stats["queue_depth"] == 0
+    assert stats["campaigns"]["0"]["failed"] == 1
+    assert stats["campaigns"]["0"]["max_latency"] > 0
+
+
+def test_unknown_and_duplicate_campaigns(tmp_path):
+    with CampaignScheduler(processes=False) as scheduler:
+        add_campaigns(scheduler, tmp_path, 1)
+
+        with pytest.raises(RuntimeError):
+            scheduler.predict("missing", [], None)
+        with pytest.raises(RuntimeError):
+            scheduler.add_campaign("0", "recording", None, str(tmp_path), {})
+
+    with pytest.raises(RuntimeError):
+        scheduler.predict("0", [], None)
@@ -217,3 +217,75 @@ def test__validate_config_missing_parts():
 
     with pytest.raises(RuntimeError):
         opt._validate_config(config_no_direction)
+
+
+def test_set_config_applies_constraints_per_chunk(venv_amlro, tmp_path):
+    import pandas as pd
+
+    opt = OptimizerAmlro(venv_amlro)
+
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.1, 0.1],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+        "budget": 10,
+        "objectives": ["yield"],
+        "direction": "min",
+        "constraints": ["f1 + f2 <= 0", 'f3 != "b"'],
+        "grid_chunk_size": 50,
+    }
+
+    opt.set_config(str(tmp_path), config)
+
+    full_combos = pd.read_csv(tmp_path / "full_combo_file.txt")
+    training_combos = pd.read_csv(tmp_path / "training_combo_file.txt")
+
+    # 231 continuous points satisfy the sum constraint, each with 2 levels
+    assert len(full_combos) == 462
+    assert not full_combos.duplicated().any()
+    assert (full_combos["f1"] + full_combos["f2"] <= 0).all()
+    assert not (full_combos["f3"] == 1).any()
+
+    assert len(training_combos) == 20
+    assert list(training_combos.columns) == ["f1", "f2", "f3"]
+
+
+def test_predict_adaptive_grid_mode(venv_amlro, tmp_path, obj_func_3d):
+    import pandas as pd
+
+    opt = OptimizerAmlro(venv_amlro)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.001, 0.001],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [[0, 1, 2]],
+        "direction": "min",
+        "budget": 10,
+        "objectives": ["yield"],
+        "grid_mode": "adaptive",
+    }
+
+    opt.set_config(tmp_path, config)
+
+    # Only the coarse grid is generated up front
+    full_combos = pd.read_csv(tmp_path / "full_combo_file.txt")
+    assert len(full_combos) == 5 * 5 * 3
+
+    next_params: list[float] = []
+    result = 0
+    for i in range(20):
+        next_params = opt.train(next_params, result, tmp_path, config)
+        result = obj_func_3d(next_params)
+
+    next_params = opt.predict(next_params, result, tmp_path, config)
+    result = obj_func_3d(next_params)
+    next_params = opt.predict(next_params, result, tmp_path, config)
+
+    assert len(next_params) == 3
+
+    # Candidates were refined, but far fewer than the 2001 x 2001 x 3 grid
+    full_combos = pd.read_csv(tmp_path / "full_combo_file.txt")
+    assert 5 * 5 * 3 < len(full_combos) < 1000
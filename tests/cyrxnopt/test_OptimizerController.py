@@ -0,0 +1,119 @@
+from collections import OrderedDict
+
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt.utilities.experiment.experiment_store import ExperimentStore
+
+
+class SessionOptimizer:
+    """Optimizer suggesting how many calls its instance has seen."""
+
+    created = 0
+    closed = 0
+
+    def __init__(self):
+        SessionOptimizer.created += 1
+        self.calls = 0
+
+    def set_config(self, experiment_dir, config):
+        pass
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        self.calls += 1
+
+        return [self.calls]
+
+    def close(self):
+        SessionOptimizer.closed += 1
+
+
+CONFIG = {"experiment_store": False, "session": True}
+
+
+@pytest.fixture
+def session_optimizer(monkeypatch):
+    SessionOptimizer.created = 0
+    SessionOptimizer.closed = 0
+    monkeypatch.setattr(controller, "_sessions", OrderedDict())
+    monkeypatch.setattr(
+        controller, "get_optimizer", lambda name, venv: SessionOptimizer()
+    )
+
+
+def predict(experiment_dir, name="session", config=CONFIG):
+    return controller.predict(name, None, [], 0.0, str(experiment_dir), config)
+
+
+def test_instances_are_kept_per_experiment(session_optimizer, tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+
+    assert predict(tmp_path / "a") == [1]
+    assert predict(tmp_path / "a") == [2]
+    assert predict(tmp_path / "b") == [1]
+    assert predict(tmp_path / "a", "other") == [1]
+    assert SessionOptimizer.created == 3
+
+    # A new campaign starts a new instance, and the old one is closed
+    controller.set_config("session", None, CONFIG, str(tmp_path / "a"))
+    assert predict(tmp_path / "a") == [1]
+    assert SessionOptimizer.created == 4
+    assert SessionOptimizer.closed == 1
+
+
+def test_sessions_are_opt_in(session_optimizer, tmp_path):
+    config = {"experiment_store": False}
+
+    assert predict(tmp_path, config=config) == [1]
+    assert predict(tmp_path, config=config) == [1]
+    assert SessionOptimizer.created == 2
+
+
+def test_sessions_are_bounded(session_optimizer, tmp_path, monkeypatch):
+    monkeypatch.setattr(controller, "_max_sessions", 2)
+    for name in ("a", "b", "c"):
+        (tmp_path / name).mkdir()
+        predict(tmp_path / name)
+
+    # The least recently used experiment lost its instance, which was closed
+    assert SessionOptimizer.closed == 1
+    assert predict(tmp_path / "c") == [2]
+    assert predict(tmp_path / "a") == [1]
+
+
+def test_resources_are_recorded_with_the_timing(session_optimizer, tmp_path):
+    config = {"experiment_store": True, "resources": {"threads": 1}}
+
+    assert predict(tmp_path, config=config) == [1]
+
+    with ExperimentStore(str(tmp_path)) as store:
+        assert store.resources("session") == [
+            (
+                "predict",
+                {
+                    "requested": {"threads": 1},
+                    "applied": {"joblib_n_jobs": 1},
+                },
+            )
+        ]
+
+
+def test_experiment_store_is_opt_in(session_optimizer, tmp_path, monkeypatch):
+    monkeypatch.setattr(controller, "_stores", OrderedDict())
+
+    predict(tmp_path, config={})
+    assert not (tmp_path / "experiment.sqlite").exists()
+
+    # One connection is kept for every call of the experiment
+    config = {"experiment_store": True}
+    predict(tmp_path, config=config)
+    store = controller._stores[str(tmp_path)][0]
+    predict(tmp_path, config=config)
+
+    assert list(controller._stores) == [str(tmp_path)]
+    assert controller._stores[str(tmp_path)][0] is store
+    assert [timing[0] for timing in store.timings("session")] == [
+        "predict",
+        "predict",
+    ]
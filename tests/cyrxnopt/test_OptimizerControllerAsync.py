@@ -0,0 +1,167 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt import OptimizerControllerAsync
+from cyrxnopt.utilities.runtime import workers
+
+
+class SlowOptimizer:
+    """Optimizer that sleeps before suggesting, then records that it
+    finished in ``done.txt``."""
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        time.sleep(config.get("sleep", 0.0))
+        with open(os.path.join(experiment_dir, "done.txt"), "a") as fout:
+            fout.write("{}\n".format(config.get("label", "")))
+
+        return [config.get("label", "")]
+
+
+class SteppingOptimizer:
+    """Optimizer that takes many short steps, checking for cancellation
+    between them, then records that it finished in ``done.txt``."""
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        for _ in range(50):
+            time.sleep(0.02)
+            workers.check_cancelled()
+        with open(os.path.join(experiment_dir, "done.txt"), "a") as fout:
+            fout.write("{}\n".format(config.get("label", "")))
+
+        return [config.get("label", "")]
+
+
+@pytest.fixture
+def slow_optimizer(monkeypatch):
+    monkeypatch.setattr(
+        controller,
+        "get_optimizer",
+        lambda name, venv: (
+            SteppingOptimizer() if name == "stepping" else SlowOptimizer()
+        ),
+    )
+    # The stand-in optimizers only exist in processes forked from this one
+    monkeypatch.setattr(workers, "START_METHODS", ["fork"])
+
+
+def predict(
+    experiment_dir, timeout=None, worker="thread", name="slow", **config
+):
+    return OptimizerControllerAsync.predict(
+        name,
+        None,
+        [],
+        None,
+        str(experiment_dir),
+        dict(config, experiment_store=False),
+        timeout=timeout,
+        worker=worker,
+    )
+
+
+@pytest.mark.parametrize("worker", ["thread", "process"])
+def test_predict(slow_optimizer, tmp_path, worker):
+    result = asyncio.run(predict(tmp_path, worker=worker, label="a"))
+
+    assert result == ["a"]
+    assert (tmp_path / "done.txt").read_text() == "a\n"
+
+
+def test_campaigns_run_concurrently(slow_optimizer, tmp_path):
+    async def main():
+        return await asyncio.gather(
+            *[
+                predict(tmp_path / str(i), sleep=0.3, label=str(i))
+                for i in range(8)
+            ]
+        )
+
+    for i in range(8):
+        (tmp_path / str(i)).mkdir()
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+
+    assert results == [[str(i)] for i in range(8)]
+    assert time.perf_counter() - start < 8 * 0.3
+
+
+def test_calls_for_one_experiment_run_in_order(slow_optimizer, tmp_path):
+    async def main():
+        return await asyncio.gather(
+            predict(tmp_path, sleep=0.2, label="a"),
+            predict(tmp_path, label="b"),
+        )
+
+    assert asyncio.run(main()) == [["a"], ["b"]]
+    assert (tmp_path / "done.txt").read_text() == "a\nb\n"
+
+
+def test_timeout_terminates_process(slow_optimizer, tmp_path):
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(predict(tmp_path, timeout=0.3, worker="process", sleep=5.0))
+
+    # The next call does not wait for the terminated one
+    start = time.perf_counter()
+    asyncio.run(predict(tmp_path, worker="process", label="b"))
+
+    assert time.perf_counter() - start < 5.0
+    assert (tmp_path / "done.txt").read_text() == "b\n"
+
+
+def test_cancelled_thread_call_finishes_before_the_next(
+    slow_optimizer, tmp_path
+):
+    async def main():
+        task = asyncio.ensure_future(predict(tmp_path, sleep=0.3, label="a"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        return await predict(tmp_path, label="b")
+
+    assert asyncio.run(main()) == ["b"]
+    assert (tmp_path / "done.txt").read_text() == "a\nb\n"
+
+
+def test_unknown_worker(tmp_path):
+    with pytest.raises(ValueError):
+        asyncio.run(predict(tmp_path, worker="fiber"))
+
+
+def test_cancelled_thread_call_stops_between_steps(slow_optimizer, tmp_path):
+    async def main():
+        task = asyncio.ensure_future(
+            predict(tmp_path, name="stepping", label="a")
+        )
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        return await predict(tmp_path, label="b")
+
+    start = time.perf_counter()
+
+    assert asyncio.run(main()) == ["b"]
+    # The first call stopped long before its 50 steps were done
+    assert time.perf_counter() - start < 0.8
+    assert (tmp_path / "done.txt").read_text() == "b\n"
+
+
+def test_worker_processes_are_not_forked():
+    context = workers.worker_context()
+
+    assert context.get_start_method() != "fork"
+    assert (
+        OptimizerControllerAsync._run_in_process(
+            os.getpid, (), {}, threading.Event()
+        )
+        != os.getpid()
+    )
@@ -1,3 +1,4 @@
+import os
 import sys
 
 import pytest
@@ -135,3 +136,425 @@ def test_predict_basic_run(venv_edbop, tmp_path, obj_func_3d) -> None:
 
     # Ensure it is the correct length (20 training + 1 predict)
     assert len(result_training_set) == 1
+
+
+@skip_libtorch_error
+@skip_error_on_install_import
+def test_predict_batch_skips_pending_suggestions(venv_edbop, tmp_path) -> None:
+    opt = OptimizerEDBOp(venv_edbop)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.1, 0.1],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+        "direction": ["min"],
+        "budget": 10,
+        "objectives": ["yield"],
+        "batch_size": 3,
+    }
+    opt.set_config(str(tmp_path), config)
+
+    first_batch = opt.predict([], 0, str(tmp_path), config)
+    # Only one of the three results is available
+    second_batch = opt.predict([first_batch[0]], [1.0], str(tmp_path), config)
+
+    assert len(first_batch) == 3
+    assert len(second_batch) == 3
+    assert all(suggestion not in first_batch for suggestion in second_batch)
+
+
+@skip_libtorch_error
+@skip_error_on_install_import
+def test_set_config_rejects_scope_over_budget(venv_edbop, tmp_path) -> None:
+    opt = OptimizerEDBOp(venv_edbop)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.0001, 0.0001],
+        "direction": ["min"],
+        "budget": 10,
+        "objectives": ["yield"],
+        "scope_memory_budget": 1,
+    }
+
+    with pytest.raises(RuntimeError):
+        opt.set_config(str(tmp_path), config)
+
+    assert not (tmp_path / "my_optimization.csv").exists()
+
+
+class FakeEDBOplus:
+    """Stands in for EDBO+ where it cannot be installed. Each run marks the
+    rows without results as the best candidates, ordered by their feature
+    values, and records how many rows and which columns it was given."""
+
+    runs: list[int] = []
+    columns: list[str] = []
+
+    def run(
+        self,
+        directory,
+        filename,
+        objectives,
+        objective_mode,
+        batch,
+        columns_features,
+        init_sampling_method,
+        seed,
+        write_extra_data=True,
+    ):
+        import numpy as np
+        import pandas as pd
+
+        path = os.path.join(directory, filename)
+        df = pd.read_csv(path)
+        FakeEDBOplus.runs.append(len(df))
+        FakeEDBOplus.columns = list(df.columns)
+
+        for objective in objectives:
+            if objective not in df:
+                df[objective] = "PENDING"
+        if columns_features == "all":
+            columns_features = [
+                name for name in df.columns if name not in objectives
+            ]
+
+        pending = df[objectives[0]].astype(str) == "PENDING"
+        df["priority"] = np.where(pending, 1.0, -1.0)
+        df = df.sort_values(
+            ["priority"] + list(columns_features),
+            ascending=[False] + [True] * len(columns_features),
+            kind="stable",
+        )
+
+        df.to_csv(path, index=False)
+
+
+@pytest.fixture
+def fake_edbop(venv_pandas, monkeypatch):
+    import numpy as np
+    import pandas as pd
+
+    def import_deps(self):
+        self._imports = {"EDBOplus": FakeEDBOplus, "np": np, "pd": pd}
+
+    FakeEDBOplus.runs = []
+    monkeypatch.setattr(OptimizerEDBOp, "_import_deps", import_deps)
+
+    return OptimizerEDBOp(venv_pandas)
+
+
+@pytest.fixture
+def small_config():
+    return {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 1]],
+        "continuous_feature_resolutions": [0.25],
+        "categorical_feature_names": ["f2"],
+        "categorical_feature_values": [["a", "b"]],
+        "direction": ["max"],
+        "budget": 10,
+        "objectives": ["yield"],
+    }
+
+
+def test_predict_hides_pending_suggestions(
+    venv_pandas, fake_edbop, small_config, tmp_path
+):
+    config = dict(small_config, batch_size=2)
+    fake_edbop.set_config(str(tmp_path), config)
+
+    first = fake_edbop.predict([], 0, str(tmp_path), config)
+    second = fake_edbop.predict([first[0]], [5.0], str(tmp_path), config)
+    # A new instance reads the files the first one wrote
+    third = OptimizerEDBOp(venv_pandas).predict(
+        [first[1]], [4.0], str(tmp_path), config
+    )
+
+    assert first == [[0.0, "a"], [0.0, "b"]]
+    assert second == [[0.25, "a"], [0.25, "b"]]
+    assert third == [[0.5, "a"], [0.5, "b"]]
+
+
+def test_scope_memory_budget_is_opt_in(fake_edbop, caplog):
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.0001, 0.0001],
+        "direction": ["min"],
+        "budget": 10,
+        "objectives": ["yield"],
+    }
+
+    fake_edbop._check_scope_size(config, ["yield"])
+    # Without a budget, large scopes are only warned about
+    assert "candidate_pool_size" in caplog.text
+
+    with pytest.raises(RuntimeError, match="scope_memory_budget"):
+        fake_edbop._check_scope_size(
+            dict(config, scope_memory_budget=1), ["yield"]
+        )
+
+
+def test_predict_scores_only_the_candidate_pool(
+    fake_edbop, small_config, tmp_path
+):
+    import pandas as pd
+
+    config = dict(
+        small_config, candidate_pool_size=3, candidate_pool_audit=True
+    )
+    fake_edbop.set_config(str(tmp_path), config)
+    FakeEDBOplus.runs = []
+
+    first = fake_edbop.predict([], 0, str(tmp_path), config)
+    fake_edbop.predict(first, 5.0, str(tmp_path), config)
+
+    # Each prediction scores the pool, plus the observed row after the first,
+    # then audits the pool against every row without a pending suggestion
+    assert FakeEDBOplus.runs == [3, 10, 4, 10]
+
+    stats = pd.read_csv(tmp_path / "candidate_pool_stats.csv")
+    assert stats["scope_rows"].tolist() == [10, 10]
+    assert stats["scored_rows"].tolist() == [3, 4]
+    assert (stats["pool_choice_rank"] >= 0).all()
+    assert (stats["full_best_priority"] == 1.0).all()
+
+
+def test_candidate_pool_is_sampled_without_the_scope(fake_edbop, tmp_path):
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.0001, 0.0001],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b"]],
+        "direction": ["max"],
+        "budget": 10,
+        "objectives": ["yield"],
+        "candidate_pool_size": 8,
+    }
+    fake_edbop.set_config(str(tmp_path), config)
+
+    assert not (tmp_path / "my_optimization.csv").exists()
+    assert not (tmp_path / "my_optimization.npz").exists()
+
+    first = fake_edbop.predict([], 0, str(tmp_path), config)
+    second = fake_edbop.predict(first, 5.0, str(tmp_path), config)
+    third = fake_edbop.predict(second, 7.0, str(tmp_path), config)
+
+    # Each prediction scores at most the pool and the results recorded
+    # before it
+    assert len(FakeEDBOplus.runs) == 3
+    assert all(n <= 8 + i for i, n in enumerate(FakeEDBOplus.runs))
+    assert len({tuple(first), tuple(second), tuple(third)}) == 3
+    assert not (tmp_path / "my_optimization.npz").exists()
+
+
+def test_predict_does_not_rewrite_the_checkpoint(
+    venv_pandas, fake_edbop, small_config, tmp_path
+):
+    fake_edbop.set_config(str(tmp_path), small_config)
+    checkpoint = tmp_path / "my_optimization.npz"
+    saved = checkpoint.read_bytes()
+
+    first = fake_edbop.predict([], 0, str(tmp_path), small_config)
+    second = fake_edbop.predict(first, 5.0, str(tmp_path), small_config)
+
+    assert checkpoint.read_bytes() == saved
+
+    # A new session applies the recorded results to the checkpoint
+    resumed = OptimizerEDBOp(venv_pandas)
+    third = resumed.predict(second, 4.0, str(tmp_path), small_config)
+    scope = resumed._load_scope(str(tmp_path), small_config)
+
+    assert first == [0.0, "a"]
+    assert second == [0.0, "b"]
+    assert third == [0.25, "a"]
+    assert sorted(
+        float(value) for value in scope["yield"] if value != "PENDING"
+    ) == [4.0, 5.0]
+
+
+class DroppingEDBOplus(FakeEDBOplus):
+    """Stand-in for an EDBO+ version that only writes back the columns it
+    knows about."""
+
+    def run(self, directory, filename, *args, **kwargs):
+        import pandas as pd
+
+        super().run(directory, filename, *args, **kwargs)
+
+        path = os.path.join(directory, filename)
+        pd.read_csv(path).drop(columns="cyrxnopt_row").to_csv(path, index=False)
+
+
+def test_edbo_output_is_matched_by_scope_key(
+    fake_edbop, small_config, tmp_path, monkeypatch
+):
+    config = dict(small_config, batch_size=2)
+    fake_edbop.set_config(str(tmp_path), config)
+
+    def read_scope(scope_path, config):
+        raise AssertionError("EDBO+ output was parsed again")
+
+    monkeypatch.setattr(fake_edbop, "_read_scope", read_scope)
+
+    first = fake_edbop.predict([], 0, str(tmp_path), config)
+    second = fake_edbop.predict(first, [1.0, 2.0], str(tmp_path), config)
+
+    assert first == [[0.0, "a"], [0.0, "b"]]
+    assert second == [[0.25, "a"], [0.25, "b"]]
+
+
+def test_edbo_output_without_scope_keys_is_parsed(
+    fake_edbop, small_config, tmp_path, monkeypatch
+):
+    import numpy as np
+    import pandas as pd
+
+    config = dict(small_config, batch_size=2)
+    fake_edbop.set_config(str(tmp_path), config)
+
+    def import_deps(self):
+        self._imports = {"EDBOplus": DroppingEDBOplus, "np": np, "pd": pd}
+
+    monkeypatch.setattr(OptimizerEDBOp, "_import_deps", import_deps)
+    read_paths = []
+    read_scope = fake_edbop._read_scope
+    monkeypatch.setattr(
+        fake_edbop,
+        "_read_scope",
+        lambda path, config: read_paths.append(path)
+        or read_scope(path, config),
+    )
+
+    first = fake_edbop.predict([], 0, str(tmp_path), config)
+    second = fake_edbop.predict(first, [1.0, 2.0], str(tmp_path), config)
+    scope = fake_edbop._load_scope(str(tmp_path), config)
+
+    assert first == [[0.0, "a"], [0.0, "b"]]
+    assert second == [[0.25, "a"], [0.25, "b"]]
+    assert sorted(scope["cyrxnopt_row"].tolist()) == sorted(
+        set(scope["cyrxnopt_row"].tolist())
+    )
+    assert len(scope) == 10
+    assert len(read_paths) == 2
+
+
+def test_pareto_front_applies_only_new_results(
+    venv_pandas, fake_edbop, small_config, tmp_path, monkeypatch
+):
+    import cyrxnopt.OptimizerEDBOp as edbop_module
+
+    reads = []
+    read_pareto_front = edbop_module.read_pareto_front
+    monkeypatch.setattr(
+        edbop_module,
+        "read_pareto_front",
+        lambda path, directions: reads.append(path)
+        or read_pareto_front(path, directions),
+    )
+
+    fake_edbop.set_config(str(tmp_path), small_config)
+    first = fake_edbop.predict([], 0, str(tmp_path), small_config)
+    second = fake_edbop.predict(first, 5.0, str(tmp_path), small_config)
+    fake_edbop.predict(second, 7.0, str(tmp_path), small_config)
+
+    assert fake_edbop.get_pareto_front(str(tmp_path), small_config) == [
+        ["0.0", "b", 7.0]
+    ]
+    assert fake_edbop.get_pareto_front(str(tmp_path), small_config) == [
+        ["0.0", "b", 7.0]
+    ]
+    # The session keeps the front rather than reading it for every update
+    assert len(reads) == 1
+
+    # A new session reads the saved front
+    resumed = OptimizerEDBOp(venv_pandas)
+    assert resumed.get_pareto_front(str(tmp_path), small_config) == [
+        ["0.0", "b", 7.0]
+    ]
+    assert len(reads) == 2
+
+
+def test_record_results_takes_over_a_suggestion(
+    fake_edbop, small_config, tmp_path
+):
+    fake_edbop.set_config(str(tmp_path), small_config)
+    first = fake_edbop.predict([], 0, str(tmp_path), small_config)
+
+    # A suggestion predicted elsewhere is given out for the next experiment
+    runs = len(FakeEDBOplus.runs)
+    fake_edbop.record_results(
+        first, 5.0, str(tmp_path), small_config, [0.0, "b"]
+    )
+    assert len(FakeEDBOplus.runs) == runs
+
+    second = fake_edbop.predict([], 0, str(tmp_path), small_config)
+    scope = fake_edbop._load_scope(str(tmp_path), small_config)
+
+    assert first == [0.0, "a"]
+    # The taken over suggestion is pending, so it is not proposed again
+    assert second == [0.25, "a"]
+    assert [float(value) for value in scope["yield"] if value != "PENDING"] == [
+        5.0
+    ]
+
+
+def test_speculate_overlays_the_assumed_result(
+    fake_edbop, small_config, tmp_path
+):
+    fake_edbop.set_config(str(tmp_path), small_config)
+    first = fake_edbop.predict([], 0, str(tmp_path), small_config)
+    files = {
+        path.name: path.read_bytes()
+        for path in tmp_path.iterdir()
+        if path.is_file()
+    }
+
+    prefetched = fake_edbop.speculate(first, 5.0, str(tmp_path), small_config)
+
+    assert first == [0.0, "a"]
+    # EDBO+ saw the pending suggestion with the assumed result
+    assert prefetched == [0.0, "b"]
+    assert FakeEDBOplus.runs[-1] == 10
+    # Nothing was recorded, in the files or in the scope kept in memory
+    assert {
+        path.name: path.read_bytes()
+        for path in tmp_path.iterdir()
+        if path.is_file()
+    } == files
+    scope = fake_edbop._load_scope(str(tmp_path), small_config)
+    assert list(scope["yield"].unique()) == ["PENDING"]
+
+
+def test_replace_suggestion_withdraws_the_late_one(
+    fake_edbop, small_config, tmp_path
+):
+    fake_edbop.set_config(str(tmp_path), small_config)
+    first = fake_edbop.predict([], 0, str(tmp_path), small_config)
+
+    # The prediction missed its deadline and a fallback was given out
+    fake_edbop.replace_suggestion(
+        first, [0.25, "a"], str(tmp_path), small_config
+    )
+    second = fake_edbop.predict([], 0, str(tmp_path), small_config)
+
+    assert first == [0.0, "a"]
+    assert second == [0.0, "a"]
+    assert (tmp_path / "suggestions.csv").read_text().splitlines()[1:] == [
+        "0.25,a",
+        "0.0,a",
+    ]
+
+
+def test_predict_only_hands_edbo_the_columns_it_reads(
+    fake_edbop, small_config, tmp_path
+):
+    fake_edbop.set_config(str(tmp_path), small_config)
+    first = fake_edbop.predict([], 0, str(tmp_path), small_config)
+    fake_edbop.predict(first, 5.0, str(tmp_path), small_config)
+
+    # The priority EDBO+ wrote in the first run is not written back
+    assert FakeEDBOplus.columns == ["f1", "f2", "yield", "cyrxnopt_row"]
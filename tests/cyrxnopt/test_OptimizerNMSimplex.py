@@ -94,3 +94,79 @@ def test_predict_basic_run(venv_nmsimplex, tmp_path, obj_func_2d) -> None:
 
     # We're not verifying the value, since randomness can affect this
     # assert result == [0, 0]
+
+
+def test_predict_snaps_to_resolution(venv_nmsimplex, tmp_path, obj_func_2d):
+    opt = OptimizerNMSimplex(venv_nmsimplex)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.25, 0.25],
+        "direction": "min",
+        "budget": 20,
+        "param_init": [0.5, 0.5],
+        "xatol": 1e-8,
+        "display": False,
+        "server": False,
+    }
+
+    result = opt.predict([], 0, tmp_path, config, obj_func_2d)
+
+    for row in result.raw_results + [list(result.x)]:
+        for value in row[:2]:
+            assert value / 0.25 == pytest.approx(round(value / 0.25))
+    assert isinstance(result.duplicate_suggestions, list)
+
+
+def test_predict_reuses_cached_evaluations(venv_nmsimplex, tmp_path):
+    opt = OptimizerNMSimplex(venv_nmsimplex)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "direction": "min",
+        "budget": 10,
+        "param_init": [0.5, 0.5],
+        "xatol": 1e-8,
+        "display": False,
+        "server": False,
+        "evaluation_cache": True,
+    }
+    calls = []
+
+    def obj_func(xs):
+        calls.append(list(xs))
+        return xs[0] ** 2 + xs[1] ** 2
+
+    opt.predict([], 0, tmp_path, config, obj_func)
+    n_calls = len(calls)
+    opt.predict([], 0, tmp_path, config, obj_func)
+
+    # The second run visits the same points and evaluates none of them
+    assert n_calls > 0
+    assert len(calls) == n_calls
+
+
+def test_predict_writes_each_iteration(venv_nmsimplex, tmp_path):
+    opt = OptimizerNMSimplex(venv_nmsimplex)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "direction": "min",
+        "budget": 10,
+        "param_init": [0.5, 0.5],
+        "xatol": 1e-8,
+        "display": False,
+        "server": False,
+    }
+    written = []
+
+    def obj_func(xs):
+        # Iterations written so far, as a crash would find them
+        results_path = tmp_path / "results.csv"
+        if results_path.exists():
+            written.append(len(results_path.read_text().splitlines()))
+        return xs[0] ** 2 + xs[1] ** 2
+
+    opt.predict([], 0, tmp_path, config, obj_func)
+
+    assert max(written) > 0
@@ -92,3 +92,53 @@ def test_predict_basic_run_min(venv_sqsnobfit, tmp_path, obj_func_2d) -> None:
 
     # We're not verifying the value, since randomness can affect this
     # assert result == [0, 0]
+
+
+def test_predict_snaps_to_resolution(venv_sqsnobfit, tmp_path, obj_func_2d):
+    opt = OptimizerSQSnobFit(venv_sqsnobfit)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "continuous_feature_resolutions": [0.25, 0.25],
+        "direction": "min",
+        "budget": 10,
+        "param_init": [0.5, 0.5],
+        "maxfail": 5,
+        "verbose": False,
+    }
+
+    result = opt.predict([], 0, tmp_path, config, obj_func_2d)
+
+    # History rows hold the result followed by the parameters
+    for row in [list(row[1:]) for row in result.history] + [
+        list(result.optpar)
+    ]:
+        for value in row:
+            assert value / 0.25 == pytest.approx(round(value / 0.25))
+
+
+def test_predict_writes_each_evaluation(venv_sqsnobfit, tmp_path):
+    opt = OptimizerSQSnobFit(venv_sqsnobfit)
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [-1, 1]],
+        "direction": "min",
+        "budget": 10,
+        "param_init": [0.5, 0.5],
+        "maxfail": 5,
+        "verbose": False,
+    }
+    written = []
+
+    def obj_func(xs):
+        # Evaluations written so far, as a crash would find them
+        results_path = tmp_path / "results.csv"
+        written.append(len(results_path.read_text().splitlines()))
+        return xs[0] ** 2 + xs[1] ** 2
+
+    opt.predict([], 0, tmp_path, config, obj_func)
+
+    rows = (tmp_path / "results.csv").read_text().splitlines()
+    assert written == list(range(len(written)))
+    assert len(rows) == len(written)
+    assert all(len(row.split(",")) == 3 for row in rows)
@@ -0,0 +1,302 @@
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt import cli
+from cyrxnopt.OptimizerService import (
+    OptimizerService,
+    ServiceClient,
+    ServiceError,
+    default_address,
+    default_token_path,
+)
+from cyrxnopt.utilities.runtime import workers
+
+
+class CountingOptimizer:
+    """Optimizer suggesting how many optimizers its process loaded, how many
+    times it was called, and its process."""
+
+    created = 0
+
+    def __init__(self):
+        CountingOptimizer.created += 1
+        self.calls = 0
+
+    def set_config(self, experiment_dir, config):
+        pass
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        if config.get("fail"):
+            raise ValueError("prediction failed")
+        self.calls += 1
+
+        return [CountingOptimizer.created, self.calls, os.getpid()]
+
+
+@pytest.fixture
+def counting_optimizer(monkeypatch):
+    CountingOptimizer.created = 0
+    optimizers = {}
+
+    def get_optimizer(name, venv):
+        # Loaded once per process, like an optimizer's modules
+        if name not in optimizers:
+            optimizers[name] = CountingOptimizer()
+
+        return optimizers[name]
+
+    monkeypatch.setattr(controller, "get_optimizer", get_optimizer)
+    # Worker processes only see the fake optimizer when they are forked
+    monkeypatch.setattr(workers, "START_METHODS", ["fork"])
+
+
+@pytest.fixture
+def service_address():
+    # Unix socket paths are limited to about a hundred characters
+    with tempfile.TemporaryDirectory() as directory:
+        yield os.path.join(directory, "service.sock")
+
+
+def start_service(
+    socket_path=None, http_address=None, processes=False, token_path=None
+):
+    service = OptimizerService(max_workers=2, processes=processes)
+    thread = threading.Thread(
+        target=service.serve, args=(socket_path, http_address, token_path)
+    )
+    thread.start()
+
+    return service, thread
+
+
+def wait_until_up(client):
+    for _ in range(200):
+        try:
+            return client.call("ping")
+        except OSError:
+            threading.Event().wait(0.01)
+
+    raise TimeoutError
+
+
+def add_campaign(client, tmp_path, name, **config):
+    (tmp_path / name).mkdir(exist_ok=True)
+    client.call(
+        "add_campaign",
+        name=name,
+        optimizer="counting",
+        venv=None,
+        experiment_dir=str(tmp_path / name),
+        config=dict(config, experiment_store=False),
+    )
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_optimizers_stay_loaded_between_calls(
+    counting_optimizer, tmp_path, service_address, processes
+):
+    service, thread = start_service(service_address, processes=processes)
+    try:
+        with ServiceClient(service_address) as client:
+            assert wait_until_up(client) == "pong"
+            add_campaign(client, tmp_path, "a")
+            client.call("set_config", campaign="a")
+
+            suggestions = [
+                client.call(
+                    "predict", campaign="a", prev_param=[1], yield_value=i
+                )
+                for i in range(3)
+            ]
+    finally:
+        service.shutdown()
+        thread.join()
+
+    assert [s[:2] for s in suggestions] == [[1, 1], [1, 2], [1, 3]]
+    assert (suggestions[0][2] != os.getpid()) == processes
+    assert not os.path.exists(service_address)
+
+
+def test_socket_is_only_for_the_owner(service_address):
+    service, thread = start_service(service_address)
+    try:
+        with ServiceClient(service_address) as client:
+            wait_until_up(client)
+
+        assert os.stat(service_address).st_mode & 0o777 == 0o600
+    finally:
+        service.shutdown()
+        thread.join()
+
+
+def test_default_socket_is_in_a_private_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv("CYRXNOPT_SERVICE", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    directory = os.path.dirname(default_address())
+
+    assert os.path.dirname(directory) == str(tmp_path)
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    assert os.path.dirname(default_token_path()) == directory
+
+    # A directory others can reach is not used
+    os.chmod(directory, 0o755)
+    with pytest.raises(RuntimeError, match="only the current user"):
+        default_address()
+
+
+def test_connections_are_reused(counting_optimizer, tmp_path, service_address):
+    service, thread = start_service(service_address)
+    try:
+        with ServiceClient(service_address, pool_size=1) as client:
+            wait_until_up(client)
+            connection = client._pool.get_nowait()
+            client._pool.put_nowait(connection)
+
+            for _ in range(5):
+                client.call("ping")
+
+            assert client._pool.get_nowait() is connection
+    finally:
+        service.shutdown()
+        thread.join()
+
+
+def test_errors_are_reported(counting_optimizer, tmp_path, service_address):
+    service, thread = start_service(service_address)
+    try:
+        with ServiceClient(service_address) as client:
+            wait_until_up(client)
+            add_campaign(client, tmp_path, "a", fail=True)
+
+            # Registering the same campaign again is allowed
+            add_campaign(client, tmp_path, "a", fail=True)
+            with pytest.raises(ServiceError, match="different campaign"):
+                add_campaign(client, tmp_path, "a")
+
+            with pytest.raises(ServiceError, match="ValueError: prediction"):
+                client.call(
+                    "predict", campaign="a", prev_param=[1], yield_value=1
+                )
+            with pytest.raises(ServiceError, match="Unknown method"):
+                client.call("optimize")
+
+            stats = client.call("stats")
+            assert stats["campaigns"]["a"]["failed"] == 1
+    finally:
+        service.shutdown()
+        thread.join()
+
+
+@pytest.fixture
+def http_service(tmp_path):
+    probe = socket.socket()
+    probe.bind(("127.0.0.1", 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    token_path = str(tmp_path / "service.token")
+    service, thread = start_service(
+        http_address=("127.0.0.1", port), token_path=token_path
+    )
+    address = "http://127.0.0.1:{}".format(port)
+    try:
+        with ServiceClient(address, token_path=token_path) as client:
+            # Fails like a refused connection until the token is written
+            wait_until_up(client)
+
+            yield client, port, token_path
+    finally:
+        service.shutdown()
+        thread.join()
+
+    assert not os.path.exists(token_path)
+
+
+def test_http(counting_optimizer, tmp_path, http_service):
+    client, _, token_path = http_service
+    add_campaign(client, tmp_path, "a")
+
+    assert client.call("predict", campaign="a", prev_param=[1], yield_value=1)[
+        :2
+    ] == [1, 1]
+    assert os.stat(token_path).st_mode & 0o777 == 0o600
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        ({"Content-Type": "text/plain"}, 415),
+        ({"Host": "attacker.example:80"}, 403),
+        ({"Origin": "http://localhost"}, 403),
+        ({"Authorization": "Bearer wrong"}, 403),
+        ({"Authorization": None}, 403),
+    ],
+)
+def test_http_refuses_requests_web_pages_can_make(
+    http_service, headers, status
+):
+    _, port, token_path = http_service
+    with open(token_path) as fin:
+        token = fin.read().strip()
+
+    sent = {
+        "Content-Type": "application/json",
+        "Authorization": "Bearer " + token,
+    }
+    sent.update(headers)
+    sent = {name: value for name, value in sent.items() if value is not None}
+
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request("POST", "/", b'{"method": "ping"}', sent)
+        response = connection.getresponse()
+        body = json.loads(response.read())
+    finally:
+        connection.close()
+
+    assert response.status == status
+    assert "result" not in body
+
+
+def test_cli(counting_optimizer, tmp_path, service_address, capsys):
+    service, thread = start_service(service_address)
+    try:
+        with ServiceClient(service_address) as client:
+            wait_until_up(client)
+
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"experiment_store": False}))
+        (tmp_path / "a").mkdir()
+        address = ["--address", service_address]
+
+        assert (
+            cli.main(
+                address
+                + ["add-campaign", "a", "--optimizer", "counting"]
+                + ["--experiment-dir", str(tmp_path / "a")]
+                + ["--config", str(config_file)]
+            )
+            == 0
+        )
+        args = ["--prev-param", "[1]", "--yield-value", "0.5"]
+        assert cli.main(address + ["predict", "a"] + args) == 0
+        assert json.loads(capsys.readouterr().out)[:2] == [1, 1]
+
+        assert cli.main(address + ["predict", "b"] + args) == 1
+        assert "no campaign named b" in capsys.readouterr().err
+
+        assert cli.main(address + ["shutdown"]) == 0
+        thread.join(10)
+        assert not thread.is_alive()
+    finally:
+        service.shutdown()
+        thread.join()
@@ -0,0 +1,61 @@
+import pytest
+
+from cyrxnopt.utilities.config.candidate_pool import sample_candidate_pool
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[0, 99], [0, 99]],
+        "continuous_feature_resolutions": [1, 1],
+        "categorical_feature_names": [],
+        "categorical_feature_values": [],
+        "budget": 10,
+        "direction": "min",
+    }
+
+
+@pytest.fixture
+def indices(venv_pandas):
+    import numpy as np
+
+    return np.stack(np.unravel_index(np.arange(100 * 100), (100, 100)), axis=1)
+
+
+def test_sample_candidate_pool_small_scope_keeps_all(indices, config):
+    import numpy as np
+
+    eligible = np.zeros(len(indices), dtype=bool)
+    eligible[:10] = True
+    observed = np.zeros(len(indices), dtype=bool)
+
+    pool = sample_candidate_pool(
+        indices, eligible, observed, None, config, 20, np.random.default_rng(0)
+    )
+
+    assert pool.tolist() == list(range(10))
+
+
+def test_sample_candidate_pool_includes_best_neighbourhood(indices, config):
+    import numpy as np
+
+    best = 50 * 100 + 50
+    observed = np.zeros(len(indices), dtype=bool)
+    observed[best] = True
+
+    pool = sample_candidate_pool(
+        indices,
+        ~observed,
+        observed,
+        best,
+        config,
+        100,
+        np.random.default_rng(0),
+    )
+
+    assert len(pool) <= 100
+    assert not observed[pool].any()
+    # The four nearest neighbours of the best row are always in the pool
+    for neighbour in [best - 100, best - 1, best + 1, best + 100]:
+        assert neighbour in pool
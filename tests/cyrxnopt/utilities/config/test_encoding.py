@@ -0,0 +1,110 @@
+import pytest
+
+from cyrxnopt.utilities.config.encoding import (
+    code_dtype,
+    decode_candidates,
+    encode_candidates,
+)
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [0, 1000]],
+        "continuous_feature_resolutions": [0.1, 1],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+        "budget": 10,
+        "direction": "min",
+    }
+
+
+@pytest.fixture
+def candidates(venv_pandas):
+    import pandas as pd
+
+    return pd.DataFrame(
+        {
+            "f1": [-1.0, 0.30000000000000004, 1.0],
+            "f2": [0.0, 500.0, 1000.0],
+            "f3": ["c", "a", "b"],
+            "yield": ["PENDING", 1.5, "PENDING"],
+        }
+    )
+
+
+def test_code_dtype(venv_pandas):
+    import numpy as np
+
+    assert code_dtype(1) == np.uint8
+    assert code_dtype(256) == np.uint8
+    assert code_dtype(257) == np.uint16
+
+
+def test_encode_candidates_compact_codes(candidates, config):
+    import numpy as np
+
+    encoded = encode_candidates(candidates, config)
+
+    assert encoded["f1"].dtype == np.uint8
+    assert encoded["f2"].dtype == np.uint16
+    assert encoded["f3"].dtype == "category"
+    assert encoded["f1"].tolist() == [0, 13, 20]
+    assert encoded["f2"].tolist() == [0, 500, 1000]
+    assert encoded["f3"].cat.codes.tolist() == [2, 0, 1]
+
+    # Non-feature columns are untouched
+    assert encoded["yield"].tolist() == candidates["yield"].tolist()
+
+
+def test_encode_candidates_matches_levels_by_string(venv_pandas):
+    import pandas as pd
+
+    config = {
+        "categorical_feature_names": ["f1"],
+        "categorical_feature_values": [[0, 1, 2]],
+    }
+    candidates = pd.DataFrame({"f1": ["2", "0"]})
+
+    encoded = encode_candidates(candidates, config)
+
+    assert encoded["f1"].tolist() == [2, 0]
+
+
+def test_encode_candidates_invalid_values(candidates, config):
+    bad_level = candidates.copy()
+    bad_level.loc[0, "f3"] = "d"
+
+    with pytest.raises(ValueError):
+        encode_candidates(bad_level, config)
+
+    below_bound = candidates.copy()
+    below_bound.loc[0, "f1"] = -2.0
+
+    with pytest.raises(ValueError):
+        encode_candidates(below_bound, config)
+
+
+def test_decode_candidates_round_trip(candidates, config):
+    decoded = decode_candidates(encode_candidates(candidates, config), config)
+
+    assert decoded["f1"].tolist() == [-1.0, 0.3, 1.0]
+    assert decoded["f2"].tolist() == candidates["f2"].tolist()
+    assert decoded["f3"].tolist() == candidates["f3"].tolist()
+    assert decoded["yield"].tolist() == candidates["yield"].tolist()
+
+
+def test_decode_candidates_fine_resolution(venv_pandas):
+    import pandas as pd
+
+    config = {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 0.001]],
+        "continuous_feature_resolutions": [0.00001],
+    }
+    candidates = pd.DataFrame({"f1": [0.00002, 0.00001, 0.0]})
+
+    decoded = decode_candidates(encode_candidates(candidates, config), config)
+
+    assert decoded["f1"].tolist() == [0.00002, 0.00001, 0.0]
@@ -0,0 +1,115 @@
+import pytest
+
+from cyrxnopt.utilities.config.feature_space import FeatureSpace, feature_space
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[0, 1], [-5, 5]],
+        "continuous_feature_resolutions": [0.1, 5],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+        "budget": 10,
+        "direction": "min",
+    }
+
+
+def test_feature_space_arrays(venv_pandas, config):
+    space = feature_space(config)
+
+    assert space.names == ["f1", "f2", "f3"]
+    assert space.shape == (11, 3, 3)
+    assert space.step_counts.tolist() == [11, 3]
+    assert space.lower.tolist() == [0, -5]
+
+
+def test_feature_space_is_cached_and_immutable(venv_pandas, config):
+    space = feature_space(config)
+
+    assert feature_space(dict(config, budget=20)) is space
+    with pytest.raises(AttributeError):
+        space.shape = (1,)
+    with pytest.raises(ValueError):
+        space.lower[0] = 1
+
+
+def test_encode_decode(venv_pandas, config):
+    space = feature_space(config)
+
+    indices = space.encode([[0.30000000000000004, 0, "b"], ["1.0", "5", "c"]])
+
+    assert indices.tolist() == [[3, 1, 1], [10, 2, 2]]
+    assert space.decode(indices) == [[0.3, 0.0, "b"], [1.0, 5.0, "c"]]
+    assert space.keys(indices).tolist() == [3 * 9 + 1 * 3 + 1, 98]
+
+
+def test_encode_unknown_level(venv_pandas, config):
+    space = feature_space(config)
+
+    with pytest.raises(ValueError):
+        space.encode([[0, 0, "d"]])
+
+    assert space.encode([[0, 0, "d"]], strict=False).tolist() == [[0, 1, -1]]
+
+
+def test_snap(venv_pandas, config):
+    space = feature_space(config)
+
+    snapped = space.snap([[0.34, 1.0], [1.3, -9.0]])
+
+    assert snapped.tolist() == [[0.3, 0.0], [1.0, -5.0]]
+
+
+def test_fine_resolution(venv_pandas):
+    space = feature_space(
+        {
+            "continuous_feature_names": ["f1", "f2"],
+            "continuous_feature_bounds": [[0, 0.001], [0, 1]],
+            "continuous_feature_resolutions": [0.00001, 0.1],
+        }
+    )
+
+    assert space.decimals == (5, 4)
+    assert space.decode([[1, 3], [2, 3]]) == [[0.00001, 0.3], [0.00002, 0.3]]
+    assert space.snap([[0.0000134, 0.34]]).tolist() == [[0.00001, 0.3]]
+
+
+def test_validate(venv_pandas, config):
+    space = feature_space(config)
+
+    valid = space.validate([[0.5, 0, "a"], [1.5, 0, "a"], [0.5, 0, "x"]])
+
+    assert valid.tolist() == [True, False, False]
+
+
+def test_no_resolutions(venv_pandas):
+    space = FeatureSpace(
+        {
+            "continuous_feature_names": ["x"],
+            "continuous_feature_bounds": [[-1, 1]],
+        }
+    )
+
+    assert not space.quantized
+    assert space.snap([[2.0], [0.123]]).tolist() == [[1.0], [0.123]]
+
+
+def test_invalid_config(venv_pandas):
+    with pytest.raises(RuntimeError):
+        FeatureSpace(
+            {
+                "continuous_feature_names": ["x"],
+                "continuous_feature_bounds": [[1, -1]],
+            }
+        )
+
+    with pytest.raises(RuntimeError):
+        FeatureSpace(
+            {
+                "continuous_feature_names": ["x"],
+                "continuous_feature_bounds": [[-1, 1]],
+                "continuous_feature_resolutions": [0],
+            }
+        )
@@ -0,0 +1,170 @@
+import pytest
+
+from cyrxnopt.utilities.config.grid import (
+    coarse_grid_axes,
+    coarse_grid_strides,
+    continuous_step_counts,
+    encoded_grid_bytes,
+    grid_decimals,
+    grid_indices_to_values,
+    grid_shape,
+    grid_size,
+    iter_grid_chunks,
+    trust_region_axes,
+)
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [0, 0.3]],
+        "continuous_feature_resolutions": [0.5, 0.1],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+        "budget": 10,
+        "direction": "min",
+    }
+
+
+def test_continuous_step_counts_includes_upper_bound(config):
+    # 0.3 / 0.1 is slightly less than 3 in floating point
+    assert continuous_step_counts(config) == [5, 4]
+
+
+def test_continuous_step_counts_excludes_partial_step():
+    config = {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 1]],
+        "continuous_feature_resolutions": [0.3],
+    }
+
+    assert continuous_step_counts(config) == [4]
+
+
+def test_grid_shape_and_size(config):
+    assert grid_shape(config) == (5, 4, 3)
+    assert grid_size(config) == 60
+
+
+def test_grid_size_categorical_only():
+    config = {
+        "categorical_feature_names": ["f1", "f2"],
+        "categorical_feature_values": [["a", "b"], [1, 2, 3]],
+    }
+
+    assert grid_size(config) == 6
+
+
+def test_encoded_grid_bytes(config):
+    # 60 rows, 2 continuous + 3 one-hot + 2 extra columns of 8 bytes
+    assert encoded_grid_bytes(config, 2) == 60 * 7 * 8
+
+
+def test_iter_grid_chunks_bounded_and_complete(venv_pandas, config):
+    import numpy as np
+
+    chunks = list(iter_grid_chunks(config, 7))
+
+    assert all(len(chunk) <= 7 for chunk in chunks)
+
+    grid = np.concatenate(chunks)
+    assert grid.shape == (60, 3)
+    assert len(np.unique(grid, axis=0)) == 60
+    assert grid.max(axis=0).tolist() == [4, 3, 2]
+
+
+def test_iter_grid_chunks_invalid_chunk_size(venv_pandas, config):
+    with pytest.raises(ValueError):
+        next(iter_grid_chunks(config, 0))
+
+
+def test_grid_indices_to_values(venv_pandas, config):
+    import numpy as np
+
+    indices = np.array([[0, 0, 0], [3, 3, 2]])
+
+    values = grid_indices_to_values(indices, config)
+
+    assert values.tolist() == [[-1.0, 0.0, 0.0], [0.5, 0.3, 2.0]]
+
+
+def test_grid_decimals():
+    assert grid_decimals(0, 1) == 4
+    assert grid_decimals(-1, 0.5) == 4
+    assert grid_decimals(0, 0.00001) == 5
+    assert grid_decimals(0.125, 0.1) == 4
+    assert grid_decimals(1e-7, 0.5) == 7
+    assert grid_decimals(0, 1e-20) == 15
+
+
+def test_grid_indices_to_values_fine_resolution(venv_pandas):
+    import numpy as np
+
+    config = {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 0.001]],
+        "continuous_feature_resolutions": [0.00001],
+    }
+
+    values = grid_indices_to_values(np.array([[0], [1], [2]]), config)
+
+    assert values[:, 0].tolist() == [0.0, 0.00001, 0.00002]
+
+
+def test_iter_grid_chunks_with_axes(venv_pandas, config):
+    import numpy as np
+
+    axes = [np.array([0, 4]), np.array([1]), np.array([0, 2])]
+
+    grid = np.concatenate(list(iter_grid_chunks(config, 3, axes)))
+
+    assert grid.tolist() == [[0, 1, 0], [0, 1, 2], [4, 1, 0], [4, 1, 2]]
+
+
+def test_coarse_grid_axes_includes_bounds(venv_pandas):
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[0, 1], [0, 1]],
+        "continuous_feature_resolutions": [0.01, 0.5],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+    }
+
+    assert coarse_grid_strides(config, 5) == [25, 1]
+
+    axes = coarse_grid_axes(config, 5)
+
+    assert axes[0].tolist() == [0, 25, 50, 75, 100]
+    assert axes[1].tolist() == [0, 1, 2]
+    assert axes[2].tolist() == [0, 1, 2]
+
+
+def test_trust_region_axes_size_independent_of_resolution(venv_pandas):
+    sizes = []
+    for resolution in [0.01, 0.0001]:
+        config = {
+            "continuous_feature_names": ["f1"],
+            "continuous_feature_bounds": [[0, 1]],
+            "continuous_feature_resolutions": [resolution],
+            "categorical_feature_names": ["f2"],
+            "categorical_feature_values": [["a", "b"]],
+        }
+        center = [continuous_step_counts(config)[0] // 2, 1]
+        half_widths = coarse_grid_strides(config, 5)
+
+        axes = trust_region_axes(center, config, half_widths, 5)
+
+        # Categorical features keep the level of the center
+        assert axes[1].tolist() == [1]
+        sizes.append(len(axes[0]))
+
+    assert sizes == [11, 11]
+
+
+def test_trust_region_axes_clipped_to_bounds(venv_pandas, config):
+    axes = trust_region_axes([0, 3, 1], config, [2, 2], 2)
+
+    assert axes[0].tolist() == [0, 1, 2]
+    assert axes[1].tolist() == [1, 2, 3]
+    assert axes[2].tolist() == [1]
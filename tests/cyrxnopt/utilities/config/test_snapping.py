@@ -0,0 +1,51 @@
+import pytest
+
+from cyrxnopt.utilities.config.snapping import (
+    SnappedObjective,
+    snap_conditions,
+    snapped_objective,
+)
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [0, 10]],
+        "continuous_feature_resolutions": [0.1, 1],
+    }
+
+
+def test_snap_conditions_reports_duplicates(venv_pandas, config):
+    snapped, duplicates = snap_conditions(
+        [[0.12, 3.4], [0.08, 2.6], [5.0, -1.0]], config
+    )
+
+    assert snapped.tolist() == [[0.1, 3.0], [0.1, 3.0], [1.0, 0.0]]
+    assert duplicates.tolist() == [False, True, False]
+
+
+def test_snapped_objective_reuses_results(venv_pandas, config):
+    calls = []
+
+    def obj_func(x):
+        calls.append(x.tolist())
+        return float(sum(x))
+
+    objective = SnappedObjective(obj_func, config)
+
+    assert objective([0.12, 3.4]) == pytest.approx(3.1)
+    assert objective([0.09, 2.9]) == pytest.approx(3.1)
+
+    assert calls == [[0.1, 3.0]]
+    assert objective.duplicates == [[0.1, 3.0]]
+
+
+def test_snapped_objective_without_resolutions(config):
+    def obj_func(x):
+        return 0.0
+
+    del config["continuous_feature_resolutions"]
+
+    assert snapped_objective(obj_func, config) is obj_func
+    assert snapped_objective(None, config) is None
@@ -0,0 +1,61 @@
+from cyrxnopt.utilities.config.space_filling import space_filling_conditions
+
+
+def test_conditions_are_on_the_grid(venv_pandas):
+    config = {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 1]],
+        "continuous_feature_resolutions": [0.25],
+        "categorical_feature_names": ["c"],
+        "categorical_feature_values": [["a", "b"]],
+    }
+
+    conditions = space_filling_conditions(config, n=4, seed=0)
+
+    assert len(conditions) == 4
+    for value, level in conditions:
+        assert value in [0.0, 0.25, 0.5, 0.75, 1.0]
+        assert level in ["a", "b"]
+
+
+def test_conditions_avoid_observations(venv_pandas):
+    config = {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[0, 10], [0, 10]],
+    }
+
+    (first,) = space_filling_conditions(
+        config, observed=[[0, 0], [0, 10], [10, 0]], seed=0
+    )
+
+    assert first[0] > 5 and first[1] > 5
+
+    picked = space_filling_conditions(config, n=2, seed=0)
+
+    # The second point is picked away from the first
+    assert (
+        abs(picked[0][0] - picked[1][0]) + abs(picked[0][1] - picked[1][1]) > 5
+    )
+
+
+def test_categorical_only(venv_pandas):
+    config = {
+        "categorical_feature_names": ["c"],
+        "categorical_feature_values": [["a", "b"]],
+    }
+
+    (conditions,) = space_filling_conditions(config, observed=[["a"]], seed=0)
+
+    assert conditions == ["b"]
+
+
+def test_conditions_keep_fine_values(venv_pandas):
+    config = {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 0.001]],
+    }
+
+    conditions = space_filling_conditions(config, n=8, seed=0)
+
+    # Values are not rounded to a coarser precision than the space has
+    assert len({value for value, in conditions}) == 8
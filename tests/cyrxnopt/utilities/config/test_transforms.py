@@ -0,0 +1,29 @@
+import copy
+import pickle
+
+import pytest
+
+from cyrxnopt.utilities.config.transforms import read_only, use_subkeys
+
+
+def test_read_only_config_is_shared_without_copies():
+    config = read_only(
+        use_subkeys(
+            {
+                "continuous_feature_names": ["f1"],
+                "continuous_feature_bounds": [[0, 1]],
+            }
+        )
+    )
+
+    assert config["continuous"]["bounds"] == ((0, 1),)
+    with pytest.raises(TypeError):
+        config["budget"] = 10
+    with pytest.raises(TypeError):
+        config["continuous"].pop("bounds")
+
+    # Copies can be modified, and pickling keeps the view read-only
+    modified = copy.deepcopy(config)
+    modified["continuous"]["bounds"].append([2, 3])
+    assert config["continuous"]["bounds"] == ((0, 1),)
+    assert pickle.loads(pickle.dumps(config)) == config
@@ -0,0 +1,93 @@
+import pytest
+
+from cyrxnopt.utilities.experiment.evaluation_cache import (
+    EvaluationCache,
+    open_evaluation_cache,
+)
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[0, 1], [0, 10]],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b"]],
+    }
+
+
+def test_cache_is_shared_through_the_store(venv_pandas, tmp_path, config):
+    with EvaluationCache(str(tmp_path), config) as cache:
+        assert cache.get([0.5, 5, "a"]) is None
+        cache.put([0.5, 5, "a"], 1.5)
+
+    with EvaluationCache(str(tmp_path), config) as cache:
+        assert cache.get(["0.5", "5.0", "a"]) == 1.5
+        assert cache.get([0.5, 5, "b"]) is None
+
+
+def test_quantized_keys(venv_pandas, tmp_path, config):
+    config["continuous_feature_resolutions"] = [0.1, 1]
+
+    with EvaluationCache(str(tmp_path), config) as cache:
+        cache.put([0.30000000000000004, 2, "a"], 2.0)
+
+        assert cache.get([0.3, 2, "a"]) == 2.0
+
+
+def test_changed_resolution_does_not_reuse_other_points(venv_pandas, tmp_path):
+    config = {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[0, 10]],
+        "continuous_feature_resolutions": [1],
+    }
+
+    with EvaluationCache(str(tmp_path), config) as cache:
+        cache.put([4.0], 123.0)
+
+    # The same experiment directory with a finer grid
+    config["continuous_feature_resolutions"] = [0.5]
+    with EvaluationCache(str(tmp_path), config) as cache:
+        # Grid index 4 is 2.0 here, which was never evaluated
+        assert cache.get([2.0]) is None
+        assert cache.get([4.0]) == 123.0
+
+
+def test_memory_tier_is_bounded(venv_pandas, tmp_path, config):
+    with EvaluationCache(str(tmp_path), config, memory_size=1) as cache:
+        cache.put([0.1, 1, "a"], 1.0)
+        cache.put([0.2, 2, "a"], 2.0)
+
+        assert len(cache._memory) == 1
+        # Evicted results are still found in the store
+        assert cache.get([0.1, 1, "a"]) == 1.0
+
+
+def test_tolerance(venv_pandas, tmp_path, config):
+    with EvaluationCache(str(tmp_path), config, tolerance=0.05) as cache:
+        cache.put([0.5, 5, "a"], 1.0)
+
+        assert cache.get([0.51, 5.1, "a"]) == 1.0
+        assert cache.get([0.6, 5, "a"]) is None
+        assert cache.get([0.5, 5, "b"]) is None
+
+
+def test_wrap_skips_evaluated_points(venv_pandas, tmp_path, config):
+    calls = []
+
+    def obj_func(x):
+        calls.append(list(x))
+        return float(x[0])
+
+    with EvaluationCache(str(tmp_path), config) as cache:
+        objective = cache.wrap(obj_func)
+        objective([0.5, 5, "a"])
+        objective([0.5, 5, "a"])
+
+        assert calls == [[0.5, 5, "a"]]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_open_evaluation_cache_disabled(tmp_path, config):
+    with open_evaluation_cache(str(tmp_path), config) as cache:
+        assert cache is None
@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+from cyrxnopt.utilities.experiment.experiment_store import (
+    ExperimentStore,
+    condition_key,
+)
+
+
+def test_condition_key_matches_text_and_numbers():
+    assert condition_key([0.5, "a", 2]) == condition_key(["0.5", "a", "2.0"])
+    assert condition_key([0.5, "a"]) != condition_key([0.5, "b"])
+
+
+def test_config(tmp_path):
+    with ExperimentStore(str(tmp_path)) as store:
+        assert store.get_config("edbop") is None
+
+        store.add_config("edbop", {"budget": 10})
+        store.add_config("edbop", {"budget": 20})
+
+        assert store.get_config("edbop") == {"budget": 20}
+        assert store.get_config("amlro") is None
+
+
+def test_suggestions_and_observations(tmp_path):
+    with ExperimentStore(str(tmp_path)) as store:
+        store.add_suggestions("edbop", [[0.1, "a"], [0.2, "b"]])
+        store.add_observations("edbop", [(["0.1", "a"], 1.5)])
+
+        assert store.suggestions("edbop") == [[0.1, "a"], [0.2, "b"]]
+        assert store.observations("edbop") == [(["0.1", "a"], 1.5)]
+        assert store.observations("amlro") == []
+
+
+def test_new_campaign_keeps_earlier_records(tmp_path):
+    with ExperimentStore(str(tmp_path)) as store:
+        first = store.add_config("edbop", {"budget": 10})
+        store.add_suggestions("edbop", [[0.1]])
+        store.add_observations("edbop", [([0.1], [1.0, 2.0])])
+        store.add_timing("edbop", "predict", 1.0, 0.5)
+        state = store.dataset_state("edbop")
+
+        second = store.add_config("edbop", {"budget": 20})
+
+        assert store.campaign("edbop") == second
+        assert store.suggestions("edbop") == []
+        assert store.observations("edbop") == []
+        assert store.dataset_state("edbop") != state
+        assert store.suggestions("edbop", first) == [[0.1]]
+        assert store.observations("edbop", first) == [([0.1], [1.0, 2.0])]
+        assert store.timings("edbop", "predict") == [("predict", 1.0, 0.5)]
+
+
+def test_timings_record_resources(tmp_path):
+    budget = {"requested": {"threads": 1}, "applied": {"joblib_n_jobs": 1}}
+
+    with ExperimentStore(str(tmp_path)) as store:
+        store.add_timing("edbop", "set_config", 1.0, 0.5)
+        store.add_timing("edbop", "predict", 1.0, 0.5, budget)
+
+        assert store.resources("edbop") == [
+            ("set_config", None),
+            ("predict", budget),
+        ]
+        assert store.resources("edbop", "predict") == [("predict", budget)]
+
+
+def test_schema_is_only_created_with_the_database(tmp_path):
+    path = str(tmp_path / "experiment.sqlite")
+
+    ExperimentStore(str(tmp_path)).close()
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("DROP TABLE timings")
+    connection.close()
+
+    # An existing database is used as it is
+    with ExperimentStore(str(tmp_path)) as store:
+        with pytest.raises(sqlite3.OperationalError):
+            store.add_timing("edbop", "predict", 1.0, 0.5)
+
+    # A database whose creation was interrupted is completed
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA user_version = 0")
+    connection.close()
+
+    with ExperimentStore(str(tmp_path)) as store:
+        store.add_timing("edbop", "predict", 1.0, 0.5)
+        assert store.timings("edbop") == [("predict", 1.0, 0.5)]
+
+
+def test_reader_sees_writes(tmp_path):
+    writer = ExperimentStore(str(tmp_path))
+    reader = ExperimentStore(str(tmp_path), read_only=True)
+
+    writer.add_observations("nmsimplex", [([1.0, 2.0], 3.0)])
+
+    assert reader.observations("nmsimplex") == [([1.0, 2.0], 3.0)]
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add_timing("nmsimplex", "predict", 1.0, 1.0)
+
+    reader.close()
+    writer.close()
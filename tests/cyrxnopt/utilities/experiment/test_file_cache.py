@@ -0,0 +1,87 @@
+import os
+
+from cyrxnopt.utilities.experiment.file_cache import AppendOnlyFileCache
+
+
+def test_refresh_missing_file(tmp_path):
+    cache = AppendOnlyFileCache(str(tmp_path / "missing.txt"))
+
+    assert not cache.refresh()
+    assert cache.lines == []
+
+
+def test_append_updates_lines(tmp_path):
+    path = tmp_path / "lines.txt"
+    cache = AppendOnlyFileCache(str(path))
+
+    cache.append(["a", "b"])
+    cache.append(["c"])
+
+    assert cache.lines == ["a", "b", "c"]
+    assert path.read_text() == "a\nb\nc\n"
+
+
+def test_refresh_reads_only_new_lines(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("a\nb\n")
+    cache = AppendOnlyFileCache(str(path))
+    cache.refresh()
+
+    with open(path, "a") as fout:
+        fout.write("c\n")
+
+    assert not cache.refresh()
+    assert cache.lines == ["a", "b", "c"]
+
+
+def test_refresh_skips_partial_line(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("a\nb")
+    cache = AppendOnlyFileCache(str(path))
+    cache.refresh()
+
+    assert cache.lines == ["a"]
+
+    with open(path, "a") as fout:
+        fout.write("c\n")
+    cache.refresh()
+
+    assert cache.lines == ["a", "bc"]
+
+
+def test_refresh_reloads_rewritten_file(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("a\nb\n")
+    cache = AppendOnlyFileCache(str(path))
+    cache.refresh()
+
+    # Longer than before, so only the content shows it was rewritten
+    path.write_text("x\ny\nz\n")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    assert cache.refresh()
+    assert cache.lines == ["x", "y", "z"]
+
+
+def test_refresh_reloads_truncated_file(tmp_path):
+    path = tmp_path / "lines.txt"
+    path.write_text("a\nb\n")
+    cache = AppendOnlyFileCache(str(path))
+    cache.refresh()
+
+    path.write_text("c\n")
+
+    assert cache.refresh()
+    assert cache.lines == ["c"]
+
+
+def test_truncate(tmp_path):
+    path = tmp_path / "lines.txt"
+    cache = AppendOnlyFileCache(str(path))
+    cache.append(["a"])
+
+    cache.truncate()
+
+    assert cache.lines == []
+    assert path.read_text() == ""
@@ -0,0 +1,195 @@
+import threading
+import time
+
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt.utilities.experiment.experiment_store import ExperimentStore
+from cyrxnopt.utilities.experiment.idempotency import (
+    IdempotentRequest,
+    request_fingerprint,
+)
+
+
+class CountingOptimizer:
+    """Optimizer suggesting how many predictions it ran."""
+
+    calls = 0
+
+    def set_config(self, experiment_dir, config):
+        pass
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        CountingOptimizer.calls += 1
+
+        return [[CountingOptimizer.calls, "a"]]
+
+
+@pytest.fixture(autouse=True)
+def counting_optimizer(monkeypatch):
+    CountingOptimizer.calls = 0
+    monkeypatch.setattr(
+        controller, "get_optimizer", lambda name, venv: CountingOptimizer()
+    )
+
+
+def run(experiment_dir, key, prev_param, yield_value, **config):
+    """Runs a prediction through the controller with an idempotency key."""
+
+    return controller.predict(
+        "edbop",
+        None,
+        prev_param,
+        yield_value,
+        str(experiment_dir),
+        dict({"budget": 10, "experiment_store": True}, **config),
+        idempotency_key=key,
+    )
+
+
+def test_fingerprint_depends_on_arguments():
+    fingerprint = request_fingerprint("EDBOp", [0.1, "a"], 1.0, {"x": 1})
+
+    assert fingerprint == request_fingerprint(
+        "edbop", [0.1, "a"], 1.0, {"x": 1}
+    )
+    assert fingerprint != request_fingerprint(
+        "edbop", [0.1, "a"], 2.0, {"x": 1}
+    )
+    assert fingerprint != request_fingerprint(
+        "edbop", [0.1, "a"], 1.0, {"x": 2}
+    )
+
+
+def test_retry_replays_without_recording(tmp_path):
+    first = run(tmp_path, "k1", [0.1, "a"], 1.0)
+    retry = run(tmp_path, "k1", [0.1, "a"], 1.0)
+
+    assert retry == first
+    assert CountingOptimizer.calls == 1
+    with ExperimentStore(str(tmp_path)) as store:
+        assert len(store.observations("edbop")) == 1
+    with ExperimentStore(str(tmp_path)) as store:
+        assert len(store.observations("edbop")) == 1
+
+
+def test_new_key_runs_again(tmp_path):
+    run(tmp_path, "k1", [0.1, "a"], 1.0)
+    second = run(tmp_path, "k2", [0.2, "a"], 2.0)
+
+    assert second == [[2, "a"]]
+    assert CountingOptimizer.calls == 2
+
+
+def test_key_reused_for_other_request(tmp_path):
+    run(tmp_path, "k1", [0.1, "a"], 1.0)
+
+    with pytest.raises(RuntimeError, match="different request"):
+        run(tmp_path, "k1", [0.2, "a"], 1.0)
+
+
+def test_key_reused_after_dataset_changed(tmp_path):
+    run(tmp_path, "k1", [0.1, "a"], 1.0)
+    run(tmp_path, "k2", [0.2, "a"], 2.0)
+
+    with pytest.raises(RuntimeError, match="recorded since"):
+        run(tmp_path, "k1", [0.1, "a"], 1.0)
+
+
+def test_key_reused_after_new_campaign(tmp_path):
+    run(tmp_path, "k1", [], 0)
+    controller.set_config(
+        "edbop", None, {"budget": 10, "experiment_store": True}, str(tmp_path)
+    )
+
+    with pytest.raises(RuntimeError, match="recorded since"):
+        run(tmp_path, "k1", [], 0)
+
+
+def test_key_needs_the_experiment_store(tmp_path):
+    with pytest.raises(RuntimeError, match="experiment store"):
+        run(tmp_path, "k1", [0.1, "a"], 1.0, experiment_store=False)
+
+    assert CountingOptimizer.calls == 0
+
+
+def test_failed_request_can_be_retried(tmp_path):
+    fingerprint = request_fingerprint("edbop", [0.1], 1.0, {})
+
+    with pytest.raises(ValueError):
+        with IdempotentRequest(str(tmp_path), "k1", "edbop", fingerprint):
+            raise ValueError("optimizer failed")
+
+    calls = []
+    with IdempotentRequest(
+        str(tmp_path), "k1", "edbop", fingerprint
+    ) as request:
+        assert not request.replayed
+        calls.append(1)
+        request.complete([0.2])
+
+    assert calls == [1]
+
+
+def test_retry_waits_for_running_request(tmp_path):
+    calls = []
+    fingerprint = request_fingerprint("edbop", [0.1], 1.0, {})
+    claimed = threading.Event()
+
+    def first():
+        with IdempotentRequest(
+            str(tmp_path), "k1", "edbop", fingerprint
+        ) as request:
+            claimed.set()
+            time.sleep(0.3)
+            calls.append(1)
+            request.complete([0.5])
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    claimed.wait()
+
+    with IdempotentRequest(
+        str(tmp_path), "k1", "edbop", fingerprint, poll_interval=0.01
+    ) as request:
+        assert request.replayed
+        assert request.response == [0.5]
+
+    thread.join()
+    assert calls == [1]
+
+
+def test_stale_claim_is_taken_over(tmp_path):
+    fingerprint = request_fingerprint("edbop", [0.1], 1.0, {})
+    with ExperimentStore(str(tmp_path)) as store:
+        assert store.claim_response("k1", "edbop", fingerprint, 60.0)
+
+    time.sleep(0.05)
+    with IdempotentRequest(
+        str(tmp_path), "k1", "edbop", fingerprint, timeout=0.01
+    ) as request:
+        assert not request.replayed
+        request.complete([0.2])
+
+
+def test_responses_are_stored_as_json(tmp_path):
+    fingerprint = request_fingerprint("edbop", [0.1], 1.0, {})
+
+    with IdempotentRequest(
+        str(tmp_path), "k1", "edbop", fingerprint
+    ) as request:
+        request.complete([[0.2, "a"]])
+
+    with ExperimentStore(str(tmp_path)) as store:
+        assert store.find_response("k1")[3] == '[[0.2, "a"]]'
+
+
+def test_responses_that_are_not_json_run_again(tmp_path):
+    fingerprint = request_fingerprint("edbop", [0.1], 1.0, {})
+
+    for _ in range(2):
+        with IdempotentRequest(
+            str(tmp_path), "k1", "edbop", fingerprint
+        ) as request:
+            assert not request.replayed
+            request.complete(object())
@@ -0,0 +1,102 @@
+import pytest
+
+from cyrxnopt.utilities.experiment.observation_log import ObservationLog
+
+
+def test_commit_writes_group(tmp_path):
+    path = tmp_path / "log.csv"
+
+    with ObservationLog(str(path)) as log:
+        log.extend(["x,yield", "1,2"])
+        assert path.read_text() == ""
+
+        log.commit()
+
+        assert path.read_text() == "x,yield\n1,2\n"
+        assert len(log) == 2
+
+
+def test_group_size_commits(tmp_path):
+    path = tmp_path / "log.csv"
+    log = ObservationLog(str(path), fsync="never", group_size=2)
+
+    log.extend(["a", "b", "c"])
+
+    assert path.read_text() == "a\nb\n"
+    log.close()
+    assert path.read_text() == "a\nb\nc\n"
+
+
+def test_read_uses_index(tmp_path):
+    path = tmp_path / "log.csv"
+
+    with ObservationLog(str(path)) as log:
+        log.extend(["a", "bb", "ccc", "dddd"])
+        log.commit()
+
+        assert log.read(1, 3) == ["bb", "ccc"]
+        assert log.read(2) == ["ccc", "dddd"]
+        assert log.read(4) == []
+
+
+def test_reopen_appends(tmp_path):
+    path = tmp_path / "log.csv"
+    with ObservationLog(str(path)) as log:
+        log.append("a")
+
+    with ObservationLog(str(path)) as log:
+        log.append("b")
+
+    with ObservationLog(str(path)) as log:
+        assert log.read() == ["a", "b"]
+
+
+def test_recover_partial_record(tmp_path):
+    path = tmp_path / "log.csv"
+    with ObservationLog(str(path)) as log:
+        log.extend(["a", "b"])
+
+    # Simulate a crash while writing a record
+    with open(path, "a") as fout:
+        fout.write("c,")
+
+    with ObservationLog(str(path)) as log:
+        assert path.read_text() == "a\nb\n"
+        assert log.read() == ["a", "b"]
+
+
+def test_recover_index(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("a\nb\n")
+
+    # Lost index entries are rebuilt from the log
+    with ObservationLog(str(path)) as log:
+        assert len(log) == 2
+        assert log.read(1) == ["b"]
+
+    # Index entries past the end of the log are dropped
+    path.write_text("a\n")
+    with ObservationLog(str(path)) as log:
+        assert log.read() == ["a"]
+
+
+def test_truncate(tmp_path):
+    path = tmp_path / "log.csv"
+
+    with ObservationLog(str(path)) as log:
+        log.extend(["a", "b"])
+        log.commit()
+        log.truncate()
+        log.append("c")
+        log.commit()
+
+        assert log.read() == ["c"]
+
+
+def test_invalid_input(tmp_path):
+    with pytest.raises(ValueError):
+        ObservationLog(str(tmp_path / "log.csv"), fsync="sometimes")
+
+    with ObservationLog(str(tmp_path / "log.csv")) as log:
+        with pytest.raises(ValueError):
+            log.append("a\nb")
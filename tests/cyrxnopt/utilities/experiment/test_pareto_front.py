@@ -0,0 +1,68 @@
+from cyrxnopt.utilities.experiment.pareto_front import (
+    ParetoFront,
+    read_pareto_front,
+    write_pareto_front,
+)
+
+
+def test_pareto_front_keeps_non_dominated(venv_pandas):
+    front = ParetoFront(["max", "min"])
+
+    assert front.add([1.0, 1.0], "a")
+    assert front.add([2.0, 2.0], "b")
+    # Dominated by "a"
+    assert not front.add([0.5, 1.5], "c")
+    # Dominates "a"
+    assert front.add([1.5, 0.5], "d")
+
+    assert front.items == ["b", "d"]
+    assert front.values.tolist() == [[2.0, 2.0], [1.5, 0.5]]
+
+
+def test_pareto_front_single_objective(venv_pandas):
+    front = ParetoFront(["min"])
+
+    for value in [3.0, 1.0, 2.0]:
+        front.add([value], value)
+
+    assert front.items == [1.0]
+
+
+def test_pareto_front_round_trip(venv_pandas, tmp_path):
+    front = ParetoFront(["max", "max"])
+    front.add([1.0, 2.0], ["0.1", "a"])
+    front.add([2.0, 1.0], ["0.2", "b"])
+    path = str(tmp_path / "front.csv")
+
+    write_pareto_front(path, front, ["f1", "f2", "yield", "ee"])
+    result = read_pareto_front(path, ["max", "max"])
+
+    assert result.items == [["0.1", "a"], ["0.2", "b"]]
+    assert result.values.tolist() == [[1.0, 2.0], [2.0, 1.0]]
+
+
+def test_pareto_front_add_is_idempotent(venv_pandas):
+    front = ParetoFront(["max", "min"])
+    front.add([1.0, 1.0], ["0.1", "a"])
+
+    assert front.add([1.0, 1.0], ["0.1", "a"])
+    # Same values with other conditions are a separate result
+    assert front.add([1.0, 1.0], ["0.2", "a"])
+
+    assert front.items == [["0.1", "a"], ["0.2", "a"]]
+
+
+def test_read_pareto_front_does_not_compare(venv_pandas, tmp_path, monkeypatch):
+    front = ParetoFront(["max"])
+    front.add([1.0], ["0.1"])
+    path = str(tmp_path / "front.csv")
+    write_pareto_front(path, front, ["f1", "yield"])
+
+    def add(self, values, item):
+        raise AssertionError("saved front was compared again")
+
+    monkeypatch.setattr(ParetoFront, "add", add)
+    result = read_pareto_front(path, ["max"])
+
+    assert result.items == [["0.1"]]
+    assert result.values.tolist() == [[1.0]]
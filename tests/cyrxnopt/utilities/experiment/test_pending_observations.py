@@ -0,0 +1,88 @@
+from cyrxnopt.utilities.experiment.pending_observations import (
+    PendingObservations,
+)
+
+
+def test_pending_skips_header(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n3,4\n")
+
+    observations = PendingObservations(str(path))
+
+    assert observations.pending() == ["1,2", "3,4"]
+
+
+def test_mark_applied_persists(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n")
+    PendingObservations(str(path)).mark_applied(1)
+
+    with open(path, "a") as fout:
+        fout.write("3,4\n")
+    observations = PendingObservations(str(path))
+
+    assert observations.pending() == ["3,4"]
+
+
+def test_reset(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n")
+    observations = PendingObservations(str(path))
+    observations.mark_applied(1)
+
+    observations.reset()
+
+    assert observations.pending() == ["1,2"]
+
+
+def test_consumers_are_independent(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n")
+    PendingObservations(str(path)).mark_applied(1)
+
+    observations = PendingObservations(str(path), consumer="front")
+
+    assert observations.pending() == ["1,2"]
+
+
+def test_only_rows_after_the_offset_are_read(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n")
+    PendingObservations(str(path)).mark_applied(1)
+    count, offset, _ = (
+        (tmp_path / "observations.csv.applied").read_text().split()
+    )
+    assert (count, offset) == ("1", "12")
+
+    with open(path, "a") as fout:
+        fout.write("3,4\n5,")
+    observations = PendingObservations(str(path))
+
+    # The incomplete last line is not pending yet
+    assert observations.pending() == ["3,4"]
+    observations.mark_applied(1)
+    with open(path, "a") as fout:
+        fout.write("6\n")
+
+    assert PendingObservations(str(path)).pending() == ["5,6"]
+
+
+def test_rewritten_table_falls_back_to_the_count(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n3,4\n")
+    PendingObservations(str(path)).mark_applied(1)
+
+    path.write_text("x,yield\n10,2\n30,4\n")
+
+    assert PendingObservations(str(path)).pending() == ["30,4"]
+
+
+def test_count_only_state(tmp_path):
+    path = tmp_path / "observations.csv"
+    path.write_text("x,yield\n1,2\n3,4\n")
+    (tmp_path / "observations.csv.applied").write_text("1\n")
+    observations = PendingObservations(str(path))
+
+    assert observations.pending() == ["3,4"]
+    observations.mark_applied(1)
+    assert observations.pending() == []
@@ -0,0 +1,93 @@
+import pytest
+
+from cyrxnopt.utilities.experiment.performed_index import (
+    PerformedIndex,
+    hash_conditions,
+    quantize_conditions,
+)
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1", "f2"],
+        "continuous_feature_bounds": [[-1, 1], [0, 10]],
+        "continuous_feature_resolutions": [0.1, 2],
+        "categorical_feature_names": ["f3"],
+        "categorical_feature_values": [["a", "b", "c"]],
+        "budget": 10,
+        "direction": "min",
+    }
+
+
+def test_quantize_conditions_uses_step_and_level_indices(config):
+    result = quantize_conditions([-0.7, 4, "c"], config)
+
+    assert result == (3, 2, 2)
+
+
+def test_quantize_conditions_accepts_encoded_categorical(config):
+    assert quantize_conditions([-0.7, 4, 2], config) == (3, 2, 2)
+    assert quantize_conditions([-0.7, 4, 2.0], config) == (3, 2, 2)
+
+
+def test_quantize_conditions_invalid_categorical(config):
+    with pytest.raises(ValueError):
+        quantize_conditions([-0.7, 4, "d"], config)
+
+    with pytest.raises(ValueError):
+        quantize_conditions([-0.7, 4, 1.5], config)
+
+
+def test_hash_conditions_ignores_float_noise(config):
+    assert hash_conditions([0.30000000000000004, 4, "a"], config) == (
+        hash_conditions([0.3, 4.0, "a"], config)
+    )
+    assert hash_conditions([0.3, 4, "a"], config) != (
+        hash_conditions([0.4, 4, "a"], config)
+    )
+
+
+def test_performed_index_survives_reload(config, tmp_path):
+    performed = PerformedIndex(str(tmp_path), config)
+    assert not performed.exists()
+
+    performed.add([0.1, 2, "b"])
+    performed.add([0.1, 2, "b"])
+
+    reloaded = PerformedIndex(str(tmp_path), config)
+
+    assert reloaded.exists()
+    assert len(reloaded) == 1
+    assert [0.1, 2, "b"] in reloaded
+    assert [0.1, 2, "c"] not in reloaded
+
+
+def test_performed_index_first_missing_out_of_order(config, tmp_path):
+    combos = [[-1, 0, 0], [0, 0, 1], [1, 10, 2]]
+    performed = PerformedIndex(str(tmp_path), config)
+
+    assert performed.first_missing(combos) == 0
+
+    performed.add([0, 0, "b"])
+    assert performed.first_missing(combos) == 0
+
+    # Conditions being recorded count without entering the index
+    assert performed.first_missing(combos, [[-1, 0, "a"]]) == 2
+    assert [-1, 0, "a"] not in performed
+
+    performed.add([-1, 0, "a"])
+    assert performed.first_missing(combos) == 2
+
+    performed.add([1, 10, "c"])
+    assert performed.first_missing(combos) == -1
+
+
+def test_performed_index_clear(config, tmp_path):
+    performed = PerformedIndex(str(tmp_path), config)
+    performed.add([0.1, 2, "b"])
+
+    performed.clear()
+
+    assert len(performed) == 0
+    assert len(PerformedIndex(str(tmp_path), config)) == 0
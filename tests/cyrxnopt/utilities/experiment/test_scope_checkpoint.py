@@ -0,0 +1,85 @@
+import pytest
+
+from cyrxnopt.utilities.config.encoding import encode_candidates
+from cyrxnopt.utilities.experiment.scope_checkpoint import (
+    load_scope_checkpoint,
+    save_scope_checkpoint,
+)
+
+
+@pytest.fixture
+def config():
+    return {
+        "continuous_feature_names": ["f1"],
+        "continuous_feature_bounds": [[-1, 1]],
+        "continuous_feature_resolutions": [0.5],
+        "categorical_feature_names": ["f2"],
+        "categorical_feature_values": [["a", "b"]],
+        "budget": 10,
+        "objectives": ["yield"],
+        "direction": ["min"],
+    }
+
+
+def test_scope_checkpoint_round_trip(venv_pandas, config, tmp_path):
+    import pandas as pd
+
+    scope = encode_candidates(
+        pd.DataFrame(
+            {
+                "f1": [0.5, -1.0, 1.0],
+                "f2": ["b", "a", "a"],
+                "yield": ["PENDING", 2.5, "PENDING"],
+                "priority": [0.9, -1.0, 0.1],
+                "cyrxnopt_row": [7, 0, 8],
+            }
+        ),
+        config,
+    )
+    path = str(tmp_path / "scope.npz")
+
+    save_scope_checkpoint(path, scope, config, ["yield"])
+    result = load_scope_checkpoint(path, config)
+
+    assert list(result.columns) == [
+        "f1",
+        "f2",
+        "yield",
+        "priority",
+        "cyrxnopt_row",
+    ]
+    assert result["f1"].tolist() == [3, 0, 4]
+    assert result["f2"].tolist() == ["b", "a", "a"]
+    assert result["yield"].tolist() == ["PENDING", 2.5, "PENDING"]
+    assert result["priority"].tolist() == [0.9, -1.0, 0.1]
+    assert result["cyrxnopt_row"].tolist() == [7, 0, 8]
+    assert result["cyrxnopt_row"].dtype == "int64"
+    assert [path.name for path in tmp_path.iterdir()] == ["scope.npz"]
+
+
+def test_scope_checkpoint_maps_the_feature_codes(venv_pandas, config, tmp_path):
+    import numpy as np
+    import pandas as pd
+
+    scope = encode_candidates(
+        pd.DataFrame(
+            {"f1": [0.5, -1.0], "f2": ["b", "a"], "yield": [1.0, 2.0]}
+        ),
+        config,
+    )
+    path = str(tmp_path / "scope.npz")
+    save_scope_checkpoint(path, scope, config, ["yield"])
+
+    result = load_scope_checkpoint(path, config)
+    codes = result["f1"].to_numpy()
+
+    # The column is a read-only view of the file rather than a copy
+    while codes.base is not None and not isinstance(codes, np.memmap):
+        codes = codes.base
+    assert isinstance(codes, np.memmap)
+    assert not codes.flags.writeable
+
+    # A new save replaces the file, so the mapped table keeps its values
+    save_scope_checkpoint(path, scope.iloc[::-1], config, ["yield"])
+    assert result["f1"].tolist() == [3, 0]
+    assert load_scope_checkpoint(path, config)["f1"].tolist() == [0, 3]
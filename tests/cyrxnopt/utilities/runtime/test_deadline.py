@@ -0,0 +1,219 @@
+import logging
+import os
+import threading
+
+import joblib
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt.utilities.experiment.experiment_store import ExperimentStore
+from cyrxnopt.utilities.runtime import resources
+from cyrxnopt.utilities.runtime.deadline import (
+    DegradedSuggestion,
+    fallback_suggestion,
+)
+
+CONFIG = {
+    "continuous_feature_names": ["f1"],
+    "continuous_feature_bounds": [[0, 10]],
+    "continuous_feature_resolutions": [1],
+    "experiment_store": True,
+}
+
+
+class BlockedOptimizer:
+    """Optimizer that only suggests once it is released, then records the
+    result it was given in ``data.txt``, and records the suggestions it was
+    asked to replace."""
+
+    release = threading.Event()
+    replaced = []
+    n_jobs = []
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        self.n_jobs.append(joblib.parallel.get_active_backend()[1])
+        self.release.wait(10)
+        with open(os.path.join(experiment_dir, "data.txt"), "a") as fout:
+            fout.write("{},{}\n".format(prev_param, yield_value))
+
+        return [7.0]
+
+    def replace_suggestion(self, made, given, experiment_dir, config):
+        self.replaced.append((made, list(given)))
+
+
+@pytest.fixture
+def blocked_optimizer(monkeypatch):
+    BlockedOptimizer.release = threading.Event()
+    BlockedOptimizer.replaced = []
+    BlockedOptimizer.n_jobs = []
+    monkeypatch.setattr(
+        controller, "get_optimizer", lambda name, venv: BlockedOptimizer()
+    )
+
+    yield BlockedOptimizer
+
+    BlockedOptimizer.release.set()
+
+
+def test_fallback_prefers_late_then_prefetched(venv_pandas):
+    suggestion = fallback_suggestion(
+        CONFIG,
+        late=[[1.0]],
+        prefetched=[[1.0], [2.0]],
+        observed=[[2.0]],
+        batch_size=3,
+    )
+
+    assert isinstance(suggestion, DegradedSuggestion)
+    assert suggestion.degraded
+    assert suggestion[0] == [1.0]
+    assert suggestion[1] not in ([1.0], [2.0])
+    assert suggestion.sources == ["late", "space_filling", "space_filling"]
+
+    single = fallback_suggestion(CONFIG, prefetched=[[3.0]])
+    assert single == [3.0]
+    assert single.sources == ["prefetch"]
+
+
+def test_predict_within_deadline(blocked_optimizer, tmp_path):
+    blocked_optimizer.release.set()
+
+    result = controller.predict(
+        "blocked", None, [1.0], 2.0, str(tmp_path), CONFIG, deadline=5.0
+    )
+
+    assert result == [7.0]
+    assert not isinstance(result, DegradedSuggestion)
+
+
+def test_predict_falls_back_after_deadline(
+    venv_pandas, blocked_optimizer, tmp_path
+):
+    experiment_dir = str(tmp_path)
+
+    fallback = controller.predict(
+        "blocked", None, [1.0], 2.0, experiment_dir, CONFIG, deadline=0.1
+    )
+
+    assert fallback.degraded
+    assert fallback.sources == ["space_filling"]
+    assert fallback != [1.0]
+
+    # The late prediction still gives the optimizer its result, and the next
+    # call waits for it before running
+    blocked_optimizer.release.set()
+    result = controller.predict(
+        "blocked", None, fallback, 3.0, experiment_dir, CONFIG
+    )
+
+    assert result == [7.0]
+    # The late suggestion was never given out
+    assert blocked_optimizer.replaced == [([7.0], list(fallback))]
+    assert (tmp_path / "data.txt").read_text() == "[1.0],2.0\n{},3.0\n".format(
+        list(fallback)
+    )
+
+    with ExperimentStore(experiment_dir) as store:
+        calls = [timing[0] for timing in store.timings("blocked")]
+        assert calls.count("deadline_fallback") == 1
+        assert calls.count("predict") == 2
+        assert store.observations("blocked") == [
+            ([1.0], 2.0),
+            (list(fallback), 3.0),
+        ]
+
+
+def test_late_suggestion_is_the_next_fallback(
+    venv_pandas, blocked_optimizer, tmp_path
+):
+    experiment_dir = str(tmp_path)
+
+    controller.predict(
+        "blocked", None, [1.0], 2.0, experiment_dir, CONFIG, deadline=0.1
+    )
+    blocked_optimizer.release.set()
+
+    # Wait for the late prediction to finish
+    with controller._background_lock:
+        late = controller._late_predictions[os.path.abspath(experiment_dir)]
+    late.result()
+
+    blocked_optimizer.release.clear()
+    fallback = controller.predict(
+        "blocked", None, [2.0], 3.0, experiment_dir, CONFIG, deadline=0.1
+    )
+
+    assert fallback == [7.0]
+    assert fallback.sources == ["late"]
+    blocked_optimizer.release.set()
+
+
+def test_late_prediction_runs_under_the_budget(
+    venv_pandas, blocked_optimizer, tmp_path
+):
+    experiment_dir = str(tmp_path)
+
+    fallback = controller.predict(
+        "blocked",
+        None,
+        [1.0],
+        2.0,
+        experiment_dir,
+        CONFIG,
+        resources={"threads": 1},
+        deadline=0.1,
+    )
+
+    assert fallback.degraded
+    # The caller holds no budget once the call returned
+    with resources.resource_budget({"threads": 2}):
+        pass
+
+    blocked_optimizer.release.set()
+    with controller._background_lock:
+        late = controller._late_predictions[os.path.abspath(experiment_dir)]
+    late.result()
+
+    assert blocked_optimizer.n_jobs == [1]
+
+
+def test_thread_workers_keep_to_thread_limits(blocked_optimizer, tmp_path):
+    blocked_optimizer.release.set()
+
+    with resources.thread_worker():
+        with pytest.raises(ValueError, match="worker processes"):
+            controller.predict(
+                "blocked",
+                None,
+                [1.0],
+                2.0,
+                str(tmp_path),
+                CONFIG,
+                resources={"memory_limit": 1024},
+                deadline=5.0,
+            )
+
+
+def test_late_suggestion_that_cannot_be_replaced_is_logged(
+    venv_pandas, blocked_optimizer, monkeypatch, tmp_path, caplog
+):
+    class UnreplacingOptimizer:
+        def predict(self, *args):
+            return BlockedOptimizer().predict(*args)
+
+    monkeypatch.setattr(
+        controller, "get_optimizer", lambda name, venv: UnreplacingOptimizer()
+    )
+    experiment_dir = str(tmp_path)
+
+    controller.predict(
+        "unreplacing", None, [1.0], 2.0, experiment_dir, CONFIG, deadline=0.1
+    )
+    blocked_optimizer.release.set()
+    with caplog.at_level(logging.WARNING, logger=controller.logger.name):
+        with controller._background_lock:
+            late = controller._late_predictions[os.path.abspath(experiment_dir)]
+        late.result()
+
+    assert "cannot replace the suggestion [7.0]" in caplog.text
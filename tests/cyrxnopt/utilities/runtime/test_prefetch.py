@@ -0,0 +1,187 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import cyrxnopt.OptimizerController as controller
+from cyrxnopt.utilities.experiment.experiment_store import ExperimentStore
+from cyrxnopt.utilities.runtime.prefetch import Speculation, liar_value
+
+
+class FakeOptimizer:
+    """Optimizer that records each result as a line of ``data.txt`` and
+    suggests the number of results it has seen. Suggestions it did not make
+    are recorded in ``taken.txt``."""
+
+    calls: list[str] = []
+    speculated: list[tuple] = []
+
+    def predict(self, prev_param, yield_value, experiment_dir, config):
+        self._record(prev_param, yield_value, experiment_dir)
+
+        self.calls.append(experiment_dir)
+        with open(os.path.join(experiment_dir, "data.txt")) as fin:
+            return [float(len(fin.readlines()))]
+
+    def speculate(self, pending, yield_value, experiment_dir, config):
+        self.speculated.append((pending, yield_value))
+        with open(os.path.join(experiment_dir, "data.txt")) as fin:
+            return [float(len(fin.readlines()) + 1)]
+
+    def record_results(
+        self, prev_param, yield_value, experiment_dir, config, suggestion
+    ):
+        self._record(prev_param, yield_value, experiment_dir)
+        with open(os.path.join(experiment_dir, "taken.txt"), "a") as fout:
+            fout.write("{}\n".format(suggestion[0]))
+
+    def _record(self, prev_param, yield_value, experiment_dir):
+        if len(prev_param) > 0:
+            path = os.path.join(experiment_dir, "data.txt")
+            with open(path, "a") as fout:
+                fout.write("{},{}\n".format(prev_param[0], yield_value))
+
+
+@pytest.fixture
+def fake_optimizer(monkeypatch, tmp_path):
+    FakeOptimizer.calls = []
+    FakeOptimizer.speculated = []
+    monkeypatch.setattr(
+        controller, "get_optimizer", lambda name, venv: FakeOptimizer()
+    )
+    (tmp_path / "data.txt").write_text("")
+
+    yield FakeOptimizer
+
+    speculation = controller._pop_speculation(str(tmp_path))
+    if speculation is not None:
+        speculation.cancel()
+        speculation.sync(retry=False)
+
+
+def test_liar_value():
+    assert liar_value([1, 2, "x", float("nan"), 6]) == 3.0
+    assert liar_value([1, 2, 6], "min") == 1.0
+    assert liar_value([1, 2, 6], "max") == 6.0
+    assert liar_value([1, 2], 0.5) == 0.5
+    assert liar_value([[1, 2]]) is None
+
+    with pytest.raises(ValueError):
+        liar_value([1.0], "median")
+
+
+def test_speculation_predicts_with_the_liar():
+    seen = []
+
+    def predict(pending, results):
+        seen.append((pending, results))
+        return [2.0]
+
+    with ThreadPoolExecutor() as executor:
+        speculation = Speculation([[1.0], [2.0]], 0.5, predict, executor)
+        assert speculation.result() == [2.0]
+
+    assert seen == [([[1.0], [2.0]], [0.5, 0.5])]
+
+    # Any result for the pending conditions is accepted by default
+    assert speculation.matches([[2.0], [1.0]], [0.5, 0.5])
+    assert speculation.matches([[2.0], [1.0]], [0.4, 0.9])
+    assert speculation.matches([[2.0], [1.0]], [0.4, 0.6], tolerance=0.1)
+    assert not speculation.matches([[2.0], [1.0]], [0.4, 0.9], tolerance=0.1)
+    assert not speculation.matches([[1.0]], [0.5])
+    assert not speculation.matches([1.0], 0.5)
+
+
+def test_speculation_reconciles_first():
+    order = []
+
+    with ThreadPoolExecutor() as executor:
+        speculation = Speculation(
+            [1.0],
+            0.5,
+            lambda pending, results: order.append("predict"),
+            executor,
+            reconcile=lambda: order.append("reconcile"),
+        )
+        speculation.sync()
+        speculation.result()
+
+    assert order == ["reconcile", "predict"]
+
+
+def test_predict_returns_prefetched_suggestion(fake_optimizer, tmp_path):
+    config = {"experiment_store": True, "prefetch": True}
+    experiment_dir = str(tmp_path)
+
+    first = controller.predict("fake", None, [], None, experiment_dir, config)
+    assert first == [0.0]
+
+    # No results yet, so there is nothing to base a liar on
+    assert controller._pop_speculation(experiment_dir) is None
+
+    second = controller.predict(
+        "fake", None, first, 1.0, experiment_dir, config
+    )
+    assert second == [1.0]
+
+    # The suggestion after the second one was predicted with the liar
+    third = controller.predict(
+        "fake", None, second, 3.0, experiment_dir, config
+    )
+    assert third == [2.0]
+
+    speculation = controller._pop_speculation(experiment_dir)
+    speculation.sync()
+    assert speculation.liar == 2.0
+    assert speculation.result() == [3.0]
+    assert fake_optimizer.speculated == [([1.0], 1.0), ([2.0], 2.0)]
+
+    # The real results reached the experiment's files, not the liar, and
+    # the prefetched suggestion was taken over without predicting again
+    assert (tmp_path / "data.txt").read_text() == "0.0,1.0\n1.0,3.0\n"
+    assert (tmp_path / "taken.txt").read_text() == "2.0\n"
+    assert fake_optimizer.calls.count(experiment_dir) == 2
+    with ExperimentStore(experiment_dir) as store:
+        calls = [timing[0] for timing in store.timings("fake")]
+        assert calls.count("prefetch") == 2
+        assert calls.count("reconcile") == 1
+        assert store.observations("fake") == [([0.0], 1.0), ([1.0], 3.0)]
+
+
+def test_predict_recomputes_outside_tolerance(fake_optimizer, tmp_path):
+    config = {"prefetch": True, "prefetch_tolerance": 0.1, "prefetch_liar": 0}
+    experiment_dir = str(tmp_path)
+
+    first = controller.predict("fake", None, [], None, experiment_dir, config)
+    second = controller.predict(
+        "fake", None, first, 1.0, experiment_dir, config
+    )
+    n_calls = len(fake_optimizer.calls)
+
+    controller.predict("fake", None, second, 5.0, experiment_dir, config)
+
+    # The prefetch was ignored and the real directory predicted again
+    assert experiment_dir in fake_optimizer.calls[n_calls:]
+    assert (tmp_path / "data.txt").read_text() == "0.0,1.0\n1.0,5.0\n"
+
+
+def test_predict_reconciles_by_default(fake_optimizer, tmp_path):
+    config = {"prefetch": True}
+    experiment_dir = str(tmp_path)
+
+    first = controller.predict("fake", None, [], None, experiment_dir, config)
+    second = controller.predict(
+        "fake", None, first, 1.0, experiment_dir, config
+    )
+    n_calls = len(fake_optimizer.calls)
+
+    # The liar is 1.0, but the prefetch is taken over for any real result
+    third = controller.predict(
+        "fake", None, second, 1.5, experiment_dir, config
+    )
+    controller._pop_speculation(experiment_dir).sync()
+
+    assert third == [2.0]
+    assert fake_optimizer.calls[n_calls:] == []
+    assert (tmp_path / "data.txt").read_text() == "0.0,1.0\n1.0,1.5\n"
+    assert (tmp_path / "taken.txt").read_text() == "2.0\n"
@@ -0,0 +1,164 @@
+import os
+import threading
+
+import pytest
+
+from cyrxnopt.utilities.runtime.resources import (
+    BLAS_THREAD_VARIABLES,
+    resource_budget,
+    thread_worker,
+)
+
+
+def test_resource_budget_empty_spec():
+    with resource_budget({}) as applied:
+        assert applied == {}
+
+
+def test_resource_budget_restores_blas_variables(monkeypatch):
+    for name in BLAS_THREAD_VARIABLES:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("OMP_NUM_THREADS", "8")
+
+    with resource_budget({"blas_threads": 2}) as applied:
+        assert applied["blas_threads"] == 2
+        for name in BLAS_THREAD_VARIABLES:
+            assert os.environ[name] == "2"
+
+    assert os.environ["OMP_NUM_THREADS"] == "8"
+    assert "MKL_NUM_THREADS" not in os.environ
+
+
+def test_resource_budget_limits_joblib():
+    import joblib
+
+    with resource_budget({"threads": 1}) as applied:
+        assert applied["joblib_n_jobs"] == 1
+        assert joblib.effective_n_jobs() == 1
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="Requires CPU affinity"
+)
+def test_resource_budget_restores_cpu_affinity():
+    previous = os.sched_getaffinity(0)
+    cpu = min(previous)
+
+    with resource_budget({"cpu_affinity": [cpu]}) as applied:
+        assert os.sched_getaffinity(0) == {cpu}
+        assert applied["cpu_affinity"] == [cpu]
+
+    assert os.sched_getaffinity(0) == previous
+
+
+def test_resource_budget_cannot_be_nested():
+    with resource_budget({}):
+        with pytest.raises(RuntimeError, match="nested"):
+            with resource_budget({}):
+                pass
+
+    # The failed attempt did not release the outer budget early
+    with resource_budget({}):
+        pass
+
+
+def test_resource_budgets_run_one_at_a_time(monkeypatch):
+    monkeypatch.setenv("OMP_NUM_THREADS", "8")
+    entered = threading.Event()
+    release = threading.Event()
+    seen = []
+
+    def other():
+        with resource_budget({"blas_threads": 2}):
+            entered.set()
+            release.wait(10)
+            seen.append(os.environ["OMP_NUM_THREADS"])
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    entered.wait(10)
+
+    def release_soon():
+        release.set()
+
+    timer = threading.Timer(0.1, release_soon)
+    timer.start()
+    with resource_budget({"blas_threads": 1}):
+        # The other budget exited and was restored before this one applied
+        seen.append(os.environ["OMP_NUM_THREADS"])
+    thread.join()
+    timer.join()
+
+    assert seen == ["2", "1"]
+    assert os.environ["OMP_NUM_THREADS"] == "8"
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="Requires CPU affinity"
+)
+def test_resource_budget_pins_every_thread_of_the_process():
+    previous = os.sched_getaffinity(0)
+    cpu = min(previous)
+    started = threading.Event()
+    release = threading.Event()
+    native_id = []
+
+    def other():
+        native_id.append(threading.get_native_id())
+        started.set()
+        release.wait(10)
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    started.wait(10)
+
+    try:
+        with resource_budget({"cpu_affinity": [cpu]}):
+            assert os.sched_getaffinity(native_id[0]) == {cpu}
+
+        assert os.sched_getaffinity(native_id[0]) == previous
+    finally:
+        release.set()
+        thread.join()
+
+
+@pytest.mark.parametrize(
+    "spec", [{"memory_limit": 1024}, {"blas_threads": 1, "threads": 1}]
+)
+def test_thread_workers_refuse_process_wide_limits(spec):
+    with thread_worker():
+        with pytest.raises(ValueError, match="worker processes"):
+            with resource_budget(spec):
+                pass
+
+        with resource_budget({"threads": 1}) as applied:
+            assert applied == {"joblib_n_jobs": 1}
+
+
+def test_thread_worker_budgets_do_not_wait(monkeypatch):
+    from joblib.parallel import get_active_backend
+
+    entered = threading.Event()
+    release = threading.Event()
+    seen = []
+
+    def other():
+        with thread_worker(), resource_budget({"threads": 2}):
+            entered.set()
+            release.wait(10)
+            seen.append(get_active_backend()[1])
+
+    thread = threading.Thread(target=other)
+    thread.start()
+    entered.wait(10)
+
+    try:
+        # The budget of the other thread is still active, and only applies
+        # to that thread
+        with thread_worker(), resource_budget({"threads": 1}):
+            seen.append(get_active_backend()[1])
+    finally:
+        release.set()
+        thread.join()
+
+    assert seen == [1, 2]
@@ -0,0 +1,39 @@
+import pytest
+
+from cyrxnopt.utilities.runtime.workers import (
+    CallCancelled,
+    CancellationToken,
+    cancellable,
+    cancellable_objective,
+    check_cancelled,
+)
+
+
+def test_check_cancelled_uses_the_token_of_the_call():
+    token = CancellationToken()
+
+    # Calls without a token are never stopped
+    check_cancelled()
+
+    with cancellable(token):
+        check_cancelled()
+        token.cancel()
+        with pytest.raises(CallCancelled):
+            check_cancelled()
+
+    check_cancelled()
+
+
+def test_cancellable_objective_stops_before_evaluating():
+    token = CancellationToken()
+    calls = []
+    objective = cancellable_objective(lambda x: calls.append(x) or x)
+
+    with cancellable(token):
+        assert objective(1.0) == 1.0
+        token.cancel()
+        with pytest.raises(CallCancelled):
+            objective(2.0)
+
+    assert calls == [1.0]
+    assert cancellable_objective(None) is None